@@ -0,0 +1,4 @@
+"""
+Benchmark di CyberSentinel
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
@@ -0,0 +1,81 @@
+"""
+Benchmark Report - CyberSentinel
+Misura il costo per report di piccole scansioni quando molti report
+vengono generati nello stesso processo (stili a freddo vs a caldo)
+
+Uso: python -m benchmarks.bench_report [--reports N] [--hosts N]
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import ScanResult, HostResult, PortResult
+from src.report_generator import ReportGenerator, clear_style_cache
+
+
+def small_scan(hosts: int) -> ScanResult:
+    """Scansione sintetica con pochi host e porte miste"""
+    result = ScanResult(target="192.168.1.0/24")
+    result.hosts = [
+        HostResult(
+            ip=f"192.168.1.{i + 1}", state="up",
+            ports=[
+                PortResult(port=445, state="open", service="SMB"),
+                PortResult(port=8080, state="open", service="HTTP Alternativo"),
+                PortResult(port=443, state="open", service="HTTPS"),
+            ]
+        )
+        for i in range(hosts)
+    ]
+    return result
+
+
+def run(reports: int, hosts: int, cold: bool) -> float:
+    """
+    Genera `reports` report e restituisce il tempo medio per report
+
+    Args:
+        reports: Numero di report da generare
+        hosts: Host per scansione
+        cold: Se True svuota la cache e crea un generatore per ogni report
+    """
+    scan = small_scan(hosts)
+    generator = ReportGenerator()
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "report.pdf")
+        start = time.perf_counter()
+        for _ in range(reports):
+            if cold:
+                clear_style_cache()
+                generator = ReportGenerator()
+            generator.generate(scan, output)
+        return (time.perf_counter() - start) / reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark costo per report")
+    parser.add_argument("--reports", type=int, default=50, help="Report per misura")
+    parser.add_argument("--hosts", type=int, default=3, help="Host per scansione")
+    args = parser.parse_args()
+
+    # Riscaldamento (import, font, cache del classificatore)
+    run(2, args.hosts, cold=True)
+
+    cold = run(args.reports, args.hosts, cold=True)
+    warm = run(args.reports, args.hosts, cold=False)
+    print(f"Report per misura: {args.reports} ({args.hosts} host ciascuno)")
+    print(f"Stili a freddo: {cold * 1000:8.2f} ms/report")
+    print(f"Stili in cache: {warm * 1000:8.2f} ms/report")
+    print(f"Risparmio:      {(cold - warm) * 1000:8.2f} ms/report ({100 * (cold - warm) / cold:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
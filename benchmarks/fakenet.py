@@ -0,0 +1,216 @@
+"""
+Rete Simulata - CyberSentinel
+Rete finta e riproducibile su indirizzi di loopback 127.x.y.z
+
+Comportamenti per porta:
+- open:     accetta e chiude la connessione
+- banner:   accetta, invia il banner del servizio e chiude
+- slow:     accetta e invia il banner dopo `delay` secondi
+- filtered: coda di accept piena, il SYN viene scartato (timeout)
+- closed:   nessun listener, connessione rifiutata (default)
+
+Tutti i listener sono serviti da un solo thread con selectors.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import heapq
+import ipaddress
+import random
+import selectors
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+BEHAVIOURS = ("open", "banner", "slow", "filtered", "closed")
+
+# Banner inviati dai servizi simulati
+DEFAULT_BANNERS = {
+    21: b"220 ProFTPD 1.3.5 Server ready\r\n",
+    22: b"SSH-2.0-OpenSSH_7.4\r\n",
+    23: b"\xff\xfd\x18\xff\xfd\x20login: ",
+    25: b"220 mail.example.local ESMTP Postfix\r\n",
+    80: b"HTTP/1.0 200 OK\r\nServer: Apache/2.4.29\r\n\r\n",
+    110: b"+OK Dovecot ready.\r\n",
+    143: b"* OK IMAP4rev1 Service Ready\r\n",
+    3306: b"J\x00\x00\x00\n5.5.62\x00",
+    5900: b"RFB 003.008\n",
+    8080: b"HTTP/1.1 401 Unauthorized\r\nServer: Apache-Coyote/1.1\r\n\r\n",
+}
+
+
+class FakeNetwork:
+    """
+    Rete simulata avviabile come context manager
+
+    Args:
+        hosts: IP -> {porta: comportamento}
+        banners: Banner per porta (default: DEFAULT_BANNERS)
+        delay: Ritardo del banner per le porte "slow" (secondi)
+    """
+
+    def __init__(
+        self,
+        hosts: Dict[str, Dict[int, str]],
+        banners: Optional[Dict[int, bytes]] = None,
+        delay: float = 0.2
+    ):
+        for services in hosts.values():
+            for behaviour in services.values():
+                if behaviour not in BEHAVIOURS:
+                    raise ValueError(f"Comportamento non valido: {behaviour}")
+        self.hosts = hosts
+        self.banners = banners if banners is not None else DEFAULT_BANNERS
+        self.delay = delay
+
+        self._selector = selectors.DefaultSelector()
+        self._sockets: List[socket.socket] = []
+        self._pending: List = []          # heap di (scadenza, n, connessione, banner)
+        self._counter = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.accepted = 0
+
+    @classmethod
+    def generate(
+        cls,
+        count: int,
+        ports: List[int],
+        subnet: str = "127.20.0.0/16",
+        open_ratio: float = 0.3,
+        filtered_ratio: float = 0.05,
+        banner_ratio: float = 0.5,
+        slow_ratio: float = 0.0,
+        seed: int = 0,
+        **kwargs
+    ) -> "FakeNetwork":
+        """
+        Rete casuale ma riproducibile (stesso seed, stessa rete)
+
+        Args:
+            count: Numero di host
+            ports: Porte simulate su ogni host
+            subnet: Rete di loopback da usare
+            open_ratio: Probabilità che una porta sia aperta
+            filtered_ratio: Probabilità che una porta sia filtrata
+            banner_ratio: Quota delle porte aperte che inviano il banner
+            slow_ratio: Quota delle porte aperte con banner ritardato
+            seed: Seme del generatore casuale
+        """
+        rng = random.Random(seed)
+        addresses = ipaddress.ip_network(subnet).hosts()
+        hosts = {}
+        for _ in range(count):
+            services = {}
+            for port in ports:
+                roll = rng.random()
+                if roll < open_ratio:
+                    kind = rng.random()
+                    if kind < slow_ratio:
+                        services[port] = "slow"
+                    elif kind < slow_ratio + banner_ratio and port in DEFAULT_BANNERS:
+                        services[port] = "banner"
+                    else:
+                        services[port] = "open"
+                elif roll < open_ratio + filtered_ratio:
+                    services[port] = "filtered"
+            hosts[str(next(addresses))] = services
+        return cls(hosts, **kwargs)
+
+    def expected_open(self) -> Dict[str, List[int]]:
+        """Porte aperte attese per host (per verificare i risultati)"""
+        return {
+            ip: sorted(p for p, b in services.items() if b in ("open", "banner", "slow"))
+            for ip, services in self.hosts.items()
+        }
+
+    def start(self) -> "FakeNetwork":
+        """Apre tutti i listener e avvia il thread di servizio"""
+        for ip, services in self.hosts.items():
+            for port, behaviour in services.items():
+                if behaviour == "closed":
+                    continue
+                listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                listener.bind((ip, port))
+                self._sockets.append(listener)
+
+                if behaviour == "filtered":
+                    self._fill_backlog(listener, ip, port)
+                    continue
+
+                listener.listen(128)
+                listener.setblocking(False)
+                self._selector.register(listener, selectors.EVENT_READ, (port, behaviour))
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def _fill_backlog(self, listener: socket.socket, ip: str, port: int) -> None:
+        """Riempie la coda di accept: i SYN successivi vengono scartati"""
+        listener.listen(0)
+        for _ in range(2):
+            filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            filler.setblocking(False)
+            filler.connect_ex((ip, port))
+            self._sockets.append(filler)
+
+    def _serve(self) -> None:
+        while self._running:
+            timeout = 0.05
+            if self._pending:
+                timeout = max(0.0, min(timeout, self._pending[0][0] - time.monotonic()))
+
+            for key, _ in self._selector.select(timeout):
+                port, behaviour = key.data
+                try:
+                    conn, _ = key.fileobj.accept()
+                except (BlockingIOError, OSError):
+                    continue
+                self.accepted += 1
+                banner = self.banners.get(port, b"") if behaviour != "open" else b""
+                if behaviour == "slow":
+                    self._counter += 1
+                    heapq.heappush(
+                        self._pending,
+                        (time.monotonic() + self.delay, self._counter, conn, banner)
+                    )
+                else:
+                    self._reply(conn, banner)
+
+            now = time.monotonic()
+            while self._pending and self._pending[0][0] <= now:
+                _, _, conn, banner = heapq.heappop(self._pending)
+                self._reply(conn, banner)
+
+    @staticmethod
+    def _reply(conn: socket.socket, banner: bytes) -> None:
+        try:
+            if banner:
+                conn.sendall(banner)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def stop(self) -> None:
+        """Chiude listener e connessioni in sospeso"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+        for _, _, conn, _ in self._pending:
+            conn.close()
+        self._pending.clear()
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+        self._sockets.clear()
+
+    def __enter__(self) -> "FakeNetwork":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,348 @@
+"""
+Suite di Benchmark - CyberSentinel
+Misura scansione, classificazione e report su una rete simulata locale
+e confronta i risultati con una baseline salvata per rilevare regressioni
+
+Uso:
+    python -m benchmarks.suite                  # esegue e confronta con la baseline
+    python -m benchmarks.suite --quick          # dimensioni ridotte
+    python -m benchmarks.suite --save-baseline  # salva i risultati come baseline
+    python -m benchmarks.suite --only scan classify
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import PortScanner, ScanResult, HostResult, PortResult
+from src.classifier import PortClassifier
+from benchmarks.fakenet import FakeNetwork
+
+ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Dimensioni (normale, --quick)
+SIZES = {
+    "scan_hosts": (64, 16),
+    "classify_hosts": (20000, 2000),
+    "report_pdf_hosts": (500, 100),
+    "report_html_hosts": (20000, 2000),
+    "vuln_lookups": (200000, 20000),
+    "startup_runs": (10, 5),
+}
+
+# Esegue run.py e si ferma al primo connect_ex: stampa il tempo dall'avvio,
+# se reportlab è stato importato e se nmap è stato cercato
+FIRST_PROBE_SCRIPT = textwrap.dedent("""
+    import time
+    t0 = time.perf_counter()
+    import os, socket, sys
+    sys.path.insert(0, os.getcwd())
+
+    def first_probe(self, address):
+        elapsed = time.perf_counter() - t0
+        from src.scanner import PortScanner
+        checked = PortScanner._nmap_checked is not None
+        sys.__stdout__.write(f"{elapsed} {'reportlab' in sys.modules} {checked}\\n")
+        sys.__stdout__.flush()
+        os._exit(0)
+
+    socket.socket.connect_ex = first_probe
+    sys.argv = ["run.py", "--target", "127.0.0.1", "--no-nmap",
+                "--json-only", "--no-banner", "--no-progress"]
+    with open("run.py", encoding="utf-8") as f:
+        exec(compile(f.read(), "run.py", "exec"), {"__name__": "__main__"})
+""")
+
+
+def first_probe(env: Optional[Dict[str, str]] = None) -> tuple:
+    """
+    Avvia la CLI (--json-only) in un nuovo interprete fino alla prima sonda
+
+    Returns:
+        (secondi dall'avvio, reportlab importato, nmap cercato)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", FIRST_PROBE_SCRIPT], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+    if not proc.stdout.strip():
+        raise RuntimeError(f"La CLI non ha raggiunto la prima sonda: {proc.stderr[-500:]}")
+    elapsed, reportlab, nmap = proc.stdout.splitlines()[-1].split()
+    return float(elapsed), reportlab == "True", nmap == "True"
+
+
+def synthetic_scan(hosts: int) -> ScanResult:
+    """Scansione sintetica con porte miste (critiche, attenzione, OK)"""
+    result = ScanResult(target="10.0.0.0/8")
+    layout = ((445, "SMB"), (3389, "RDP"), (22, "SSH"), (8080, ""), (443, "HTTPS"))
+    result.hosts = [
+        HostResult(
+            ip=f"10.{i // 65000}.{i // 250 % 260}.{i % 250 + 1}",
+            state="up",
+            ports=[
+                PortResult(port=port, state="open", service=service)
+                for j, (port, service) in enumerate(layout) if (i + j) % 3
+            ]
+        )
+        for i in range(hosts)
+    ]
+    return result
+
+
+def bench_scan(hosts: int) -> Dict:
+    """PortScanner (backend socket) contro la rete simulata"""
+    network = FakeNetwork.generate(
+        hosts, PortScanner.DEFAULT_PORTS,
+        open_ratio=0.25, filtered_ratio=0.01, slow_ratio=0.1, delay=0.05
+    )
+    scanner = PortScanner(timeout=0.2, use_nmap=False)
+    with network, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        found = scanner.scan_hosts(list(network.hosts))
+        seconds = time.perf_counter() - start
+
+    expected = network.expected_open()
+    detected = {h.ip: sorted(p.port for p in h.ports) for h in found}
+    mismatches = sum(1 for ip, ports in expected.items() if detected.get(ip, []) != ports)
+    return {
+        "seconds": seconds,
+        "items": hosts * len(scanner.ports),
+        "mismatches": mismatches,
+    }
+
+
+def bench_classify(hosts: int) -> Dict:
+    """PortClassifier.classify_scan_results su una scansione sintetica"""
+    result = synthetic_scan(hosts)
+    classifier = PortClassifier()
+    start = time.perf_counter()
+    classified = classifier.classify_scan_results(result.hosts)
+    return {
+        "seconds": time.perf_counter() - start,
+        "items": classified["summary"]["total_open_ports"],
+    }
+
+
+def _bench_report(generator, hosts: int, suffix: str) -> Dict:
+    result = synthetic_scan(hosts)
+    classified = result.classify()
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, f"report{suffix}")
+        start = time.perf_counter()
+        generator.generate(result, output, classified=classified)
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(output)
+    return {
+        "seconds": seconds,
+        "items": classified["summary"]["total_open_ports"],
+        "bytes": size,
+    }
+
+
+def bench_report_pdf(hosts: int) -> Dict:
+    """ReportGenerator.generate (PDF, layout raggruppato)"""
+    from src.report_generator import ReportGenerator
+    return _bench_report(ReportGenerator(), hosts, ".pdf")
+
+
+def bench_report_html(hosts: int) -> Dict:
+    """HtmlReportGenerator.generate (HTML in streaming)"""
+    from src.html_report import HtmlReportGenerator
+    return _bench_report(HtmlReportGenerator(), hosts, ".html")
+
+
+def bench_vuln_match(lookups: int) -> Dict:
+    """VulnerabilityIndex.lookup su banner sintetici (5000 avvisi, 50 prodotti)"""
+    from src.vulndb import Advisory, VulnerabilityIndex
+
+    advisories = [
+        Advisory(id=f"ADV-{i}", product=f"prodotto{i % 50}", title="",
+                 ranges=((f"{i % 7}.{i % 13}", f"{i % 7 + 1}.{i % 5}"),))
+        for i in range(5000)
+    ]
+    start = time.perf_counter()
+    index = VulnerabilityIndex(advisories)
+    build = time.perf_counter() - start
+    banners = [f"Prodotto{i % 50}/{i % 9}.{i % 11}.{i % 3}" for i in range(1000)]
+
+    start = time.perf_counter()
+    matches = 0
+    for i in range(lookups):
+        matches += len(index.lookup(banners[i % 1000]))
+    return {
+        "seconds": time.perf_counter() - start,
+        "items": lookups,
+        "build_seconds": build,
+        "matches": matches,
+    }
+
+
+def bench_startup(runs: int) -> Dict:
+    """Avvio della CLI --json-only fino al primo connect (migliore di N avvii)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Bytecode in una cache temporanea, come in un'installazione reale
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=tmp)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        first_probe(env)
+        timings = [first_probe(env)[0] for _ in range(runs)]
+    return {
+        "seconds": min(timings),
+        "items": 1,
+        "median_start": statistics.median(timings),
+    }
+
+
+BENCHMARKS: Dict[str, tuple] = {
+    "scan": (bench_scan, "scan_hosts"),
+    "classify": (bench_classify, "classify_hosts"),
+    "report_pdf": (bench_report_pdf, "report_pdf_hosts"),
+    "report_html": (bench_report_html, "report_html_hosts"),
+    "vuln_match": (bench_vuln_match, "vuln_lookups"),
+    "startup": (bench_startup, "startup_runs"),
+}
+
+
+def run_benchmark(func: Callable[[int], Dict], size: int, repeat: int) -> Dict:
+    """
+    Esegue un benchmark più volte
+
+    Returns:
+        Tempo minimo e mediano, elementi al secondo e metriche aggiuntive
+    """
+    runs = [func(size) for _ in range(repeat)]
+    seconds = [r["seconds"] for r in runs]
+    best = min(runs, key=lambda r: r["seconds"])
+    summary = dict(best)
+    summary.update({
+        "size": size,
+        "seconds": min(seconds),
+        "median": statistics.median(seconds),
+        "rate": best["items"] / best["seconds"] if best["seconds"] else 0.0,
+        "repeat": repeat,
+    })
+    return summary
+
+
+def run_suite(names: List[str], quick: bool = False, repeat: int = 3) -> Dict:
+    """
+    Esegue i benchmark indicati
+
+    Args:
+        names: Chiavi di BENCHMARKS
+        quick: Usa le dimensioni ridotte
+        repeat: Ripetizioni per benchmark (la scansione una sola volta)
+
+    Returns:
+        Risultati con metadati dell'ambiente
+    """
+    results = {}
+    for name in names:
+        func, size_key = BENCHMARKS[name]
+        size = SIZES[size_key][1 if quick else 0]
+        results[name] = run_benchmark(func, size, 1 if name in ("scan", "startup") else repeat)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[str]:
+    """
+    Confronta con la baseline
+
+    Args:
+        current: Risultati di run_suite
+        baseline: Risultati salvati in precedenza
+        threshold: Rallentamento tollerato (0.2 = +20%)
+
+    Returns:
+        Descrizioni delle regressioni (vuota se nessuna)
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference or reference.get("size") != result.get("size"):
+            continue
+        if result["seconds"] > reference["seconds"] * (1 + threshold):
+            regressions.append(
+                f"{name}: {result['seconds']:.3f}s contro {reference['seconds']:.3f}s "
+                f"(+{(result['seconds'] / reference['seconds'] - 1) * 100:.0f}%)"
+            )
+        if result.get("mismatches"):
+            regressions.append(f"{name}: {result['mismatches']} host con porte errate")
+    return regressions
+
+
+def load_baseline(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite di benchmark CyberSentinel")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmark da eseguire")
+    parser.add_argument("--quick", action="store_true", help="Dimensioni ridotte")
+    parser.add_argument("--repeat", type=int, default=3, help="Ripetizioni (default: 3)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Rallentamento tollerato rispetto alla baseline (default: 0.2)")
+    parser.add_argument("--baseline", type=Path, help="File baseline (default: results/baseline[_quick].json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Salva i risultati come nuova baseline")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    current = run_suite(names, quick=args.quick, repeat=args.repeat)
+
+    print(f"{'Benchmark':<12} {'Dim.':>7} {'Min':>9} {'Mediana':>9} {'Elem/s':>12}")
+    for name, r in current["results"].items():
+        note = f"  ({r['mismatches']} host con porte errate)" if r.get("mismatches") else ""
+        print(f"{name:<12} {r['size']:>7} {r['seconds']:>8.3f}s {r['median']:>8.3f}s {r['rate']:>12.0f}{note}")
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    with open(RESULTS_DIR / "history.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(current) + "\n")
+
+    baseline_path = args.baseline or RESULTS_DIR / ("baseline_quick.json" if args.quick else "baseline.json")
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nBaseline salvata: {baseline_path}")
+        return
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(f"\nNessuna baseline in {baseline_path} (usa --save-baseline)")
+        return
+
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print("\nRegressioni rispetto alla baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"\nNessuna regressione rispetto a {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
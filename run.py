@@ -24,12 +24,6 @@ try:
 except ImportError:
     HAS_COLOR = False
 
-try:
-    from tqdm import tqdm
-    HAS_TQDM = True
-except ImportError:
-    HAS_TQDM = False
-
 
 def print_banner():
     """Stampa banner applicazione"""
@@ -81,6 +75,310 @@ def print_colored(text: str, color: str = "white"):
         print(text)
 
 
+def load_hitlist(args):
+    """Indirizzi della hitlist IPv6 (--hitlist), None se non indicata"""
+    if not args.hitlist:
+        return None
+    from src.targets import load_hitlist as read_hitlist
+    try:
+        return read_hitlist(args.hitlist)
+    except OSError as e:
+        print_colored(f"[!] Impossibile leggere la hitlist: {e}", "red")
+        sys.exit(1)
+
+
+def run_distributed_scan(args, target: str, ports, host_done, cancel=None):
+    """Esegue la scansione come coordinatore distribuito"""
+    from src.distributed import ScanCoordinator, spawn_local_workers
+
+    def host_received(host):
+        host_done(host)
+        if args.verbose:
+            print(f"    Ricevuto {host.ip}: {len(host.ports)} porte aperte")
+
+    coordinator = ScanCoordinator(
+        target,
+        address=args.coordinator,
+        ports=ports,
+        timeout=args.timeout,
+        host_callback=host_received,
+        hitlist=load_hitlist(args)
+    ).start()
+    print_colored(f"[*] Coordinatore in ascolto su {coordinator.address}", "cyan")
+
+    workers = []
+    if args.local_workers > 0:
+        workers = spawn_local_workers(coordinator.address, args.local_workers)
+        print_colored(f"[*] Avviati {len(workers)} worker locali", "cyan")
+
+    try:
+        result = coordinator.wait(cancel=cancel)
+    finally:
+        coordinator.stop()
+        for worker in workers:
+            worker.join(timeout=5)
+
+    if coordinator.failed_ips:
+        print_colored(
+            f"[!] {len(coordinator.failed_ips)} host non scansionati (worker falliti)",
+            "yellow"
+        )
+    return result
+
+
+def run_report_batch(args):
+    """Genera in parallelo i report delle scansioni JSON indicate"""
+    import time
+    from src.report_batch import generate_reports
+
+    sources = [path for path in args.report_batch if Path(path).is_file()]
+    for missing in sorted(set(args.report_batch) - set(sources)):
+        print_colored(f"[!] File non trovato: {missing}", "yellow")
+    if not sources:
+        print_colored("[!] Nessuna scansione JSON da elaborare", "red")
+        sys.exit(1)
+
+    print_colored(f"[*] Generazione di {len(sources)} report", "cyan")
+
+    def report_done(report):
+        if report.ok:
+            print(f"    [+] {report.output} ({report.seconds:.2f}s)")
+        else:
+            print_colored(f"    [!] {report.source}: {report.error}", "red")
+
+    start = time.perf_counter()
+    reports = generate_reports(
+        sources,
+        output_dir=args.output_dir,
+        workers=args.jobs or None,
+        callback=report_done
+    )
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in reports if not r.ok]
+    print()
+    print_colored(
+        f"[*] {len(reports) - len(failed)} report generati in {elapsed:.1f}s "
+        f"({len(failed)} errori)",
+        "red" if failed else "green"
+    )
+    if failed:
+        sys.exit(1)
+
+
+def run_history(args):
+    """Importa scansioni nello storico e/o genera il report di andamento"""
+    from src.history import HistoryStore, months_ago
+
+    store = HistoryStore(args.history)
+
+    if args.history_import:
+        sources = [path for path in args.history_import if Path(path).is_file()]
+        for missing in sorted(set(args.history_import) - set(sources)):
+            print_colored(f"[!] File non trovato: {missing}", "yellow")
+        try:
+            ingested, skipped = store.ingest_files(sources)
+        except (OSError, ValueError, KeyError) as e:
+            print_colored(f"[!] Errore importazione storico: {e}", "red")
+            sys.exit(1)
+        print_colored(
+            f"[+] Storico aggiornato: {ingested} scansioni importate, "
+            f"{skipped} già presenti o non recenti",
+            "green"
+        )
+
+    if not args.trend_report:
+        return
+
+    targets = [args.target] if args.target else store.targets()
+    if len(targets) != 1:
+        print_colored("[!] Specificare --target: lo storico contiene " +
+                      (", ".join(targets) or "nessun target"), "red")
+        sys.exit(1)
+
+    points = store.trend(
+        targets[0],
+        bucket=args.trend_bucket,
+        since=months_ago(args.trend_months)
+    )
+    print_colored(f"[*] Report di andamento: {targets[0]}, {len(points)} periodi", "cyan")
+
+    try:
+        from src.report_generator import ReportGenerator
+        ReportGenerator().generate_trend(targets[0], points, args.trend_report)
+    except ImportError:
+        print_colored("[!] Installa reportlab: pip install reportlab", "red")
+        sys.exit(1)
+    print_colored(f"[+] Report generato: {args.trend_report}", "green")
+
+
+def read_config(path: str) -> dict:
+    """Legge il file di configurazione YAML (esce in caso di errore)"""
+    from src.config import ConfigError, read_yaml
+
+    try:
+        return read_yaml(path)
+    except ImportError:
+        print_colored("[!] Installa pyyaml: pip install pyyaml", "red")
+        sys.exit(1)
+    except ConfigError as e:
+        print_colored(f"[!] Configurazione non valida: {e}", "red")
+        sys.exit(1)
+
+
+def load_profile(args):
+    """
+    Configurazione validata e profilo scelto (--config, --scan-profile)
+
+    Returns:
+        (Config, ScanProfile) oppure (None, None) senza --config
+    """
+    if not args.config:
+        return None, None
+    from src.config import ConfigError, parse_config
+
+    try:
+        config = parse_config(read_config(args.config))
+        return config, config.profile(args.scan_profile)
+    except ConfigError as e:
+        print_colored(f"[!] Configurazione non valida: {e}", "red")
+        sys.exit(1)
+
+
+def profile_defaults(profile) -> dict:
+    """Valori del profilo come default degli argomenti (la riga di comando prevale)"""
+    defaults = {
+        "targets": list(profile.targets),
+        "ports": profile.ports,
+        "udp": profile.udp,
+        "timeout": profile.timeout,
+        "concurrency": profile.concurrency,
+        "rate_limit": profile.rate_limit,
+        "deadline": profile.deadline,
+        "no_nmap": not profile.use_nmap,
+        "no_inspect": not profile.inspect,
+        "no_report": not profile.report,
+        "format": profile.report_format,
+        "json": profile.json,
+    }
+    if profile.output:
+        defaults["output"] = profile.output
+    return defaults
+
+
+def scan_targets(scanner, targets, **options):
+    """Scansiona i target in sequenza e unisce i risultati in un solo ScanResult"""
+    result = scanner.scan(targets[0], **options)
+    for target in targets[1:]:
+        result.extend(scanner.scan(target, **options))
+    result.target = ", ".join(targets)
+    return result
+
+
+def duration(value: str) -> float:
+    """Durata per --deadline: secondi oppure 30m, 2h (vedi config.parse_duration)"""
+    from src.config import parse_duration
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def cancel_on_interrupt(cancel):
+    """
+    Ctrl+C annulla la scansione invece di terminare il programma: report e
+    JSON vengono prodotti con i risultati parziali. Un secondo Ctrl+C esce.
+
+    Returns:
+        Gestore di SIGINT precedente, da ripristinare con signal.signal
+    """
+    import signal
+    from src.cancel import INTERRUPTED
+
+    def interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        cancel.cancel(INTERRUPTED)
+        print_colored("\n[!] Interruzione: completo il report con i risultati parziali "
+                      "(Ctrl+C di nuovo per uscire)", "yellow")
+
+    return signal.signal(signal.SIGINT, interrupt)
+
+
+def create_pipeline(config: dict):
+    """Canali di notifica abilitati in 'notifications' (esce se non validi)"""
+    from src.sinks import pipeline_from_config
+
+    try:
+        pipeline = pipeline_from_config(config)
+    except (OSError, ValueError) as e:
+        print_colored(f"[!] Notifiche non valide: {e}", "red")
+        sys.exit(1)
+    if not pipeline:
+        print_colored("[*] Nessun canale abilitato in 'notifications'", "yellow")
+    return pipeline
+
+
+def report_pipeline(pipeline):
+    """Consegna gli host in coda e stampa l'esito per canale"""
+    for name, stats in pipeline.close().items():
+        lost = stats.dropped + stats.failed
+        print_colored(
+            f"[{'!' if lost else '+'}] Notifiche {name}: {stats.delivered} host inviati"
+            + (f", {lost} non consegnati" if lost else ""),
+            "yellow" if lost else "green"
+        )
+
+
+def run_scheduler(args):
+    """Avvia lo scheduler delle scansioni ricorrenti"""
+    import logging
+    from src.classifier import PortClassifier
+    from src.config import parse_config
+    from src.logs import SERVICE_FORMAT, setup_logging
+    from src.scheduler import ScanScheduler, ScheduledScanRunner
+
+    config = read_config(args.schedule)
+    try:
+        validated = parse_config(config)
+        setup_logging(
+            validated.logging,
+            console_level=logging.DEBUG if args.verbose else logging.INFO,
+            console_format=SERVICE_FORMAT,
+            queued=True
+        )
+    except ValueError as e:
+        print_colored(f"[!] Configurazione non valida: {e}", "red")
+        sys.exit(1)
+
+    settings = validated.schedule
+    if not settings.profiles:
+        print_colored("[!] Nessun profilo in 'schedule.profiles'", "red")
+        sys.exit(1)
+
+    pipeline = create_pipeline(config) if config.get("notifications") else None
+    scheduler = ScanScheduler(
+        list(settings.profiles),
+        state_file=settings.state_file,
+        max_concurrent=settings.max_concurrent,
+        runner=ScheduledScanRunner(
+            pipeline=pipeline,
+            classifier=PortClassifier(validated.classifier),
+            report_settings=validated.report
+        ),
+        startup_spread=settings.startup_spread
+    )
+
+    print_colored(f"[*] Scheduler avviato con {len(settings.profiles)} profili (Ctrl+C per uscire)", "cyan")
+    for profile in settings.profiles:
+        next_run = datetime.fromtimestamp(scheduler.state[profile.name].next_run)
+        print(f"    {profile.name}: {profile.target}, prossima esecuzione {next_run:%d/%m %H:%M}")
+    try:
+        scheduler.run_forever()
+    finally:
+        if pipeline:
+            pipeline.close()
+
+
 def main():
     """Funzione principale"""
     parser = argparse.ArgumentParser(
@@ -102,6 +400,12 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
         help="Target da scansionare (IP, CIDR o hostname)"
     )
 
+    parser.add_argument(
+        "--hitlist",
+        metavar="FILE",
+        help="Indirizzi IPv6 noti (uno per riga) per reti troppo grandi da enumerare"
+    )
+
     parser.add_argument(
         "-a", "--auto-detect",
         action="store_true",
@@ -111,7 +415,13 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
     parser.add_argument(
         "-o", "--output",
         default="cybersentinel_report.pdf",
-        help="File PDF di output (default: cybersentinel_report.pdf)"
+        help="File del report (default: cybersentinel_report.pdf o .html)"
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["pdf", "html"],
+        help="Formato del report (default: dall'estensione di --output, altrimenti pdf)"
     )
 
     parser.add_argument(
@@ -119,12 +429,85 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
         help="Salva anche risultati in formato JSON"
     )
 
+    parser.add_argument(
+        "--no-report", "--json-only",
+        dest="no_report",
+        action="store_true",
+        help="Non generare il report (avvio più rapido, reportlab non viene caricato)"
+    )
+
     parser.add_argument(
         "-q", "--quick",
         action="store_true",
         help="Scansione veloce (solo porte critiche)"
     )
 
+    parser.add_argument(
+        "-p", "--ports",
+        metavar="PORTE",
+        help="Porte da scansionare: top100, top1000, all, intervalli (es. 1-1024,8080)"
+    )
+
+    parser.add_argument(
+        "--udp",
+        action="store_true",
+        help="Scansiona anche i servizi UDP (DNS, SNMP, NTP, SSDP, ...)"
+    )
+
+    parser.add_argument(
+        "--no-inspect",
+        action="store_true",
+        help="Non analizzare i servizi aperti (TLS, web, SMB/RDP/SSH, versioni vulnerabili)"
+    )
+
+    parser.add_argument(
+        "--vulndb",
+        action="append",
+        metavar="FILE",
+        help="Dataset JSON di vulnerabilità aggiuntivo (ripetibile)"
+    )
+
+    parser.add_argument(
+        "--notify",
+        metavar="CONFIG",
+        help="Invia ogni host completato ai canali in 'notifications' del file YAML CONFIG "
+             "(webhook, email, syslog, file)"
+    )
+
+    parser.add_argument(
+        "--config",
+        metavar="CONFIG",
+        help="File YAML con i profili di scansione (target, porte, timeout, limiti, output)"
+    )
+
+    parser.add_argument(
+        "--scan-profile",
+        metavar="NOME",
+        help="Profilo di --config da usare (default: l'unico definito)"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        metavar="N",
+        help="Connessioni in volo per host nelle scansioni di molte porte"
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        metavar="N",
+        help="Nuove connessioni TCP al secondo (default: nessun limite)"
+    )
+
+    parser.add_argument(
+        "--deadline",
+        type=duration,
+        metavar="DURATA",
+        help="Tempo massimo per scansione e analisi (es. 45m, 2h): allo scadere "
+             "il report usa i risultati parziali"
+    )
+
     parser.add_argument(
         "--timeout",
         type=float,
@@ -138,6 +521,137 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
         help="Non usare nmap anche se disponibile"
     )
 
+    parser.add_argument(
+        "--coordinator",
+        metavar="INDIRIZZO",
+        help="Coordina una scansione distribuita in ascolto su INDIRIZZO "
+             "(host:porta o unix:/percorso)"
+    )
+
+    parser.add_argument(
+        "--worker",
+        metavar="INDIRIZZO",
+        help="Avvia come worker collegato al coordinatore INDIRIZZO"
+    )
+
+    parser.add_argument(
+        "--local-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Con --coordinator, avvia N worker locali (default: 0)"
+    )
+
+    parser.add_argument(
+        "--daemon",
+        metavar="INDIRIZZO",
+        help="Avvia in modalità servizio con API su INDIRIZZO "
+             "(es: 127.0.0.1:8765 o unix:/percorso)"
+    )
+
+    parser.add_argument(
+        "--state-dir",
+        default="cybersentinel_state",
+        help="Directory per coda job e risultati del servizio "
+             "(default: cybersentinel_state)"
+    )
+
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        default=2,
+        help="Scansioni concorrenti massime in modalità servizio (default: 2)"
+    )
+
+    parser.add_argument(
+        "--schedule",
+        metavar="CONFIG",
+        help="Esegue le scansioni programmate definite nel file YAML CONFIG"
+    )
+
+    parser.add_argument(
+        "--metrics",
+        metavar="HOST:PORTA",
+        help="Espone le metriche Prometheus su HOST:PORTA/metrics durante la scansione"
+    )
+
+    parser.add_argument(
+        "--no-progress",
+        action="store_true",
+        help="Disattiva l'avanzamento live nel terminale"
+    )
+
+    parser.add_argument(
+        "--report-batch",
+        nargs="+",
+        metavar="JSON",
+        help="Genera un report PDF per ogni scansione JSON salvata (senza scansionare)"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        help="Directory dei PDF generati con --report-batch (default: accanto ai JSON)"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Processi paralleli per --report-batch (default: numero di CPU)"
+    )
+
+    parser.add_argument(
+        "--history",
+        metavar="DIR",
+        help="Archivia la scansione negli aggregati storici in DIR"
+    )
+
+    parser.add_argument(
+        "--history-import",
+        nargs="+",
+        metavar="JSON",
+        help="Con --history, importa scansioni JSON salvate nello storico"
+    )
+
+    parser.add_argument(
+        "--trend-report",
+        metavar="FILE",
+        help="Con --history, genera il report PDF di andamento (senza scansionare)"
+    )
+
+    parser.add_argument(
+        "--trend-months",
+        type=int,
+        default=12,
+        help="Mesi coperti dal report di andamento (default: 12)"
+    )
+
+    parser.add_argument(
+        "--trend-bucket",
+        choices=["day", "week", "month"],
+        default="month",
+        help="Aggregazione del report di andamento (default: month)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Mostra i tempi per fase (discovery, DNS, connessione, report)"
+    )
+
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        help="Salva il profilo: .prof (cProfile), .html/.txt (pyinstrument), "
+             ".json (tempi per fase)"
+    )
+
+    parser.add_argument(
+        "--no-banner",
+        action="store_true",
+        help="Non mostrare il banner iniziale"
+    )
+
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -152,47 +666,184 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
 
     args = parser.parse_args()
 
+    # Profilo dal file di configurazione: i suoi valori diventano i default
+    config, profile = load_profile(args)
+    if profile:
+        parser.set_defaults(**profile_defaults(profile))
+        args = parser.parse_args()
+
+    # Log: avvisi sul terminale (-v anche i passi), file JSON Lines da 'logging'
+    import logging
+    from src.logs import setup_logging
+    setup_logging(config.logging if config else None,
+                  console_level=logging.INFO if args.verbose else logging.WARNING)
+
     # Mostra banner
-    print_banner()
+    if not args.no_banner:
+        print_banner()
 
     # Importa moduli (qui per velocizzare --help)
     from src.scanner import PortScanner
     from src.classifier import PortClassifier
-    from src.report_generator import ReportGenerator
+
+    # Modalità servizio: resta attivo e riceve job via API
+    if args.daemon:
+        from src.daemon import ScanDaemon
+        from src.logs import SERVICE_FORMAT
+
+        setup_logging(
+            config.logging if config else None,
+            console_level=logging.DEBUG if args.verbose else logging.INFO,
+            console_format=SERVICE_FORMAT,
+            queued=True
+        )
+        daemon = ScanDaemon(
+            args.state_dir,
+            address=args.daemon,
+            max_concurrent=args.max_jobs,
+            default_timeout=args.timeout,
+            use_nmap=not args.no_nmap
+        )
+        print_colored(f"[*] Servizio in ascolto su {args.daemon} (Ctrl+C per uscire)", "cyan")
+        daemon.serve_forever()
+        sys.exit(0)
+
+    # Report in batch da scansioni salvate
+    if args.report_batch:
+        run_report_batch(args)
+        sys.exit(0)
+
+    # Storico: importazione di scansioni salvate e report di andamento
+    if args.history_import or args.trend_report:
+        if not args.history:
+            print_colored("[!] Specificare la directory dello storico con --history", "red")
+            sys.exit(1)
+        run_history(args)
+        sys.exit(0)
+
+    # Scansioni programmate da file di configurazione
+    if args.schedule:
+        run_scheduler(args)
+        sys.exit(0)
+
+    # Modalità worker: riceve i target dal coordinatore
+    if args.worker:
+        from src.distributed import ScanWorker
+
+        print_colored(f"[*] Worker collegato al coordinatore {args.worker}", "cyan")
+        try:
+            scanned = ScanWorker(args.worker).run()
+        except OSError as e:
+            print_colored(f"[!] Coordinatore non raggiungibile: {e}", "red")
+            sys.exit(1)
+        print_colored(f"[+] Worker terminato: {scanned} host scansionati", "green")
+        sys.exit(0)
+
+    # Formato del report
+    from src.reports import create_report_generator, report_format_for
+
+    output = args.output
+    report_format = report_format_for(output, args.format)
+    if report_format == "html" and output == parser.get_default("output"):
+        output = str(Path(output).with_suffix(".html"))
 
     # Determina target
     if args.auto_detect:
-        target = PortScanner.get_local_network()
-        print_colored(f"[*] Rete locale rilevata: {target}", "cyan")
+        targets = [PortScanner.get_local_network()]
+        print_colored(f"[*] Rete locale rilevata: {targets[0]}", "cyan")
     elif args.target:
-        target = args.target
+        targets = [args.target]
+    elif getattr(args, "targets", None):
+        targets = args.targets
     else:
         print_colored("[!] Errore: specificare --target o --auto-detect", "red")
         parser.print_help()
         sys.exit(1)
+    target = ", ".join(targets)
 
     # Valida target
-    if not PortScanner.validate_target(target):
-        print_colored(f"[!] Target non valido: {target}", "red")
+    for item in targets:
+        if not PortScanner.validate_target(item):
+            print_colored(f"[!] Target non valido: {item}", "red")
+            sys.exit(1)
+    if args.coordinator and len(targets) > 1:
+        print_colored("[!] La scansione distribuita accetta un solo target", "red")
         sys.exit(1)
 
     # Configura porte
-    if args.quick:
+    if args.ports:
+        from src.ports import parse_ports
+        try:
+            ports = parse_ports(args.ports)
+        except ValueError as e:
+            print_colored(f"[!] {e}", "red")
+            sys.exit(1)
+    elif args.quick:
         # Porte critiche per scan veloce
-        ports = [21, 22, 23, 80, 443, 445, 3389, 3306, 1433, 5900]
+        from src.ports import QUICK_PORTS
+        ports = QUICK_PORTS
         print_colored("[*] Modalità veloce: solo 10 porte critiche", "yellow")
     else:
         ports = None  # Usa default (20 porte)
 
+    udp_ports = None
+    if args.udp:
+        from src.udp_scanner import DEFAULT_UDP_PORTS
+        udp_ports = DEFAULT_UDP_PORTS
+
+    # Telemetria: avanzamento live ed eventuale endpoint Prometheus
+    from src.telemetry import ScanTelemetry, LiveProgress, MetricsServer, format_stage_table
+
+    telemetry = ScanTelemetry()
+    metrics_server = None
+    if args.metrics:
+        host, _, port = args.metrics.rpartition(":")
+        try:
+            metrics_server = MetricsServer(telemetry, host or "127.0.0.1", int(port)).start()
+            print_colored(
+                f"[*] Metriche Prometheus su http://{host or '127.0.0.1'}:{metrics_server.port}/metrics",
+                "cyan"
+            )
+        except (ValueError, OSError) as e:
+            print_colored(f"[!] Impossibile avviare l'endpoint metriche: {e}", "red")
+
     # Crea scanner
     scanner = PortScanner(
         ports=ports,
         timeout=args.timeout,
-        use_nmap=not args.no_nmap
+        use_nmap=not args.no_nmap,
+        telemetry=telemetry,
+        hitlist=load_hitlist(args),
+        udp_ports=udp_ports,
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit
     )
 
+    # Un profilo con backend nmap non ripiega sui socket
+    if profile and profile.backend == "nmap" and not args.no_nmap and not scanner.use_nmap:
+        print_colored(f"[!] Il profilo {profile.name} richiede nmap, non trovato nel PATH", "red")
+        sys.exit(1)
+
+    # Dataset di vulnerabilità aggiuntivi letti subito (errori prima della scansione)
+    vulndb = tuple(args.vulndb or ())
+    if vulndb and not args.no_inspect:
+        from src.vulndb import load_index
+        try:
+            load_index(vulndb)
+        except (OSError, ValueError, KeyError) as e:
+            print_colored(f"[!] Dataset vulnerabilità non valido: {e}", "red")
+            sys.exit(1)
+
+    # Canali di notifica (errori di configurazione prima della scansione)
+    pipeline = create_pipeline(read_config(args.notify)) if args.notify else None
+
+    def host_done(host):
+        profiler.add_host(host)
+        if pipeline:
+            pipeline(host)
+
     # Info nmap
-    if scanner._nmap_available and not args.no_nmap:
+    if scanner.use_nmap:
         print_colored("[+] Nmap rilevato: scansione avanzata attiva", "green")
     else:
         print_colored("[*] Uso scansione socket Python", "yellow")
@@ -200,6 +851,8 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
     print()
     print_colored(f"[*] Avvio scansione: {target}", "cyan")
     print_colored(f"[*] Porte da verificare: {len(scanner.ports)}", "cyan")
+    if scanner.udp_ports:
+        print_colored(f"[*] Porte UDP da verificare: {len(scanner.udp_ports)}", "cyan")
     print()
 
     # Progress callback
@@ -210,18 +863,79 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
         if args.verbose:
             print(f"    Scansione {ip} ({current}/{total}) - {elapsed}s trascorsi")
 
+    live = None
+    if not args.no_progress and not args.verbose and sys.stderr.isatty():
+        live = LiveProgress(telemetry).start()
+
+    # Profilazione (tempi per fase ed eventuale cProfile/pyinstrument)
+    from contextlib import ExitStack
+    from src.profiling import StageProfiler, profile_to
+
+    profiler = StageProfiler()
+    profiling = ExitStack()
+    try:
+        profiling.enter_context(profile_to(args.profile_output))
+    except RuntimeError as e:
+        print_colored(f"[!] {e}", "red")
+        sys.exit(1)
+
+    # Scadenza e Ctrl+C fermano scansione e analisi: restano i risultati parziali
+    import signal
+    from src.cancel import INTERRUPTED, CancelToken
+
+    cancel = CancelToken(args.deadline)
+    previous_handler = cancel_on_interrupt(cancel)
+
     # Esegui scansione
     try:
-        result = scanner.scan(
-            target,
-            progress_callback=progress_callback
-        )
+        with profiler.span("scan"):
+            if args.coordinator:
+                result = run_distributed_scan(args, target, scanner.ports, host_done, cancel)
+            else:
+                result = scan_targets(
+                    scanner,
+                    targets,
+                    progress_callback=progress_callback,
+                    host_callback=host_done,
+                    cancel=cancel
+                )
     except KeyboardInterrupt:
         print_colored("\n[!] Scansione interrotta dall'utente", "yellow")
         sys.exit(130)
     except Exception as e:
         print_colored(f"\n[!] Errore durante la scansione: {e}", "red")
         sys.exit(1)
+    finally:
+        if live:
+            live.stop()
+
+    if args.verbose and telemetry.stages:
+        print()
+        print_colored("[*] Latenze per fase:", "cyan")
+        for row in format_stage_table(telemetry):
+            print(f"    {row}")
+
+    # Ispezione dei servizi aperti (certificati TLS, ...)
+    if not args.no_inspect:
+        from src.inspection import default_inspectors, run_inspections
+        try:
+            with profiler.span("inspect"):
+                inspected = run_inspections(
+                    result, default_inspectors(timeout=args.timeout, vulndb=vulndb), cancel
+                )
+        except KeyboardInterrupt:
+            print_colored("\n[!] Analisi interrotta dall'utente", "yellow")
+            sys.exit(130)
+        if inspected.get("tls"):
+            print_colored(f"[*] Servizi TLS analizzati: {inspected['tls']}", "cyan")
+        if inspected.get("vulns"):
+            print_colored(f"[!] Servizi con versioni vulnerabili o fuori supporto: {inspected['vulns']}", "yellow")
+    signal.signal(signal.SIGINT, previous_handler)
+
+    if not result.complete:
+        from src.report_text import incomplete_notice
+        print()
+        print_colored(f"[!] {incomplete_notice(result)}", "yellow")
 
     # Mostra risultati
     print()
@@ -229,9 +943,10 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
     print_colored("RISULTATI SCANSIONE", "cyan")
     print_colored("=" * 60, "cyan")
 
-    # Classifica risultati
-    classifier = PortClassifier()
-    classified = classifier.classify_scan_results(result.hosts)
+    # Classifica risultati (una sola volta: riusati anche dal report)
+    classifier = PortClassifier(config.classifier if config else None)
+    with profiler.span("classify"):
+        classified = result.classify(classifier)
 
     # Statistiche
     summary = classified['summary']
@@ -260,16 +975,23 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
             )
         print()
 
-    # Genera report PDF
-    print_colored(f"[*] Generazione report PDF: {args.output}", "cyan")
+    # Genera report (backend caricato solo ora: PDF con reportlab oppure HTML)
+    if args.no_report:
+        if not args.json:
+            print_colored("[*] Report disattivato (--no-report)", "yellow")
+    else:
+        print_colored(f"[*] Generazione report {report_format.upper()}: {output}", "cyan")
 
-    try:
-        generator = ReportGenerator()
-        output_path = generator.generate(result, args.output)
-        print_colored(f"[+] Report generato: {output_path}", "green")
-    except Exception as e:
-        print_colored(f"[!] Errore generazione PDF: {e}", "red")
-        print_colored("[*] Installa reportlab: pip install reportlab", "yellow")
+        try:
+            with profiler.span("report"):
+                generator = create_report_generator(report_format, config.report if config else None)
+                output_path = generator.generate(result, output, classified=classified)
+            print_colored(f"[+] Report generato: {output_path}", "green")
+        except ImportError as e:
+            print_colored(f"[!] Errore generazione PDF: {e}", "red")
+            print_colored("[*] Installa reportlab: pip install reportlab (oppure usa --format html)", "yellow")
+        except Exception as e:
+            print_colored(f"[!] Errore generazione report: {e}", "red")
 
     # Salva JSON se richiesto
     if args.json:
@@ -279,10 +1001,43 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
         except Exception as e:
             print_colored(f"[!] Errore salvataggio JSON: {e}", "red")
 
+    # Archivia negli aggregati storici
+    if args.history:
+        try:
+            from src.history import HistoryStore
+            if HistoryStore(args.history).ingest(result):
+                print_colored(f"[+] Storico aggiornato: {args.history}", "green")
+            elif not result.complete:
+                print_colored("[!] Scansione incompleta: storico non aggiornato", "yellow")
+        except (OSError, ValueError) as e:
+            print_colored(f"[!] Errore aggiornamento storico: {e}", "red")
+
+    # Consegna le notifiche ancora in coda
+    if pipeline:
+        report_pipeline(pipeline)
+
+    # Profilo
+    profiling.close()
+    profiler.stop()
+    if args.profile:
+        print()
+        print_colored("[*] Tempi per fase:", "cyan")
+        for line in profiler.format_breakdown():
+            print(f"    {line}")
+    if args.profile_output:
+        if args.profile_output.endswith(".json"):
+            profiler.to_json(args.profile_output)
+        print_colored(f"[+] Profilo salvato: {args.profile_output}", "green")
+
     # Tempo totale
     total_time = (datetime.now() - start_time).seconds
     print()
-    print_colored(f"[*] Scansione completata in {total_time} secondi", "cyan")
+    if result.complete:
+        print_colored(f"[*] Scansione completata in {total_time} secondi", "cyan")
+    else:
+        print_colored(f"[!] Scansione parziale terminata in {total_time} secondi", "yellow")
+    if metrics_server:
+        metrics_server.stop()
 
     # Valutazione rischio
     print()
@@ -292,7 +1047,7 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
             "red"
         )
         print_colored(
-            "    Consulta il report PDF per le raccomandazioni.",
+            "    Consulta il report per le raccomandazioni.",
             "yellow"
         )
     elif summary['warning_count'] > 0:
@@ -311,6 +1066,10 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
     print("  ISIPC - Truant Bruno | https://isipc.com")
     print()
 
+    # Interrotta con Ctrl+C: report salvato, codice di uscita come per SIGINT
+    if cancel.reason == INTERRUPTED:
+        sys.exit(130)
+
 
 if __name__ == "__main__":
     main()
@@ -11,8 +11,21 @@ __author__ = "ISIPC - Truant Bruno"
 __email__ = "info@isipc.com"
 __url__ = "https://isipc.com"
 
-from .scanner import PortScanner
-from .classifier import PortClassifier
-from .report_generator import ReportGenerator
+# Import pigri: `import src` non carica reportlab né il motore di scansione
+_LAZY_EXPORTS = {
+    "PortScanner": ".scanner",
+    "PortClassifier": ".classifier",
+    "ReportGenerator": ".report_generator",
+    "HtmlReportGenerator": ".html_report",
+}
 
-__all__ = ["PortScanner", "PortClassifier", "ReportGenerator"]
+__all__ = ["PortScanner", "PortClassifier", "ReportGenerator", "HtmlReportGenerator"]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
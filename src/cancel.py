@@ -0,0 +1,128 @@
+"""
+Annullamento Scansioni - CyberSentinel
+Scadenza e annullamento cooperativo di una scansione
+
+Lo stesso CancelToken viene passato a tutte le fasi: connessioni TCP,
+sweep parallelo, UDP, nmap, DNS e ispezioni. Ogni ciclo lo controlla tra
+una sonda e l'altra e limita le attese bloccanti al tempo rimasto, così
+alla scadenza (o dopo cancel()) la scansione si ferma in pochi decimi di
+secondo e restituisce quanto raccolto fino a quel momento.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+# Attesa massima tra due controlli (select, processi nmap, chiamate DNS)
+CHECK_INTERVAL = 0.1
+
+# Timeout minimo: 0 renderebbe le socket non bloccanti
+_MIN_TIMEOUT = 0.01
+
+# Motivi dell'interruzione (ScanResult.coverage["reason"])
+DEADLINE = "deadline"
+INTERRUPTED = "interrupted"
+
+
+class CancelToken:
+    """
+    Annullamento cooperativo con scadenza opzionale (thread-safe)
+
+    Args:
+        deadline: Secondi a disposizione da adesso (None = nessuna scadenza)
+        clock: Sorgente del tempo (per i test)
+    """
+
+    def __init__(self, deadline: Optional[float] = None, clock=time.monotonic):
+        self.clock = clock
+        self.expires = None if deadline is None else clock() + deadline
+        self._reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+
+    def cancel(self, reason: str = INTERRUPTED) -> None:
+        """Richiede l'arresto della scansione (resta il primo motivo)"""
+        with self._lock:
+            if self._reason is None:
+                self._reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """True dopo cancel() o alla scadenza"""
+        if self._event.is_set():
+            return True
+        if self.expires is not None and self.clock() >= self.expires:
+            self.cancel(DEADLINE)
+            return True
+        return False
+
+    @property
+    def reason(self) -> Optional[str]:
+        """DEADLINE, INTERRUPTED (o il motivo passato a cancel), None se attivo"""
+        return self._reason if self.cancelled else None
+
+    def remaining(self) -> Optional[float]:
+        """Secondi alla scadenza (None = nessuna scadenza, 0 = annullato)"""
+        if self.cancelled:
+            return 0.0
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - self.clock())
+
+    def timeout(self, value: float) -> float:
+        """Timeout di un'operazione bloccante, limitato al tempo rimasto"""
+        remaining = self.remaining()
+        if remaining is None:
+            return value
+        return max(_MIN_TIMEOUT, min(value, remaining))
+
+    def sleep(self, seconds: float) -> bool:
+        """
+        Attende fino a `seconds`, meno se il token viene annullato
+
+        Returns:
+            True se annullato
+        """
+        if seconds > 0 and not self.cancelled:
+            self._event.wait(self.timeout(seconds))
+        return self.cancelled
+
+    def call(self, func: Callable, *args, default=None):
+        """
+        Chiamata bloccante non interrompibile (es. DNS) eseguita in un thread
+        e attesa finché il token resta attivo
+
+        Args:
+            func: Funzione da chiamare con args
+            default: Valore restituito se il token viene annullato prima
+
+        Returns:
+            Risultato di func oppure default
+
+        Raises:
+            Le eccezioni sollevate da func
+        """
+        if self.cancelled:
+            return default
+        outcome = {}
+        done = threading.Event()
+
+        def run():
+            try:
+                outcome["value"] = func(*args)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=run, name="cancellable-call", daemon=True).start()
+        while not done.wait(self.timeout(CHECK_INTERVAL)) and not self.cancelled:
+            pass
+        if not done.is_set():
+            return default  # Il thread termina da solo, il risultato è scartato
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["value"]
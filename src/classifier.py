@@ -6,8 +6,8 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
 """
 
 from enum import Enum
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple, Union
 
 
 class RiskLevel(Enum):
@@ -18,6 +18,10 @@ class RiskLevel(Enum):
     INFO = "info"              # Blu - Informativo
 
 
+# Ordine di gravità, per confrontare i livelli
+_SEVERITY = {RiskLevel.INFO: 0, RiskLevel.OK: 1, RiskLevel.WARNING: 2, RiskLevel.CRITICAL: 3}
+
+
 @dataclass
 class PortInfo:
     """Informazioni complete su una porta"""
@@ -36,8 +40,9 @@ class PortClassifier:
     """
 
     # Database porte con classificazione rischio
-    PORT_DATABASE: Dict[int, Tuple[str, RiskLevel, str, str, str]] = {
+    PORT_DATABASE: Dict[Union[int, Tuple[int, str]], Tuple[str, RiskLevel, str, str, str]] = {
         # Porta: (servizio, rischio, descrizione, spiegazione_rischio, raccomandazione)
+        # Chiave (porta, protocollo) per i servizi di un solo protocollo, porta per gli altri
 
         # CRITICHE (Rosso) - Non dovrebbero MAI essere esposte su Internet
         21: (
@@ -111,6 +116,43 @@ class PortClassifier:
             "Disabilitare se non necessario. Se serve, usare solo tramite VPN con autenticazione forte."
         ),
 
+        # Servizi UDP
+        (69, "udp"): (
+            "TFTP",
+            RiskLevel.CRITICAL,
+            "Trasferimento file senza autenticazione (UDP)",
+            "TFTP non chiede password: chiunque raggiunga il server può scaricare (o caricare) file, spesso configurazioni di router e telefoni.",
+            "Disattivare TFTP quando non serve. Se necessario per il provisioning, limitarlo alla rete dei dispositivi."
+        ),
+        (137, "udp"): (
+            "NetBIOS-NS",
+            RiskLevel.CRITICAL,
+            "Nomi NetBIOS di Windows (UDP)",
+            "Rivela nomi dei computer, dominio e utenti collegati. Usato negli attacchi di spoofing dei nomi per rubare credenziali.",
+            "Bloccare sul firewall perimetrale e disattivare NetBIOS su TCP/IP dove non serve."
+        ),
+        (161, "udp"): (
+            "SNMP",
+            RiskLevel.CRITICAL,
+            "Gestione dispositivi di rete (UDP)",
+            "Con la community predefinita \"public\" chiunque legge la configurazione di router, stampanti e switch; può essere sfruttato per attacchi DDoS.",
+            "Cambiare le community predefinite o passare a SNMPv3. Limitare l'accesso ai soli sistemi di monitoraggio."
+        ),
+        (11211, "udp"): (
+            "Memcached",
+            RiskLevel.CRITICAL,
+            "Cache in memoria senza autenticazione (UDP)",
+            "Espone i dati in cache a chiunque. Su UDP è stato usato per i più grandi attacchi DDoS di amplificazione.",
+            "Disattivare UDP (-U 0), accettare connessioni solo da localhost o dalla rete applicativa."
+        ),
+        11211: (
+            "Memcached",
+            RiskLevel.CRITICAL,
+            "Cache in memoria senza autenticazione",
+            "Chiunque raggiunga la porta legge, modifica o cancella i dati in cache dell'applicazione.",
+            "Accettare connessioni solo da localhost o dalla rete applicativa e bloccare la porta sul firewall."
+        ),
+
         # ATTENZIONE (Giallo) - Richiedono verifica configurazione
         22: (
             "SSH",
@@ -155,6 +197,35 @@ class PortClassifier:
             "Verificare cosa è in ascolto. Proteggere con autenticazione. Considerare di limitare gli IP di accesso."
         ),
 
+        (123, "udp"): (
+            "NTP",
+            RiskLevel.WARNING,
+            "Sincronizzazione orario (UDP)",
+            "Server NTP mal configurati possono essere usati per attacchi DDoS di amplificazione (comando monlist).",
+            "Se non è un server orario pubblico, bloccare dall'esterno. Disattivare monlist e aggiornare il servizio."
+        ),
+        (1434, "udp"): (
+            "SQL Server Browser",
+            RiskLevel.WARNING,
+            "Elenco istanze SQL Server (UDP)",
+            "Rivela nomi e porte delle istanze database, facilitando gli attacchi a SQL Server.",
+            "Disattivare il servizio SQL Server Browser se non necessario e bloccarlo sul firewall."
+        ),
+        (1900, "udp"): (
+            "SSDP/UPnP",
+            RiskLevel.WARNING,
+            "Scoperta automatica dispositivi (UDP)",
+            "UPnP rivela modello e versione dei dispositivi e può permettere di aprire porte sul router. Sfruttato per DDoS.",
+            "Disattivare UPnP sul router e sui dispositivi che non lo richiedono. Mai esporlo su Internet."
+        ),
+        (5353, "udp"): (
+            "mDNS",
+            RiskLevel.WARNING,
+            "Scoperta servizi in rete locale (UDP)",
+            "Rivela nomi e servizi dei dispositivi. Non dovrebbe rispondere a richieste provenienti da fuori della rete locale.",
+            "Limitare mDNS alla rete locale e bloccarlo sul firewall perimetrale."
+        ),
+
         # OK (Verde) - Generalmente sicure se aggiornate
         53: (
             "DNS",
@@ -186,23 +257,92 @@ class PortClassifier:
         ),
     }
 
-    def __init__(self):
-        """Inizializza il classificatore"""
-        pass
+    def __init__(self, settings=None):
+        """
+        Inizializza il classificatore
 
-    def classify_port(self, port: int, service: str = "") -> PortInfo:
+        Args:
+            settings: config.ClassifierSettings (livelli imposti per porta, opzionale)
+        """
+        self.settings = settings
+
+    def classify_port(self, port: int, service: str = "", details: Optional[Dict] = None,
+                      protocol: str = "tcp") -> PortInfo:
         """
         Classifica una singola porta
 
         Args:
             port: Numero porta
             service: Nome servizio (opzionale, per override)
+            details: Esiti delle fasi di ispezione (PortResult.details)
+            protocol: "tcp" o "udp"
 
         Returns:
             Informazioni complete sulla porta
         """
-        if port in self.PORT_DATABASE:
-            svc, risk, desc, explanation, recommendation = self.PORT_DATABASE[port]
+        info = self._lookup(port, service, protocol)
+        level = self.settings.override(port) if self.settings else None
+        if level is not None and level != info.risk_level:
+            info = replace(
+                info,
+                risk_level=level,
+                risk_explanation=f"{info.risk_explanation} Livello impostato dalla configurazione aziendale."
+            )
+        if details:
+            info = self.refine(info, details)
+        return info
+
+    def refine(self, info: PortInfo, details: Dict) -> PortInfo:
+        """
+        Corregge la classificazione con quanto osservato sul servizio
+
+        Ogni fase di ispezione può fornire un riepilogo ("summary"), una
+        valutazione del servizio osservato ("risk") e una lista di problemi
+        ("findings", con level critical o warning). La valutazione sostituisce
+        il rischio generico della porta (mai se questo è critico), poi il
+        rischio sale al livello del problema più grave; testi e
+        raccomandazioni vengono aggiunti a quelli della porta.
+
+        Args:
+            info: Classificazione di base della porta
+            details: Esiti delle fasi di ispezione, per nome della fase
+
+        Returns:
+            Nuovo PortInfo (quello ricevuto se non c'è nulla da aggiungere)
+        """
+        stages = [stage for stage in details.values() if isinstance(stage, dict)]
+        risk = info.risk_level
+        assessed = [RiskLevel(stage["risk"]) for stage in stages if stage.get("risk")]
+        if assessed and risk != RiskLevel.CRITICAL:
+            risk = max(assessed, key=_SEVERITY.get)
+
+        summaries, titles, recommendations = [], [], []
+        for stage in stages:
+            if stage.get("summary"):
+                summaries.append(stage["summary"])
+            for finding in stage.get("findings", []):
+                level = RiskLevel(finding.get("level", "warning"))
+                if _SEVERITY[level] > _SEVERITY[risk]:
+                    risk = level
+                titles.append(finding["title"])
+                if finding.get("recommendation"):
+                    recommendations.append(finding["recommendation"])
+
+        if not (summaries or titles) and risk == info.risk_level:
+            return info
+        return replace(
+            info,
+            risk_level=risk,
+            description=" - ".join([info.description] + summaries),
+            risk_explanation=" ".join([info.risk_explanation] + [f"{t}." for t in titles]),
+            recommendation=" ".join(recommendations + [info.recommendation])
+        )
+
+    def _lookup(self, port: int, service: str, protocol: str = "tcp") -> PortInfo:
+        """Classificazione dal database: prima (porta, protocollo), poi la sola porta"""
+        entry = self.PORT_DATABASE.get((port, protocol)) or self.PORT_DATABASE.get(port)
+        if entry:
+            svc, risk, desc, explanation, recommendation = entry
             return PortInfo(
                 port=port,
                 service=service or svc,
@@ -253,7 +393,9 @@ class PortClassifier:
 
                 port_info = self.classify_port(
                     port_result.port,
-                    port_result.service
+                    port_result.service,
+                    getattr(port_result, 'details', None),
+                    getattr(port_result, 'protocol', 'tcp')
                 )
 
                 entry = {
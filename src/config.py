@@ -0,0 +1,467 @@
+"""
+Configurazione - CyberSentinel
+Profili di scansione e impostazioni lette dal file YAML
+
+Il file viene letto e validato una sola volta all'avvio: ogni errore
+(chiave sconosciuta, porte o durate non valide) emerge prima della
+scansione. Profili e impostazioni sono oggetti immutabili condivisi da
+scanner, classificatore e generatori di report.
+
+Esempio:
+    scanner:
+      timeout: 2.0
+    profiles:
+      server:
+        targets: [192.168.1.10, 192.168.1.11]
+        ports: top1000
+        rate_limit: 200
+        deadline: 45m
+    classifier:
+      risk_overrides: {3389: warning}
+    schedule:
+      profiles:
+        - name: server-notte
+          profile: server
+          every: 1d
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import re
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .classifier import RiskLevel
+from .ports import parse_ports
+from .reports import report_format_for
+
+# Motore di scansione: nmap se presente, solo nmap, solo socket Python
+BACKENDS = ("auto", "nmap", "socket")
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class ConfigError(ValueError):
+    """Configurazione non valida"""
+
+
+def parse_duration(value) -> float:
+    """
+    Converte una durata in secondi
+
+    Args:
+        value: Numero di secondi oppure stringa come "30m", "6h", "1d"
+
+    Returns:
+        Durata in secondi
+    """
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = _DURATION_RE.match(str(value))
+        if not match:
+            raise ValueError(f"Durata non valida: {value}")
+        seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError(f"La durata deve essere positiva: {value}")
+    return seconds
+
+
+@dataclass(frozen=True)
+class ScanProfile:
+    """Profilo di scansione con nome (sezione 'profiles')"""
+    name: str
+    targets: Tuple[str, ...] = ()
+    ports: Optional[str] = None           # Specifica per parse_ports (None = porte PMI)
+    udp: bool = False
+    timeout: float = 2.0
+    concurrency: Optional[int] = None     # Connessioni in volo per host
+    rate_limit: Optional[float] = None    # Nuove connessioni al secondo
+    deadline: Optional[float] = None      # Secondi per scansione e analisi (poi risultati parziali)
+    backend: str = "auto"
+    inspect: bool = True
+    report: bool = True
+    output: Optional[str] = None
+    report_format: Optional[str] = None
+    json: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, name: str, data: Mapping[str, Any]) -> "ScanProfile":
+        """
+        Crea e valida un profilo
+
+        Args:
+            name: Nome del profilo
+            data: Impostazioni (sezione 'scanner' più quelle del profilo)
+
+        Raises:
+            ConfigError: Se un valore non è valido
+        """
+        where = f"profilo {name}"
+        _check_keys(data, {f.name for f in fields(cls)} - {"name"} | {"target", "use_nmap"}, where)
+
+        targets = data.get("targets", data.get("target")) or ()
+        if isinstance(targets, str):
+            targets = [targets]
+        targets = tuple(str(t).strip() for t in targets)
+
+        ports = data.get("ports")
+        if isinstance(ports, (list, tuple)):
+            ports = ",".join(str(p) for p in ports)
+        if ports is not None:
+            ports = str(ports)
+            try:
+                parse_ports(ports)
+            except ValueError as e:
+                raise ConfigError(f"{where}: {e}")
+
+        backend = data.get("backend")
+        if backend is None:
+            backend = "auto" if data.get("use_nmap", True) else "socket"
+        if backend not in BACKENDS:
+            raise ConfigError(f"{where}: backend deve essere uno tra {', '.join(BACKENDS)}")
+
+        deadline = data.get("deadline")
+        if deadline is not None:
+            try:
+                deadline = parse_duration(deadline)
+            except ValueError as e:
+                raise ConfigError(f"{where}: deadline: {e}")
+
+        report_format = data.get("report_format")
+        if report_format is not None:
+            try:
+                report_format_for("", report_format)
+            except ValueError as e:
+                raise ConfigError(f"{where}: {e}")
+
+        return cls(
+            name=name,
+            targets=targets,
+            ports=ports,
+            udp=bool(data.get("udp", False)),
+            timeout=_positive(data.get("timeout", 2.0), f"{where}: timeout"),
+            concurrency=_optional(data.get("concurrency"), int, f"{where}: concurrency"),
+            rate_limit=_optional(data.get("rate_limit"), float, f"{where}: rate_limit"),
+            deadline=deadline,
+            backend=backend,
+            inspect=bool(data.get("inspect", True)),
+            report=bool(data.get("report", True)),
+            output=data.get("output"),
+            report_format=report_format,
+            json=data.get("json")
+        )
+
+    @property
+    def use_nmap(self) -> bool:
+        return self.backend != "socket"
+
+    def scanner_options(self) -> Dict[str, Any]:
+        """Argomenti per PortScanner (porte espanse, porte UDP se richieste)"""
+        udp_ports = None
+        if self.udp:
+            from .udp_scanner import DEFAULT_UDP_PORTS
+            udp_ports = DEFAULT_UDP_PORTS
+        return {
+            "ports": parse_ports(self.ports) if self.ports else None,
+            "timeout": self.timeout,
+            "use_nmap": self.use_nmap,
+            "concurrency": self.concurrency,
+            "rate_limit": self.rate_limit,
+            "udp_ports": udp_ports,
+        }
+
+
+@dataclass(frozen=True)
+class ClassifierSettings:
+    """Impostazioni del classificatore (sezione 'classifier')"""
+    # Livello di base per porta, es. 3389 -> WARNING se raggiungibile solo in VPN.
+    # I problemi trovati dalle fasi di ispezione alzano comunque il livello.
+    risk_overrides: Tuple[Tuple[int, RiskLevel], ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ClassifierSettings":
+        _check_keys(data, {"risk_overrides"}, "classifier")
+        overrides = []
+        for port, level in (data.get("risk_overrides") or {}).items():
+            try:
+                overrides.append((int(port), RiskLevel(str(level).lower())))
+            except ValueError:
+                raise ConfigError(f"classifier.risk_overrides: valore non valido {port}: {level}")
+        return cls(risk_overrides=tuple(sorted(overrides, key=lambda item: item[0])))
+
+    def override(self, port: int) -> Optional[RiskLevel]:
+        """Livello imposto per la porta, None se non configurato"""
+        for configured, level in self.risk_overrides:
+            if configured == port:
+                return level
+        return None
+
+
+@dataclass(frozen=True)
+class ReportSettings:
+    """Impostazioni dei report (sezione 'report')"""
+    title: str = "Report Sicurezza Rete"
+    detailed_recommendations: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ReportSettings":
+        _check_keys(data, {f.name for f in fields(cls)}, "report")
+        return cls(
+            title=str(data.get("title", cls.title)),
+            detailed_recommendations=bool(data.get("detailed_recommendations", True))
+        )
+
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    """Impostazioni dei log (sezione 'logging', vedi logs.setup_logging)"""
+    level: str = "INFO"
+    file: Optional[str] = None
+    format: str = "json"      # File in JSON Lines oppure testo
+    sample_hosts: int = 1     # Un messaggio per host ogni N (1 = tutti)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LoggingSettings":
+        _check_keys(data, {f.name for f in fields(cls)}, "logging")
+        level = str(data.get("level", "INFO")).upper()
+        if level not in LOG_LEVELS:
+            raise ConfigError(f"logging.level deve essere uno tra {', '.join(LOG_LEVELS)}")
+        fmt = data.get("format", "json")
+        if fmt not in ("json", "text"):
+            raise ConfigError("logging.format deve essere json o text")
+        return cls(
+            level=level,
+            file=data.get("file") or None,
+            format=fmt,
+            sample_hosts=int(_positive(data.get("sample_hosts", 1), "logging.sample_hosts"))
+        )
+
+
+@dataclass(frozen=True)
+class ScheduledScan:
+    """
+    Scansione ricorrente (sezione 'schedule.profiles'): un ScanProfile
+    validato più la sola cadenza
+    """
+    name: str
+    profile: ScanProfile
+    interval: float               # Secondi tra due esecuzioni
+    jitter: float = 0.1           # Variazione casuale, frazione dell'intervallo (±)
+    output_dir: str = "reports"   # JSON e report con data e ora nel nome
+
+    # Chiavi proprie della voce; le altre sono impostazioni del ScanProfile
+    CADENCE_KEYS = ("name", "profile", "every", "interval", "jitter", "output_dir")
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], profiles: Mapping[str, Mapping[str, Any]],
+                  defaults: Mapping[str, Any]) -> "ScheduledScan":
+        """
+        Crea e valida una voce dello scheduler
+
+        Args:
+            data: Voce di 'schedule.profiles'
+            profiles: Sezione 'profiles' (per 'profile: <nome>')
+            defaults: Sezione 'scanner'
+
+        Raises:
+            ConfigError: Se un valore non è valido
+        """
+        if not isinstance(data, dict) or not data.get("name"):
+            raise ConfigError("schedule.profiles: ogni voce richiede 'name'")
+        name = str(data["name"])
+        where = f"schedule {name}"
+
+        base = dict(defaults)
+        reference = data.get("profile")
+        if reference is not None:
+            if reference not in profiles:
+                raise ConfigError(f"{where}: profilo sconosciuto {reference} "
+                                  f"(disponibili: {', '.join(profiles) or 'nessuno'})")
+            base.update(profiles[reference])
+        settings = {k: v for k, v in data.items() if k not in cls.CADENCE_KEYS}
+        paths = sorted({"output", "json"} & set(settings))
+        if paths:
+            raise ConfigError(f"{where}: {', '.join(paths)} non supportati, usare output_dir")
+        profile = ScanProfile.from_dict(name, {**base, **settings})
+        if not profile.targets:
+            raise ConfigError(f"{where}: manca 'target' (o un 'profile' con targets)")
+
+        every = data.get("every", data.get("interval"))
+        if every is None:
+            raise ConfigError(f"{where}: manca 'every'")
+        try:
+            interval = parse_duration(every)
+        except ValueError as e:
+            raise ConfigError(f"{where}: every: {e}")
+        try:
+            jitter = float(data.get("jitter", 0.1))
+        except (TypeError, ValueError):
+            jitter = -1.0
+        if not 0 <= jitter < 1:
+            raise ConfigError(f"{where}: jitter deve essere tra 0 e 1")
+
+        return cls(
+            name=name,
+            profile=profile,
+            interval=interval,
+            jitter=jitter,
+            output_dir=str(data.get("output_dir", "reports"))
+        )
+
+    @property
+    def target(self) -> str:
+        """Target del profilo, per log e messaggi"""
+        return ", ".join(self.profile.targets)
+
+
+@dataclass(frozen=True)
+class ScheduleSettings:
+    """Scansioni programmate (sezione 'schedule', vedi scheduler.ScanScheduler)"""
+    profiles: Tuple[ScheduledScan, ...] = ()
+    max_concurrent: int = 2
+    state_file: str = "cybersentinel_schedule.json"
+    startup_spread: float = 300.0   # Secondi in cui distribuire le scansioni arretrate
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], profiles: Mapping[str, Mapping[str, Any]],
+                  defaults: Mapping[str, Any]) -> "ScheduleSettings":
+        _check_keys(data, {f.name for f in fields(cls)}, "schedule")
+        entries = data.get("profiles") or []
+        if not isinstance(entries, list):
+            raise ConfigError("schedule.profiles: attesa una lista")
+        scans = tuple(ScheduledScan.from_dict(entry, profiles, defaults) for entry in entries)
+        names = [scan.name for scan in scans]
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ConfigError(f"schedule.profiles: nomi ripetuti {', '.join(duplicates)}")
+        spread = data.get("startup_spread", cls.startup_spread)
+        return cls(
+            profiles=scans,
+            max_concurrent=int(_positive(data.get("max_concurrent", cls.max_concurrent),
+                                         "schedule.max_concurrent")),
+            state_file=str(data.get("state_file", cls.state_file)),
+            startup_spread=0.0 if spread == 0 else _positive(spread, "schedule.startup_spread")
+        )
+
+
+@dataclass(frozen=True)
+class Config:
+    """Configurazione validata"""
+    profiles: Mapping[str, ScanProfile] = field(default_factory=lambda: MappingProxyType({}))
+    classifier: ClassifierSettings = ClassifierSettings()
+    report: ReportSettings = ReportSettings()
+    logging: LoggingSettings = LoggingSettings()
+    schedule: ScheduleSettings = ScheduleSettings()
+    data: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))  # Altre sezioni
+
+    def profile(self, name: Optional[str] = None) -> ScanProfile:
+        """
+        Profilo richiesto
+
+        Args:
+            name: Nome del profilo; se omesso, l'unico profilo definito
+                oppure le sole impostazioni della sezione 'scanner'
+
+        Raises:
+            ConfigError: Se il profilo non esiste o la scelta è ambigua
+        """
+        if name is not None:
+            if name not in self.profiles:
+                raise ConfigError(f"Profilo sconosciuto: {name} "
+                                  f"(disponibili: {', '.join(self.profiles) or 'nessuno'})")
+            return self.profiles[name]
+        if len(self.profiles) == 1:
+            return next(iter(self.profiles.values()))
+        if self.profiles:
+            raise ConfigError(f"Indicare il profilo: {', '.join(self.profiles)}")
+        return ScanProfile.from_dict("default", self.data.get("scanner") or {})
+
+
+def parse_config(data: Optional[Mapping[str, Any]]) -> Config:
+    """
+    Valida la configurazione già caricata
+
+    I profili ereditano le impostazioni della sezione 'scanner'; le voci
+    di 'schedule.profiles' anche quelle del profilo indicato con 'profile'.
+
+    Raises:
+        ConfigError: Se una sezione non è valida
+    """
+    data = dict(data or {})
+    defaults = _section(data, "scanner")
+    sections = {str(name): settings for name, settings in _section(data, "profiles").items()}
+    profiles = {}
+    for name, settings in sections.items():
+        if not isinstance(settings, dict):
+            raise ConfigError(f"profilo {name}: attese delle impostazioni")
+        profiles[name] = ScanProfile.from_dict(name, {**defaults, **settings})
+    if "scanner" in data:
+        ScanProfile.from_dict("scanner", defaults)  # Errori anche senza profili
+
+    return Config(
+        profiles=MappingProxyType(profiles),
+        classifier=ClassifierSettings.from_dict(_section(data, "classifier")),
+        report=ReportSettings.from_dict(_section(data, "report")),
+        logging=LoggingSettings.from_dict(_section(data, "logging")),
+        schedule=ScheduleSettings.from_dict(_section(data, "schedule"), sections, defaults),
+        data=MappingProxyType(data)
+    )
+
+
+def read_yaml(path: str) -> Dict[str, Any]:
+    """
+    Legge un file YAML
+
+    Raises:
+        ImportError: Se pyyaml non è installato
+        ConfigError: Se il file non è leggibile o non è YAML valido
+    """
+    import yaml
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        raise ConfigError(str(e))
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: attesa una mappa di sezioni")
+    return data
+
+
+def load_config(path: str) -> Config:
+    """Legge e valida il file di configurazione (vedi parse_config)"""
+    return parse_config(read_yaml(path))
+
+
+def _section(data: Mapping[str, Any], name: str) -> Dict[str, Any]:
+    section = data.get(name) or {}
+    if not isinstance(section, dict):
+        raise ConfigError(f"Sezione '{name}' non valida: attese delle impostazioni")
+    return section
+
+
+def _check_keys(data: Mapping[str, Any], known, where: str) -> None:
+    unknown = sorted(set(data) - set(known))
+    if unknown:
+        raise ConfigError(f"{where}: chiavi sconosciute {', '.join(map(str, unknown))}")
+
+
+def _positive(value, where: str) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f"{where}: atteso un numero, trovato {value!r}")
+    if number <= 0:
+        raise ConfigError(f"{where}: deve essere positivo")
+    return number
+
+
+def _optional(value, kind, where: str):
+    if value is None:
+        return None
+    return kind(_positive(value, where))
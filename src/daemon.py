@@ -0,0 +1,520 @@
+"""
+Modalità Servizio - CyberSentinel
+Demone con API HTTP locale e coda di job persistente
+
+Il demone mantiene "caldi" scanner, classificatore e generatore report tra
+un job e l'altro, così lo scheduler esterno non paga l'avvio del processo
+(e l'import di reportlab) a ogni scansione.
+
+API (JSON):
+    POST   /jobs               Accoda una scansione {"target": ..., "ports": [...], "deadline": "45m"}
+    GET    /jobs               Elenco job
+    GET    /jobs/<id>          Stato di un job
+    GET    /jobs/<id>/result   Risultato ScanResult in JSON
+    GET    /jobs/<id>/report   Report PDF
+    DELETE /jobs/<id>          Annulla un job in coda o ferma quello in corso (risultati parziali)
+    GET    /health             Stato del servizio
+    GET    /metrics            Metriche in formato Prometheus
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import uuid
+from dataclasses import dataclass, field, asdict, replace
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cancel import INTERRUPTED, CancelToken
+from .scanner import PortScanner
+from .classifier import PortClassifier
+from .distributed import parse_address
+from .inspection import default_inspectors, run_inspections
+from .telemetry import ScanTelemetry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScanJob:
+    """Job di scansione in coda"""
+    target: str
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    ports: Optional[List[int]] = None
+    timeout: float = 2.0
+    use_nmap: bool = True
+    report: bool = True
+    deadline: Optional[float] = None  # Secondi per scansione e analisi
+    status: str = "queued"  # queued, running, done, failed, cancelled
+    created: str = field(default_factory=lambda: datetime.now().isoformat())
+    started: Optional[str] = None
+    finished: Optional[str] = None
+    error: str = ""
+    complete: bool = True  # False se fermato dalla scadenza o annullato in corso
+    summary: Dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScanJob":
+        known = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class JobStore:
+    """
+    Coda job persistente su disco.
+    Ogni job è un file JSON in <state_dir>/jobs, scritto in modo atomico;
+    risultati e report stanno in <state_dir>/results e <state_dir>/reports.
+    Lo store conserva copie: i job restituiti sono istantanee che i thread
+    dell'API serializzano senza lock, le modifiche passano da save o update.
+    """
+
+    def __init__(self, state_dir: str):
+        self.root = Path(state_dir)
+        self.jobs_dir = self.root / "jobs"
+        self.results_dir = self.root / "results"
+        self.reports_dir = self.root / "reports"
+        for d in (self.jobs_dir, self.results_dir, self.reports_dir):
+            d.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ScanJob] = {}
+        self._load()
+
+    def _load(self) -> None:
+        for path in sorted(self.jobs_dir.glob("*.json")):
+            try:
+                job = ScanJob.from_dict(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning("Job illeggibile %s: %s", path.name, e)
+                continue
+            # Job interrotti da un riavvio tornano in coda
+            if job.status == "running":
+                job.status = "queued"
+                job.started = None
+            self._jobs[job.job_id] = job
+
+    def save(self, job: ScanJob) -> None:
+        """Salva una copia del job (scrittura atomica)"""
+        with self._lock:
+            self._write(replace(job))
+
+    def update(self, job_id: str, expected: Optional[str] = None, **changes) -> Optional[ScanJob]:
+        """
+        Modifica e salva un job in modo atomico
+
+        Args:
+            job_id: Job da modificare
+            expected: Stato richiesto (es. "queued"), None per qualsiasi
+            changes: Campi da modificare
+
+        Returns:
+            Copia del job aggiornato, None se assente o in un altro stato
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (expected is not None and job.status != expected):
+                return None
+            job = replace(job, **changes)
+            self._write(job)
+            return replace(job)
+
+    def _write(self, job: ScanJob) -> None:
+        self._jobs[job.job_id] = job
+        path = self.jobs_dir / f"{job.job_id}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(job), indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def list(self) -> List[ScanJob]:
+        with self._lock:
+            return sorted((replace(j) for j in self._jobs.values()), key=lambda j: j.created)
+
+    def pending(self) -> List[ScanJob]:
+        """Job in coda, in ordine di arrivo"""
+        return [j for j in self.list() if j.status == "queued"]
+
+    def result_path(self, job_id: str) -> Path:
+        return self.results_dir / f"{job_id}.json"
+
+    def report_path(self, job_id: str) -> Path:
+        return self.reports_dir / f"{job_id}.pdf"
+
+
+class ScanDaemon:
+    """
+    Servizio di scansione a lunga esecuzione.
+    Esegue i job con un numero massimo di scansioni concorrenti e riusa
+    scanner, classificatore e generatore report tra i job.
+    """
+
+    def __init__(
+        self,
+        state_dir: str,
+        address: str = "127.0.0.1:8765",
+        max_concurrent: int = 2,
+        default_timeout: float = 2.0,
+        use_nmap: bool = True
+    ):
+        """
+        Inizializza il demone
+
+        Args:
+            state_dir: Directory per coda job, risultati e report
+            address: Indirizzo API ("host:porta" o "unix:/percorso")
+            max_concurrent: Job eseguiti in parallelo al massimo
+            default_timeout: Timeout di default per i job
+            use_nmap: Default per l'uso di nmap nei job
+        """
+        self.store = JobStore(state_dir)
+        self.address_spec = address
+        self.max_concurrent = max(1, max_concurrent)
+        self.default_timeout = default_timeout
+        self.default_use_nmap = use_nmap
+
+        self.classifier = PortClassifier()
+        self.telemetry = ScanTelemetry()
+        self._generator = None
+        self._report_lock = threading.Lock()
+        self._scanners: Dict[Tuple, PortScanner] = {}
+        self._scanners_lock = threading.Lock()
+        self._running: Dict[str, CancelToken] = {}  # job in corso -> token
+
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._server = None
+        self._server_thread: Optional[threading.Thread] = None
+
+    # --- Componenti riusati tra i job ---
+
+    @property
+    def generator(self):
+        """ReportGenerator condiviso (reportlab importato una sola volta)"""
+        if self._generator is None:
+            from .report_generator import ReportGenerator
+            self._generator = ReportGenerator()
+        return self._generator
+
+    def get_scanner(self, ports: Optional[List[int]], timeout: float, use_nmap: bool) -> PortScanner:
+        """Restituisce uno scanner già pronto per la configurazione richiesta"""
+        key = (tuple(ports) if ports else None, timeout, use_nmap)
+        with self._scanners_lock:
+            scanner = self._scanners.get(key)
+            if scanner is None:
+                scanner = PortScanner(
+                    ports=ports, timeout=timeout, use_nmap=use_nmap,
+                    telemetry=self.telemetry
+                )
+                self._scanners[key] = scanner
+            return scanner
+
+    # --- Ciclo di vita ---
+
+    @property
+    def address(self) -> str:
+        """Indirizzo effettivo dell'API"""
+        if self._server is None:
+            return self.address_spec
+        if self._server.address_family == socket.AF_UNIX:
+            return f"unix:{self._server.server_address}"
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self, warm_up: bool = True) -> "ScanDaemon":
+        """Avvia API e worker, rimettendo in coda i job persistiti"""
+        if warm_up:
+            try:
+                self.generator
+            except ImportError as e:
+                logger.warning("Report PDF non disponibili: %s", e)
+
+        for job in self.store.pending():
+            self._queue.put(job.job_id)
+
+        for i in range(self.max_concurrent):
+            worker = threading.Thread(
+                target=self._worker_loop, name=f"job-worker-{i + 1}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        family, addr = parse_address(self.address_spec)
+        if family == socket.AF_UNIX:
+            if os.path.exists(addr):
+                os.unlink(addr)
+            self._server = _UnixHTTPServer(addr, _ApiHandler)
+        else:
+            server_cls = _HTTP6Server if family == socket.AF_INET6 else ThreadingHTTPServer
+            self._server = server_cls(addr, _ApiHandler)
+        self._server.scan_daemon = self
+
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._server_thread.start()
+        logger.info("Demone in ascolto su %s", self.address)
+        return self
+
+    def stop(self) -> None:
+        """Ferma API e worker (i job in corso terminano la scansione)"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if self._server.address_family == socket.AF_UNIX:
+                try:
+                    os.unlink(self._server.server_address)
+                except OSError:
+                    pass
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers.clear()
+
+    def serve_forever(self) -> None:
+        """Avvia il demone e resta in attesa fino a Ctrl+C"""
+        self.start()
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    # --- Job ---
+
+    def submit(self, params: Dict) -> ScanJob:
+        """
+        Accoda un nuovo job
+
+        Args:
+            params: Parametri del job (target obbligatorio)
+
+        Returns:
+            Job creato
+
+        Raises:
+            ValueError: Se un parametro non è valido
+        """
+        target = params.get("target")
+        if not target or not PortScanner.validate_target(target):
+            raise ValueError(f"Target non valido: {target}")
+
+        ports = params.get("ports")
+        if ports is not None:
+            if not isinstance(ports, list) or not all(
+                isinstance(p, int) and 0 < p < 65536 for p in ports
+            ):
+                raise ValueError("ports deve essere una lista di porte 1-65535")
+
+        timeout = params.get("timeout", self.default_timeout)
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError("timeout deve essere un numero di secondi positivo")
+
+        # JSON booleani: la stringa "false" non deve valere True
+        for name in ("use_nmap", "report"):
+            if name in params and not isinstance(params[name], bool):
+                raise ValueError(f"{name} deve essere true o false")
+
+        deadline = params.get("deadline")
+        if deadline is not None:
+            from .config import parse_duration
+            deadline = parse_duration(deadline)
+
+        job = ScanJob(
+            target=target,
+            ports=ports,
+            timeout=float(timeout),
+            use_nmap=params.get("use_nmap", self.default_use_nmap),
+            report=params.get("report", True),
+            deadline=deadline,
+        )
+        self.store.save(job)
+        self._queue.put(job.job_id)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[ScanJob]:
+        """
+        Annulla un job in coda; un job in corso si ferma a breve e salva
+        risultato e report parziali (stato "cancelled" al termine)
+        """
+        job = self.store.update(job_id, expected="queued", status="cancelled",
+                                finished=datetime.now().isoformat())
+        if job is not None:
+            return job
+        # Il token è registrato prima che il job passi a "running"
+        token = self._running.get(job_id)
+        if token is not None:
+            token.cancel(INTERRUPTED)
+        return self.store.get(job_id)
+
+    def _worker_loop(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            job = self.store.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            cancel = self._running[job_id] = CancelToken(job.deadline)
+            job = self.store.update(job_id, expected="queued", status="running",
+                                    started=datetime.now().isoformat())
+            if job is None:  # Annullato nel frattempo
+                self._running.pop(job_id, None)
+                continue
+            self._run_job(job, cancel)
+
+    def _run_job(self, job: ScanJob, cancel: CancelToken) -> None:
+        # job è una copia privata: lo stato pubblicato cambia solo con store.update
+        changes = {}
+        try:
+            scanner = self.get_scanner(job.ports, job.timeout, job.use_nmap)
+            result = scanner.scan(job.target, cancel=cancel)
+            run_inspections(result, default_inspectors(timeout=job.timeout, cache_dir=self.store.root),
+                            cancel)
+            result.to_json(str(self.store.result_path(job.job_id)))
+
+            classified = result.classify(self.classifier)
+            changes.update(complete=result.complete, summary=classified["summary"])
+
+            if job.report:
+                # reportlab non è thread-safe: un report alla volta
+                with self._report_lock:
+                    self.generator.generate(
+                        result, str(self.store.report_path(job.job_id)), classified=classified
+                    )
+
+            changes["status"] = "cancelled" if cancel.reason == INTERRUPTED else "done"
+        except Exception as e:
+            logger.error("Job %s fallito: %s", job.job_id, e)
+            changes.update(status="failed", error=str(e))
+        finally:
+            self._running.pop(job.job_id, None)
+
+        self.store.update(job.job_id, finished=datetime.now().isoformat(), **changes)
+
+
+class _HTTP6Server(ThreadingHTTPServer):
+    address_family = socket.AF_INET6
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """Handler API HTTP del demone"""
+
+    server_version = "CyberSentinel"
+
+    def log_message(self, format, *args):
+        logger.debug("API: " + format, *args)
+
+    def address_string(self):
+        # I socket Unix non hanno indirizzo client
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: Path, content_type: str) -> None:
+        data = path.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job_or_404(self, job_id: str) -> Optional[ScanJob]:
+        job = self.server.scan_daemon.store.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"Job non trovato: {job_id}"})
+        return job
+
+    def do_GET(self):
+        daemon = self.server.scan_daemon
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+
+        if parts == ["health"]:
+            jobs = daemon.store.list()
+            self._send_json(200, {
+                "status": "ok",
+                "queued": sum(1 for j in jobs if j.status == "queued"),
+                "running": sum(1 for j in jobs if j.status == "running"),
+                "max_concurrent": daemon.max_concurrent,
+            })
+        elif parts == ["metrics"]:
+            body = daemon.telemetry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif parts == ["jobs"]:
+            self._send_json(200, [asdict(j) for j in daemon.store.list()])
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job_or_404(parts[1])
+            if job:
+                self._send_json(200, asdict(job))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] in ("result", "report"):
+            job = self._job_or_404(parts[1])
+            if not job:
+                return
+            if parts[2] == "result":
+                path, ctype = daemon.store.result_path(job.job_id), "application/json"
+            else:
+                path, ctype = daemon.store.report_path(job.job_id), "application/pdf"
+            if job.status not in ("done", "cancelled") or not path.exists():
+                self._send_json(409, {"error": f"Job in stato {job.status}", "status": job.status})
+            else:
+                self._send_file(path, ctype)
+        else:
+            self._send_json(404, {"error": "Risorsa non trovata"})
+
+    def do_POST(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if parts != ["jobs"]:
+            self._send_json(404, {"error": "Risorsa non trovata"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            params = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(params, dict):
+                raise ValueError("Corpo della richiesta non valido")
+            job = self.server.scan_daemon.submit(params)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(202, asdict(job))
+
+    def do_DELETE(self):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send_json(404, {"error": "Risorsa non trovata"})
+            return
+        if not self._job_or_404(parts[1]):
+            return
+        job = self.server.scan_daemon.cancel(parts[1])
+        if job.status == "running":
+            status = 202  # Si ferma a breve con i risultati parziali
+        else:
+            status = 200 if job.status == "cancelled" else 409
+        self._send_json(status, asdict(job))
@@ -0,0 +1,554 @@
+"""
+Scansione Distribuita - CyberSentinel
+Un coordinatore distribuisce blocchi di target a più worker PortScanner
+
+Protocollo: messaggi JSON, uno per riga, su TCP o socket Unix.
+Il worker chiede un lease su un blocco (shard) di IP, invia ogni HostResult
+appena completato e un heartbeat periodico; se il worker muore o smette di
+rispondere, gli IP non ancora ricevuti tornano disponibili per altri worker.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from .cancel import CHECK_INTERVAL, DEADLINE
+from .scanner import PortScanner, HostResult, ScanResult
+
+logger = logging.getLogger(__name__)
+
+
+def parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """
+    Interpreta un indirizzo del coordinatore
+
+    Args:
+        address: "host:porta" per TCP oppure "unix:/percorso/socket"
+
+    Returns:
+        Tupla (famiglia socket, indirizzo)
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Indirizzo coordinatore non valido: {address}")
+    host = host.strip("[]") or "127.0.0.1"
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    return family, (host, int(port))
+
+
+def _send(wfile, message: Dict) -> None:
+    """Invia un messaggio JSON su una riga"""
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+def _recv(rfile) -> Optional[Dict]:
+    """Legge un messaggio JSON (None se la connessione è chiusa)"""
+    line = rfile.readline()
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+
+@dataclass
+class Shard:
+    """Blocco di IP assegnabile a un worker"""
+    shard_id: int
+    ips: List[str]
+    lease_id: Optional[str] = None
+    worker: Optional[str] = None
+    expires: float = 0.0
+    attempts: int = 0
+    done: bool = False
+    failed: bool = False
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    """Gestisce la connessione di un singolo worker"""
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        conn_id = uuid.uuid4().hex
+        worker = conn_id
+
+        try:
+            while True:
+                message = _recv(self.rfile)
+                if message is None:
+                    break
+
+                kind = message.get("type")
+                if kind == "hello":
+                    worker = f"{message.get('worker', 'worker')}#{conn_id[:8]}"
+                    _send(self.wfile, coordinator._config_message())
+                elif kind == "lease":
+                    _send(self.wfile, coordinator._grant_lease(worker))
+                elif kind == "heartbeat":
+                    coordinator._renew(worker, message.get("lease_id"))
+                elif kind == "host":
+                    coordinator._receive_host(
+                        worker, message.get("lease_id"), message.get("host", {})
+                    )
+                elif kind == "complete":
+                    coordinator._complete(worker, message.get("lease_id"))
+        except (OSError, ValueError) as e:
+            logger.warning("Connessione worker %s interrotta: %s", worker, e)
+        finally:
+            # Worker disconnesso: i suoi lease tornano disponibili
+            coordinator._release_worker(worker)
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _TCP6Server(_TCPServer):
+    address_family = socket.AF_INET6
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ScanCoordinator:
+    """
+    Coordinatore della scansione distribuita.
+    Suddivide il target in shard, li assegna in lease ai worker e raccoglie
+    i risultati in un unico ScanResult.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        address: str = "127.0.0.1:0",
+        ports: Optional[List[int]] = None,
+        timeout: float = 2.0,
+        shard_size: int = 16,
+        lease_ttl: float = 30.0,
+        max_attempts: int = 3,
+        host_callback: Optional[Callable[[HostResult], None]] = None,
+        hitlist: Optional[List[str]] = None
+    ):
+        """
+        Inizializza il coordinatore
+
+        Args:
+            target: IP, CIDR o hostname da scansionare
+            address: Indirizzo di ascolto ("host:porta" o "unix:/percorso")
+            ports: Porte da scansionare (default: porte PMI)
+            timeout: Timeout connessione usato dai worker
+            shard_size: Numero di IP per ogni shard
+            lease_ttl: Secondi senza heartbeat prima di riassegnare uno shard
+            max_attempts: Tentativi massimi per shard prima di abbandonarlo
+            host_callback: Callback per ogni host ricevuto dai worker
+            hitlist: Indirizzi noti per le reti IPv6 troppo grandi da enumerare
+        """
+        scanner = PortScanner(ports=ports, timeout=timeout, use_nmap=False, hitlist=hitlist)
+        if not scanner.validate_target(target):
+            raise ValueError(f"Target non valido: {target}")
+
+        self.target = target
+        self.ports = scanner.ports
+        self.timeout = timeout
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+        self.host_callback = host_callback
+        self._address = address
+
+        ip_list = scanner._get_hosts_from_target(target)
+        self._ip_order = {ip: i for i, ip in enumerate(ip_list)}
+        self.shards = [
+            Shard(shard_id=n, ips=ip_list[i:i + shard_size])
+            for n, i in enumerate(range(0, len(ip_list), max(1, shard_size)))
+        ]
+
+        self._results: Dict[str, HostResult] = {}
+        self._received: Set[str] = set()
+        self._lock = threading.Condition()
+        self._server = None
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self.start_time = datetime.now()
+
+    @property
+    def address(self) -> str:
+        """Indirizzo effettivo di ascolto (porta reale se era 0)"""
+        if self._server is None:
+            return self._address
+        if self._server.address_family == socket.AF_UNIX:
+            return f"unix:{self._server.server_address}"
+        host, port = self._server.server_address[:2]
+        if ":" in host:
+            return f"[{host}]:{port}"
+        return f"{host}:{port}"
+
+    def start(self) -> "ScanCoordinator":
+        """Avvia il server e il controllo dei lease scaduti"""
+        family, addr = parse_address(self._address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(addr):
+                os.unlink(addr)
+            self._server = _UnixServer(addr, _CoordinatorHandler)
+        elif family == socket.AF_INET6:
+            self._server = _TCP6Server(addr, _CoordinatorHandler)
+        else:
+            self._server = _TCPServer(addr, _CoordinatorHandler)
+        self._server.coordinator = self
+
+        self.start_time = datetime.now()
+        for target in (self._server.serve_forever, self._reap_expired):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(
+            "Coordinatore in ascolto su %s: %d shard, %d host",
+            self.address, len(self.shards), len(self._ip_order)
+        )
+        return self
+
+    def stop(self) -> None:
+        """Ferma il server"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if self._server.address_family == socket.AF_UNIX:
+                try:
+                    os.unlink(self._server.server_address)
+                except OSError:
+                    pass
+        with self._lock:
+            self._lock.notify_all()
+
+    @property
+    def finished(self) -> bool:
+        """True quando tutti gli shard sono completati o abbandonati"""
+        return all(s.done or s.failed for s in self.shards)
+
+    def wait(self, timeout: Optional[float] = None, cancel=None) -> ScanResult:
+        """
+        Attende il completamento di tutti gli shard
+
+        Args:
+            timeout: Secondi massimi di attesa (None = illimitato)
+            cancel: CancelToken (scadenza o annullamento della scansione)
+
+        Returns:
+            Risultato aggregato (parziale, e segnato incompleto, se scade
+            il timeout o il token viene annullato)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reason = None
+        with self._lock:
+            while not self.finished and not self._stop.is_set():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning("Timeout coordinatore: risultato parziale")
+                    reason = DEADLINE
+                    break
+                if cancel and cancel.cancelled:
+                    logger.warning("Scansione distribuita annullata (%s): risultato parziale",
+                                   cancel.reason)
+                    reason = cancel.reason
+                    break
+                wait = remaining if remaining is not None else 1.0
+                self._lock.wait(min(wait, CHECK_INTERVAL) if cancel else wait)
+        result = self.result()
+        if reason:
+            result.mark_incomplete(reason)
+        return result
+
+    def run(self, timeout: Optional[float] = None) -> ScanResult:
+        """Avvia, attende il completamento e ferma il coordinatore"""
+        self.start()
+        try:
+            return self.wait(timeout)
+        finally:
+            self.stop()
+
+    def result(self) -> ScanResult:
+        """Costruisce lo ScanResult con gli host ricevuti finora"""
+        with self._lock:
+            hosts = sorted(
+                self._results.values(),
+                key=lambda h: self._ip_order.get(h.ip, len(self._ip_order))
+            )
+            received = len(self._received)
+        return ScanResult(
+            target=self.target,
+            start_time=self.start_time,
+            end_time=datetime.now(),
+            hosts=[h for h in hosts if h.ports or h.state == "up"],
+            coverage={"hosts_total": len(self._ip_order), "hosts_scanned": received}
+        )
+
+    @property
+    def failed_ips(self) -> List[str]:
+        """IP abbandonati dopo max_attempts tentativi falliti"""
+        return [
+            ip for s in self.shards if s.failed
+            for ip in s.ips if ip not in self._received
+        ]
+
+    # --- Gestione lease (chiamate dai thread di connessione) ---
+
+    def _config_message(self) -> Dict:
+        return {
+            "type": "config",
+            "ports": self.ports,
+            "timeout": self.timeout,
+            "heartbeat": max(0.05, self.lease_ttl / 3),
+        }
+
+    def _remaining(self, shard: Shard) -> List[str]:
+        return [ip for ip in shard.ips if ip not in self._received]
+
+    def _grant_lease(self, worker: str) -> Dict:
+        with self._lock:
+            for shard in self.shards:
+                if shard.done or shard.failed or shard.lease_id is not None:
+                    continue
+                shard.lease_id = uuid.uuid4().hex
+                shard.worker = worker
+                shard.expires = time.monotonic() + self.lease_ttl
+                shard.attempts += 1
+                logger.debug(
+                    "Shard %d assegnato a %s (tentativo %d)",
+                    shard.shard_id, worker, shard.attempts
+                )
+                return {
+                    "type": "lease",
+                    "lease_id": shard.lease_id,
+                    "ips": self._remaining(shard),
+                }
+
+            if self.finished or self._stop.is_set():
+                return {"type": "done"}
+            # Shard tutti assegnati: il worker riprova (potrebbero liberarsi)
+            return {"type": "wait", "retry": min(1.0, self.lease_ttl / 4)}
+
+    def _find_lease(self, worker: str, lease_id: Optional[str]) -> Optional[Shard]:
+        for shard in self.shards:
+            if shard.lease_id is not None and shard.lease_id == lease_id:
+                return shard if shard.worker == worker else None
+        return None
+
+    def _renew(self, worker: str, lease_id: Optional[str]) -> None:
+        with self._lock:
+            shard = self._find_lease(worker, lease_id)
+            if shard is not None:
+                shard.expires = time.monotonic() + self.lease_ttl
+
+    def _receive_host(self, worker: str, lease_id: Optional[str], data: Dict) -> None:
+        host = HostResult.from_dict(data)
+        with self._lock:
+            shard = self._find_lease(worker, lease_id)
+            # Lease scaduto o riassegnato: il risultato verrà riprodotto
+            if shard is None or host.ip not in shard.ips:
+                return
+            shard.expires = time.monotonic() + self.lease_ttl
+            self._received.add(host.ip)
+            self._results[host.ip] = host
+            self._lock.notify_all()
+
+        if self.host_callback:
+            self.host_callback(host)
+
+    def _complete(self, worker: str, lease_id: Optional[str]) -> None:
+        with self._lock:
+            shard = self._find_lease(worker, lease_id)
+            if shard is None:
+                return
+            shard.lease_id = None
+            shard.worker = None
+            shard.done = not self._remaining(shard)
+            self._lock.notify_all()
+
+    def _release(self, shard: Shard, reason: str) -> None:
+        """Rimette in coda uno shard (chiamare con il lock acquisito)"""
+        logger.warning(
+            "Shard %d rilasciato da %s: %s", shard.shard_id, shard.worker, reason
+        )
+        shard.lease_id = None
+        shard.worker = None
+        if not self._remaining(shard):
+            shard.done = True
+        elif shard.attempts >= self.max_attempts:
+            shard.failed = True
+            logger.error(
+                "Shard %d abbandonato dopo %d tentativi", shard.shard_id, shard.attempts
+            )
+        self._lock.notify_all()
+
+    def _release_worker(self, worker: str) -> None:
+        with self._lock:
+            for shard in self.shards:
+                if shard.worker == worker:
+                    self._release(shard, "worker disconnesso")
+
+    def _reap_expired(self) -> None:
+        interval = max(0.05, self.lease_ttl / 4)
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                for shard in self.shards:
+                    if shard.lease_id is not None and shard.expires < now:
+                        self._release(shard, "heartbeat scaduto")
+
+
+class ScanWorker:
+    """
+    Worker della scansione distribuita.
+    Riceve shard dal coordinatore e li scansiona con un PortScanner riusato
+    tra un lease e l'altro.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        worker_id: Optional[str] = None,
+        connect_timeout: float = 10.0
+    ):
+        """
+        Inizializza il worker
+
+        Args:
+            address: Indirizzo del coordinatore ("host:porta" o "unix:/percorso")
+            worker_id: Nome del worker (default: hostname-pid)
+            connect_timeout: Timeout di connessione al coordinatore
+        """
+        self.address = address
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.connect_timeout = connect_timeout
+        self.scanner: Optional[PortScanner] = None
+        self.hosts_scanned = 0
+        self._write_lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        sock.connect(addr)
+        sock.settimeout(None)
+        return sock
+
+    def _send(self, wfile, message: Dict) -> None:
+        with self._write_lock:
+            _send(wfile, message)
+
+    def run(self) -> int:
+        """
+        Elabora lease finché il coordinatore non ha più lavoro
+
+        Returns:
+            Numero di host scansionati
+        """
+        sock = self._connect()
+        rfile = sock.makefile("rb")
+        wfile = sock.makefile("wb")
+
+        try:
+            self._send(wfile, {"type": "hello", "worker": self.worker_id})
+            config = _recv(rfile)
+            if config is None:
+                return self.hosts_scanned
+
+            self.scanner = PortScanner(
+                ports=config["ports"],
+                timeout=config["timeout"],
+                use_nmap=False
+            )
+            heartbeat = config["heartbeat"]
+
+            while True:
+                self._send(wfile, {"type": "lease"})
+                reply = _recv(rfile)
+                if reply is None or reply["type"] == "done":
+                    break
+                if reply["type"] == "wait":
+                    time.sleep(reply.get("retry", 0.5))
+                    continue
+                self._process_lease(wfile, reply["lease_id"], reply["ips"], heartbeat)
+        except (OSError, ValueError) as e:
+            logger.warning("Worker %s: connessione persa (%s)", self.worker_id, e)
+        finally:
+            for f in (rfile, wfile):
+                try:
+                    f.close()
+                except OSError:
+                    pass
+            sock.close()
+
+        return self.hosts_scanned
+
+    def _process_lease(self, wfile, lease_id: str, ips: List[str], heartbeat: float) -> None:
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(heartbeat):
+                try:
+                    self._send(wfile, {"type": "heartbeat", "lease_id": lease_id})
+                except OSError:
+                    return
+
+        def send_host(host: HostResult):
+            self.hosts_scanned += 1
+            self._send(wfile, {
+                "type": "host",
+                "lease_id": lease_id,
+                "host": host.to_dict(),
+            })
+
+        beater = threading.Thread(target=beat, daemon=True)
+        beater.start()
+        try:
+            self.scanner.scan_hosts(ips, host_callback=send_host)
+        finally:
+            stop.set()
+            beater.join()
+        self._send(wfile, {"type": "complete", "lease_id": lease_id})
+
+
+def _worker_main(address: str, worker_id: str) -> None:
+    """Entry point dei processi worker locali"""
+    ScanWorker(address, worker_id=worker_id).run()
+
+
+def spawn_local_workers(address: str, count: int) -> List:
+    """
+    Avvia worker locali in processi separati
+
+    Args:
+        address: Indirizzo del coordinatore
+        count: Numero di processi worker
+
+    Returns:
+        Lista dei processi avviati (multiprocessing.Process)
+    """
+    import multiprocessing
+
+    processes = []
+    for i in range(count):
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(address, f"local-{i + 1}"),
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+    return processes
@@ -0,0 +1,283 @@
+"""
+Storico Scansioni - CyberSentinel
+Aggregati giornalieri di molte scansioni per i report di andamento
+
+Ogni scansione viene ridotta, al momento dell'importazione, a:
+- un registro delle esposizioni aperte (host:porta, prima comparsa, rischio)
+- un aggregato per giorno (rischio, problemi critici, nuovi servizi,
+  tempi di risoluzione)
+
+Un report su 12 mesi legge quindi al massimo 366 aggregati invece di
+ricaricare tutti i JSON delle scansioni.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .scanner import ScanResult
+
+logger = logging.getLogger(__name__)
+
+# Livelli di rischio considerati "problemi" per il tempo di risoluzione
+FINDING_LEVELS = ("critical", "warning")
+
+# Campi sommati quando si aggregano più giorni
+_SUM_FIELDS = ("scans", "risk_sum", "new_services", "new_critical",
+               "remediated", "remediation_seconds")
+
+
+@dataclass
+class TrendPoint:
+    """Andamento di un periodo (giorno, settimana o mese)"""
+    period: str
+    scans: int
+    risk_score: float           # Media delle scansioni del periodo
+    risk_score_max: int
+    critical_count: int         # Ultima scansione del periodo
+    warning_count: int
+    open_ports: int
+    new_services: int           # Esposizioni comparse nel periodo
+    new_critical: int
+    remediated: int             # Problemi chiusi nel periodo
+    mttr_hours: Optional[float]  # Tempo medio di risoluzione
+
+
+def period_key(day: str, bucket: str) -> str:
+    """
+    Periodo di aggregazione di un giorno
+
+    Args:
+        day: Data "YYYY-MM-DD"
+        bucket: "day", "week" (ISO) oppure "month"
+
+    Returns:
+        Chiave del periodo ("2026-03-14", "2026-W11", "2026-03")
+    """
+    if bucket == "day":
+        return day
+    if bucket == "month":
+        return day[:7]
+    if bucket == "week":
+        year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+        return f"{year}-W{week:02d}"
+    raise ValueError(f"Periodo non valido: {bucket} (usa day, week o month)")
+
+
+class HistoryStore:
+    """
+    Archivio degli aggregati per target.
+    Un file JSON per target in `directory`, scritto in modo atomico.
+    Le scansioni vanno importate in ordine cronologico: quelle non più
+    recenti dell'ultima importata vengono ignorate (importazione idempotente).
+    Anche le scansioni incomplete (scadenza o interruzione) vengono ignorate:
+    le esposizioni non raggiunte risulterebbero risolte e poi di nuovo nuove.
+    """
+
+    def __init__(self, directory: str):
+        self.root = Path(directory)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _safe_name(target: str) -> str:
+        return "".join(c if c.isalnum() or c in "-." else "_" for c in target)
+
+    def _path(self, target: str) -> Path:
+        return self.root / f"{self._safe_name(target)}.json"
+
+    def _load(self, target: str) -> Dict:
+        series = self._series.get(target)
+        if series is None:
+            path = self._path(target)
+            if path.exists():
+                series = json.loads(path.read_text(encoding="utf-8"))
+            else:
+                series = {"target": target, "last_scan": None, "open": {}, "days": {}}
+            self._series[target] = series
+        return series
+
+    def _save(self, series: Dict) -> None:
+        path = self._path(series["target"])
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(series, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def targets(self) -> List[str]:
+        """Target presenti nell'archivio"""
+        targets = []
+        for path in sorted(self.root.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    targets.append(json.load(f)["target"])
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Storico illeggibile %s: %s", path.name, e)
+        return targets
+
+    def ingest(self, scan_result: ScanResult) -> bool:
+        """
+        Aggiunge una scansione agli aggregati del suo target
+
+        Args:
+            scan_result: Scansione completata
+
+        Returns:
+            False se la scansione è incompleta o non è più recente
+            dell'ultima importata
+        """
+        if not scan_result.complete:
+            logger.info("Scansione incompleta di %s non importata nello storico", scan_result.target)
+            return False
+        scan_time = scan_result.start_time
+        classified = scan_result.classify()
+        summary = classified["summary"]
+
+        current: Dict[str, Tuple[str, str]] = {}
+        for level in ("critical", "warning", "ok"):
+            for item in classified[level]:
+                port_info = item["port_info"]
+                current[f"{item['host']}:{port_info.port}"] = (level, port_info.service)
+
+        with self._lock:
+            series = self._load(scan_result.target)
+            if series["last_scan"] and scan_time.isoformat() <= series["last_scan"]:
+                return False
+
+            day = series["days"].setdefault(scan_time.strftime("%Y-%m-%d"), {
+                "scans": 0, "risk_sum": 0, "risk_max": 0,
+                "new_services": 0, "new_critical": 0,
+                "remediated": 0, "remediation_seconds": 0.0,
+            })
+            day["scans"] += 1
+            day["risk_sum"] += summary["risk_score"]
+            day["risk_max"] = max(day["risk_max"], summary["risk_score"])
+            day["critical_count"] = summary["critical_count"]
+            day["warning_count"] = summary["warning_count"]
+            day["open_ports"] = summary["total_open_ports"]
+
+            # Esposizioni nuove
+            exposures = series["open"]
+            for key, (level, service) in current.items():
+                if key not in exposures:
+                    exposures[key] = {
+                        "first_seen": scan_time.isoformat(),
+                        "risk": level,
+                        "service": service,
+                    }
+                    day["new_services"] += 1
+                    if level == "critical":
+                        day["new_critical"] += 1
+
+            # Esposizioni sparite: problemi risolti
+            for key in [k for k in exposures if k not in current]:
+                exposure = exposures.pop(key)
+                if exposure["risk"] in FINDING_LEVELS:
+                    opened = datetime.fromisoformat(exposure["first_seen"])
+                    day["remediated"] += 1
+                    day["remediation_seconds"] += (scan_time - opened).total_seconds()
+
+            series["last_scan"] = scan_time.isoformat()
+            self._save(series)
+        return True
+
+    def ingest_files(self, paths: Iterable[str]) -> Tuple[int, int]:
+        """
+        Importa scansioni JSON salvate, in ordine cronologico
+
+        Args:
+            paths: File JSON di ScanResult
+
+        Returns:
+            Coppia (importate, ignorate)
+        """
+        # Prima passata: solo le date, per non tenere in memoria tutte le scansioni
+        dated = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                dated.append((json.load(f)["start_time"], str(path)))
+
+        ingested = 0
+        for _, path in sorted(dated):
+            if self.ingest(ScanResult.from_json(path)):
+                ingested += 1
+        return ingested, len(dated) - ingested
+
+    def open_exposures(self, target: str) -> Dict[str, Dict]:
+        """Esposizioni ancora aperte dopo l'ultima scansione"""
+        with self._lock:
+            return dict(self._load(target)["open"])
+
+    def trend(
+        self,
+        target: str,
+        bucket: str = "month",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[TrendPoint]:
+        """
+        Andamento per periodo calcolato dagli aggregati giornalieri
+
+        Args:
+            target: Target della serie
+            bucket: "day", "week" oppure "month"
+            since: Inizio (incluso, opzionale)
+            until: Fine (inclusa, opzionale)
+
+        Returns:
+            Punti in ordine cronologico
+        """
+        first = since.strftime("%Y-%m-%d") if since else ""
+        last = until.strftime("%Y-%m-%d") if until else "9999"
+
+        with self._lock:
+            days = sorted(self._load(target)["days"].items())
+
+        periods: Dict[str, Dict] = {}
+        for day, rollup in days:
+            if not first <= day <= last:
+                continue
+            agg = periods.get(period_key(day, bucket))
+            if agg is None:
+                agg = periods[period_key(day, bucket)] = dict.fromkeys(_SUM_FIELDS, 0)
+                agg["risk_max"] = 0
+            for name in _SUM_FIELDS:
+                agg[name] += rollup[name]
+            agg["risk_max"] = max(agg["risk_max"], rollup["risk_max"])
+            # Giorni in ordine: restano i valori dell'ultimo
+            for name in ("critical_count", "warning_count", "open_ports"):
+                agg[name] = rollup[name]
+
+        return [
+            TrendPoint(
+                period=period,
+                scans=agg["scans"],
+                risk_score=round(agg["risk_sum"] / agg["scans"], 1),
+                risk_score_max=agg["risk_max"],
+                critical_count=agg["critical_count"],
+                warning_count=agg["warning_count"],
+                open_ports=agg["open_ports"],
+                new_services=agg["new_services"],
+                new_critical=agg["new_critical"],
+                remediated=agg["remediated"],
+                mttr_hours=(
+                    round(agg["remediation_seconds"] / agg["remediated"] / 3600, 1)
+                    if agg["remediated"] else None
+                ),
+            )
+            for period, agg in periods.items()
+        ]
+
+
+def months_ago(months: int, now: Optional[datetime] = None) -> datetime:
+    """Primo giorno del mese di `months` mesi fa (incluso il corrente)"""
+    now = now or datetime.now()
+    index = now.year * 12 + now.month - 1 - (months - 1)
+    return datetime(index // 12, index % 12 + 1, 1)
@@ -0,0 +1,298 @@
+"""
+Generatore Report HTML - CyberSentinel
+Report in un unico file HTML autonomo (stili inclusi, nessuna risorsa esterna)
+
+Alternativa leggera al PDF: non importa reportlab e scrive il file
+a blocchi man mano che lo genera, quindi la memoria resta limitata
+ai risultati classificati anche con centinaia di migliaia di righe.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+from datetime import datetime
+from html import escape
+from typing import Dict, Iterator, List, Optional
+
+from .classifier import PortClassifier
+from .config import ReportSettings
+from . import report_text
+
+_CSS = """
+body { font-family: Helvetica, Arial, sans-serif; color: #212529; max-width: 60em; margin: 2em auto; padding: 0 1em; line-height: 1.45; }
+h1 { color: #1a365d; text-align: center; margin-bottom: 0; letter-spacing: .05em; }
+h2 { color: #1a365d; border-bottom: 2px solid #1a365d; padding-bottom: .2em; margin-top: 2em; }
+.subtitle { text-align: center; color: #343a40; margin-top: .3em; }
+.info td:first-child { font-weight: bold; text-align: right; padding-right: 1em; }
+.risk { background: #f8f9fa; border: 3px solid; text-align: center; padding: 1em; margin: 1em 0; }
+.risk strong { font-size: 1.6em; display: block; }
+.risk-critical { border-color: #dc3545; color: #dc3545; }
+.risk-warning { border-color: #ffc107; color: #856404; }
+.risk-ok { border-color: #28a745; color: #28a745; }
+.counts { width: 100%; border-collapse: collapse; text-align: center; margin: 1em 0; }
+.counts th { color: #fff; padding: .5em; }
+.counts td { font-size: 1.8em; font-weight: bold; padding: .3em; }
+.alert { background: #dc3545; color: #fff; padding: .8em 1em; margin: 1em 0; }
+.incomplete { border: 2px solid #ffc107; color: #856404; font-weight: bold; padding: .8em 1em; margin: 1em 0; }
+.finding { margin: 1em 0; padding-bottom: .6em; border-bottom: 1px solid #f8f9fa; }
+.finding h3 { font-size: 1.05em; margin: .3em 0; }
+.critical h3 { color: #dc3545; }
+.warning h3 { color: #856404; }
+table.hosts, table.ok { border-collapse: collapse; width: 100%; font-size: .85em; }
+table.hosts th, table.ok th { color: #fff; text-align: left; padding: .25em .5em; }
+table.hosts td, table.ok td { padding: .2em .5em; border-bottom: 1px solid #f8f9fa; vertical-align: top; }
+table.hosts tr:nth-child(even), table.ok tr:nth-child(even) { background: #f8f9fa; }
+ul.ips { columns: 4; list-style: none; padding: 0; font-size: .85em; font-family: monospace; }
+details summary { cursor: pointer; color: #1a365d; margin: .3em 0; }
+footer { margin-top: 3em; border-top: 1px solid #1a365d; padding-top: .8em; text-align: center; font-size: .85em; color: #343a40; }
+footer .disclaimer { font-style: italic; font-size: .9em; }
+"""
+
+
+class HtmlReportGenerator:
+    """
+    Genera report HTML autonomi con lo stesso contenuto del report PDF.
+    Stessa interfaccia di ReportGenerator (generate).
+    """
+
+    COLORS = {
+        'primary': '#1a365d',
+        'critical': '#dc3545',
+        'warning': '#ffc107',
+        'ok': '#28a745',
+    }
+
+    # Righe scritte insieme in un solo blocco
+    CHUNK_ROWS = 1000
+
+    def __init__(self, settings: Optional[ReportSettings] = None):
+        """
+        Inizializza il generatore
+
+        Args:
+            settings: Titolo e livello di dettaglio (default: ReportSettings())
+        """
+        self.settings = settings or ReportSettings()
+        self.classifier = PortClassifier()
+
+    def generate(
+        self,
+        scan_result,
+        output_path: str,
+        title: Optional[str] = None,
+        classified: Optional[Dict] = None
+    ) -> str:
+        """
+        Genera il report HTML completo
+
+        Args:
+            scan_result: Risultato della scansione (ScanResult)
+            output_path: Percorso file HTML output
+            title: Titolo della pagina (default: quello delle impostazioni)
+            classified: Risultati già classificati (default: scan_result.classify())
+
+        Returns:
+            Percorso del file generato
+        """
+        if classified is None:
+            classified = scan_result.classify(self.classifier)
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            for chunk in self.render(scan_result, classified, title or self.settings.title):
+                f.write(chunk)
+
+        return output_path
+
+    def render(self, scan_result, classified: Dict, title: str = "Report Sicurezza Rete") -> Iterator[str]:
+        """
+        Produce il documento HTML a blocchi
+
+        Args:
+            scan_result: Risultato della scansione (ScanResult)
+            classified: Risultati di PortClassifier.classify_scan_results
+            title: Titolo della pagina
+
+        Returns:
+            Iteratore di frammenti HTML
+        """
+        yield (
+            "<!DOCTYPE html>\n<html lang=\"it\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>CyberSentinel - {escape(title)}</title>\n"
+            f"<style>{_CSS}</style>\n</head>\n<body>\n"
+        )
+        yield self._header(scan_result.target, scan_result.start_time,
+                           report_text.incomplete_notice(scan_result))
+        yield self._executive_summary(classified['summary'])
+        yield from self._critical_section(classified['critical'])
+        yield from self._warning_section(classified['warning'])
+        yield from self._ok_section(classified['ok'])
+        yield self._recommendations(classified['summary'])
+        yield self._footer()
+        yield "</body>\n</html>\n"
+
+    def _header(self, target: str, scan_date: datetime, notice: Optional[str] = None) -> str:
+        """Titolo, informazioni sulla scansione ed eventuale avviso di scansione incompleta"""
+        return (
+            "<h1>CYBERSENTINEL</h1>\n"
+            "<p class=\"subtitle\">Report Sicurezza Rete Aziendale</p>\n"
+            "<table class=\"info\">\n"
+            f"<tr><td>Target scansionato:</td><td>{escape(target)}</td></tr>\n"
+            f"<tr><td>Data scansione:</td><td>{scan_date.strftime('%d/%m/%Y alle %H:%M')}</td></tr>\n"
+            "<tr><td>Generato da:</td><td>CyberSentinel v1.0.0</td></tr>\n"
+            "</table>\n"
+            + (f"<p class=\"incomplete\">{escape(notice)}</p>\n" if notice else "")
+        )
+
+    def _executive_summary(self, summary: Dict) -> str:
+        """Box di rischio, conteggi e spiegazione per non-tecnici"""
+        level = report_text.overall_level(summary)
+        risk_text, risk_desc = report_text.RISK_BOXES[level]
+        c = self.COLORS
+        return (
+            "<h2>Riepilogo Esecutivo</h2>\n"
+            f"<div class=\"risk risk-{level}\"><strong>{risk_text}</strong>"
+            f"<span>{escape(risk_desc)}</span></div>\n"
+            "<table class=\"counts\">\n<tr>"
+            f"<th style=\"background:{c['critical']}\">Problemi Critici</th>"
+            f"<th style=\"background:{c['warning']}\">Attenzione</th>"
+            f"<th style=\"background:{c['ok']}\">OK</th>"
+            f"<th style=\"background:{c['primary']}\">Totale Porte</th></tr>\n<tr>"
+            f"<td style=\"color:{c['critical']}\">{summary['critical_count']}</td>"
+            f"<td style=\"color:#856404\">{summary['warning_count']}</td>"
+            f"<td style=\"color:{c['ok']}\">{summary['ok_count']}</td>"
+            f"<td style=\"color:{c['primary']}\">{summary['total_open_ports']}</td>"
+            "</tr>\n</table>\n"
+            f"<p><b>{report_text.EXPLANATION_TITLE}</b></p>\n"
+            f"<p>{escape(report_text.EXPLANATION)}</p>\n"
+        )
+
+    def _host_list(self, items: List, header_color: str) -> Iterator[str]:
+        """
+        Elenco completo degli host di un gruppo, richiudibile.
+        Tabella se ci sono hostname o versioni, altrimenti IP su colonne.
+        """
+        yield f"<details><summary>Elenco dei {len(items)} host</summary>\n"
+
+        if any(item['hostname'] or item['version'] for item in items):
+            yield (
+                f"<table class=\"hosts\"><tr style=\"background:{header_color}\">"
+                "<th>Host</th><th>Hostname</th><th>Versione</th></tr>\n"
+            )
+            row = "<tr><td>{}</td><td>{}</td><td>{}</td></tr>\n"
+            for i in range(0, len(items), self.CHUNK_ROWS):
+                yield "".join(
+                    row.format(
+                        escape(item['host']),
+                        escape(item['hostname'] or "-"),
+                        escape(item['version'] or "-")
+                    )
+                    for item in items[i:i + self.CHUNK_ROWS]
+                )
+            yield "</table>\n"
+        else:
+            yield "<ul class=\"ips\">\n"
+            for i in range(0, len(items), self.CHUNK_ROWS):
+                yield "".join(
+                    f"<li>{escape(item['host'])}</li>\n"
+                    for item in items[i:i + self.CHUNK_ROWS]
+                )
+            yield "</ul>\n"
+
+        yield "</details>\n"
+
+    def _finding_title(self, items: List) -> str:
+        port_info = items[0]['port_info']
+        return (
+            f"<h3>&#9679; Porta {port_info.port} ({escape(port_info.service)}) "
+            f"{escape(report_text.hosts_label(items))}</h3>\n"
+        )
+
+    def _critical_section(self, critical_items: List) -> Iterator[str]:
+        """Sezione problemi critici, raggruppata per porta"""
+        if not critical_items:
+            return
+
+        yield (
+            "<h2>Problemi Critici - Intervento Urgente</h2>\n"
+            f"<div class=\"alert\"><b>ATTENZIONE:</b> {escape(report_text.CRITICAL_WARNING)}</div>\n"
+        )
+
+        for items in report_text.group_by_port(critical_items):
+            port_info = items[0]['port_info']
+            yield (
+                "<div class=\"finding critical\">\n"
+                + self._finding_title(items)
+                + f"<p><b>Cos'è:</b> {escape(port_info.description)}</p>\n"
+                f"<p><b>Perché è pericoloso:</b> {escape(port_info.risk_explanation)}</p>\n"
+                + (f"<p><b>Cosa fare:</b> {escape(port_info.recommendation)}</p>\n"
+                   if self.settings.detailed_recommendations else "")
+            )
+            if len(items) > 1:
+                yield from self._host_list(items, self.COLORS['critical'])
+            yield "</div>\n"
+
+    def _warning_section(self, warning_items: List) -> Iterator[str]:
+        """Sezione punti di attenzione, raggruppata per porta"""
+        if not warning_items:
+            return
+
+        yield (
+            "<h2>Punti di Attenzione</h2>\n"
+            f"<p>{escape(report_text.WARNING_INTRO)}</p>\n"
+        )
+
+        for items in report_text.group_by_port(warning_items):
+            port_info = items[0]['port_info']
+            yield (
+                "<div class=\"finding warning\">\n"
+                + self._finding_title(items)
+                + f"<p>{escape(self._description(port_info))}</p>\n"
+            )
+            if len(items) > 1:
+                yield from self._host_list(items, self.COLORS['warning'])
+            yield "</div>\n"
+
+    def _description(self, port_info) -> str:
+        """Descrizione, con la raccomandazione se il report è dettagliato"""
+        if self.settings.detailed_recommendations:
+            return f"{port_info.description}. {port_info.recommendation}"
+        return port_info.description
+
+    def _ok_section(self, ok_items: List) -> Iterator[str]:
+        """Tabella delle porte OK: una riga per porta con tutti gli host"""
+        if not ok_items:
+            return
+
+        yield (
+            "<h2>Configurazioni Corrette</h2>\n"
+            f"<p>{escape(report_text.OK_INTRO)}</p>\n"
+            f"<table class=\"ok\"><tr style=\"background:{self.COLORS['ok']}\">"
+            "<th>Porta</th><th>Servizio</th><th>Host</th><th>Note</th></tr>\n"
+        )
+
+        for items in report_text.group_by_port(ok_items):
+            port_info = items[0]['port_info']
+            yield f"<tr><td>{port_info.port}</td><td>{escape(port_info.service)}</td><td>"
+            for i in range(0, len(items), self.CHUNK_ROWS):
+                yield ("" if i == 0 else ", ") + ", ".join(
+                    escape(item['host']) for item in items[i:i + self.CHUNK_ROWS]
+                )
+            yield "</td><td>Mantenere aggiornato</td></tr>\n"
+
+        yield "</table>\n"
+
+    def _recommendations(self, summary: Dict) -> str:
+        """Prossimi passi consigliati (testi interni con markup <b>)"""
+        steps = "".join(f"<p>{rec}</p>\n" for rec in report_text.recommendations(summary))
+        return f"<h2>Prossimi Passi Consigliati</h2>\n{steps}"
+
+    def _footer(self) -> str:
+        """Footer con crediti e nota"""
+        return (
+            "<footer>\n"
+            "<p>Report generato da <b>CyberSentinel</b> - La sentinella digitale per le PMI italiane</p>\n"
+            "<p>Sviluppato da <b>ISIPC - Truant Bruno</b> | "
+            "<a href=\"https://isipc.com\">isipc.com</a> | "
+            "<a href=\"https://github.com/brunotr88\">github.com/brunotr88</a></p>\n"
+            f"<p class=\"disclaimer\">{escape(report_text.DISCLAIMER)}</p>\n"
+            "</footer>\n"
+        )
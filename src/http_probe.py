@@ -0,0 +1,359 @@
+"""
+Sonda HTTP - CyberSentinel
+Analisi dei servizi web aperti: server, titolo, redirect e pannelli esposti
+
+Per ogni servizio web richiede pochi percorsi sulla stessa connessione
+(keep-alive, richieste in pipeline) leggendo al massimo MAX_BODY byte per
+risposta. Se il server chiude o non gestisce la pipeline, le richieste
+rimanenti ripartono su una nuova connessione.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import html
+import logging
+import re
+import socket
+import ssl
+from typing import Dict, List, Optional, Tuple
+
+from .scanner import HostResult, PortResult
+from .tls_inspect import TLS_PORTS, probe_context
+
+logger = logging.getLogger(__name__)
+
+# Porte su cui cercare un servizio web
+HTTP_PORTS = {80, 443, 591, 3000, 5000, 8000, 8008, 8080, 8081, 8088, 8443, 8888, 9000, 9090, 9443, 10000}
+
+MAX_BODY = 64 * 1024          # Byte conservati per risposta
+MAX_DRAIN = 1024 * 1024       # Byte scartati al massimo per riusare la connessione
+MAX_HEADER_BYTES = 16 * 1024
+USER_AGENT = "CyberSentinel/1.0"
+
+# Pannelli di amministrazione riconoscibili
+# (nome, percorso, dove cercare, testo in minuscolo, livello)
+#   auth:   intestazione WWW-Authenticate di una risposta 401
+#   header: nome di un'intestazione presente
+#   title/body: titolo o corpo di una risposta 200
+ADMIN_PANELS: Tuple[Tuple[str, str, str, str, str], ...] = (
+    ("Tomcat Manager", "/manager/html", "auth", "tomcat manager", "critical"),
+    ("Tomcat Manager", "/manager/html", "title", "tomcat web application manager", "critical"),
+    ("phpMyAdmin", "/phpmyadmin/", "title", "phpmyadmin", "critical"),
+    ("phpMyAdmin", "/", "title", "phpmyadmin", "critical"),
+    ("Jenkins", "/", "header", "x-jenkins", "critical"),
+    ("Webmin", "/", "title", "webmin", "critical"),
+    ("Proxmox VE", "/", "title", "proxmox", "warning"),
+    ("Grafana", "/", "title", "grafana", "warning"),
+    ("Kibana", "/", "header", "kbn-name", "warning"),
+    ("Synology DSM", "/", "title", "synology", "warning"),
+    ("pfSense", "/", "title", "pfsense", "warning"),
+    ("WordPress (login)", "/wp-login.php", "body", "wp-submit", "warning"),
+)
+
+PATHS = ["/"] + sorted({path for _, path, _, _, _ in ADMIN_PANELS} - {"/"})
+
+_TITLE = re.compile(rb"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
+_PASSWORD_FIELD = re.compile(rb"<input[^>]+type=[\"']?password", re.IGNORECASE)
+
+
+class _ProtocolError(Exception):
+    """Risposta non valida o connessione da abbandonare"""
+
+
+class _Reader:
+    """Lettura bufferizzata di risposte HTTP da una socket"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = bytearray()
+
+    def _fill(self) -> None:
+        data = self.sock.recv(65536)
+        if not data:
+            raise EOFError
+        self.buffer += data
+
+    def readline(self) -> bytes:
+        while True:
+            end = self.buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(self.buffer[:end + 1])
+                del self.buffer[:end + 1]
+                return line
+            if len(self.buffer) > MAX_HEADER_BYTES:
+                raise _ProtocolError("intestazioni troppo lunghe")
+            self._fill()
+
+    def read(self, size: int, keep: int) -> bytes:
+        """Legge size byte conservandone al massimo keep"""
+        kept = bytearray()
+        while size > 0:
+            if not self.buffer:
+                self._fill()
+            chunk = self.buffer[:size]
+            del self.buffer[:len(chunk)]
+            size -= len(chunk)
+            if len(kept) < keep:
+                kept += chunk[:keep - len(kept)]
+        return bytes(kept)
+
+
+def read_response(reader: _Reader, max_body: int = MAX_BODY) -> Dict:
+    """
+    Legge una risposta HTTP/1.x completa
+
+    Args:
+        reader: Lettore della connessione
+        max_body: Byte del corpo da conservare
+
+    Returns:
+        Dizionario con status, headers (nomi in minuscolo), body e
+        keep_alive (False se la connessione non è riutilizzabile)
+
+    Raises:
+        _ProtocolError, EOFError, OSError: Se la risposta non è leggibile
+    """
+    status_line = reader.readline().decode("latin-1").strip()
+    parts = status_line.split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        raise _ProtocolError(f"risposta non HTTP: {status_line[:40]!r}")
+    status = int(parts[1])
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = reader.readline().decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        headers[name] = f"{headers[name]}, {value.strip()}" if name in headers else value.strip()
+
+    keep_alive = parts[0] != "HTTP/1.0" and "close" not in headers.get("connection", "").lower()
+    body = b""
+    if status >= 200 and status not in (204, 304):
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks, drained = bytearray(), 0
+            while True:
+                size = int(reader.readline().split(b";")[0].strip() or b"0", 16)
+                drained += size
+                if drained > MAX_DRAIN:
+                    raise _ProtocolError("risposta troppo grande")
+                if size == 0:
+                    while reader.readline().strip():  # trailer
+                        pass
+                    break
+                chunks += reader.read(size, max(0, max_body - len(chunks)))
+                reader.readline()
+            body = bytes(chunks)
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length - max_body > MAX_DRAIN:
+                raise _ProtocolError("risposta troppo grande")
+            body = reader.read(length, max_body)
+        else:
+            # Corpo fino alla chiusura: la connessione non è riutilizzabile
+            keep_alive = False
+            try:
+                while len(reader.buffer) < max_body:
+                    reader._fill()
+            except (EOFError, OSError):
+                pass
+            body = bytes(reader.buffer[:max_body])
+    return {"status": status, "headers": headers, "body": body, "keep_alive": keep_alive}
+
+
+def _title(body: bytes) -> str:
+    match = _TITLE.search(body)
+    if not match:
+        return ""
+    text = html.unescape(match.group(1).decode("utf-8", "replace"))
+    return " ".join(text.split())[:120]
+
+
+def find_panels(responses: Dict[str, Dict]) -> List[Tuple[str, str]]:
+    """
+    Pannelli di amministrazione riconosciuti nelle risposte
+
+    Args:
+        responses: Risposte per percorso (read_response)
+
+    Returns:
+        Lista di (nome, livello) senza duplicati
+    """
+    found: Dict[str, str] = {}
+    for name, path, where, text, level in ADMIN_PANELS:
+        response = responses.get(path)
+        if not response or name in found:
+            continue
+        headers = response["headers"]
+        if where == "auth":
+            hit = response["status"] == 401 and text in headers.get("www-authenticate", "").lower()
+        elif where == "header":
+            hit = text in headers
+        elif response["status"] != 200:
+            hit = False
+        elif where == "title":
+            hit = text in _title(response["body"]).lower()
+        else:
+            hit = text.encode() in response["body"].lower()
+        if hit:
+            found[name] = level
+    return list(found.items())
+
+
+class HttpInspector:
+    """
+    Fase di ispezione dei servizi web (vedi inspection.run_stage)
+
+    Args:
+        timeout: Timeout per connessione e lettura (secondi)
+        workers: Servizi analizzati in parallelo
+        paths: Percorsi richiesti (default: PATHS)
+        max_body: Byte conservati per risposta
+    """
+
+    name = "http"
+
+    def __init__(self, timeout: float = 3.0, workers: int = 16,
+                 paths: Optional[List[str]] = None, max_body: int = MAX_BODY):
+        self.timeout = timeout
+        self.workers = workers
+        self.paths = list(paths or PATHS)
+        self.max_body = max_body
+
+    def wants(self, port: PortResult) -> bool:
+        """Porte web note o servizi riconosciuti come HTTP"""
+        return port.protocol == "tcp" and (port.port in HTTP_PORTS or "http" in port.service.lower())
+
+    def inspect(self, host: HostResult, port: PortResult) -> Optional[Dict]:
+        """
+        Richiede i percorsi e valuta il servizio
+
+        Args:
+            host: Host della scansione
+            port: Porta aperta
+
+        Returns:
+            Dizionario dei risultati oppure None se il servizio non parla HTTP
+        """
+        use_tls = "tls" in port.details or port.port in TLS_PORTS or "https" in port.service.lower()
+        responses = self.fetch(host.ip, port.port, use_tls, host.hostname)
+        root = responses.get("/")
+        if root is None:
+            return None
+
+        headers = root["headers"]
+        location = headers.get("location", "")
+        https_redirect = root["status"] in (301, 302, 303, 307, 308) and location.lower().startswith("https://")
+        server = headers.get("server", "")[:80]
+        title = _title(root["body"])
+        panels = find_panels(responses)
+        login_form = any(_PASSWORD_FIELD.search(r["body"]) for r in responses.values())
+
+        findings = []
+        for name, level in panels:
+            findings.append({
+                "level": level,
+                "title": f"Pannello di amministrazione raggiungibile: {name}",
+                "recommendation": "Rendere il pannello accessibile solo dalla rete interna o tramite VPN, "
+                                  "con autenticazione forte.",
+            })
+        if login_form and not use_tls:
+            findings.append({
+                "level": "warning",
+                "title": "Pagina di login senza cifratura",
+                "recommendation": "Servire le pagine di accesso solo su HTTPS.",
+            })
+
+        if server and not port.version:
+            port.version = server
+
+        summary = [f"HTTP {root['status']}"]
+        if title:
+            summary.append(f'"{title}"')
+        if server:
+            summary.append(f"server {server}")
+        if https_redirect:
+            summary.append("redirect a HTTPS")
+        return {
+            "status": root["status"],
+            "server": server,
+            "title": title,
+            "location": location[:200],
+            "https_redirect": https_redirect,
+            "tls": use_tls,
+            "paths": {path: r["status"] for path, r in responses.items()},
+            "panels": [name for name, _ in panels],
+            "login_form": login_form,
+            # Cifrato o con redirect a HTTPS: nessun traffico in chiaro
+            "risk": "ok" if use_tls or https_redirect else "warning",
+            "findings": findings,
+            "summary": ", ".join(summary),
+        }
+
+    def fetch(self, ip: str, port: int, use_tls: bool, hostname: str = "") -> Dict[str, Dict]:
+        """
+        Richiede i percorsi riusando la connessione
+
+        Args:
+            ip: Indirizzo del servizio
+            port: Porta del servizio
+            use_tls: Connessione TLS
+            hostname: Nome per Host e SNI (default: ip)
+
+        Returns:
+            Risposte per percorso (solo quelle lette)
+        """
+        authority = hostname or (f"[{ip}]" if ":" in ip else ip)
+        if port not in (80, 443):
+            authority = f"{authority}:{port}"
+        pending = list(self.paths)
+        responses: Dict[str, Dict] = {}
+
+        while pending:
+            try:
+                sock = self._connect(ip, port, use_tls, hostname)
+            except (OSError, ssl.SSLError) as e:
+                logger.debug("Connessione HTTP fallita %s:%d: %s", ip, port, e)
+                break
+            done = 0
+            try:
+                with sock:
+                    # Tutte le richieste in pipeline, poi le risposte in ordine
+                    sock.sendall(b"".join(self._request(path, authority) for path in pending))
+                    reader = _Reader(sock)
+                    for path in pending:
+                        response = read_response(reader, self.max_body)
+                        responses[path] = response
+                        done += 1
+                        if not response["keep_alive"]:
+                            break
+            except (_ProtocolError, EOFError, OSError, ValueError) as e:
+                logger.debug("Risposta HTTP interrotta %s:%d: %s", ip, port, e)
+            if not done:
+                # Nessun progresso su una connessione nuova: il percorso viene saltato
+                pending.pop(0)
+                if "/" not in responses:
+                    break
+            pending = pending[done:]
+        return responses
+
+    def _connect(self, ip: str, port: int, use_tls: bool, hostname: str) -> socket.socket:
+        sock = socket.create_connection((ip, port), timeout=self.timeout)
+        if not use_tls:
+            return sock
+        try:
+            return probe_context().wrap_socket(sock, server_hostname=hostname or None)
+        except (OSError, ssl.SSLError):
+            sock.close()
+            raise
+
+    @staticmethod
+    def _request(path: str, authority: str) -> bytes:
+        return (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {authority}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept: */*\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1")
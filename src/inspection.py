@@ -0,0 +1,137 @@
+"""
+Ispezione Servizi - CyberSentinel
+Fasi di analisi eseguite dopo la scansione sulle porte aperte
+
+Ogni fase (ispettore) sceglie le porte che la riguardano, le analizza con
+un pool limitato di thread e scrive l'esito in PortResult.details[nome];
+il classificatore usa questi dati per correggere il livello di rischio.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .scanner import HostResult, PortResult, ScanResult
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_dir() -> Path:
+    """Directory per le cache tra una scansione e l'altra ($XDG_CACHE_HOME/cybersentinel)"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "cybersentinel"
+
+
+def default_inspectors(timeout: float = 3.0, cache_dir: Optional[Path] = None,
+                       vulndb: Sequence[str] = ()) -> List:
+    """
+    Ispettori usati da CLI e demone
+
+    Args:
+        timeout: Timeout per connessione (secondi)
+        cache_dir: Directory delle cache (default: default_cache_dir())
+        vulndb: Dataset di vulnerabilità aggiuntivi (file JSON)
+
+    Returns:
+        Lista di ispettori nell'ordine di esecuzione
+
+    Raises:
+        OSError, ValueError: Se un dataset di vulnerabilità non è leggibile
+    """
+    from .http_probe import HttpInspector
+    from .protocol_checks import ProtocolInspector
+    from .tls_inspect import TlsInspector
+    from .vulndb import VulnerabilityMatcher, load_index
+
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    # TLS prima di HTTP: la sonda HTTP usa details["tls"] per scegliere lo schema;
+    # le versioni si confrontano per ultime, dopo che le sonde le hanno completate
+    return [
+        TlsInspector(timeout=timeout, cache_path=cache_dir / "tls.json"),
+        HttpInspector(timeout=timeout),
+        ProtocolInspector(timeout=timeout),
+        VulnerabilityMatcher(load_index(tuple(vulndb))),
+    ]
+
+
+def run_stage(inspector, hosts: List[HostResult], cancel=None) -> int:
+    """
+    Esegue un ispettore su tutte le porte aperte che lo riguardano
+
+    L'ispettore espone name, workers, wants(port_result) e
+    inspect(host, port_result) -> dizionario oppure None; con offline = True
+    non apre connessioni e viene eseguito anche dopo l'annullamento.
+
+    Args:
+        inspector: Ispettore da eseguire
+        hosts: Host della scansione
+        cancel: CancelToken; se annullato le porte non ancora analizzate
+            vengono saltate (le analisi in corso terminano entro il loro timeout)
+
+    Returns:
+        Numero di porte analizzate con successo
+    """
+    return _run_stage(inspector, hosts, cancel)[0]
+
+
+def _run_stage(inspector, hosts: List[HostResult], cancel=None) -> Tuple[int, int]:
+    """Come run_stage, più il numero di porte saltate per annullamento"""
+    targets: List[Tuple[HostResult, PortResult]] = [
+        (host, port) for host in hosts for port in host.ports
+        if port.state == "open" and inspector.wants(port)
+    ]
+    if not targets:
+        return 0, 0
+    if getattr(inspector, "offline", False):
+        cancel = None
+
+    def inspect(target: Tuple[HostResult, PortResult]) -> Optional[bool]:
+        host, port = target
+        if cancel and cancel.cancelled:
+            return None
+        try:
+            details = inspector.inspect(host, port)
+        except Exception as e:  # una porta non deve fermare la fase
+            logger.warning("Ispezione %s fallita su %s:%d: %s", inspector.name, host.ip, port.port, e)
+            return False
+        if details is None:
+            return False
+        port.details[inspector.name] = details
+        return True
+
+    workers = max(1, min(inspector.workers, len(targets)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"inspect-{inspector.name}") as pool:
+        outcomes = list(pool.map(inspect, targets))
+    return outcomes.count(True), outcomes.count(None)
+
+
+def run_inspections(result: ScanResult, inspectors: List, cancel=None) -> Dict[str, int]:
+    """
+    Esegue le fasi di ispezione in ordine e invalida la classificazione
+
+    Args:
+        result: Risultato della scansione (modificato in place)
+        inspectors: Ispettori da eseguire (vedi default_inspectors)
+        cancel: CancelToken; se interrompe un'analisi il risultato viene
+            segnato incompleto con le porte saltate in coverage["ports_not_inspected"]
+
+    Returns:
+        Porte analizzate per fase
+    """
+    counts = {}
+    skipped = 0
+    for inspector in inspectors:
+        counts[inspector.name], stage_skipped = _run_stage(inspector, result.hosts, cancel)
+        skipped += stage_skipped
+        finish = getattr(inspector, "finish", None)
+        if finish:
+            finish()
+    if skipped:
+        result.coverage["ports_not_inspected"] = result.coverage.get("ports_not_inspected", 0) + skipped
+        result.mark_incomplete(cancel.reason)
+    result.invalidate_classification()
+    return counts
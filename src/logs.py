@@ -0,0 +1,155 @@
+"""
+Log Strutturati - CyberSentinel
+Log in JSON Lines con scrittura asincrona e campionamento dei messaggi per host
+
+I moduli usano logging.getLogger(__name__) e non scrivono mai direttamente
+su stdout. Con un file di log i record passano da una coda (QueueHandler):
+formattazione e scrittura avvengono in un thread separato e lo scanner non
+aspetta l'I/O. I messaggi per host (extra={"sample": ...}) possono essere
+campionati; quelli sotto il livello configurato vengono scartati dal logger
+prima di costruire il record, quindi costano un solo confronto.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import atexit
+import json
+import logging
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from .config import LoggingSettings
+
+# Attributi standard di LogRecord: tutto il resto (extra=) finisce nel JSON
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sample"}
+
+# Formato del terminale per servizio e scheduler
+SERVICE_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_PREFIXES = {logging.DEBUG: "[.]", logging.INFO: "[*]"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Un oggetto JSON per riga con i campi extra del record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Messaggi per il terminale con i prefissi di run.py ([*], [!])"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return f"{_PREFIXES.get(record.levelno, '[!]')} {super().format(record)}"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lascia passare un messaggio ogni `every` tra quelli con la stessa
+    chiave extra={"sample": chiave}; avvisi ed errori passano sempre.
+    I record che passano riportano sample_rate per stimare i totali.
+
+    Args:
+        every: Frequenza di campionamento (1 = tutti)
+    """
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = max(1, int(every))
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None or self.every == 1 or record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.every:
+            return False
+        record.sample_rate = self.every
+        return True
+
+
+_listener = None  # QueueListener attivo (uno per processo)
+
+
+def setup_logging(
+    settings: Optional[LoggingSettings] = None,
+    console_level: Optional[int] = logging.WARNING,
+    console_format: Optional[str] = None,
+    queued: bool = False
+) -> None:
+    """
+    Configura i log del processo (sostituisce una configurazione precedente)
+
+    Args:
+        settings: Livello, file e campionamento (sezione 'logging')
+        console_level: Livello minimo sul terminale (stderr), None per nessuno
+        console_format: Formato del terminale (default: prefissi [*] e [!])
+        queued: Scrittura asincrona anche senza file (servizio, scheduler)
+    """
+    global _listener
+    settings = settings or LoggingSettings()
+    stop_logging()
+
+    handlers = []
+    if console_level is not None:
+        console = logging.StreamHandler(sys.stderr)
+        console.setLevel(console_level)
+        console.setFormatter(logging.Formatter(console_format) if console_format
+                             else ConsoleFormatter("%(message)s"))
+        handlers.append(console)
+    if settings.file:
+        file = logging.FileHandler(settings.file, encoding="utf-8")
+        file.setLevel(settings.level)
+        file.setFormatter(JsonFormatter() if settings.format == "json"
+                          else logging.Formatter(SERVICE_FORMAT))
+        handlers.append(file)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    # Il livello del logger è il minimo dei canali: il resto non crea record
+    root.setLevel(min((h.level for h in handlers), default=logging.CRITICAL))
+
+    sampling = SamplingFilter(settings.sample_hosts)
+    if settings.file or queued:
+        import queue
+        from logging.handlers import QueueHandler, QueueListener
+
+        records = queue.SimpleQueue()
+        front = QueueHandler(records)
+        front.addFilter(sampling)
+        root.addHandler(front)
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    else:
+        for handler in handlers:
+            handler.addFilter(sampling)
+            root.addHandler(handler)
+
+
+def stop_logging() -> None:
+    """Scrive i record in coda e chiude i file di log"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,149 @@
+"""
+Profilazione - CyberSentinel
+Tempi per fase (discovery, DNS, connessione, classificazione, report)
+e output compatibile con cProfile / pyinstrument
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class StageProfiler:
+    """
+    Accumula il tempo speso in ogni fase della pipeline.
+    Costo trascurabile: due letture di perf_counter per span e un dizionario.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, stage: str, seconds: float, count: int = 1) -> None:
+        """Aggiunge una durata alla fase indicata"""
+        with self._lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + count
+
+    @contextmanager
+    def span(self, stage: str):
+        """Misura il blocco di codice come fase `stage`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def add_host(self, host) -> None:
+        """
+        Importa i tempi per fase registrati dallo scanner in un HostResult.
+        Utilizzabile direttamente come host_callback di PortScanner.scan.
+        """
+        for stage, seconds in host.timings.items():
+            self.record(stage, seconds)
+
+    def stop(self) -> None:
+        """Fissa il tempo totale"""
+        self.finished = time.perf_counter()
+
+    @property
+    def wall_time(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def breakdown(self) -> List[Dict]:
+        """
+        Riepilogo per fase, ordinato per tempo totale
+
+        Returns:
+            Lista di dizionari stage/total/count/mean/percent
+        """
+        wall = max(self.wall_time, 1e-9)
+        with self._lock:
+            rows = [
+                {
+                    "stage": stage,
+                    "total": total,
+                    "count": self.counts[stage],
+                    "mean": total / self.counts[stage],
+                    "percent": 100.0 * total / wall,
+                }
+                for stage, total in self.totals.items()
+            ]
+        return sorted(rows, key=lambda r: r["total"], reverse=True)
+
+    def format_breakdown(self) -> List[str]:
+        """Righe di testo con il riepilogo per fase"""
+        lines = [f"{'Fase':<12} {'Totale':>10} {'N':>7} {'Media':>10} {'%':>6}"]
+        for row in self.breakdown():
+            lines.append(
+                f"{row['stage']:<12} {row['total']:>9.3f}s {row['count']:>7} "
+                f"{row['mean'] * 1000:>8.2f}ms {row['percent']:>5.1f}%"
+            )
+        lines.append(f"{'totale':<12} {self.wall_time:>9.3f}s")
+        return lines
+
+    def to_json(self, filepath: str) -> None:
+        """Salva il riepilogo in formato JSON"""
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(
+                {"wall_time": self.wall_time, "stages": self.breakdown()},
+                f, indent=2
+            )
+
+
+@contextmanager
+def profile_to(filepath: Optional[str]):
+    """
+    Profila il blocco e salva il risultato in filepath.
+
+    - .json: nessun profiler di funzioni, solo il riepilogo per fase
+      (scritto dal chiamante con StageProfiler.to_json)
+    - .html / .txt: pyinstrument, se installato
+    - altre estensioni (es. .prof): statistiche cProfile, leggibili con
+      pstats, snakeviz o `pyinstrument --load-prof`
+
+    Args:
+        filepath: File di output (None = nessuna profilazione)
+    """
+    if not filepath or filepath.endswith(".json"):
+        yield
+        return
+
+    if filepath.endswith((".html", ".txt")):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise RuntimeError(
+                "pyinstrument non installato: pip install pyinstrument "
+                "(oppure usa un file .prof per cProfile)"
+            )
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(filepath, "w", encoding="utf-8") as f:
+                if filepath.endswith(".html"):
+                    f.write(profiler.output_html())
+                else:
+                    f.write(profiler.output_text())
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filepath)
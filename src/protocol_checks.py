@@ -0,0 +1,374 @@
+"""
+Controlli di Protocollo - CyberSentinel
+Handshake non invasivi per SMB, RDP e SSH sulle porte aperte
+
+Nessun tentativo di accesso: solo la negoziazione iniziale di ogni
+protocollo, quanto basta per sapere se SMBv1 è attivo, se RDP richiede
+NLA e quali algoritmi e metodi di autenticazione offre SSH. I controlli
+girano in parallelo con un tempo massimo complessivo per host.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .scanner import HostResult, PortResult
+
+logger = logging.getLogger(__name__)
+
+SMB_PORTS = {445}
+RDP_PORTS = {3389}
+SSH_PORTS = {22, 2222}
+
+# --- SMB ---
+
+_SMB1_NEGOTIATE = (
+    b"\xffSMB\x72" + b"\x00" * 4 + b"\x18" + struct.pack("<H", 0xC001)
+    + b"\x00" * 12 + b"\x00\x00\xff\xfe\x00\x00\x00\x00"
+    + b"\x00" + struct.pack("<H", 12) + b"\x02NT LM 0.12\x00"
+)
+
+SMB2_DIALECTS = {0x0202: "2.0.2", 0x0210: "2.1", 0x0300: "3.0", 0x0302: "3.0.2", 0x0311: "3.1.1"}
+
+
+def _smb2_negotiate() -> bytes:
+    """NEGOTIATE SMB2 con tutti i dialetti e i contesti richiesti da 3.1.1"""
+    header = b"\xfeSMB" + struct.pack("<HHIHHIIQIIQ", 64, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0) + b"\x00" * 16
+    dialects = b"".join(struct.pack("<H", d) for d in SMB2_DIALECTS)
+    fixed_size = 36 + len(dialects)
+    context_offset = 64 + fixed_size + (-(64 + fixed_size) % 8)
+
+    preauth = struct.pack("<HHH", 1, 32, 0x0001) + os.urandom(32)  # SHA-512 + salt
+    encryption = struct.pack("<HHH", 2, 0x0002, 0x0001)            # AES-128-GCM, AES-128-CCM
+    contexts = b""
+    for context_type, data in ((1, preauth), (2, encryption)):
+        contexts += b"\x00" * (-len(contexts) % 8)
+        contexts += struct.pack("<HHI", context_type, len(data), 0) + data
+
+    body = struct.pack("<HHHHI", 36, len(SMB2_DIALECTS), 1, 0, 0) + os.urandom(16)
+    body += struct.pack("<IHH", context_offset, 2, 0) + dialects
+    body += b"\x00" * (context_offset - 64 - len(body))
+    return header + body + contexts
+
+
+# --- RDP ---
+
+PROTOCOL_RDP, PROTOCOL_SSL, PROTOCOL_HYBRID, PROTOCOL_HYBRID_EX = 0x0, 0x1, 0x2, 0x8
+_RDP_PROTOCOLS = {PROTOCOL_RDP: "RDP standard", PROTOCOL_SSL: "TLS",
+                  PROTOCOL_HYBRID: "CredSSP (NLA)", PROTOCOL_HYBRID_EX: "CredSSP (NLA)"}
+_HYBRID_REQUIRED_BY_SERVER = 0x05
+
+
+def _rdp_request(protocols: int) -> bytes:
+    """TPKT + X.224 Connection Request con RDP_NEG_REQ"""
+    negotiation = struct.pack("<BBHI", 0x01, 0, 8, protocols)
+    x224 = bytes([6 + len(negotiation), 0xE0, 0, 0, 0, 0, 0]) + negotiation
+    return struct.pack(">BBH", 3, 0, 4 + len(x224)) + x224
+
+
+# --- SSH ---
+
+SSH_CLIENT_BANNER = b"SSH-2.0-CyberSentinel_1.0\r\n"
+_SSH_LISTS = ("kex", "hostkey", "cipher", "cipher_s2c", "mac", "mac_s2c")
+_WEAK_SSH = {
+    "kex": ("diffie-hellman-group1-sha1", "diffie-hellman-group14-sha1",
+            "diffie-hellman-group-exchange-sha1", "gss-group1-sha1"),
+    "hostkey": ("ssh-dss",),
+    "cipher": ("3des-cbc", "aes128-cbc", "aes192-cbc", "aes256-cbc", "blowfish-cbc",
+               "cast128-cbc", "arcfour", "arcfour128", "arcfour256"),
+    "mac": ("hmac-md5", "hmac-md5-96", "hmac-sha1-96", "hmac-md5-etm@openssh.com",
+            "hmac-md5-96-etm@openssh.com", "hmac-sha1-96-etm@openssh.com"),
+}
+
+
+def parse_kexinit(payload: bytes) -> Dict[str, List[str]]:
+    """
+    Liste di algoritmi di un messaggio SSH_MSG_KEXINIT
+
+    Args:
+        payload: Payload del pacchetto (primo byte 20)
+
+    Returns:
+        Algoritmi per kex, hostkey, cipher, cipher_s2c, mac, mac_s2c
+
+    Raises:
+        ValueError: Se il messaggio non è un KEXINIT valido
+    """
+    if not payload or payload[0] != 20:
+        raise ValueError("KEXINIT atteso")
+    pos = 17  # tipo + cookie
+    lists = {}
+    for name in _SSH_LISTS:
+        if pos + 4 > len(payload):
+            raise ValueError("KEXINIT troncato")
+        (size,) = struct.unpack_from(">I", payload, pos)
+        pos += 4
+        lists[name] = [a for a in payload[pos:pos + size].decode("ascii", "replace").split(",") if a]
+        pos += size
+    return lists
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return bytes(data)
+
+
+def _finding(level: str, title: str, recommendation: str) -> Dict:
+    return {"level": level, "title": title, "recommendation": recommendation}
+
+
+class ProtocolInspector:
+    """
+    Fase dei controlli di protocollo (vedi inspection.run_stage)
+
+    Args:
+        timeout: Timeout per operazione di rete (secondi)
+        host_budget: Secondi complessivi per tutti i controlli di un host
+        workers: Controlli in parallelo
+    """
+
+    name = "protocol"
+
+    def __init__(self, timeout: float = 3.0, host_budget: float = 10.0, workers: int = 32):
+        self.timeout = timeout
+        self.host_budget = host_budget
+        self.workers = workers
+        self._deadlines: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wants(self, port: PortResult) -> bool:
+        return port.protocol == "tcp" and self._check_for(port) is not None
+
+    def inspect(self, host: HostResult, port: PortResult) -> Optional[Dict]:
+        """
+        Esegue il controllo adatto alla porta entro il tempo dell'host
+
+        Returns:
+            Dizionario dei risultati oppure None se il controllo non è riuscito
+        """
+        with self._lock:
+            deadline = self._deadlines.setdefault(host.ip, time.monotonic() + self.host_budget)
+        check = self._check_for(port)
+        try:
+            return check(host.ip, port, deadline)
+        except (OSError, EOFError, ValueError, struct.error) as e:
+            logger.debug("Controllo %s fallito su %s:%d: %s", check.__name__, host.ip, port.port, e)
+            return None
+
+    def _check_for(self, port: PortResult):
+        service = port.service.lower()
+        if port.port in SMB_PORTS or service in ("microsoft-ds", "smb"):
+            return self.check_smb
+        if port.port in RDP_PORTS or service in ("ms-wbt-server", "rdp"):
+            return self.check_rdp
+        if port.port in SSH_PORTS or service == "ssh":
+            return self.check_ssh
+        return None
+
+    def _connect(self, ip: str, port: int, deadline: float) -> socket.socket:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("tempo per l'host esaurito")
+        return socket.create_connection((ip, port), timeout=min(self.timeout, remaining))
+
+    # --- SMB ---
+
+    def _smb_exchange(self, ip: str, port: int, deadline: float, message: bytes) -> bytes:
+        with self._connect(ip, port, deadline) as sock:
+            sock.sendall(b"\x00" + len(message).to_bytes(3, "big") + message)
+            length = int.from_bytes(_recv_exact(sock, 4)[1:], "big")
+            return _recv_exact(sock, min(length, 65536))
+
+    def check_smb(self, ip: str, port: PortResult, deadline: float) -> Optional[Dict]:
+        """Dialetto SMB2/3 più alto, firma obbligatoria e supporto a SMBv1"""
+        try:
+            response = self._smb_exchange(ip, port.port, deadline, _smb2_negotiate())
+        except (OSError, EOFError):
+            response = b""  # solo SMBv1 o servizio diverso
+        dialect, signing_required = None, None
+        if response[:4] == b"\xfeSMB" and struct.unpack_from("<I", response, 8)[0] == 0:
+            security_mode, revision = struct.unpack_from("<HH", response, 66)
+            dialect = SMB2_DIALECTS.get(revision, f"0x{revision:04x}")
+            signing_required = bool(security_mode & 0x02)
+
+        smb1 = False
+        try:
+            response = self._smb_exchange(ip, port.port, deadline, _SMB1_NEGOTIATE)
+            if response[:4] == b"\xffSMB" and struct.unpack_from("<H", response, 33)[0] != 0xFFFF:
+                smb1 = True
+                if signing_required is None:
+                    signing_required = bool(response[35] & 0x08)
+        except (OSError, EOFError, struct.error):
+            pass  # connessione chiusa: SMBv1 disattivato
+
+        if dialect is None and not smb1:
+            return None
+
+        findings = []
+        if smb1:
+            findings.append(_finding(
+                "critical", "SMBv1 attivo (protocollo sfruttato da EternalBlue/WannaCry)",
+                "Disattivare SMBv1 (Windows: Set-SmbServerConfiguration -EnableSMB1Protocol $false)."))
+        if signing_required is False:
+            findings.append(_finding(
+                "warning", "Firma SMB non obbligatoria (possibili attacchi NTLM relay)",
+                "Rendere obbligatoria la firma SMB tramite criteri di gruppo."))
+        summary = f"SMB {dialect}" if dialect else "solo SMBv1"
+        return {
+            "protocol": "smb",
+            "dialect": dialect,
+            "smb1": smb1,
+            "signing_required": signing_required,
+            "findings": findings,
+            "summary": summary + (", SMBv1 attivo" if smb1 and dialect else ""),
+        }
+
+    # --- RDP ---
+
+    def _rdp_negotiate(self, ip: str, port: int, deadline: float, protocols: int) -> Dict:
+        with self._connect(ip, port, deadline) as sock:
+            sock.sendall(_rdp_request(protocols))
+            tpkt = _recv_exact(sock, 4)
+            data = _recv_exact(sock, struct.unpack(">H", tpkt[2:])[0] - 4)
+        if len(data) < 2 or data[1] & 0xF0 != 0xD0:  # Connection Confirm
+            raise ValueError("risposta X.224 non valida")
+        if len(data) < 15:
+            return {"selected": PROTOCOL_RDP}  # server senza negoziazione: solo RDP standard
+        kind, _, _, value = struct.unpack_from("<BBHI", data, 7)
+        return {"selected": value} if kind == 0x02 else {"failure": value}
+
+    def check_rdp(self, ip: str, port: PortResult, deadline: float) -> Optional[Dict]:
+        """Protocollo di sicurezza preferito e obbligo di NLA"""
+        offered = self._rdp_negotiate(ip, port.port, deadline,
+                                      PROTOCOL_SSL | PROTOCOL_HYBRID | PROTOCOL_HYBRID_EX)
+        if "failure" in offered:
+            return None
+        without_nla = self._rdp_negotiate(ip, port.port, deadline, PROTOCOL_SSL)
+        nla_required = without_nla.get("failure") == _HYBRID_REQUIRED_BY_SERVER
+        standard = offered["selected"] == PROTOCOL_RDP
+
+        findings = []
+        if not nla_required:
+            findings.append(_finding(
+                "critical", "NLA non obbligatoria: la schermata di accesso è raggiungibile senza credenziali "
+                            "(superficie di attacco di BlueKeep)",
+                "Abilitare \"Consenti connessioni solo da computer che eseguono Desktop remoto con NLA\"."))
+        if standard:
+            findings.append(_finding(
+                "warning", "Sicurezza RDP standard senza TLS",
+                "Impostare il livello di sicurezza RDP su SSL/TLS."))
+        protocol = _RDP_PROTOCOLS.get(offered["selected"], str(offered["selected"]))
+        return {
+            "protocol": "rdp",
+            "security": protocol,
+            "nla_required": nla_required,
+            "findings": findings,
+            "summary": f"RDP con {protocol}, NLA {'obbligatoria' if nla_required else 'non obbligatoria'}",
+        }
+
+    # --- SSH ---
+
+    def check_ssh(self, ip: str, port: PortResult, deadline: float) -> Optional[Dict]:
+        """Banner, algoritmi offerti e metodi di autenticazione"""
+        with self._connect(ip, port.port, deadline) as sock:
+            banner = ""
+            for _ in range(20):  # righe prima del banner ammesse da RFC 4253
+                line = self._readline(sock)
+                if line.startswith(b"SSH-"):
+                    banner = line.decode("ascii", "replace").strip()
+                    break
+            if not banner:
+                return None
+            sock.sendall(SSH_CLIENT_BANNER)
+            length = struct.unpack(">I", _recv_exact(sock, 4))[0]
+            if not 5 <= length <= 65536:
+                raise ValueError("pacchetto SSH non valido")
+            packet = _recv_exact(sock, length)
+            algorithms = parse_kexinit(packet[1:length - packet[0]])
+
+        software = banner.split("-", 2)[2] if banner.count("-") >= 2 else banner
+        if software and not port.version:
+            port.version = software
+        auth_methods = self._ssh_auth_methods(ip, port.port, deadline)
+
+        findings = []
+        if banner.startswith("SSH-1."):
+            findings.append(_finding("critical", "Protocollo SSH 1 supportato",
+                                     "Disattivare SSH 1: ha vulnerabilità di progetto non correggibili."))
+        weak = sorted({a for kind, names in _WEAK_SSH.items()
+                       for a in algorithms.get(kind, []) + algorithms.get(f"{kind}_s2c", [])
+                       if a in names})
+        if weak:
+            findings.append(_finding("warning", f"Algoritmi SSH deboli offerti: {', '.join(weak)}",
+                                     "Rimuovere gli algoritmi obsoleti (SHA-1, CBC, arcfour, MD5) "
+                                     "dalla configurazione di sshd."))
+        if auth_methods is not None:
+            if "none" in auth_methods:
+                findings.append(_finding("critical", "Accesso SSH senza autenticazione",
+                                         "Disattivare subito l'accesso senza password (PermitEmptyPasswords no)."))
+            elif "password" in auth_methods or "keyboard-interactive" in auth_methods:
+                findings.append(_finding("warning", "Accesso SSH con password abilitato (esposto a brute force)",
+                                         "Usare solo chiavi (PasswordAuthentication no) e limitare gli IP."))
+
+        details = {
+            "protocol": "ssh",
+            "banner": banner[:120],
+            "algorithms": {k: v for k, v in algorithms.items() if not k.endswith("_s2c")},
+            "auth_methods": auth_methods,
+            "findings": findings,
+            "summary": f"{software[:60]}" + (f", autenticazione: {', '.join(auth_methods)}"
+                                             if auth_methods else ""),
+        }
+        # Solo chiavi e nessun algoritmo debole: SSH configurato come raccomandato
+        if auth_methods is not None and not findings:
+            details["risk"] = "ok"
+        return details
+
+    @staticmethod
+    def _readline(sock: socket.socket) -> bytes:
+        line = bytearray()
+        while not line.endswith(b"\n") and len(line) < 256:
+            chunk = sock.recv(1)
+            if not chunk:
+                raise EOFError
+            line += chunk
+        return bytes(line)
+
+    def _ssh_auth_methods(self, ip: str, port: int, deadline: float) -> Optional[List[str]]:
+        """
+        Metodi di autenticazione offerti (richiesta "none", come ssh -v)
+
+        Richiede paramiko per lo scambio di chiavi; senza restituisce None.
+        """
+        try:
+            import paramiko
+        except ImportError:
+            return None
+        try:
+            sock = self._connect(ip, port, deadline)
+        except OSError:
+            return None
+        transport = paramiko.Transport(sock)
+        try:
+            transport.start_client(timeout=max(0.1, min(self.timeout, deadline - time.monotonic())))
+            try:
+                transport.auth_none("cybersentinel")
+            except paramiko.BadAuthenticationType as e:
+                return list(e.allowed_types)
+            return ["none"]
+        except (paramiko.SSHException, OSError, EOFError) as e:
+            logger.debug("Metodi SSH non disponibili da %s:%d: %s", ip, port, e)
+            return None
+        finally:
+            transport.close()
@@ -0,0 +1,136 @@
+"""
+Generazione Report in Batch - CyberSentinel
+Genera molti report PDF in parallelo con un pool di processi
+
+Ogni processo del pool crea un solo ReportGenerator (stili già pronti)
+e lo riusa per tutti i report che gli vengono assegnati: doc.build di
+reportlab è CPU-bound, quindi i processi sfruttano tutti i core.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .scanner import ScanResult
+
+# Generatore del processo corrente (creato una volta per worker)
+_generator = None
+
+Source = Union[str, Path, ScanResult]
+
+
+@dataclass
+class BatchReport:
+    """Esito della generazione di un report del batch"""
+    source: str
+    output: str
+    seconds: float = 0.0
+    error: str = ""
+    worker_pid: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+def _init_worker() -> None:
+    """Inizializzatore del pool: prepara il generatore una sola volta"""
+    global _generator
+    from .report_generator import ReportGenerator
+    _generator = ReportGenerator()
+
+
+def _render(source: Source, output: str) -> BatchReport:
+    """Genera un singolo report nel processo corrente"""
+    if _generator is None:
+        _init_worker()
+
+    label = source.target if isinstance(source, ScanResult) else str(source)
+    start = time.perf_counter()
+    try:
+        result = source if isinstance(source, ScanResult) else ScanResult.from_json(str(source))
+        _generator.generate(result, output)
+    except Exception as e:
+        return BatchReport(
+            source=label, output=output, seconds=time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}", worker_pid=os.getpid()
+        )
+    return BatchReport(
+        source=label, output=output, seconds=time.perf_counter() - start,
+        worker_pid=os.getpid()
+    )
+
+
+def plan_outputs(sources: Iterable[Source], output_dir: Optional[str] = None) -> List[Tuple[Source, str]]:
+    """
+    Associa a ogni input il percorso del PDF da generare
+
+    Args:
+        sources: File JSON di scansioni salvate o oggetti ScanResult
+        output_dir: Directory dei PDF (default: accanto al file JSON)
+
+    Returns:
+        Lista di coppie (input, percorso PDF)
+    """
+    jobs = []
+    for i, source in enumerate(sources):
+        if isinstance(source, ScanResult):
+            safe = "".join(c if c.isalnum() else "_" for c in source.target)
+            name = f"report_{i + 1:04d}_{safe}.pdf"
+            directory = Path(output_dir or ".")
+        else:
+            name = Path(source).with_suffix(".pdf").name
+            directory = Path(output_dir) if output_dir else Path(source).parent
+        jobs.append((source, str(directory / name)))
+    return jobs
+
+
+def generate_reports(
+    sources: Iterable[Source],
+    output_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+    callback=None
+) -> List[BatchReport]:
+    """
+    Genera un report PDF per ogni scansione
+
+    Args:
+        sources: File JSON di scansioni salvate o oggetti ScanResult
+        output_dir: Directory dei PDF (default: accanto al file JSON)
+        workers: Processi del pool (default: numero di CPU; 1 = sequenziale)
+        callback: Chiamata con ogni BatchReport appena completato
+
+    Returns:
+        Esiti nello stesso ordine degli input
+    """
+    jobs = plan_outputs(sources, output_dir)
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(jobs)) or 1
+    results: List[Optional[BatchReport]] = [None] * len(jobs)
+
+    if workers == 1:
+        for i, (source, output) in enumerate(jobs):
+            results[i] = _render(source, output)
+            if callback:
+                callback(results[i])
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(_render, source, output): i
+            for i, (source, output) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if callback:
+                callback(results[futures[future]])
+
+    return results
@@ -5,9 +5,11 @@ Crea report professionali e comprensibili per non-tecnici
 Sviluppato da ISIPC - Truant Bruno | https://isipc.com
 """
 
+import copy
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
+from xml.sax.saxutils import escape
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -20,8 +22,21 @@ from reportlab.platypus import (
 )
 from reportlab.graphics.shapes import Drawing, Rect, String
 from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
 
 from .classifier import PortClassifier, RiskLevel
+from .config import ReportSettings
+from . import report_text
+
+# Cache di processo: fogli di stile e flowable statici per classe di generatore
+_STYLE_CACHE: Dict[type, object] = {}
+_FLOWABLE_CACHE: Dict[tuple, List] = {}
+
+
+def clear_style_cache() -> None:
+    """Svuota le cache di stili e flowable statici (usato da test e benchmark)"""
+    _STYLE_CACHE.clear()
+    _FLOWABLE_CACHE.clear()
 
 
 class ReportGenerator:
@@ -40,13 +55,44 @@ class ReportGenerator:
         'light_gray': colors.HexColor('#f8f9fa'),
         'dark_gray': colors.HexColor('#343a40'),
         'text': colors.HexColor('#212529'),
+        'warning_text': colors.HexColor('#856404'),  # Giallo scuro leggibile
     }
 
-    def __init__(self):
-        """Inizializza il generatore"""
+    # Soglie layout raggruppato
+    MAX_HOSTS_LISTED = 500     # Host elencati per gruppo prima di troncare
+    HOST_GRID_COLUMNS = 4      # Colonne della griglia di soli IP
+    OK_HOSTS_INLINE = 12       # Host elencati per riga nella tabella OK
+
+    def __init__(self, settings: Optional[ReportSettings] = None):
+        """
+        Inizializza il generatore
+
+        Args:
+            settings: Titolo e livello di dettaglio (default: ReportSettings())
+        """
+        self.settings = settings or ReportSettings()
         self.classifier = PortClassifier()
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+
+        # Gli stili sono costanti: costruiti una volta per processo e condivisi
+        styles = _STYLE_CACHE.get(type(self))
+        if styles is None:
+            self.styles = getSampleStyleSheet()
+            self._setup_custom_styles()
+            _STYLE_CACHE[type(self)] = self.styles
+        else:
+            self.styles = styles
+
+    def _static(self, key: str, build: Callable[[], List]) -> List:
+        """
+        Restituisce flowable a contenuto costante, costruiti una sola volta.
+        Ogni report riceve copie superficiali: reportlab annota i flowable
+        durante l'impaginazione e le annotazioni non devono propagarsi.
+        """
+        cache_key = (type(self), key)
+        flowables = _FLOWABLE_CACHE.get(cache_key)
+        if flowables is None:
+            flowables = _FLOWABLE_CACHE[cache_key] = build()
+        return [copy.copy(f) for f in flowables]
 
     def _setup_custom_styles(self):
         """Configura stili personalizzati"""
@@ -82,7 +128,8 @@ class ReportGenerator:
             fontName='Helvetica-Bold'
         ))
 
-        # Corpo testo
+        # Corpo testo (sostituisce lo stile omonimo del foglio base)
+        self.styles.byName.pop('BodyText', None)
         self.styles.add(ParagraphStyle(
             name='BodyText',
             parent=self.styles['Normal'],
@@ -107,7 +154,7 @@ class ReportGenerator:
             name='Warning',
             parent=self.styles['Normal'],
             fontSize=11,
-            textColor=colors.HexColor('#856404'),
+            textColor=self.COLORS['warning_text'],
             fontName='Helvetica-Bold'
         ))
 
@@ -120,6 +167,15 @@ class ReportGenerator:
             fontName='Helvetica-Bold'
         ))
 
+        # Cella di tabella (testo a capo)
+        self.styles.add(ParagraphStyle(
+            name='TableCell',
+            parent=self.styles['Normal'],
+            fontSize=9,
+            leading=11,
+            textColor=self.COLORS['text']
+        ))
+
         # Footer
         self.styles.add(ParagraphStyle(
             name='Footer',
@@ -129,8 +185,37 @@ class ReportGenerator:
             alignment=TA_CENTER
         ))
 
-    def _create_header(self, target: str, scan_date: datetime) -> List:
-        """Crea header del report"""
+        # Disclaimer finale
+        self.styles.add(ParagraphStyle(
+            name='Disclaimer',
+            fontSize=7,
+            textColor=self.COLORS['dark_gray'],
+            alignment=TA_CENTER
+        ))
+
+        # Box di avviso (testo bianco su sfondo colorato)
+        self.styles.add(ParagraphStyle(
+            name='WarningBox',
+            fontSize=10,
+            textColor=colors.white
+        ))
+
+        # Livello di rischio nel riepilogo (uno stile per colore)
+        for level in ('critical', 'warning', 'ok'):
+            self.styles.add(ParagraphStyle(
+                name=f'Risk_{level}',
+                alignment=TA_CENTER,
+                textColor=self.COLORS[level]
+            ))
+
+        self.styles.add(ParagraphStyle(
+            name='RiskDesc',
+            alignment=TA_CENTER,
+            fontSize=10
+        ))
+
+    def _create_header(self, target: str, scan_date: datetime, notice: Optional[str] = None) -> List:
+        """Crea header del report (con l'avviso di scansione incompleta, se presente)"""
         elements = []
 
         # Titolo
@@ -164,6 +249,18 @@ class ReportGenerator:
         elements.append(info_table)
         elements.append(Spacer(1, 20))
 
+        if notice:
+            notice_table = Table([[Paragraph(notice, self.styles['Warning'])]], colWidths=[15*cm])
+            notice_table.setStyle(TableStyle([
+                ('BOX', (0, 0), (-1, -1), 2, self.COLORS['warning']),
+                ('TOPPADDING', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+                ('LEFTPADDING', (0, 0), (-1, -1), 10),
+                ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ]))
+            elements.append(notice_table)
+            elements.append(Spacer(1, 20))
+
         return elements
 
     def _create_executive_summary(self, classified: Dict) -> List:
@@ -178,42 +275,10 @@ class ReportGenerator:
         summary = classified['summary']
 
         # Box riepilogo con colore basato su rischio
-        risk_score = summary['risk_score']
-        if summary['critical_count'] > 0:
-            risk_color = self.COLORS['critical']
-            risk_text = "RISCHIO ALTO"
-            risk_desc = "Sono state trovate vulnerabilità critiche che richiedono intervento immediato."
-        elif risk_score >= 40:
-            risk_color = self.COLORS['warning']
-            risk_text = "RISCHIO MEDIO"
-            risk_desc = "Sono presenti alcune configurazioni che richiedono attenzione."
-        else:
-            risk_color = self.COLORS['ok']
-            risk_text = "RISCHIO BASSO"
-            risk_desc = "La rete appare ben configurata, con poche aree di miglioramento."
-
-        # Tabella riepilogo visuale
-        summary_data = [
-            [
-                Paragraph(f"<font size='20'><b>{risk_text}</b></font>",
-                         ParagraphStyle('risk', alignment=TA_CENTER, textColor=risk_color)),
-            ],
-            [
-                Paragraph(risk_desc,
-                         ParagraphStyle('desc', alignment=TA_CENTER, fontSize=10))
-            ]
-        ]
-
-        summary_table = Table(summary_data, colWidths=[15*cm])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), self.COLORS['light_gray']),
-            ('BOX', (0, 0), (-1, -1), 2, risk_color),
-            ('TOPPADDING', (0, 0), (-1, -1), 15),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-        ]))
+        level = report_text.overall_level(summary)
 
-        elements.append(summary_table)
-        elements.append(Spacer(1, 15))
+        # Tabella riepilogo visuale (contenuto costante per livello)
+        elements.extend(self._static(f'risk_box_{level}', lambda: self._build_risk_box(level)))
 
         # Conteggi
         counts_data = [
@@ -227,7 +292,7 @@ class ReportGenerator:
         ]
 
         counts_table = Table(counts_data, colWidths=[3.75*cm]*4)
-        counts_table.setStyle(TableStyle([
+        counts_table.setStyle(self._cached_table_style('counts', lambda: [
             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -239,7 +304,7 @@ class ReportGenerator:
             ('FONTSIZE', (0, 1), (-1, 1), 18),
             ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
             ('TEXTCOLOR', (0, 1), (0, 1), self.COLORS['critical']),
-            ('TEXTCOLOR', (1, 1), (1, 1), colors.HexColor('#856404')),
+            ('TEXTCOLOR', (1, 1), (1, 1), self.COLORS['warning_text']),
             ('TEXTCOLOR', (2, 1), (2, 1), self.COLORS['ok']),
             ('TEXTCOLOR', (3, 1), (3, 1), self.COLORS['primary']),
             ('GRID', (0, 0), (-1, -1), 1, colors.white),
@@ -251,42 +316,103 @@ class ReportGenerator:
         elements.append(Spacer(1, 20))
 
         # Spiegazione per non-tecnici
-        elements.append(Paragraph(
-            "<b>Cosa significa questo report?</b>",
-            self.styles['BodyText']
-        ))
-
-        elements.append(Paragraph(
-            "Abbiamo scansionato la vostra rete per verificare quali 'porte' sono aperte e accessibili. "
-            "Le porte sono come le porte di un edificio: alcune devono essere aperte per lavorare "
-            "(come la porta d'ingresso), ma altre dovrebbero restare chiuse per sicurezza "
-            "(come la porta del caveau). Questo report vi mostra quali porte sono aperte e se "
-            "rappresentano un rischio per la vostra azienda.",
-            self.styles['BodyText']
-        ))
+        elements.extend(self._static('summary_explanation', lambda: [
+            Paragraph(
+                f"<b>{report_text.EXPLANATION_TITLE}</b>",
+                self.styles['BodyText']
+            ),
+            Paragraph(report_text.EXPLANATION, self.styles['BodyText']),
+        ]))
 
         return elements
 
-    def _create_critical_section(self, critical_items: List) -> List:
-        """Crea sezione problemi critici"""
-        elements = []
+    def _build_risk_box(self, level: str) -> List:
+        """Box del livello di rischio complessivo (critical, warning, ok)"""
+        risk_text, risk_desc = report_text.RISK_BOXES[level]
 
-        if not critical_items:
-            return elements
+        summary_data = [
+            [Paragraph(f"<font size='20'><b>{risk_text}</b></font>", self.styles[f'Risk_{level}'])],
+            [Paragraph(risk_desc, self.styles['RiskDesc'])]
+        ]
 
-        elements.append(PageBreak())
+        summary_table = Table(summary_data, colWidths=[15*cm])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), self.COLORS['light_gray']),
+            ('BOX', (0, 0), (-1, -1), 2, self.COLORS[level]),
+            ('TOPPADDING', (0, 0), (-1, -1), 15),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+        ]))
 
-        elements.append(Paragraph(
-            "Problemi Critici - Intervento Urgente",
-            self.styles['SectionHeader']
-        ))
+        return [summary_table, Spacer(1, 15)]
 
-        # Box rosso di avviso
+    def _cached_table_style(self, key: str, build: Callable[[], List]) -> TableStyle:
+        """TableStyle a comandi costanti, costruito una volta per processo"""
+        cache_key = (type(self), f'style_{key}')
+        cached = _FLOWABLE_CACHE.get(cache_key)
+        if cached is None:
+            cached = _FLOWABLE_CACHE[cache_key] = [TableStyle(build())]
+        return cached[0]
+
+    # Raggruppamento condiviso con gli altri formati di report
+    _group_by_port = staticmethod(report_text.group_by_port)
+    _hosts_label = staticmethod(report_text.hosts_label)
+
+    def _create_host_table(self, items: List, header_color) -> List:
+        """
+        Tabella compatta degli host di un gruppo.
+        Oltre MAX_HOSTS_LISTED host l'elenco viene troncato con una nota;
+        senza hostname né versioni gli IP sono disposti su più colonne.
+        """
+        elements = []
+        shown = items[:self.MAX_HOSTS_LISTED]
+        detailed = any(item['hostname'] or item['version'] for item in shown)
+
+        if detailed:
+            data = [["Host", "Hostname", "Versione"]]
+            data.extend(
+                [item['host'], item['hostname'] or "-", item['version'] or "-"]
+                for item in shown
+            )
+            col_widths = [4*cm, 5.5*cm, 5.5*cm]
+        else:
+            columns = self.HOST_GRID_COLUMNS
+            ips = [item['host'] for item in shown]
+            data = [["Host"] + [""] * (columns - 1)]
+            data.extend(
+                ips[i:i + columns] + [""] * (columns - len(ips[i:i + columns]))
+                for i in range(0, len(ips), columns)
+            )
+            col_widths = [15*cm / columns] * columns
+
+        table = Table(data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (0, 0), (-1, 0), header_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1),
+             [colors.white, self.COLORS['light_gray']]),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ]))
+        elements.append(table)
+
+        omitted = len(items) - len(shown)
+        if omitted > 0:
+            elements.append(Paragraph(
+                f"<i>... e altri {omitted} host con la stessa porta aperta "
+                f"(elenco completo nell'export JSON).</i>",
+                self.styles['BodyText']
+            ))
+
+        elements.append(Spacer(1, 6))
+        return elements
+
+    def _build_critical_intro(self) -> List:
+        """Intestazione costante della sezione critica con box di avviso"""
         warning_text = Paragraph(
-            "<font color='white'><b>ATTENZIONE:</b> I seguenti problemi rappresentano "
-            "un rischio significativo per la sicurezza della vostra rete e dei vostri dati. "
-            "Si consiglia di intervenire il prima possibile.</font>",
-            ParagraphStyle('warning_box', fontSize=10, textColor=colors.white)
+            f"<font color='white'><b>ATTENZIONE:</b> {report_text.CRITICAL_WARNING}</font>",
+            self.styles['WarningBox']
         )
 
         warning_table = Table([[warning_text]], colWidths=[15*cm])
@@ -298,34 +424,53 @@ class ReportGenerator:
             ('RIGHTPADDING', (0, 0), (-1, -1), 12),
         ]))
 
-        elements.append(warning_table)
-        elements.append(Spacer(1, 15))
+        return [
+            PageBreak(),
+            Paragraph("Problemi Critici - Intervento Urgente", self.styles['SectionHeader']),
+            warning_table,
+            Spacer(1, 15),
+        ]
 
-        # Dettaglio ogni problema
-        for item in critical_items:
-            port_info = item['port_info']
+    def _create_critical_section(self, critical_items: List) -> List:
+        """Crea sezione problemi critici"""
+        elements = []
+
+        if not critical_items:
+            return elements
+
+        elements.extend(self._static('critical_intro', self._build_critical_intro))
+
+        # Dettaglio raggruppato per porta: spiegazioni una volta sola.
+        # I testi includono titoli HTTP, banner e soggetti TLS letti dagli
+        # host: sono escapati per il markup dei Paragraph
+        for items in self._group_by_port(critical_items):
+            port_info = items[0]['port_info']
 
             elements.append(Paragraph(
                 f"<font color='#dc3545'>&#9679;</font> "
-                f"<b>Porta {port_info.port} ({port_info.service})</b> "
-                f"su {item['host']}",
+                f"<b>Porta {port_info.port} ({escape(port_info.service)})</b> "
+                f"{self._hosts_label(items)}",
                 self.styles['Critical']
             ))
 
             elements.append(Paragraph(
-                f"<b>Cos'è:</b> {port_info.description}",
+                f"<b>Cos'è:</b> {escape(port_info.description)}",
                 self.styles['BodyText']
             ))
 
             elements.append(Paragraph(
-                f"<b>Perché è pericoloso:</b> {port_info.risk_explanation}",
+                f"<b>Perché è pericoloso:</b> {escape(port_info.risk_explanation)}",
                 self.styles['BodyText']
             ))
 
-            elements.append(Paragraph(
-                f"<b>Cosa fare:</b> {port_info.recommendation}",
-                self.styles['BodyText']
-            ))
+            if self.settings.detailed_recommendations:
+                elements.append(Paragraph(
+                    f"<b>Cosa fare:</b> {escape(port_info.recommendation)}",
+                    self.styles['BodyText']
+                ))
+
+            if len(items) > 1:
+                elements.extend(self._create_host_table(items, self.COLORS['critical']))
 
             elements.append(HRFlowable(
                 width="100%", thickness=0.5,
@@ -341,33 +486,32 @@ class ReportGenerator:
         if not warning_items:
             return elements
 
-        elements.append(Paragraph(
-            "Punti di Attenzione",
-            self.styles['SectionHeader']
-        ))
-
-        elements.append(Paragraph(
-            "Queste porte non sono necessariamente pericolose, ma richiedono "
-            "verifica della configurazione per garantire la sicurezza.",
-            self.styles['BodyText']
-        ))
-
-        elements.append(Spacer(1, 10))
+        elements.extend(self._static('warning_intro', lambda: [
+            Paragraph(
+                "Punti di Attenzione",
+                self.styles['SectionHeader']
+            ),
+            Paragraph(report_text.WARNING_INTRO, self.styles['BodyText']),
+            Spacer(1, 10),
+        ]))
 
-        for item in warning_items:
-            port_info = item['port_info']
+        for items in self._group_by_port(warning_items):
+            port_info = items[0]['port_info']
 
             elements.append(Paragraph(
                 f"<font color='#ffc107'>&#9679;</font> "
-                f"<b>Porta {port_info.port} ({port_info.service})</b> "
-                f"su {item['host']}",
+                f"<b>Porta {port_info.port} ({escape(port_info.service)})</b> "
+                f"{self._hosts_label(items)}",
                 self.styles['Warning']
             ))
 
-            elements.append(Paragraph(
-                f"{port_info.description}. {port_info.recommendation}",
-                self.styles['BodyText']
-            ))
+            text = escape(port_info.description)
+            if self.settings.detailed_recommendations:
+                text = f"{text}. {escape(port_info.recommendation)}"
+            elements.append(Paragraph(text, self.styles['BodyText']))
+
+            if len(items) > 1:
+                elements.extend(self._create_host_table(items, self.COLORS['warning']))
 
             elements.append(Spacer(1, 5))
 
@@ -380,39 +524,39 @@ class ReportGenerator:
         if not ok_items:
             return elements
 
-        elements.append(Paragraph(
-            "Configurazioni Corrette",
-            self.styles['SectionHeader']
-        ))
-
-        elements.append(Paragraph(
-            "Le seguenti porte sono aperte ma generalmente sicure se "
-            "i servizi sono aggiornati.",
-            self.styles['BodyText']
-        ))
-
-        elements.append(Spacer(1, 10))
+        elements.extend(self._static('ok_intro', lambda: [
+            Paragraph(
+                "Configurazioni Corrette",
+                self.styles['SectionHeader']
+            ),
+            Paragraph(report_text.OK_INTRO, self.styles['BodyText']),
+            Spacer(1, 10),
+        ]))
 
-        # Tabella compatta per le porte OK
-        ok_data = [["Host", "Porta", "Servizio", "Note"]]
+        # Tabella compatta per le porte OK: una riga per porta
+        ok_data = [["Porta", "Servizio", "Host", "Note"]]
 
-        for item in ok_items:
-            port_info = item['port_info']
+        for items in self._group_by_port(ok_items):
+            port_info = items[0]['port_info']
+            hosts = ", ".join(item['host'] for item in items[:self.OK_HOSTS_INLINE])
+            if len(items) > self.OK_HOSTS_INLINE:
+                hosts += f" e altri {len(items) - self.OK_HOSTS_INLINE}"
             ok_data.append([
-                item['host'],
                 str(port_info.port),
                 port_info.service,
+                Paragraph(hosts, self.styles['TableCell']),
                 "Mantenere aggiornato"
             ])
 
         if len(ok_data) > 1:
-            ok_table = Table(ok_data, colWidths=[4*cm, 2*cm, 4*cm, 5*cm])
+            ok_table = Table(ok_data, colWidths=[2*cm, 3.5*cm, 6*cm, 3.5*cm], repeatRows=1)
             ok_table.setStyle(TableStyle([
                 ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
                 ('FONTSIZE', (0, 0), (-1, -1), 9),
                 ('BACKGROUND', (0, 0), (-1, 0), self.COLORS['ok']),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
                 ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
                 ('GRID', (0, 0), (-1, -1), 0.5, self.COLORS['light_gray']),
                 ('ROWBACKGROUNDS', (0, 1), (-1, -1),
                  [colors.white, self.COLORS['light_gray']]),
@@ -432,37 +576,17 @@ class ReportGenerator:
             self.styles['SectionHeader']
         ))
 
-        recommendations = []
-
-        if classified['summary']['critical_count'] > 0:
-            recommendations.extend([
-                "1. <b>URGENTE:</b> Affrontare immediatamente i problemi critici elencati sopra",
-                "2. Contattare il vostro tecnico IT o un consulente di sicurezza",
-                "3. Verificare i backup dei dati siano aggiornati e funzionanti",
-                "4. Considerare un audit di sicurezza completo",
-            ])
-        elif classified['summary']['warning_count'] > 0:
-            recommendations.extend([
-                "1. Verificare la configurazione dei servizi segnalati in giallo",
-                "2. Aggiornare tutti i sistemi alle ultime versioni",
-                "3. Rivedere le regole del firewall",
-                "4. Pianificare scansioni periodiche (mensili)",
-            ])
-        else:
-            recommendations.extend([
-                "1. Continuare a mantenere i sistemi aggiornati",
-                "2. Eseguire scansioni periodiche (trimestrali)",
-                "3. Formare il personale sulla sicurezza informatica",
-                "4. Verificare periodicamente i backup",
-            ])
-
-        for rec in recommendations:
+        for rec in report_text.recommendations(classified['summary']):
             elements.append(Paragraph(rec, self.styles['BodyText']))
 
         return elements
 
     def _create_footer(self) -> List:
-        """Crea footer del report"""
+        """Crea footer del report (contenuto costante, costruito una volta)"""
+        return self._static('footer', self._build_footer)
+
+    def _build_footer(self) -> List:
+        """Costruisce i flowable del footer"""
         elements = []
 
         elements.append(Spacer(1, 30))
@@ -487,11 +611,8 @@ class ReportGenerator:
         elements.append(Spacer(1, 10))
 
         elements.append(Paragraph(
-            "<i>Nota: Questo report fornisce una valutazione di base della sicurezza di rete. "
-            "Non sostituisce un audit di sicurezza professionale completo. "
-            "Per una valutazione approfondita, contattare un professionista della sicurezza informatica.</i>",
-            ParagraphStyle('disclaimer', fontSize=7, textColor=self.COLORS['dark_gray'],
-                          alignment=TA_CENTER)
+            f"<i>{report_text.DISCLAIMER}</i>",
+            self.styles['Disclaimer']
         ))
 
         return elements
@@ -500,7 +621,8 @@ class ReportGenerator:
         self,
         scan_result,
         output_path: str,
-        title: str = "Report Sicurezza Rete"
+        title: Optional[str] = None,
+        classified: Optional[Dict] = None
     ) -> str:
         """
         Genera il report PDF completo
@@ -508,13 +630,15 @@ class ReportGenerator:
         Args:
             scan_result: Risultato della scansione (ScanResult)
             output_path: Percorso file PDF output
-            title: Titolo personalizzato (opzionale)
+            title: Titolo del documento (default: quello delle impostazioni)
+            classified: Risultati già classificati (default: scan_result.classify())
 
         Returns:
             Percorso del file generato
         """
         # Classifica risultati
-        classified = self.classifier.classify_scan_results(scan_result.hosts)
+        if classified is None:
+            classified = scan_result.classify(self.classifier)
 
         # Crea documento
         doc = SimpleDocTemplate(
@@ -523,7 +647,8 @@ class ReportGenerator:
             rightMargin=2*cm,
             leftMargin=2*cm,
             topMargin=2*cm,
-            bottomMargin=2*cm
+            bottomMargin=2*cm,
+            title=title or self.settings.title
         )
 
         # Costruisci contenuto
@@ -532,7 +657,8 @@ class ReportGenerator:
         # Header
         elements.extend(self._create_header(
             scan_result.target,
-            scan_result.start_time
+            scan_result.start_time,
+            report_text.incomplete_notice(scan_result)
         ))
 
         # Riepilogo esecutivo
@@ -559,6 +685,156 @@ class ReportGenerator:
 
         return output_path
 
+    def _create_trend_chart(self, points: List) -> Drawing:
+        """Grafico a linee: rischio medio e problemi critici per periodo"""
+        drawing = Drawing(15*cm, 6*cm)
+        chart = HorizontalLineChart()
+        chart.x = 1*cm
+        chart.y = 1*cm
+        chart.width = 13.5*cm
+        chart.height = 4.5*cm
+        chart.data = [
+            [p.risk_score for p in points],
+            [p.critical_count for p in points],
+        ]
+        # Con molti periodi solo un'etichetta ogni `step` resta leggibile
+        step = max(1, len(points) // 12)
+        chart.categoryAxis.categoryNames = [
+            p.period if i % step == 0 else "" for i, p in enumerate(points)
+        ]
+        chart.categoryAxis.labels.fontSize = 7
+        chart.categoryAxis.labels.angle = 45 if len(points) > 6 else 0
+        chart.categoryAxis.labels.boxAnchor = 'ne' if len(points) > 6 else 'n'
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 7
+        chart.lines[0].strokeColor = self.COLORS['primary']
+        chart.lines[0].strokeWidth = 2
+        chart.lines[1].strokeColor = self.COLORS['critical']
+        chart.lines[1].strokeWidth = 1.5
+        drawing.add(chart)
+        drawing.add(String(1*cm, 5.7*cm, "Rischio medio (0-100)", fontSize=8,
+                           fillColor=self.COLORS['primary']))
+        drawing.add(String(5.5*cm, 5.7*cm, "Problemi critici", fontSize=8,
+                           fillColor=self.COLORS['critical']))
+        return drawing
+
+    def generate_trend(
+        self,
+        target: str,
+        points: List,
+        output_path: str,
+        title: str = "Andamento Sicurezza Rete"
+    ) -> str:
+        """
+        Genera il report di andamento da aggregati storici
+
+        Args:
+            target: Target della serie storica
+            points: TrendPoint in ordine cronologico (HistoryStore.trend)
+            output_path: Percorso file PDF output
+            title: Titolo personalizzato (opzionale)
+
+        Returns:
+            Percorso del file generato
+        """
+        doc = SimpleDocTemplate(
+            output_path,
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=2*cm,
+            bottomMargin=2*cm
+        )
+
+        elements = [
+            Paragraph("CYBERSENTINEL", self.styles['MainTitle']),
+            Paragraph(title, self.styles['SubTitle']),
+        ]
+
+        period = f"{points[0].period} - {points[-1].period}" if points else "-"
+        info_table = Table([
+            ["Target:", target],
+            ["Periodo:", period],
+            ["Generato il:", datetime.now().strftime("%d/%m/%Y alle %H:%M")],
+        ], colWidths=[5*cm, 10*cm])
+        info_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]))
+        elements.extend([info_table, Spacer(1, 20)])
+
+        elements.append(Paragraph("Riepilogo del Periodo", self.styles['SectionHeader']))
+
+        if not points:
+            elements.append(Paragraph(
+                "Nessuna scansione archiviata nel periodo richiesto.",
+                self.styles['BodyText']
+            ))
+        else:
+            remediated = sum(p.remediated for p in points)
+            mttr = (
+                sum(p.mttr_hours * p.remediated for p in points if p.mttr_hours is not None) / remediated
+                if remediated else None
+            )
+            first, last = points[0], points[-1]
+            summary_table = Table([
+                ["Scansioni", "Rischio", "Critici oggi", "Nuovi servizi", "Risolti", "Tempo medio"],
+                [
+                    str(sum(p.scans for p in points)),
+                    f"{first.risk_score:.0f} -> {last.risk_score:.0f}",
+                    str(last.critical_count),
+                    str(sum(p.new_services for p in points)),
+                    str(remediated),
+                    f"{mttr / 24:.1f} gg" if mttr is not None else "-",
+                ],
+            ], colWidths=[2.5*cm]*6)
+            summary_table.setStyle(self._cached_table_style('trend_summary', lambda: [
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 8),
+                ('FONTSIZE', (0, 1), (-1, 1), 12),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('BACKGROUND', (0, 0), (-1, 0), self.COLORS['primary']),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('TOPPADDING', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ]))
+            elements.extend([summary_table, Spacer(1, 15)])
+
+            elements.append(self._create_trend_chart(points))
+            elements.append(Spacer(1, 15))
+
+            elements.append(Paragraph("Dettaglio per Periodo", self.styles['SectionHeader']))
+            data = [["Periodo", "Scans.", "Rischio", "Critici", "Attenz.",
+                     "Nuovi", "Risolti", "MTTR (h)"]]
+            data.extend(
+                [
+                    p.period, str(p.scans), f"{p.risk_score:.0f}", str(p.critical_count),
+                    str(p.warning_count), str(p.new_services), str(p.remediated),
+                    f"{p.mttr_hours:.1f}" if p.mttr_hours is not None else "-",
+                ]
+                for p in points
+            )
+            table = Table(data, colWidths=[2.6*cm] + [1.8*cm] * 7, repeatRows=1)
+            table.setStyle(self._cached_table_style('trend_detail', lambda: [
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+                ('BACKGROUND', (0, 0), (-1, 0), self.COLORS['primary']),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1),
+                 [colors.white, self.COLORS['light_gray']]),
+                ('TOPPADDING', (0, 0), (-1, -1), 3),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+            ]))
+            elements.append(table)
+
+        elements.extend(self._create_footer())
+        doc.build(elements)
+
+        return output_path
+
 
 def main():
     """Test del generatore report"""
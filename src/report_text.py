@@ -0,0 +1,165 @@
+"""
+Testi dei Report - CyberSentinel
+Contenuti e regole comuni a tutti i formati di report (PDF, HTML)
+
+Nessuna dipendenza esterna: importabile senza reportlab.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+from typing import Dict, List, Optional
+
+# Livello complessivo -> (titolo, descrizione)
+RISK_BOXES = {
+    'critical': (
+        "RISCHIO ALTO",
+        "Sono state trovate vulnerabilità critiche che richiedono intervento immediato."
+    ),
+    'warning': (
+        "RISCHIO MEDIO",
+        "Sono presenti alcune configurazioni che richiedono attenzione."
+    ),
+    'ok': (
+        "RISCHIO BASSO",
+        "La rete appare ben configurata, con poche aree di miglioramento."
+    ),
+}
+
+EXPLANATION_TITLE = "Cosa significa questo report?"
+EXPLANATION = (
+    "Abbiamo scansionato la vostra rete per verificare quali 'porte' sono aperte e accessibili. "
+    "Le porte sono come le porte di un edificio: alcune devono essere aperte per lavorare "
+    "(come la porta d'ingresso), ma altre dovrebbero restare chiuse per sicurezza "
+    "(come la porta del caveau). Questo report vi mostra quali porte sono aperte e se "
+    "rappresentano un rischio per la vostra azienda."
+)
+
+CRITICAL_WARNING = (
+    "I seguenti problemi rappresentano un rischio significativo per la sicurezza "
+    "della vostra rete e dei vostri dati. Si consiglia di intervenire il prima possibile."
+)
+
+WARNING_INTRO = (
+    "Queste porte non sono necessariamente pericolose, ma richiedono "
+    "verifica della configurazione per garantire la sicurezza."
+)
+
+OK_INTRO = (
+    "Le seguenti porte sono aperte ma generalmente sicure se "
+    "i servizi sono aggiornati."
+)
+
+DISCLAIMER = (
+    "Nota: Questo report fornisce una valutazione di base della sicurezza di rete. "
+    "Non sostituisce un audit di sicurezza professionale completo. "
+    "Per una valutazione approfondita, contattare un professionista della sicurezza informatica."
+)
+
+# Scansione incompleta: motivo (ScanResult.coverage["reason"]) -> testo
+INCOMPLETE_REASONS = {
+    'deadline': "raggiunta la scadenza prevista",
+    'interrupted': "interrotta dall'operatore",
+}
+
+# Prossimi passi per livello complessivo (markup minimo: solo <b>)
+RECOMMENDATIONS = {
+    'critical': [
+        "1. <b>URGENTE:</b> Affrontare immediatamente i problemi critici elencati sopra",
+        "2. Contattare il vostro tecnico IT o un consulente di sicurezza",
+        "3. Verificare i backup dei dati siano aggiornati e funzionanti",
+        "4. Considerare un audit di sicurezza completo",
+    ],
+    'warning': [
+        "1. Verificare la configurazione dei servizi segnalati in giallo",
+        "2. Aggiornare tutti i sistemi alle ultime versioni",
+        "3. Rivedere le regole del firewall",
+        "4. Pianificare scansioni periodiche (mensili)",
+    ],
+    'ok': [
+        "1. Continuare a mantenere i sistemi aggiornati",
+        "2. Eseguire scansioni periodiche (trimestrali)",
+        "3. Formare il personale sulla sicurezza informatica",
+        "4. Verificare periodicamente i backup",
+    ],
+}
+
+
+def overall_level(summary: Dict) -> str:
+    """
+    Livello del box di rischio complessivo
+
+    Args:
+        summary: Sezione 'summary' dei risultati classificati
+
+    Returns:
+        'critical', 'warning' oppure 'ok'
+    """
+    if summary['critical_count'] > 0:
+        return 'critical'
+    if summary['risk_score'] >= 40:
+        return 'warning'
+    return 'ok'
+
+
+def incomplete_notice(scan_result) -> Optional[str]:
+    """
+    Avviso per una scansione interrotta, con la copertura raggiunta
+
+    Args:
+        scan_result: Risultato della scansione (ScanResult)
+
+    Returns:
+        Testo dell'avviso oppure None se la scansione è completa
+    """
+    if scan_result.complete:
+        return None
+    coverage = scan_result.coverage
+    reason = INCOMPLETE_REASONS.get(coverage.get('reason'), "interrotta")
+    parts = [f"Scansione incompleta ({reason})."]
+    for label, done, total in (("Host verificati", 'hosts_scanned', 'hosts_total'),
+                               ("Porte verificate", 'ports_probed', 'ports_total')):
+        if coverage.get(total):
+            ratio = coverage.get(done, 0) / coverage[total]
+            parts.append(f"{label}: {coverage.get(done, 0)} su {coverage[total]} ({ratio:.0%}).")
+    if coverage.get('ports_not_inspected'):
+        parts.append(f"Servizi non analizzati: {coverage['ports_not_inspected']}.")
+    parts.append("Host e porte non verificati potrebbero esporre servizi non riportati qui.")
+    return " ".join(parts)
+
+
+def recommendations(summary: Dict) -> List[str]:
+    """Prossimi passi consigliati in base ai conteggi"""
+    if summary['critical_count'] > 0:
+        return RECOMMENDATIONS['critical']
+    if summary['warning_count'] > 0:
+        return RECOMMENDATIONS['warning']
+    return RECOMMENDATIONS['ok']
+
+
+def group_by_port(items: List) -> List[List]:
+    """
+    Raggruppa i risultati per porta e testo, dal gruppo più numeroso
+
+    I testi di port_info includono riepiloghi e problemi trovati dalle fasi
+    di ispezione: host con la stessa porta ma esiti diversi finiscono in
+    gruppi separati, così ogni problema resta associato ai suoi host.
+
+    Args:
+        items: Voci classificate (host, port_info, ...)
+
+    Returns:
+        Lista di gruppi, ognuno con le voci della stessa porta e degli stessi testi
+    """
+    groups: Dict[tuple, List] = {}
+    for item in items:
+        info = item['port_info']
+        key = (info.port, info.description, info.risk_explanation, info.recommendation)
+        groups.setdefault(key, []).append(item)
+    return sorted(groups.values(), key=lambda g: (-len(g), g[0]['port_info'].port))
+
+
+def hosts_label(items: List) -> str:
+    """Testo "su <host>" oppure "su N host" per il titolo di un gruppo"""
+    if len(items) == 1:
+        return f"su {items[0]['host']}"
+    return f"su {len(items)} host"
@@ -0,0 +1,65 @@
+"""
+Backend dei Report - CyberSentinel
+Selezione del formato e import pigro del generatore
+
+Il backend PDF importa reportlab (lento all'avvio): viene caricato solo
+quando un report PDF deve essere davvero generato.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+from importlib import import_module
+from typing import Optional
+
+# Formato -> (modulo, classe del generatore)
+REPORT_BACKENDS = {
+    "pdf": (".report_generator", "ReportGenerator"),
+    "html": (".html_report", "HtmlReportGenerator"),
+}
+
+# Estensioni riconosciute per dedurre il formato dal file di output
+_EXTENSIONS = {
+    ".pdf": "pdf",
+    ".html": "html",
+    ".htm": "html",
+}
+
+
+def report_format_for(output_path: str, report_format: Optional[str] = None) -> str:
+    """
+    Formato del report: quello indicato, altrimenti dedotto dall'estensione
+
+    Args:
+        output_path: File di output
+        report_format: Formato esplicito (opzionale)
+
+    Returns:
+        Chiave di REPORT_BACKENDS (default: pdf)
+    """
+    if report_format:
+        if report_format not in REPORT_BACKENDS:
+            raise ValueError(f"Formato report non supportato: {report_format}")
+        return report_format
+    for extension, fmt in _EXTENSIONS.items():
+        if output_path.lower().endswith(extension):
+            return fmt
+    return "pdf"
+
+
+def create_report_generator(report_format: str = "pdf", settings=None):
+    """
+    Importa il backend richiesto e crea il generatore
+
+    Args:
+        report_format: Chiave di REPORT_BACKENDS
+        settings: config.ReportSettings (opzionale)
+
+    Returns:
+        Istanza con metodo generate(scan_result, output_path)
+
+    Raises:
+        ImportError: Dipendenza del backend non installata (es. reportlab)
+    """
+    module_name, class_name = REPORT_BACKENDS[report_format_for("", report_format)]
+    module = import_module(module_name, __package__)
+    return getattr(module, class_name)(settings)
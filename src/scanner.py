@@ -3,15 +3,57 @@ Scanner Engine - Modulo principale per la scansione delle porte
 Sviluppato da ISIPC - Truant Bruno | https://isipc.com
 """
 
+import errno
+import logging
 import socket
 import subprocess
 import sys
-from typing import Dict, List, Optional, Union
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 import ipaddress
 import json
 
+from .classifier import PortClassifier
+from .ports import PortSet
+from . import targets
+
+logger = logging.getLogger(__name__)
+
+# Codice di errore di connect_ex -> stato della porta
+#   closed:      RST ricevuto, l'host risponde
+#   filtered:    nessuna risposta entro il timeout o blocco del firewall locale
+#   unreachable: ICMP host/rete irraggiungibile, inutile provare altre porte
+_ERRNO_STATES: Dict[int, str] = {}
+for _name, _state in (
+    ("ECONNREFUSED", "closed"), ("WSAECONNREFUSED", "closed"),
+    ("ETIMEDOUT", "filtered"), ("WSAETIMEDOUT", "filtered"),
+    ("EAGAIN", "filtered"), ("EWOULDBLOCK", "filtered"), ("WSAEWOULDBLOCK", "filtered"),
+    ("EINPROGRESS", "filtered"), ("EACCES", "filtered"), ("EPERM", "filtered"),
+    ("EHOSTUNREACH", "unreachable"), ("WSAEHOSTUNREACH", "unreachable"),
+    ("ENETUNREACH", "unreachable"), ("WSAENETUNREACH", "unreachable"),
+    ("EHOSTDOWN", "unreachable"), ("WSAEHOSTDOWN", "unreachable"),
+    ("ENETDOWN", "unreachable"), ("WSAENETDOWN", "unreachable"),
+):
+    if hasattr(errno, _name):
+        _ERRNO_STATES.setdefault(getattr(errno, _name), _state)
+
+
+def port_state_from_errno(code: int) -> str:
+    """
+    Stato di una porta dal codice restituito da connect_ex
+
+    Args:
+        code: 0 oppure errno della connessione
+
+    Returns:
+        open, closed, filtered, unreachable oppure error
+    """
+    if code == 0:
+        return "open"
+    return _ERRNO_STATES.get(code, "error")
+
 
 @dataclass
 class PortResult:
@@ -21,6 +63,7 @@ class PortResult:
     service: str = ""
     version: str = ""
     protocol: str = "tcp"
+    details: Dict = field(default_factory=dict)  # Esiti delle fasi di ispezione (tls, ...)
 
 
 @dataclass
@@ -28,9 +71,59 @@ class HostResult:
     """Risultato scansione singolo host"""
     ip: str
     hostname: str = ""
-    state: str = "unknown"  # up, down
+    state: str = "unknown"  # up, down, unreachable
     ports: List[PortResult] = field(default_factory=list)
     scan_time: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)  # secondi per fase
+    closed_count: int = 0    # Porte che hanno risposto con RST
+    filtered_count: int = 0  # Porte senza risposta
+
+    def to_dict(self) -> Dict:
+        """Converte in dizionario per serializzazione JSON"""
+        return {
+            "ip": self.ip,
+            "hostname": self.hostname,
+            "state": self.state,
+            "scan_time": self.scan_time,
+            "timings": self.timings,
+            "closed_count": self.closed_count,
+            "filtered_count": self.filtered_count,
+            "ports": [
+                {
+                    "port": p.port,
+                    "state": p.state,
+                    "service": p.service,
+                    "version": p.version,
+                    "protocol": p.protocol,
+                    "details": p.details
+                }
+                for p in self.ports
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HostResult":
+        """Ricostruisce un HostResult da dizionario (inverso di to_dict)"""
+        return cls(
+            ip=data["ip"],
+            hostname=data.get("hostname", ""),
+            state=data.get("state", "unknown"),
+            scan_time=data.get("scan_time", 0.0),
+            timings=data.get("timings", {}),
+            closed_count=data.get("closed_count", 0),
+            filtered_count=data.get("filtered_count", 0),
+            ports=[
+                PortResult(
+                    port=p["port"],
+                    state=p["state"],
+                    service=p.get("service", ""),
+                    version=p.get("version", ""),
+                    protocol=p.get("protocol", "tcp"),
+                    details=p.get("details", {})
+                )
+                for p in data.get("ports", [])
+            ]
+        )
 
 
 @dataclass
@@ -41,6 +134,64 @@ class ScanResult:
     end_time: Optional[datetime] = None
     hosts: List[HostResult] = field(default_factory=list)
     scanner_version: str = "1.0.0"
+    complete: bool = True  # False se interrotta (scadenza o annullamento)
+    # Host e porte verificati (hosts_total, hosts_scanned, ports_total, ports_probed)
+    # e, se incompleta, il motivo (reason)
+    coverage: Dict = field(default_factory=dict)
+
+    # Classificazione memorizzata (vedi classify)
+    _classified: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    _classified_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _classified_hosts: Optional[List[HostResult]] = field(default=None, init=False, repr=False, compare=False)
+
+    def classify(self, classifier=None) -> Dict:
+        """
+        Classifica gli host per rischio, una sola volta per risultato.
+        Console, report e servizi ricevono lo stesso dizionario.
+
+        La cache si invalida se la lista degli host viene sostituita o se
+        cambia il numero di host o di porte; dopo modifiche in place delle
+        porte esistenti chiamare invalidate_classification().
+
+        Args:
+            classifier: PortClassifier da usare (default: PortClassifier())
+
+        Returns:
+            Dizionario di PortClassifier.classify_scan_results
+        """
+        classifier = classifier or PortClassifier()
+        key = (type(classifier), getattr(classifier, "settings", None),
+               len(self.hosts), sum(len(h.ports) for h in self.hosts))
+        if (self._classified is None or self._classified_hosts is not self.hosts
+                or self._classified_key != key):
+            self._classified = classifier.classify_scan_results(self.hosts)
+            self._classified_key = key
+            self._classified_hosts = self.hosts
+        return self._classified
+
+    def invalidate_classification(self) -> None:
+        """Scarta la classificazione memorizzata"""
+        self._classified = None
+
+    def mark_incomplete(self, reason: str) -> None:
+        """
+        Segna il risultato come parziale (resta il primo motivo)
+
+        Args:
+            reason: Motivo (cancel.DEADLINE, cancel.INTERRUPTED, ...)
+        """
+        self.complete = False
+        self.coverage = {**self.coverage, "reason": self.coverage.get("reason", reason)}
+
+    def extend(self, other: "ScanResult") -> None:
+        """Aggiunge host e copertura della scansione di un altro target"""
+        self.hosts = merge_hosts(self.hosts, other.hosts)
+        self.end_time = other.end_time
+        for key, value in other.coverage.items():
+            if key != "reason":
+                self.coverage[key] = self.coverage.get(key, 0) + value
+        if not other.complete:
+            self.mark_incomplete(other.coverage.get("reason", ""))
 
     def to_dict(self) -> Dict:
         """Converte in dizionario per serializzazione JSON"""
@@ -49,25 +200,9 @@ class ScanResult:
             "start_time": self.start_time.isoformat(),
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "scanner_version": self.scanner_version,
-            "hosts": [
-                {
-                    "ip": h.ip,
-                    "hostname": h.hostname,
-                    "state": h.state,
-                    "scan_time": h.scan_time,
-                    "ports": [
-                        {
-                            "port": p.port,
-                            "state": p.state,
-                            "service": p.service,
-                            "version": p.version,
-                            "protocol": p.protocol
-                        }
-                        for p in h.ports
-                    ]
-                }
-                for h in self.hosts
-            ]
+            "complete": self.complete,
+            "coverage": self.coverage,
+            "hosts": [h.to_dict() for h in self.hosts]
         }
 
     def to_json(self, filepath: str) -> None:
@@ -75,6 +210,26 @@ class ScanResult:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScanResult":
+        """Ricostruisce un ScanResult da dizionario (inverso di to_dict)"""
+        end_time = data.get("end_time")
+        return cls(
+            target=data["target"],
+            start_time=datetime.fromisoformat(data["start_time"]),
+            end_time=datetime.fromisoformat(end_time) if end_time else None,
+            hosts=[HostResult.from_dict(h) for h in data.get("hosts", [])],
+            scanner_version=data.get("scanner_version", "1.0.0"),
+            complete=data.get("complete", True),
+            coverage=data.get("coverage", {})
+        )
+
+    @classmethod
+    def from_json(cls, filepath: str) -> "ScanResult":
+        """Carica risultati salvati in formato JSON"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
 
 class PortScanner:
     """
@@ -106,6 +261,12 @@ class PortScanner:
         8080,  # HTTP-Alt
     ]
 
+    # Da quante porte per host si usano connessioni in parallelo (ConnectSweep)
+    SWEEP_MIN_PORTS = 64
+
+    # Esito della verifica di nmap (None = non ancora verificato)
+    _nmap_checked: Optional[bool] = None
+
     # Servizi noti per porta
     PORT_SERVICES = {
         21: "FTP",
@@ -134,33 +295,68 @@ class PortScanner:
         self,
         ports: Optional[List[int]] = None,
         timeout: float = 2.0,
-        use_nmap: bool = True
+        use_nmap: bool = True,
+        telemetry=None,
+        hitlist: Optional[List[str]] = None,
+        udp_ports: Optional[List[int]] = None,
+        concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None
     ):
         """
         Inizializza lo scanner
 
         Args:
-            ports: Lista porte da scansionare (default: porte PMI)
+            ports: Porte da scansionare, lista o PortSet (default: porte PMI)
             timeout: Timeout connessione in secondi
             use_nmap: Usa nmap se disponibile (più accurato)
+            telemetry: ScanTelemetry per metriche di avanzamento (opzionale)
+            hitlist: Indirizzi noti per le reti IPv6 troppo grandi da enumerare
+            udp_ports: Porte UDP da scansionare dopo le TCP (default: nessuna)
+            concurrency: Connessioni in volo per host nello sweep parallelo
+                (default: sweep.default_concurrency())
+            rate_limit: Nuove connessioni TCP al secondo (default: nessun limite)
         """
-        self.ports = ports or self.DEFAULT_PORTS
+        self.ports = list(ports) if ports else self.DEFAULT_PORTS
         self.timeout = timeout
+        self.telemetry = telemetry
+        self.hitlist = hitlist or []
+        self.udp_ports = udp_ports or []
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self._limiter = None
+        if rate_limit:
+            from .sweep import RateLimiter
+            self._limiter = RateLimiter(rate_limit)
         self.use_nmap = use_nmap and self._check_nmap()
-        self._nmap_available = self._check_nmap()
 
-    def _check_nmap(self) -> bool:
-        """Verifica se nmap è installato"""
-        try:
-            result = subprocess.run(
-                ["nmap", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return False
+    @property
+    def _nmap_available(self) -> bool:
+        return self._check_nmap()
+
+    @classmethod
+    def _check_nmap(cls) -> bool:
+        """
+        Verifica se nmap è installato.
+        L'esito è memorizzato per processo: nmap viene avviato al massimo
+        una volta, e mai se non è nel PATH.
+        """
+        if cls._nmap_checked is None:
+            import shutil
+
+            available = False
+            if shutil.which("nmap"):
+                try:
+                    result = subprocess.run(
+                        ["nmap", "--version"],
+                        capture_output=True,
+                        text=True,
+                        timeout=5
+                    )
+                    available = result.returncode == 0
+                except (subprocess.SubprocessError, OSError):
+                    pass
+            PortScanner._nmap_checked = available
+        return cls._nmap_checked
 
     @staticmethod
     def get_local_network() -> str:
@@ -203,28 +399,23 @@ class PortScanner:
         except ValueError:
             pass
 
-        # Prova come IP singolo
+        # Prova come IP singolo (anche link-local con %zona)
         try:
-            ipaddress.ip_address(target)
+            targets.normalize_address(target)
             return True
         except ValueError:
             pass
 
-        # Prova come hostname
-        try:
-            socket.gethostbyname(target)
-            return True
-        except socket.gaierror:
-            pass
+        # Prova come hostname (IPv4 o IPv6)
+        return bool(targets.resolve(target))
 
-        return False
-
-    def _get_hosts_from_target(self, target: str) -> List[str]:
+    def _get_hosts_from_target(self, target: str, cancel=None) -> List[str]:
         """
         Estrae lista IP dal target
 
         Args:
             target: IP, CIDR o hostname
+            cancel: CancelToken che interrompe la risoluzione DNS dell'hostname
 
         Returns:
             Lista di IP da scansionare
@@ -232,138 +423,253 @@ class PortScanner:
         # Prova come rete CIDR
         try:
             network = ipaddress.ip_network(target, strict=False)
-            # Limita a 1024 host per sicurezza
-            hosts = list(network.hosts())
-            if len(hosts) > 1024:
-                print(f"[!] Attenzione: range troppo grande ({len(hosts)} host), limitato a 1024")
-                hosts = hosts[:1024]
-            return [str(ip) for ip in hosts]
         except ValueError:
-            pass
+            network = None
+
+        if network is not None:
+            hosts = targets.hosts_for_network(network, targets.MAX_HOSTS, self.hitlist)
+            if network.version == 4 and network.num_addresses - 2 > targets.MAX_HOSTS:
+                logger.warning("Range troppo grande (%d host), limitato a %d",
+                               network.num_addresses - 2, targets.MAX_HOSTS)
+            elif network.num_addresses > targets.MAX_HOSTS:
+                logger.info("Rete IPv6 %s: %d indirizzi candidati "
+                            "(hitlist, neighbour cache, schemi comuni)", network, len(hosts))
+            return hosts
 
         # Prova come IP singolo
         try:
-            ip = ipaddress.ip_address(target)
-            return [str(ip)]
+            return [targets.normalize_address(target)]
         except ValueError:
             pass
 
-        # Prova come hostname
-        try:
-            ip = socket.gethostbyname(target)
-            return [ip]
-        except socket.gaierror:
-            return []
+        # Prova come hostname: tutti gli indirizzi IPv4 e IPv6
+        if cancel:
+            return cancel.call(targets.resolve, target, default=[])
+        return targets.resolve(target)
 
-    def _scan_port_socket(self, ip: str, port: int) -> PortResult:
+    def _scan_port_socket(self, ip: str, port: int, cancel=None) -> PortResult:
         """
         Scansiona singola porta con socket Python
 
         Args:
             ip: Indirizzo IP
             port: Numero porta
+            cancel: CancelToken che limita il timeout al tempo rimasto
 
         Returns:
             Risultato scansione
         """
+        if self.telemetry:
+            import time
+            self.telemetry.probe_started()
+            start = time.monotonic()
+            result = self._probe_port(ip, port, cancel)
+            self.telemetry.probe_finished(result.state, time.monotonic() - start)
+            return result
+        return self._probe_port(ip, port, cancel)
+
+    def _probe_port(self, ip: str, port: int, cancel=None) -> PortResult:
+        """
+        Connessione TCP verso una porta (usata da _scan_port_socket).
+        Lo stato deriva dal codice di errore (vedi port_state_from_errno);
+        con settimeout, connect_ex segnala il timeout come EAGAIN.
+        """
+        if self._limiter:
+            self._limiter.wait(cancel)
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            result = sock.connect_ex((ip, port))
-            sock.close()
-
-            if result == 0:
-                return PortResult(
-                    port=port,
-                    state="open",
-                    service=self.PORT_SERVICES.get(port, "unknown")
-                )
-            else:
-                return PortResult(port=port, state="closed")
-
+            family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(cancel.timeout(self.timeout) if cancel else self.timeout)
+                state = port_state_from_errno(sock.connect_ex((ip, port)))
         except socket.timeout:
-            return PortResult(port=port, state="filtered")
-        except Exception:
-            return PortResult(port=port, state="error")
+            state = "filtered"
+        except OSError as e:
+            state = port_state_from_errno(e.errno) if e.errno else "error"
+
+        return self._port_result(port, state)
+
+    def _port_result(self, port: int, state: str) -> PortResult:
+        if state == "open":
+            return PortResult(
+                port=port,
+                state="open",
+                service=self.PORT_SERVICES.get(port, "unknown")
+            )
+        return PortResult(port=port, state=state)
+
+    def _probe_ports(self, ip: str, cancel=None) -> Iterator[PortResult]:
+        """Porte provate una alla volta, nell'ordine di self.ports"""
+        for port in self.ports:
+            if cancel and cancel.cancelled:
+                return
+            yield self._scan_port_socket(ip, port, cancel)
+
+    def _sweep_ports(self, ip: str, cancel=None) -> Iterator[PortResult]:
+        """Porte provate in parallelo con ConnectSweep (ordine di completamento)"""
+        from .sweep import ConnectSweep
+
+        # Lo sweep aggiorna la telemetria all'avvio e all'esito di ogni connessione
+        sweep = ConnectSweep(self.timeout, self.concurrency, self._limiter, self.telemetry)
+        with closing(sweep.run(ip, self.ports, cancel)) as outcomes:
+            for port, state, seconds in outcomes:
+                yield self._port_result(port, state)
+
+    def _discover_host(self, ip: str, cancel=None) -> str:
+        """
+        Verifica se l'host risponde su alcune porte comuni
 
-    def _scan_host_socket(self, ip: str, callback=None) -> HostResult:
+        Returns:
+            "up" (porta aperta o rifiutata), "unreachable" (ICMP di errore)
+            oppure "unknown" (nessuna risposta o scansione annullata)
+        """
+        for test_port in (80, 443, 22, 445):
+            if cancel and cancel.cancelled:
+                break
+            state = self._probe_port(ip, test_port, cancel).state
+            if state in ("open", "closed"):
+                return "up"
+            if state == "unreachable":
+                return "unreachable"
+        return "unknown"
+
+    def _scan_host_socket(self, ip: str, callback=None, cancel=None) -> HostResult:
         """
         Scansiona host con socket Python
 
+        Un host che risponde con host/rete irraggiungibile viene abbandonato
+        senza provare le porte restanti, a meno che un'altra porta abbia già
+        risposto (un firewall può rifiutare con ICMP solo alcune porte).
+
         Args:
             ip: Indirizzo IP
             callback: Funzione callback per progress
+            cancel: CancelToken; se annullato restano le porte già verificate
 
         Returns:
             Risultato scansione host
         """
+        return self._scan_host(ip, callback, cancel)[0]
+
+    def _scan_host(self, ip: str, callback=None, cancel=None) -> tuple:
+        """Come _scan_host_socket, più il numero di porte verificate"""
         import time
         start = time.time()
+        stage_start = time.perf_counter()
+        timings = {}
 
-        # Verifica se host è raggiungibile
-        host_up = False
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            # Prova porta comune per verificare se host è up
-            for test_port in [80, 443, 22, 445]:
-                if sock.connect_ex((ip, test_port)) == 0:
-                    host_up = True
-                    break
-            sock.close()
-        except Exception:
-            pass
+        # Verifica se host è raggiungibile (un RST basta a dire che è up)
+        discovery = self._discover_host(ip, cancel)
+        host_up = discovery == "up"
 
         # Se host sembra down, prova comunque le porte
-        if not host_up:
+        if discovery == "unknown" and not (cancel and cancel.cancelled):
             # Tenta ping
             try:
                 if sys.platform == "win32":
                     ping_cmd = ["ping", "-n", "1", "-w", "1000", ip]
+                elif sys.platform == "darwin" and ":" in ip:
+                    ping_cmd = ["ping6", "-c", "1", ip]
                 else:
                     ping_cmd = ["ping", "-c", "1", "-W", "1", ip]
-                result = subprocess.run(ping_cmd, capture_output=True, timeout=3)
+                result = subprocess.run(ping_cmd, capture_output=True,
+                                        timeout=cancel.timeout(3) if cancel else 3)
                 host_up = result.returncode == 0
             except Exception:
                 pass
 
+        now = time.perf_counter()
+        timings["discovery"] = now - stage_start
+        stage_start = now
+
         hostname = ""
-        try:
-            hostname = socket.gethostbyaddr(ip)[0]
-        except Exception:
-            pass
+        if discovery != "unreachable":
+            try:
+                if cancel:
+                    # Il resolver non ha timeout: la risposta si attende solo finché il token è attivo
+                    names = cancel.call(socket.gethostbyaddr, ip)
+                    hostname = names[0] if names else ""
+                else:
+                    hostname = socket.gethostbyaddr(ip)[0]
+            except Exception:
+                pass
+
+        now = time.perf_counter()
+        timings["dns"] = now - stage_start
+        stage_start = now
 
         ports = []
-        for i, port in enumerate(self.ports):
-            result = self._scan_port_socket(ip, port)
-            if result.state == "open":
-                ports.append(result)
-                host_up = True  # Se una porta è aperta, host è up
+        closed = filtered = probed = 0
+        unreachable = discovery == "unreachable"
+        total = len(self.ports)
+        if not unreachable:
+            # Molte porte: connessioni in parallelo
+            if total >= self.SWEEP_MIN_PORTS:
+                outcomes = self._sweep_ports(ip, cancel)
+            else:
+                outcomes = self._probe_ports(ip, cancel)
+            with closing(outcomes):
+                for i, result in enumerate(outcomes):
+                    if cancel and cancel.cancelled and result.state != "open":
+                        # Timeout accorciato dalla scadenza: esito non attendibile
+                        break
+                    probed = i + 1
+                    if result.state == "open":
+                        ports.append(result)
+                        host_up = True  # Se una porta è aperta, host è up
+                    elif result.state == "closed":
+                        closed += 1
+                        host_up = True
+                    elif result.state == "filtered":
+                        filtered += 1
+                    elif result.state == "unreachable":
+                        if host_up:
+                            filtered += 1
+                        else:
+                            unreachable = True
+                            break
+                    if callback:
+                        callback(ip, result.port, i + 1, total)
+        if unreachable:
+            probed = total  # Nessuna porta raggiungibile: host verificato
             if callback:
-                callback(ip, port, i + 1, len(self.ports))
+                callback(ip, self.ports[-1], total, total)
+        ports.sort(key=lambda p: p.port)
+
+        timings["connect"] = time.perf_counter() - stage_start
+        if self.telemetry:
+            self.telemetry.observe("discovery", timings["discovery"])
+            self.telemetry.observe("dns", timings["dns"])
+
+        if host_up:
+            state = "up"
+        else:
+            state = "unreachable" if unreachable else "down"
 
         return HostResult(
             ip=ip,
             hostname=hostname,
-            state="up" if host_up else "down",
+            state=state,
             ports=ports,
-            scan_time=time.time() - start
-        )
+            scan_time=time.time() - start,
+            timings=timings,
+            closed_count=closed,
+            filtered_count=filtered
+        ), probed
 
-    def _scan_with_nmap(self, target: str, callback=None) -> List[HostResult]:
+    def _scan_with_nmap(self, target: str, callback=None, cancel=None) -> List[HostResult]:
         """
         Scansiona con nmap (più accurato)
 
         Args:
             target: Target da scansionare
             callback: Funzione callback per progress
+            cancel: CancelToken; se annullato nmap viene terminato e
+                restano gli host già completati
 
         Returns:
             Lista risultati host
         """
-        import time
-
-        ports_str = ",".join(str(p) for p in self.ports)
+        ports_str = PortSet(self.ports).to_spec()
 
         # Costruisci comando nmap
         cmd = [
@@ -374,36 +680,114 @@ class PortScanner:
             "--open",  # Solo porte aperte
             "-T4",  # Timing aggressivo
             "-oX", "-",  # Output XML su stdout
-            target
+            "-iL", "-",  # Target da stdin
         ]
+        if self.rate_limit:
+            cmd += ["--max-rate", str(self.rate_limit)]
+        if self.concurrency:
+            cmd += ["--max-parallelism", str(self.concurrency)]
 
+        results = []
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minuti max
-            )
+            # nmap non mescola le famiglie: un'esecuzione per IPv4 e una (-6) per IPv6
+            for ipv6, group in self._nmap_target_groups(target, cancel):
+                if cancel and cancel.cancelled:
+                    break
+                returncode, output = self._run_nmap(
+                    cmd + (["-6"] if ipv6 else []), "\n".join(group) + "\n", cancel
+                )
+                if returncode is None:
+                    # Interrotto: l'XML è troncato, valgono gli host completi
+                    results.extend(self._parse_nmap_xml(output, partial=True))
+                    break
 
-            if result.returncode != 0:
-                return []
+                if returncode != 0:
+                    return []
 
-            # Parse XML output
-            return self._parse_nmap_xml(result.stdout)
+                # Parse XML output
+                results.extend(self._parse_nmap_xml(output))
+            return results
 
         except subprocess.TimeoutExpired:
-            print("[!] Timeout nmap, uso fallback socket")
+            logger.warning("Timeout nmap, uso fallback socket")
             return []
         except Exception as e:
-            print(f"[!] Errore nmap: {e}, uso fallback socket")
+            logger.warning("Errore nmap: %s, uso fallback socket", e)
             return []
 
-    def _parse_nmap_xml(self, xml_output: str) -> List[HostResult]:
+    def _run_nmap(self, cmd: List[str], targets_input: str, cancel=None) -> tuple:
+        """
+        Esegue nmap con un limite di 5 minuti, controllando il token ogni CHECK_INTERVAL
+
+        Returns:
+            (codice di uscita, stdout); codice None se terminato per annullamento
+
+        Raises:
+            subprocess.TimeoutExpired: Oltre il limite di tempo
+        """
+        import time
+        from .cancel import CHECK_INTERVAL
+
+        limit = time.monotonic() + 300  # 5 minuti max
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True)
+        with process:
+            while True:
+                wait = max(0.0, limit - time.monotonic())
+                if cancel:
+                    wait = min(wait, CHECK_INTERVAL)
+                try:
+                    output, _ = process.communicate(targets_input, timeout=wait)
+                    return process.returncode, output
+                except subprocess.TimeoutExpired:
+                    targets_input = None  # Già inviato: i tentativi successivi solo leggono
+                    if cancel and cancel.cancelled:
+                        break
+                    if time.monotonic() >= limit:
+                        process.kill()
+                        process.communicate()
+                        raise
+
+            # Annullato: nmap scrive gli host completati prima di uscire
+            process.terminate()
+            try:
+                output, _ = process.communicate(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                output, _ = process.communicate()
+            return None, output
+
+    def _nmap_target_groups(self, target: str, cancel=None) -> List[tuple]:
+        """
+        Target per nmap divisi per famiglia
+
+        Le reti IPv4 passano intatte (nmap le espande da sé); reti IPv6
+        e hostname diventano gli indirizzi di _get_hosts_from_target.
+
+        Returns:
+            Lista di (ipv6, lista target) non vuote
+        """
+        try:
+            network = ipaddress.ip_network(target, strict=False)
+        except ValueError:
+            network = None
+        if network is not None and network.version == 4:
+            return [(False, [target])]
+
+        addresses = self._get_hosts_from_target(target, cancel)
+        groups = [
+            (False, [a for a in addresses if ":" not in a]),
+            (True, [a for a in addresses if ":" in a]),
+        ]
+        return [(ipv6, group) for ipv6, group in groups if group]
+
+    def _parse_nmap_xml(self, xml_output: str, partial: bool = False) -> List[HostResult]:
         """
         Parsa output XML di nmap
 
         Args:
             xml_output: Output XML
+            partial: Output troncato (nmap interrotto): solo gli host completi
 
         Returns:
             Lista risultati host
@@ -413,9 +797,15 @@ class PortScanner:
         results = []
 
         try:
-            root = ET.fromstring(xml_output)
+            if partial:
+                # Elementi <host> già chiusi; il resto del documento manca
+                parser = ET.XMLPullParser(events=("end",))
+                parser.feed(xml_output)
+                hosts = [element for _, element in parser.read_events() if element.tag == "host"]
+            else:
+                hosts = ET.fromstring(xml_output).findall(".//host")
 
-            for host in root.findall(".//host"):
+            for host in hosts:
                 # Stato host
                 status = host.find("status")
                 if status is None or status.get("state") != "up":
@@ -423,6 +813,8 @@ class PortScanner:
 
                 # IP
                 address = host.find("address[@addrtype='ipv4']")
+                if address is None:
+                    address = host.find("address[@addrtype='ipv6']")
                 if address is None:
                     continue
                 ip = address.get("addr")
@@ -435,6 +827,7 @@ class PortScanner:
 
                 # Porte
                 ports = []
+                counts = {"closed": 0, "filtered": 0}
                 for port in host.findall(".//port"):
                     port_num = int(port.get("portid"))
                     state = port.find("state")
@@ -457,24 +850,109 @@ class PortScanner:
 
                     if port_result.state == "open":
                         ports.append(port_result)
+                    elif port_result.state in counts:
+                        counts[port_result.state] += 1
+
+                # Porte raggruppate da nmap (<extraports state="closed" count="18">)
+                for extra in host.findall("ports/extraports"):
+                    state = extra.get("state", "")
+                    if state in counts:
+                        counts[state] += int(extra.get("count", 0))
 
                 results.append(HostResult(
                     ip=ip,
                     hostname=hostname,
                     state="up",
-                    ports=ports
+                    ports=ports,
+                    closed_count=counts["closed"],
+                    filtered_count=counts["filtered"]
                 ))
 
         except ET.ParseError as e:
-            print(f"[!] Errore parsing XML nmap: {e}")
+            logger.error("Errore parsing XML nmap: %s", e)
 
         return results
 
+    def scan_hosts(
+        self,
+        ip_list: List[str],
+        callback=None,
+        progress_callback=None,
+        host_callback=None,
+        cancel=None
+    ) -> List[HostResult]:
+        """
+        Scansiona una lista esplicita di IP con socket Python
+
+        Args:
+            ip_list: Lista di IP da scansionare
+            callback: Callback per ogni porta scansionata
+            progress_callback: Callback per progress globale
+            host_callback: Callback per ogni host completato (riceve HostResult)
+            cancel: CancelToken; se annullato si ferma e restituisce gli host già scansionati
+
+        Returns:
+            Host con porte aperte o esplicitamente up
+        """
+        return self._scan_host_list(ip_list, callback, progress_callback, host_callback, cancel)[0]
+
+    def _scan_host_list(self, ip_list, callback, progress_callback, host_callback, cancel) -> tuple:
+        """Come scan_hosts, più la copertura (vedi ScanResult.coverage)"""
+        hosts = []
+        total_hosts = len(ip_list)
+        total_ports = len(self.ports)
+        scanned = probed_ports = 0
+        if self.telemetry:
+            self.telemetry.add_hosts(total_hosts)
+
+        for i, ip in enumerate(ip_list):
+            if cancel and cancel.cancelled:
+                break
+            if progress_callback:
+                progress_callback(i + 1, total_hosts, ip)
+
+            host_result, probed = self._scan_host(ip, callback, cancel)
+            probed_ports += probed
+            if probed < total_ports:
+                # Interrotto a metà: valgono solo le porte aperte già trovate
+                if not host_result.ports:
+                    break
+            else:
+                scanned += 1
+            # Un messaggio per host (campionato): sotto DEBUG costa un confronto
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Host %s (%d/%d): %s, %d porte aperte", ip, i + 1, total_hosts,
+                    host_result.state, len(host_result.ports),
+                    extra={"sample": "host", "ip": ip, "state": host_result.state,
+                           "open_ports": len(host_result.ports),
+                           "seconds": round(host_result.scan_time, 3)}
+                )
+
+            if self.telemetry:
+                self.telemetry.host_finished(host_result)
+            if host_callback:
+                host_callback(host_result)
+
+            # Aggiungi solo host con porte aperte o esplicitamente up
+            if host_result.ports or host_result.state == "up":
+                hosts.append(host_result)
+
+        coverage = {
+            "hosts_total": total_hosts,
+            "hosts_scanned": scanned,
+            "ports_total": total_hosts * total_ports,
+            "ports_probed": probed_ports,
+        }
+        return hosts, coverage
+
     def scan(
         self,
         target: str,
         callback=None,
-        progress_callback=None
+        progress_callback=None,
+        host_callback=None,
+        cancel=None
     ) -> ScanResult:
         """
         Esegue scansione completa
@@ -483,44 +961,115 @@ class PortScanner:
             target: IP, CIDR o hostname
             callback: Callback per ogni porta scansionata
             progress_callback: Callback per progress globale
+            host_callback: Callback per ogni host completato (riceve HostResult)
+            cancel: CancelToken (scadenza o annullamento): il risultato
+                contiene gli host già scansionati ed è segnato incompleto
 
         Returns:
             Risultato scansione
         """
         from datetime import datetime
 
-        if not self.validate_target(target):
+        # Con un token anche la risoluzione DNS del target si può interrompere
+        if cancel:
+            valid = cancel.call(self.validate_target, target, default=True)
+        else:
+            valid = self.validate_target(target)
+        if not valid:
             raise ValueError(f"Target non valido: {target}")
 
         result = ScanResult(target=target, start_time=datetime.now())
 
         # Prova con nmap se disponibile
-        if self.use_nmap and self._nmap_available:
-            print(f"[*] Scansione con nmap: {target}")
-            hosts = self._scan_with_nmap(target, callback)
-            if hosts:
+        if self.use_nmap and self._nmap_available and not (cancel and cancel.cancelled):
+            logger.info("Scansione con nmap: %s", target)
+            nmap_start = datetime.now()
+            hosts = self._scan_with_nmap(target, callback, cancel)
+            if self.telemetry:
+                self.telemetry.observe(
+                    "nmap", (datetime.now() - nmap_start).total_seconds()
+                )
+            # nmap interrotto: niente fallback, restano gli host già completati
+            if hosts or (cancel and cancel.cancelled):
+                if self.telemetry:
+                    self.telemetry.add_hosts(len(hosts))
+                    for host_result in hosts:
+                        self.telemetry.host_finished(host_result)
+                if host_callback:
+                    for host_result in hosts:
+                        host_callback(host_result)
                 result.hosts = hosts
+                if cancel and cancel.cancelled:
+                    # nmap riporta solo gli host attivi: la copertura è una stima per difetto
+                    total = len(self._get_hosts_from_target(target, cancel))
+                    result.coverage = {
+                        "hosts_total": max(total, len(hosts)),
+                        "hosts_scanned": len(hosts),
+                    }
+                    result.mark_incomplete(cancel.reason)
+                else:
+                    self._add_udp(result, self._get_hosts_from_target(target, cancel), cancel)
                 result.end_time = datetime.now()
                 return result
 
         # Fallback a socket
-        print(f"[*] Scansione con socket Python: {target}")
-        ip_list = self._get_hosts_from_target(target)
+        logger.info("Scansione con socket Python: %s", target)
+        ip_list = self._get_hosts_from_target(target, cancel)
+        result.hosts, result.coverage = self._scan_host_list(
+            ip_list, callback, progress_callback, host_callback, cancel
+        )
+        self._add_udp(result, ip_list, cancel)
+        if cancel and cancel.cancelled and (
+                result.coverage["ports_probed"] < result.coverage["ports_total"] or self.udp_ports):
+            result.mark_incomplete(cancel.reason)
 
-        total_hosts = len(ip_list)
-        for i, ip in enumerate(ip_list):
-            if progress_callback:
-                progress_callback(i + 1, total_hosts, ip)
+        result.end_time = datetime.now()
+        return result
 
-            print(f"[*] Scansione {ip} ({i+1}/{total_hosts})")
-            host_result = self._scan_host_socket(ip, callback)
+    def _add_udp(self, result: ScanResult, ip_list: List[str], cancel=None) -> None:
+        """
+        Scansione UDP (se richiesta) unita ai risultati TCP.
+        Anche con nmap usa UdpScanner: nmap -sU richiede privilegi di root.
+        """
+        if not self.udp_ports or not ip_list or (cancel and cancel.cancelled):
+            return
+        import time
+        from .udp_scanner import UdpScanner
 
-            # Aggiungi solo host con porte aperte o esplicitamente up
-            if host_result.ports or host_result.state == "up":
-                result.hosts.append(host_result)
+        logger.info("Scansione UDP: %d porte su %d host", len(self.udp_ports), len(ip_list))
+        start = time.perf_counter()
+        udp_hosts = UdpScanner(self.udp_ports, timeout=self.timeout).scan(ip_list, cancel)
+        if self.telemetry:
+            self.telemetry.observe("udp", time.perf_counter() - start)
+        result.hosts = merge_hosts(result.hosts, udp_hosts)
 
-        result.end_time = datetime.now()
-        return result
+
+def merge_hosts(hosts: List[HostResult], extra: List[HostResult]) -> List[HostResult]:
+    """
+    Unisce risultati dello stesso host ottenuti da scansioni diverse (es. TCP e UDP)
+
+    Args:
+        hosts: Risultati esistenti (modificati in place)
+        extra: Risultati da aggiungere
+
+    Returns:
+        Lista unita; host nuovi aggiunti solo se up o con porte aperte
+    """
+    merged = list(hosts)
+    by_ip = {h.ip: h for h in merged}
+    for host in extra:
+        current = by_ip.get(host.ip)
+        if current is None:
+            if host.ports or host.state == "up":
+                merged.append(host)
+                by_ip[host.ip] = host
+            continue
+        current.ports.extend(host.ports)
+        current.closed_count += host.closed_count
+        current.filtered_count += host.filtered_count
+        if host.state == "up":
+            current.state = "up"
+    return merged
 
 
 def main():
@@ -0,0 +1,340 @@
+"""
+Scansioni Programmate - CyberSentinel
+Esegue profili di scansione ricorrenti con cadenza variata casualmente (jitter)
+
+A differenza di cron, lo scheduler:
+- distribuisce le scansioni nel tempo invece di avviarle tutte insieme
+- limita le scansioni concorrenti a livello globale
+- salta un'esecuzione se la precedente dello stesso profilo è ancora in corso
+- salva lo stato su disco, così un riavvio non fa partire tutto subito
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .cancel import CancelToken
+from .classifier import PortClassifier
+from .config import ScheduledScan, parse_config
+from .reports import create_report_generator, report_format_for
+from .scanner import PortScanner
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduleState:
+    """Stato persistente di un profilo"""
+    last_run: Optional[float] = None
+    next_run: Optional[float] = None
+    last_status: str = ""
+    last_duration: float = 0.0
+    runs: int = 0
+    skipped: int = 0
+
+
+class ScanScheduler:
+    """
+    Scheduler di scansioni ricorrenti.
+    Ogni profilo viene eseguito circa ogni `interval` secondi, con variazione
+    casuale `jitter`, rispettando il limite globale di concorrenza.
+    """
+
+    def __init__(
+        self,
+        profiles: List[ScheduledScan],
+        state_file: Optional[str] = None,
+        max_concurrent: int = 2,
+        runner: Optional[Callable[[ScheduledScan], None]] = None,
+        startup_spread: float = 300.0,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Inizializza lo scheduler
+
+        Args:
+            profiles: Profili da eseguire
+            state_file: File JSON per lo stato tra riavvii (opzionale)
+            max_concurrent: Scansioni concorrenti massime
+            runner: Funzione che esegue un profilo (default: scansione + report)
+            startup_spread: Finestra in secondi in cui distribuire le
+                esecuzioni arretrate all'avvio
+            clock: Sorgente del tempo (per i test)
+            rng: Generatore casuale (per i test)
+        """
+        names = [p.name for p in profiles]
+        if len(set(names)) != len(names):
+            raise ValueError("Nomi dei profili duplicati")
+
+        self.profiles = {p.name: p for p in profiles}
+        self.state_file = Path(state_file) if state_file else None
+        self.max_concurrent = max(1, max_concurrent)
+        self.runner = runner or ScheduledScanRunner()
+        self.startup_spread = startup_spread
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._running: Dict[str, float] = {}
+        self._slot_free = threading.Event()  # Segnalato al termine di ogni scansione
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent, thread_name_prefix="scheduled-scan"
+        )
+        self._stop = threading.Event()
+
+        self.state: Dict[str, ScheduleState] = self._load_state()
+        self._plan_initial_runs()
+
+    # --- Stato persistente ---
+
+    def _load_state(self) -> Dict[str, ScheduleState]:
+        state = {}
+        if self.state_file and self.state_file.exists():
+            try:
+                data = json.loads(self.state_file.read_text(encoding="utf-8"))
+                known = ScheduleState.__dataclass_fields__
+                for name, entry in data.items():
+                    state[name] = ScheduleState(
+                        **{k: v for k, v in entry.items() if k in known}
+                    )
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning("Stato scheduler illeggibile, ripartenza pulita: %s", e)
+        return {name: state.get(name, ScheduleState()) for name in self.profiles}
+
+    def _save_state(self) -> None:
+        if not self.state_file:
+            return
+        with self._lock:
+            data = {name: vars(s).copy() for name, s in self.state.items()}
+        with self._save_lock:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp, self.state_file)
+
+    def _jittered(self, profile: ScheduledScan) -> float:
+        spread = profile.interval * profile.jitter
+        return profile.interval + self.rng.uniform(-spread, spread)
+
+    def _plan_initial_runs(self) -> None:
+        """
+        Calcola la prima esecuzione di ogni profilo.
+        I profili mai eseguiti e quelli arretrati partono in un istante
+        casuale entro startup_spread (o entro l'intervallo, se più breve)
+        invece di partire tutti insieme.
+        """
+        now = self.clock()
+        for name, profile in self.profiles.items():
+            state = self.state[name]
+            if state.last_run is None:
+                window = min(profile.interval, self.startup_spread)
+                state.next_run = now + self.rng.uniform(0, window)
+            else:
+                planned = state.last_run + self._jittered(profile)
+                if planned <= now:
+                    window = min(profile.interval, self.startup_spread)
+                    planned = now + self.rng.uniform(0, window)
+                state.next_run = planned
+        self._save_state()
+
+    # --- Esecuzione ---
+
+    @property
+    def running(self) -> List[str]:
+        """Profili in esecuzione"""
+        with self._lock:
+            return list(self._running)
+
+    def run_pending(self) -> List[str]:
+        """
+        Avvia i profili scaduti, nei limiti di concorrenza
+
+        Returns:
+            Nomi dei profili avviati
+        """
+        now = self.clock()
+        started = []
+        changed = False
+        due = sorted(
+            (s.next_run, name) for name, s in self.state.items()
+            if s.next_run is not None and s.next_run <= now
+        )
+
+        for _, name in due:
+            profile = self.profiles[name]
+            state = self.state[name]
+            with self._lock:
+                if name in self._running:
+                    # Esecuzione precedente ancora in corso: salta questo turno
+                    state.skipped += 1
+                    state.next_run = now + self._jittered(profile)
+                    logger.info("Profilo %s ancora in esecuzione, turno saltato", name)
+                    changed = True
+                    continue
+                if len(self._running) >= self.max_concurrent:
+                    # Resta scaduto: partirà appena si libera uno slot
+                    continue
+                self._running[name] = now
+                state.last_run = now
+                state.next_run = now + self._jittered(profile)
+            self._executor.submit(self._execute, profile)
+            started.append(name)
+
+        # Un profilo che attende uno slot non cambia lo stato: nessuna scrittura
+        if started or changed:
+            self._save_state()
+        return started
+
+    def _execute(self, profile: ScheduledScan) -> None:
+        start = time.monotonic()
+        status = "ok"
+        try:
+            logger.info("Avvio scansione programmata %s (%s)", profile.name, profile.target)
+            self.runner(profile)
+        except Exception as e:
+            status = f"errore: {e}"
+            logger.error("Scansione programmata %s fallita: %s", profile.name, e)
+        finally:
+            with self._lock:
+                state = self.state[profile.name]
+                state.last_status = status
+                state.last_duration = time.monotonic() - start
+                state.runs += 1
+                self._running.pop(profile.name, None)
+            self._save_state()
+            self._slot_free.set()
+
+    def seconds_until_next(self) -> float:
+        """Secondi mancanti alla prossima esecuzione prevista"""
+        upcoming = [s.next_run for s in self.state.values() if s.next_run is not None]
+        if not upcoming:
+            return 60.0
+        return max(0.0, min(upcoming) - self.clock())
+
+    def run_forever(self, poll_interval: float = 1.0) -> None:
+        """Esegue lo scheduler fino a stop() o Ctrl+C"""
+        try:
+            while not self._stop.is_set():
+                self._slot_free.clear()
+                self.run_pending()
+                wait = self.seconds_until_next()
+                if wait > 0:
+                    self._stop.wait(min(poll_interval, wait))
+                else:
+                    # Profili scaduti ma tutti gli slot occupati: si riprova
+                    # quando una scansione termina, senza ciclare
+                    self._slot_free.wait(poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def stop(self) -> None:
+        """Richiede l'arresto del ciclo run_forever"""
+        self._stop.set()
+        self._slot_free.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Attende le scansioni in corso e salva lo stato"""
+        self._executor.shutdown(wait=wait)
+        self._save_state()
+
+
+class ScheduledScanRunner:
+    """
+    Esecutore di default: scansiona i target del ScanProfile, analizza i
+    servizi aperti come CLI e demone e salva JSON e report in output_dir.
+    Scanner e generatori di report vengono riusati tra esecuzioni.
+
+    Args:
+        pipeline: Canali di notifica (sinks.SinkPipeline) a cui inviare
+            ogni host completato, con il nome del profilo (opzionale)
+        classifier: PortClassifier per il report (default: livelli standard)
+        report_settings: config.ReportSettings per i report (opzionale)
+    """
+
+    def __init__(self, pipeline=None, classifier=None, report_settings=None):
+        self.pipeline = pipeline
+        self.classifier = classifier
+        self.report_settings = report_settings
+        self._scanners: Dict[tuple, PortScanner] = {}
+        self._generators: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _scanner(self, profile: ScheduledScan) -> PortScanner:
+        settings = profile.profile
+        key = (settings.ports, settings.udp, settings.timeout, settings.use_nmap,
+               settings.concurrency, settings.rate_limit)
+        with self._lock:
+            if key not in self._scanners:
+                self._scanners[key] = PortScanner(**settings.scanner_options())
+            scanner = self._scanners[key]
+        if settings.backend == "nmap" and not scanner.use_nmap:
+            raise RuntimeError("backend nmap richiesto ma nmap non è installato")
+        return scanner
+
+    def __call__(self, profile: ScheduledScan) -> None:
+        settings = profile.profile
+        host_callback = None
+        if self.pipeline:
+            def host_callback(host):
+                self.pipeline.submit(host, profile=profile.name)
+        cancel = CancelToken(settings.deadline) if settings.deadline else None
+        scanner = self._scanner(profile)
+        result = None
+        for target in settings.targets:
+            partial = scanner.scan(target, host_callback=host_callback, cancel=cancel)
+            if result is None:
+                result = partial
+            else:
+                result.extend(partial)
+        if settings.inspect:
+            from .inspection import default_inspectors, run_inspections
+            run_inspections(result, default_inspectors(timeout=settings.timeout), cancel)
+        if not result.complete:
+            logger.warning("Scansione programmata %s incompleta: %s", profile.name, result.coverage)
+
+        output_dir = Path(profile.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{profile.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        result.to_json(str(output_dir / f"{stem}.json"))
+
+        if settings.report:
+            report_format = report_format_for(settings.output or "", settings.report_format)
+            classified = result.classify(self.classifier or PortClassifier())
+            with self._lock:
+                if report_format not in self._generators:
+                    self._generators[report_format] = create_report_generator(
+                        report_format, self.report_settings
+                    )
+                self._generators[report_format].generate(
+                    result, str(output_dir / f"{stem}.{report_format}"), classified=classified
+                )
+
+
+def load_schedule(config: Dict) -> List[ScheduledScan]:
+    """
+    Legge i profili dalla sezione 'schedule' della configurazione
+
+    Args:
+        config: Configurazione YAML già caricata
+
+    Returns:
+        Lista dei profili, validati come config.ScanProfile
+
+    Raises:
+        config.ConfigError: Se la configurazione non è valida
+    """
+    return list(parse_config(config).schedule.profiles)
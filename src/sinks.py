@@ -0,0 +1,445 @@
+"""
+Canali di Notifica - CyberSentinel
+Invio dei risultati per host a webhook, email, syslog e file
+
+Ogni host completato viene serializzato subito e accodato a tutti i canali.
+Ogni canale ha una coda limitata e un proprio thread che raggruppa gli host
+in lotti e li consegna con nuovi tentativi a intervalli crescenti. Lo
+scanner non aspetta mai: se una coda è piena (canale lento o irraggiungibile)
+l'host viene scartato per quel canale e conteggiato.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import logging
+import os
+import queue
+import smtplib
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .scanner import HostResult
+
+logger = logging.getLogger(__name__)
+
+SMTP_PASSWORD_ENV = "CYBERSENTINEL_SMTP_PASSWORD"
+
+_SYSLOG_FACILITIES = {"user": 1, "daemon": 3, "auth": 4, "local0": 16, "local1": 17,
+                      "local2": 18, "local3": 19, "local4": 20, "local5": 21,
+                      "local6": 22, "local7": 23}
+
+
+class Sink:
+    """
+    Canale di consegna (da estendere)
+
+    Le sottoclassi implementano send(batch). Un OSError (rete, SMTP, HTTP
+    5xx) viene ritentato; un ValueError indica un rifiuto definitivo.
+    """
+
+    name = "sink"
+    batch_size = 50         # Host massimi per consegna
+    flush_interval = 1.0    # Secondi massimi di attesa per completare un lotto
+
+    def send(self, batch: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Rilascia le risorse del canale"""
+
+
+class WebhookSink(Sink):
+    """
+    POST JSON {"hosts": [...]} a un URL
+
+    Args:
+        url: Indirizzo del webhook
+        timeout: Timeout della richiesta in secondi
+        headers: Intestazioni aggiuntive (es. token di autorizzazione)
+    """
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10.0, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def send(self, batch: List[Dict]) -> None:
+        body = json.dumps({"hosts": batch}, default=str).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            # 4xx: richiesta rifiutata, ritentare non serve (salvo 408 e 429)
+            if e.code < 500 and e.code not in (408, 429):
+                raise ValueError(f"webhook rifiutato: HTTP {e.code}") from e
+            raise
+
+
+class EmailSink(Sink):
+    """
+    Un messaggio per lotto con riepilogo testuale e allegato JSON
+
+    Args:
+        smtp_server: Server SMTP
+        smtp_port: Porta (587 con STARTTLS, 25 senza)
+        recipient: Destinatario (o più, separati da virgola)
+        username: Utente SMTP (opzionale)
+        password: Password SMTP (default: variabile CYBERSENTINEL_SMTP_PASSWORD)
+        sender: Mittente (default: username)
+        starttls: Usa STARTTLS prima dell'autenticazione
+        timeout: Timeout di connessione in secondi
+    """
+
+    name = "email"
+    batch_size = 500
+    flush_interval = 30.0  # Poche email con molti host
+
+    def __init__(
+        self,
+        smtp_server: str,
+        recipient: str,
+        smtp_port: int = 587,
+        username: str = "",
+        password: Optional[str] = None,
+        sender: str = "",
+        starttls: bool = True,
+        timeout: float = 10.0
+    ):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.recipient = recipient
+        self.username = username
+        self.password = password if password is not None else os.environ.get(SMTP_PASSWORD_ENV, "")
+        self.sender = sender or username or "cybersentinel@localhost"
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def message(self, batch: List[Dict]) -> EmailMessage:
+        """Messaggio con una riga per host e i risultati completi in allegato"""
+        open_ports = sum(len(h.get("ports", [])) for h in batch)
+        msg = EmailMessage()
+        msg["Subject"] = f"CyberSentinel: {len(batch)} host, {open_ports} porte aperte"
+        msg["From"] = self.sender
+        msg["To"] = self.recipient
+
+        lines = []
+        for host in batch:
+            name = f"{host['ip']} ({host['hostname']})" if host.get("hostname") else host["ip"]
+            ports = ", ".join(f"{p['port']}/{p.get('service') or '?'}" for p in host.get("ports", []))
+            lines.append(f"{name}: {ports or 'nessuna porta aperta'}")
+        msg.set_content("Risultati CyberSentinel\n\n" + "\n".join(lines) + "\n")
+        msg.add_attachment(
+            json.dumps({"hosts": batch}, indent=2, default=str).encode("utf-8"),
+            maintype="application", subtype="json", filename="risultati.json"
+        )
+        return msg
+
+    def send(self, batch: List[Dict]) -> None:
+        with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+            smtp.send_message(self.message(batch))
+
+
+class SyslogSink(Sink):
+    """
+    Un messaggio syslog RFC 5424 (JSON) per host, via UDP o socket locale
+
+    Args:
+        address: "host:porta" (UDP, default porta 514) oppure percorso
+            di un socket Unix (es. /dev/log)
+        facility: Facility syslog (default: local0)
+    """
+
+    name = "syslog"
+
+    def __init__(self, address: str = "localhost:514", facility: str = "local0"):
+        if facility not in _SYSLOG_FACILITIES:
+            raise ValueError(f"Facility syslog non valida: {facility}")
+        self.facility = _SYSLOG_FACILITIES[facility]
+        self.hostname = socket.gethostname()
+        if address.startswith("/"):
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._target = address
+        else:
+            host, _, port = address.rpartition(":") if ":" in address else (address, "", "514")
+            family = socket.AF_INET6 if ":" in host.strip("[]") else socket.AF_INET
+            self._sock = socket.socket(family, socket.SOCK_DGRAM)
+            self._target = (host.strip("[]"), int(port))
+
+    def format(self, host: Dict) -> bytes:
+        """Messaggio RFC 5424: severità warning con porte aperte, info altrimenti"""
+        severity = 4 if host.get("ports") else 6
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        header = f"<{self.facility * 8 + severity}>1 {timestamp} {self.hostname} cybersentinel - host -"
+        return f"{header} {json.dumps(host, separators=(',', ':'), default=str)}".encode("utf-8")
+
+    def send(self, batch: List[Dict]) -> None:
+        for host in batch:
+            self._sock.sendto(self.format(host), self._target)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class FileSink(Sink):
+    """
+    Aggiunge un host per riga (JSON Lines) a un file
+
+    Args:
+        path: File di destinazione (creato se non esiste)
+    """
+
+    name = "file"
+    batch_size = 200
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def send(self, batch: List[Dict]) -> None:
+        lines = "".join(json.dumps(host, default=str) + "\n" for host in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+@dataclass
+class SinkStats:
+    """Contatori di consegna di un canale"""
+    delivered: int = 0  # Host consegnati
+    dropped: int = 0    # Host scartati per coda piena
+    failed: int = 0     # Host persi dopo tutti i tentativi
+    batches: int = 0
+    retries: int = 0
+
+
+class _SinkWorker:
+    """Coda limitata e thread di consegna di un canale"""
+
+    def __init__(self, sink: Sink, queue_size: int, retries: int, backoff: float, max_backoff: float):
+        self.sink = sink
+        self.queue: "queue.Queue[Dict]" = queue.Queue(maxsize=queue_size)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = SinkStats()
+        self.closing = threading.Event()
+        self.abort = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"sink-{sink.name}", daemon=True)
+        self.thread.start()
+
+    def offer(self, record: Dict) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if not self.stats.dropped:
+                logger.warning("Canale %s in ritardo: host scartati", self.sink.name)
+            self.stats.dropped += 1
+
+    def _next_batch(self) -> List[Dict]:
+        """Primo host in attesa, poi altri fino a batch_size o flush_interval"""
+        try:
+            batch = [self.queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.sink.flush_interval
+        while len(batch) < self.sink.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.closing.is_set():
+                break
+            try:  # Attesa a piccoli passi: la chiusura svuota subito la coda
+                batch.append(self.queue.get(timeout=min(remaining, 0.1)))
+            except queue.Empty:
+                pass
+        return batch
+
+    def _deliver(self, batch: List[Dict]) -> None:
+        for attempt in range(self.retries + 1):
+            try:
+                self.sink.send(batch)
+            except ValueError as e:
+                logger.error("Canale %s: consegna rifiutata: %s", self.sink.name, e)
+                break
+            except OSError as e:
+                if attempt == self.retries or self.abort.is_set():
+                    logger.error("Canale %s: consegna fallita dopo %d tentativi: %s",
+                                 self.sink.name, attempt + 1, e)
+                    break
+                self.stats.retries += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                logger.debug("Canale %s: %s, nuovo tentativo tra %.1fs", self.sink.name, e, delay)
+                if self.abort.wait(delay):
+                    break
+            else:
+                self.stats.delivered += len(batch)
+                self.stats.batches += 1
+                return
+        self.stats.failed += len(batch)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._deliver(batch)
+            elif self.closing.is_set():
+                break
+        try:
+            self.sink.close()
+        except OSError:
+            pass
+
+
+class SinkPipeline:
+    """
+    Distribuisce gli host completati a più canali senza bloccare lo scanner
+
+    L'istanza è utilizzabile direttamente come host_callback di
+    PortScanner.scan (o del coordinatore distribuito).
+
+    Args:
+        sinks: Canali di destinazione
+        queue_size: Host in attesa massimi per canale
+        retries: Nuovi tentativi per lotto dopo un errore di rete
+        backoff: Attesa prima del primo nuovo tentativo (raddoppia ogni volta)
+        max_backoff: Attesa massima tra due tentativi
+    """
+
+    def __init__(
+        self,
+        sinks: Sequence[Sink],
+        queue_size: int = 1000,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0
+    ):
+        self._workers = [_SinkWorker(s, queue_size, retries, backoff, max_backoff) for s in sinks]
+
+    def __bool__(self) -> bool:
+        return bool(self._workers)
+
+    def __call__(self, host: HostResult) -> None:
+        self.submit(host)
+
+    def submit(self, host: HostResult, **context) -> None:
+        """
+        Accoda un host a tutti i canali (non blocca mai)
+
+        Args:
+            host: Host completato
+            **context: Campi aggiunti al record (es. profile="ufficio")
+        """
+        if not self._workers:
+            return
+        # Serializzato subito: le fasi successive modificano ancora l'host
+        record = {**context, **host.to_dict()}
+        for worker in self._workers:
+            worker.offer(record)
+
+    def close(self, timeout: float = 30.0) -> Dict[str, SinkStats]:
+        """
+        Consegna gli host in coda e ferma i thread
+
+        Args:
+            timeout: Secondi massimi di attesa complessivi; scaduti, i
+                nuovi tentativi vengono interrotti
+
+        Returns:
+            Statistiche per canale
+        """
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.closing.set()
+        for worker in self._workers:
+            worker.thread.join(max(0.0, deadline - time.monotonic()))
+            if worker.thread.is_alive():
+                worker.abort.set()
+                worker.thread.join(1.0)
+        return self.stats()
+
+    def stats(self) -> Dict[str, SinkStats]:
+        """Statistiche per canale"""
+        return {worker.sink.name: worker.stats for worker in self._workers}
+
+
+def sinks_from_config(config: Dict) -> List[Sink]:
+    """
+    Canali abilitati nella sezione 'notifications' della configurazione
+
+    Args:
+        config: Configurazione YAML già caricata
+
+    Returns:
+        Lista dei canali (vuota se nessuno è abilitato)
+
+    Raises:
+        ValueError: Se un canale abilitato è incompleto
+    """
+    section = (config or {}).get("notifications") or {}
+    sinks: List[Sink] = []
+
+    webhook = section.get("webhook") or {}
+    if webhook.get("enabled"):
+        if not webhook.get("url"):
+            raise ValueError("notifications.webhook: manca 'url'")
+        sinks.append(WebhookSink(webhook["url"], timeout=float(webhook.get("timeout", 10)),
+                                 headers=webhook.get("headers")))
+
+    email = section.get("email") or {}
+    if email.get("enabled"):
+        for key in ("smtp_server", "recipient"):
+            if not email.get(key):
+                raise ValueError(f"notifications.email: manca '{key}'")
+        sinks.append(EmailSink(
+            email["smtp_server"], email["recipient"],
+            smtp_port=int(email.get("smtp_port", 587)),
+            username=email.get("username", ""),
+            sender=email.get("sender", ""),
+            starttls=bool(email.get("starttls", True))
+        ))
+
+    syslog = section.get("syslog") or {}
+    if syslog.get("enabled"):
+        sinks.append(SyslogSink(str(syslog.get("address", "localhost:514")),
+                                facility=syslog.get("facility", "local0")))
+
+    file = section.get("file") or {}
+    if file.get("enabled"):
+        if not file.get("path"):
+            raise ValueError("notifications.file: manca 'path'")
+        sinks.append(FileSink(file["path"]))
+
+    return sinks
+
+
+def pipeline_from_config(config: Dict) -> SinkPipeline:
+    """
+    Pipeline con i canali e le opzioni di 'notifications'
+
+    Opzioni: queue_size, retries, backoff (secondi).
+    """
+    section = (config or {}).get("notifications") or {}
+    return SinkPipeline(
+        sinks_from_config(config),
+        queue_size=int(section.get("queue_size", 1000)),
+        retries=int(section.get("retries", 3)),
+        backoff=float(section.get("backoff", 1.0))
+    )
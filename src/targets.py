@@ -0,0 +1,223 @@
+"""
+Generazione Target - CyberSentinel
+Indirizzi da scansionare per reti IPv4 e IPv6 e risoluzione dual-stack
+
+Una rete IPv6 /64 contiene 2^64 indirizzi: non si può enumerare.
+Per i prefissi grandi gli indirizzi candidati vengono da:
+- hitlist: file con indirizzi noti (uno per riga)
+- neighbour cache: host IPv6 già visti dal sistema sul segmento locale
+- schemi a byte basso: ::1, ::2, ... e suffissi assegnati a mano
+  (::53, ::80, ::443, ::cafe, ...), sui primi sottoreti /64 del prefisso
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import ipaddress
+import itertools
+import logging
+import socket
+import subprocess
+import sys
+from typing import Iterable, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Limite di indirizzi per target
+MAX_HOSTS = 1024
+
+# Suffissi scelti a mano dagli amministratori (porta scritta in esadecimale, parole)
+PATTERN_SUFFIXES = (
+    0x21, 0x22, 0x25, 0x53, 0x80, 0x443, 0x445, 0x3389, 0x8080,
+    0x100, 0x1000, 0xa, 0xb, 0xc, 0xd, 0xe, 0xf,
+    0xcafe, 0xbeef, 0xface, 0xc0de, 0xdead_beef, 0x1_0000_0001,
+)
+
+# Identificativi delle sottoreti /64 provate dentro prefissi più corti
+SUBNET_IDS = (0, 1, 2, 3, 0x10, 0x100)
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def resolve(hostname: str) -> List[str]:
+    """
+    Risolve un hostname in tutti i suoi indirizzi IPv4 e IPv6
+
+    Args:
+        hostname: Nome da risolvere
+
+    Returns:
+        Indirizzi nell'ordine di getaddrinfo, senza duplicati (vuota se non risolve)
+    """
+    try:
+        infos = socket.getaddrinfo(hostname, None, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        return []
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+def normalize_address(address: str) -> str:
+    """
+    Forma canonica di un indirizzo IP, mantenendo la zona IPv6 (fe80::1%eth0)
+
+    ipaddress accetta la zona solo da Python 3.9: viene separata prima
+    dell'analisi e riaggiunta.
+
+    Raises:
+        ValueError: Se l'indirizzo non è valido
+    """
+    address, separator, zone = address.partition("%")
+    return str(ipaddress.ip_address(address)) + separator + zone
+
+
+def in_network(address: str, network: Network) -> bool:
+    """True se l'indirizzo (anche con %zona) appartiene alla rete"""
+    try:
+        return ipaddress.ip_address(address.partition("%")[0]) in network
+    except ValueError:
+        return False
+
+
+def load_hitlist(path: str) -> List[str]:
+    """
+    Legge una hitlist: un indirizzo per riga, commenti con #
+
+    Args:
+        path: File della hitlist
+
+    Returns:
+        Indirizzi validi, righe non valide ignorate
+    """
+    addresses = []
+    invalid = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                ipaddress.ip_address(line)
+                addresses.append(line)
+            except ValueError:
+                invalid += 1
+    if invalid:
+        logger.warning("Hitlist %s: %d righe non valide ignorate", path, invalid)
+    return addresses
+
+
+def _neighbour_command() -> List[str]:
+    if sys.platform == "win32":
+        return ["netsh", "interface", "ipv6", "show", "neighbors"]
+    if sys.platform.startswith("linux"):
+        return ["ip", "-6", "neigh", "show"]
+    return ["ndp", "-an"]
+
+
+def parse_neighbours(output: str) -> List[str]:
+    """
+    Estrae gli indirizzi IPv6 dall'output di ip neigh, ndp o netsh
+
+    Gli indirizzi link-local mantengono la zona (fe80::1%eth0), necessaria
+    per connettersi; le voci fallite o incomplete sono scartate.
+
+    Args:
+        output: Testo del comando
+
+    Returns:
+        Indirizzi IPv6 senza duplicati
+    """
+    addresses = []
+    for line in output.splitlines():
+        tokens = line.split()
+        if not tokens or any(word in line.lower() for word in ("failed", "incomplete", "unreachable")):
+            continue
+        address = tokens[0]
+        try:
+            ip = ipaddress.ip_address(address.partition("%")[0])  # ndp/netsh: fe80::1%en0
+        except ValueError:
+            continue
+        if ip.version != 6 or ip.is_multicast:
+            continue
+        # ip neigh: "fe80::1 dev eth0 lladdr ..."
+        if ip.is_link_local and "%" not in address and len(tokens) > 2 and tokens[1] == "dev":
+            address = f"{address}%{tokens[2]}"
+        addresses.append(address)
+    return list(dict.fromkeys(addresses))
+
+
+def neighbour_addresses() -> List[str]:
+    """Indirizzi IPv6 nella neighbour cache del sistema (vuota se non disponibile)"""
+    try:
+        result = subprocess.run(
+            _neighbour_command(), capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug("Neighbour cache non disponibile: %s", e)
+        return []
+    return parse_neighbours(result.stdout)
+
+
+def pattern_candidates(network: ipaddress.IPv6Network, low_bytes: int = 256) -> Iterator[str]:
+    """
+    Indirizzi a byte basso e suffissi comuni dentro una rete IPv6
+
+    Per prefissi più corti di /64 gli schemi vengono applicati alle
+    sottoreti con identificativo basso (SUBNET_IDS).
+
+    Args:
+        network: Rete IPv6
+        low_bytes: Quanti indirizzi ::1, ::2, ... per sottorete
+
+    Returns:
+        Iteratore di indirizzi (senza duplicati)
+    """
+    base = int(network.network_address)
+    if network.prefixlen < 64:
+        subnets = [base + (sid << 64) for sid in SUBNET_IDS if sid < 1 << (64 - network.prefixlen)]
+    else:
+        subnets = [base]
+
+    host_bits = 128 - max(network.prefixlen, 64)
+    suffixes = list(range(1, low_bytes + 1)) + list(PATTERN_SUFFIXES)
+    seen = set()
+    for suffix, subnet in itertools.product(suffixes, subnets):
+        if suffix >= 1 << host_bits:
+            continue
+        value = subnet + suffix
+        if value not in seen:
+            seen.add(value)
+            yield str(ipaddress.IPv6Address(value))
+
+
+def hosts_for_network(
+    network: Network,
+    limit: int = MAX_HOSTS,
+    hitlist: Optional[Iterable[str]] = None,
+    neighbours: bool = True
+) -> List[str]:
+    """
+    Indirizzi da scansionare in una rete, senza mai enumerare prefissi enormi
+
+    Reti piccole (al massimo `limit` indirizzi): tutti gli host.
+    Reti IPv4 più grandi: i primi `limit` host.
+    Reti IPv6 più grandi: hitlist, poi neighbour cache, poi schemi a byte basso,
+    filtrati sulla rete e troncati a `limit`.
+
+    Args:
+        network: Rete da scansionare
+        limit: Numero massimo di indirizzi
+        hitlist: Indirizzi noti (opzionale)
+        neighbours: Usa la neighbour cache del sistema
+
+    Returns:
+        Lista di indirizzi
+    """
+    if network.version == 4 or network.num_addresses <= limit:
+        return [str(ip) for ip in itertools.islice(network.hosts(), limit)]
+
+    sources = [iter(hitlist or ())]
+    if neighbours:
+        sources.append(iter(neighbour_addresses()))
+    sources.append(pattern_candidates(network))
+
+    candidates = (a for a in itertools.chain(*sources) if in_network(a, network))
+    return list(itertools.islice(dict.fromkeys(candidates), limit))
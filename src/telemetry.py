@@ -0,0 +1,344 @@
+"""
+Telemetria Scansione - CyberSentinel
+Contatori di avanzamento e throughput, istogrammi di latenza per fase,
+visualizzazione live nel terminale ed export in formato Prometheus
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import bisect
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Limiti superiori dei bucket degli istogrammi (secondi)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Istogramma a bucket fissi (compatibile con il formato Prometheus)"""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # ultimo bucket = +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Stima di un quantile (limite superiore del bucket che lo contiene)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+
+class ScanTelemetry:
+    """
+    Raccoglie metriche di una o più scansioni.
+    Thread-safe: lo stesso oggetto può essere condiviso tra scanner diversi
+    (es. tutti i job del demone).
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.started = clock()
+        self.hosts_planned = 0
+        self.hosts_completed = 0
+        self.hosts_up = 0
+        self.probes_total = 0
+        self.probes_by_state: Dict[str, int] = {}
+        self.in_flight = 0
+        self.stages: Dict[str, LatencyHistogram] = {}
+
+    # --- Hook chiamati dallo scanner ---
+
+    def add_hosts(self, count: int) -> None:
+        """Registra host da scansionare (si somma per scansioni concorrenti)"""
+        with self._lock:
+            self.hosts_planned += count
+
+    def probe_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def probe_finished(self, state: str, seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.probes_total += 1
+            self.probes_by_state[state] = self.probes_by_state.get(state, 0) + 1
+            self._observe("connect", seconds)
+
+    def probes_abandoned(self, count: int) -> None:
+        """Connessioni avviate e chiuse senza esito (sweep interrotto)"""
+        with self._lock:
+            self.in_flight -= count
+
+    def host_finished(self, host) -> None:
+        with self._lock:
+            self.hosts_completed += 1
+            if host.state == "up" or host.ports:
+                self.hosts_up += 1
+            self._observe("host", host.scan_time)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Registra la durata di una fase (discovery, dns, nmap, ...)"""
+        with self._lock:
+            self._observe(stage, seconds)
+
+    def _observe(self, stage: str, seconds: float) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    # --- Metriche derivate ---
+
+    @property
+    def elapsed(self) -> float:
+        return max(1e-9, self.clock() - self.started)
+
+    @property
+    def probes_per_second(self) -> float:
+        return self.probes_total / self.elapsed
+
+    @property
+    def timeout_ratio(self) -> float:
+        """Frazione di probe terminati in timeout (porte filtrate)"""
+        if not self.probes_total:
+            return 0.0
+        return self.probes_by_state.get("filtered", 0) / self.probes_total
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Secondi stimati al termine (None se non stimabile)"""
+        remaining = self.hosts_planned - self.hosts_completed
+        if remaining <= 0:
+            return 0.0
+        if not self.hosts_completed:
+            return None
+        return remaining * self.elapsed / self.hosts_completed
+
+    def snapshot(self) -> Dict:
+        """Copia coerente delle metriche principali"""
+        with self._lock:
+            return {
+                "elapsed": self.elapsed,
+                "hosts_planned": self.hosts_planned,
+                "hosts_completed": self.hosts_completed,
+                "hosts_up": self.hosts_up,
+                "probes_total": self.probes_total,
+                "probes_by_state": dict(self.probes_by_state),
+                "probes_per_second": self.probes_per_second,
+                "in_flight": self.in_flight,
+                "timeout_ratio": self.timeout_ratio,
+                "eta": self.eta,
+                "stages": {
+                    name: {"count": h.count, "mean": h.mean, "p95": h.quantile(0.95)}
+                    for name, h in self.stages.items()
+                },
+            }
+
+    def format_status(self) -> str:
+        """Riga di stato compatta per il terminale"""
+        s = self.snapshot()
+        eta = "--" if s["eta"] is None else f"{s['eta']:.0f}s"
+        return (
+            f"host {s['hosts_completed']}/{s['hosts_planned']} | "
+            f"{s['probes_per_second']:.0f} probe/s | "
+            f"in corso {s['in_flight']} | "
+            f"timeout {s['timeout_ratio']:.0%} | ETA {eta}"
+        )
+
+    # --- Export Prometheus ---
+
+    def to_prometheus(self) -> str:
+        """Metriche in formato testo Prometheus"""
+        with self._lock:
+            lines = [
+                "# HELP cybersentinel_hosts_planned Host da scansionare",
+                "# TYPE cybersentinel_hosts_planned gauge",
+                f"cybersentinel_hosts_planned {self.hosts_planned}",
+                "# HELP cybersentinel_hosts_completed_total Host completati",
+                "# TYPE cybersentinel_hosts_completed_total counter",
+                f"cybersentinel_hosts_completed_total {self.hosts_completed}",
+                "# HELP cybersentinel_hosts_up_total Host attivi trovati",
+                "# TYPE cybersentinel_hosts_up_total counter",
+                f"cybersentinel_hosts_up_total {self.hosts_up}",
+                "# HELP cybersentinel_probes_total Probe eseguiti per esito",
+                "# TYPE cybersentinel_probes_total counter",
+            ]
+            for state, n in sorted(self.probes_by_state.items()):
+                lines.append(f'cybersentinel_probes_total{{state="{state}"}} {n}')
+            lines += [
+                "# HELP cybersentinel_probes_in_flight Connessioni in corso",
+                "# TYPE cybersentinel_probes_in_flight gauge",
+                f"cybersentinel_probes_in_flight {self.in_flight}",
+                "# HELP cybersentinel_probes_per_second Throughput medio dei probe",
+                "# TYPE cybersentinel_probes_per_second gauge",
+                f"cybersentinel_probes_per_second {self.probes_per_second:.3f}",
+                "# HELP cybersentinel_timeout_ratio Frazione di probe in timeout",
+                "# TYPE cybersentinel_timeout_ratio gauge",
+                f"cybersentinel_timeout_ratio {self.timeout_ratio:.4f}",
+            ]
+            eta = self.eta
+            if eta is not None:
+                lines += [
+                    "# HELP cybersentinel_eta_seconds Tempo stimato al termine",
+                    "# TYPE cybersentinel_eta_seconds gauge",
+                    f"cybersentinel_eta_seconds {eta:.1f}",
+                ]
+
+            lines += [
+                "# HELP cybersentinel_stage_seconds Latenza per fase",
+                "# TYPE cybersentinel_stage_seconds histogram",
+            ]
+            for stage, h in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, n in zip(h.bounds, h.counts):
+                    cumulative += n
+                    lines.append(
+                        f'cybersentinel_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'cybersentinel_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}'
+                )
+                lines.append(f'cybersentinel_stage_seconds_sum{{stage="{stage}"}} {h.total:.6f}')
+                lines.append(f'cybersentinel_stage_seconds_count{{stage="{stage}"}} {h.count}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _metrics_handler():
+    """Handler HTTP delle metriche (http.server importato solo se serve)"""
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        """Espone /metrics in formato Prometheus"""
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = self.server.telemetry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return _MetricsHandler
+
+
+class MetricsServer:
+    """Endpoint HTTP locale con le metriche della telemetria"""
+
+    def __init__(self, telemetry: ScanTelemetry, host: str = "127.0.0.1", port: int = 9464):
+        from http.server import ThreadingHTTPServer
+
+        self.telemetry = telemetry
+        self._server = ThreadingHTTPServer((host, port), _metrics_handler())
+        self._server.daemon_threads = True
+        self._server.telemetry = telemetry
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class LiveProgress:
+    """
+    Mostra l'avanzamento nel terminale aggiornandolo periodicamente.
+    Usa tqdm se installato, altrimenti una riga riscritta su stderr.
+    """
+
+    def __init__(self, telemetry: ScanTelemetry, interval: float = 0.5, stream=None):
+        self.telemetry = telemetry
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._bar = None
+
+    def start(self) -> "LiveProgress":
+        try:
+            from tqdm import tqdm
+            self._bar = tqdm(
+                total=0, unit="host", file=self.stream, dynamic_ncols=True, leave=True
+            )
+        except ImportError:
+            self._bar = None
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _render(self) -> None:
+        if self._bar is not None:
+            snapshot = self.telemetry.snapshot()
+            self._bar.total = snapshot["hosts_planned"]
+            self._bar.n = snapshot["hosts_completed"]
+            self._bar.set_postfix_str(
+                f"{snapshot['probes_per_second']:.0f} probe/s, "
+                f"in corso {snapshot['in_flight']}, "
+                f"timeout {snapshot['timeout_ratio']:.0%}",
+                refresh=True
+            )
+        else:
+            self.stream.write("\r    " + self.telemetry.format_status() + "   ")
+            self.stream.flush()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._render()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._render()
+        if self._bar is not None:
+            self._bar.close()
+        else:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def format_stage_table(telemetry: ScanTelemetry) -> List[str]:
+    """Righe di riepilogo delle latenze per fase"""
+    rows = []
+    for name, stats in sorted(telemetry.snapshot()["stages"].items()):
+        rows.append(
+            f"{name:<10} n={stats['count']:<6} media {stats['mean'] * 1000:8.1f} ms"
+            f"   p95 <= {stats['p95'] * 1000:8.1f} ms"
+        )
+    return rows
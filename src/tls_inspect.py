@@ -0,0 +1,388 @@
+"""
+Ispezione TLS - CyberSentinel
+Certificato, versione del protocollo e cifrario dei servizi TLS aperti
+
+Per ogni porta TLS aperta esegue un handshake senza verifica (certificato,
+versione e cifrario negoziati). Le verifiche più lente (catena di fiducia,
+supporto a TLS 1.0/1.1) vengono ripetute solo quando il certificato cambia:
+l'esito è memorizzato per (ip, porta, impronta SHA-256) tra una scansione
+e l'altra.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import ssl
+import threading
+import time
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .scanner import HostResult, PortResult
+
+logger = logging.getLogger(__name__)
+
+# Porte su cui il servizio parla TLS fin dal primo byte
+TLS_PORTS = {443, 465, 636, 853, 990, 993, 995, 5061, 5986, 8443, 9443}
+
+_TLS_SERVICES = {"imaps", "pop3s", "smtps", "ldaps", "ftps"}
+
+EXPIRY_WARNING_DAYS = 30
+CACHE_TTL = 7 * 24 * 3600  # Le verifiche si ripetono comunque dopo una settimana
+
+# Cifrari senza cifratura, senza autenticazione o deboli
+_BROKEN_CIPHERS = ("NULL", "EXP", "ADH", "AECDH", "anon")
+_WEAK_CIPHERS = ("RC4", "DES", "MD5", "IDEA", "SEED")
+
+# OID in forma DER
+_OID_CN = bytes.fromhex("550403")
+_OID_O = bytes.fromhex("55040a")
+_OID_RSA = bytes.fromhex("2a864886f70d010101")
+_OID_EC = bytes.fromhex("2a8648ce3d0201")
+_EC_CURVES = {
+    bytes.fromhex("2a8648ce3d030107"): 256,  # P-256
+    bytes.fromhex("2b81040022"): 384,        # P-384
+    bytes.fromhex("2b81040023"): 521,        # P-521
+}
+_EDWARDS = {bytes.fromhex("2b6570"): 256, bytes.fromhex("2b6571"): 448}  # Ed25519, Ed448
+_WEAK_SIGNATURES = {
+    bytes.fromhex("2a864886f70d010104"): "MD5",
+    bytes.fromhex("2a864886f70d010105"): "SHA-1",
+}
+
+
+class CertificateError(ValueError):
+    """Certificato DER non interpretabile"""
+
+
+def _tlv(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """(tag, inizio contenuto, fine contenuto) dell'elemento DER in pos"""
+    if pos + 2 > len(data):
+        raise CertificateError("elemento DER troncato")
+    tag, length = data[pos], data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+    if pos + length > len(data):
+        raise CertificateError("lunghezza DER oltre la fine")
+    return tag, pos, pos + length
+
+
+def _children(data: bytes, start: int, end: int) -> List[Tuple[int, int, int]]:
+    items = []
+    while start < end:
+        item = _tlv(data, start)
+        items.append(item)
+        start = item[2]
+    return items
+
+
+def _name(data: bytes, start: int, end: int) -> Dict[str, str]:
+    """CN e O di un Name X.501"""
+    fields = {}
+    for _, rdn_start, rdn_end in _children(data, start, end):
+        for _, seq_start, seq_end in _children(data, rdn_start, rdn_end):
+            (_, oid_start, oid_end), (_, value_start, value_end) = _children(data, seq_start, seq_end)[:2]
+            oid = data[oid_start:oid_end]
+            key = "CN" if oid == _OID_CN else "O" if oid == _OID_O else None
+            if key and key not in fields:
+                fields[key] = data[value_start:value_end].decode("utf-8", "replace")
+    return fields
+
+
+def _time(data: bytes, tag: int, start: int, end: int) -> datetime:
+    text = data[start:end].decode("ascii")
+    fmt = "%y%m%d%H%M%SZ" if tag == 0x17 else "%Y%m%d%H%M%SZ"  # UTCTime / GeneralizedTime
+    return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+
+
+def _key_info(data: bytes, start: int, end: int) -> Tuple[str, int]:
+    """Tipo e dimensione in bit della chiave pubblica"""
+    (_, alg_start, alg_end), (_, bits_start, bits_end) = _children(data, start, end)[:2]
+    alg = _children(data, alg_start, alg_end)
+    oid = data[alg[0][1]:alg[0][2]]
+    if oid == _OID_RSA:
+        # BIT STRING: byte dei bit inutilizzati, poi SEQUENCE { modulo, esponente }
+        _, seq_start, seq_end = _tlv(data, bits_start + 1)
+        _, mod_start, mod_end = _children(data, seq_start, seq_end)[0]
+        return "RSA", int.from_bytes(data[mod_start:mod_end], "big").bit_length()
+    if oid == _OID_EC and len(alg) > 1:
+        return "EC", _EC_CURVES.get(data[alg[1][1]:alg[1][2]], 0)
+    if oid in _EDWARDS:
+        return "EdDSA", _EDWARDS[oid]
+    return "sconosciuta", 0
+
+
+def parse_certificate(der: bytes) -> Dict:
+    """
+    Campi principali di un certificato X.509 in formato DER
+
+    Args:
+        der: Certificato come restituito da getpeercert(binary_form=True)
+
+    Returns:
+        Dizionario con subject, issuer, not_before, not_after (datetime UTC),
+        self_signed, key_type, key_bits e weak_signature
+
+    Raises:
+        CertificateError: Se il certificato non è interpretabile
+    """
+    try:
+        _, cert_start, cert_end = _tlv(der, 0)
+        _, tbs_start, tbs_end = _children(der, cert_start, cert_end)[0]
+        fields = _children(der, tbs_start, tbs_end)
+        if fields[0][0] == 0xA0:  # [0] version esplicita
+            fields = fields[1:]
+        _, sig, issuer, validity, subject, spki = fields[:6]
+
+        sig_oid_start, sig_oid_end = _children(der, sig[1], sig[2])[0][1:]
+        not_before, not_after = (
+            _time(der, tag, start, end) for tag, start, end in _children(der, validity[1], validity[2])[:2]
+        )
+        key_type, key_bits = _key_info(der, spki[1], spki[2])
+    except (IndexError, ValueError) as e:
+        raise CertificateError(f"certificato non valido: {e}") from e
+
+    return {
+        "subject": _name(der, subject[1], subject[2]),
+        "issuer": _name(der, issuer[1], issuer[2]),
+        "not_before": not_before,
+        "not_after": not_after,
+        "self_signed": der[issuer[1]:issuer[2]] == der[subject[1]:subject[2]],
+        "key_type": key_type,
+        "key_bits": key_bits,
+        "weak_signature": _WEAK_SIGNATURES.get(der[sig_oid_start:sig_oid_end], ""),
+    }
+
+
+def _format_name(name: Dict[str, str]) -> str:
+    return ", ".join(f"{k}={v}" for k, v in name.items())
+
+
+def probe_context(version: Optional[ssl.TLSVersion] = None) -> ssl.SSLContext:
+    """Contesto senza verifica che accetta anche protocolli e cifrari obsoleti"""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)  # TLSVersion.TLSv1 deprecato
+        try:
+            context.set_ciphers("ALL:@SECLEVEL=0")
+            context.minimum_version = version or ssl.TLSVersion.TLSv1
+            if version:
+                context.maximum_version = version
+        except (ssl.SSLError, ValueError):
+            pass  # OpenSSL senza supporto: resta il minimo predefinito
+    return context
+
+
+def build_findings(cert: Dict, version: str, cipher: str, trusted: Optional[bool],
+                   verify_error: str, legacy: List[str], now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Problemi rilevati su certificato e configurazione TLS
+
+    Args:
+        cert: Campi del certificato (parse_certificate)
+        version: Versione negoziata (es. TLSv1.3)
+        cipher: Cifrario negoziato
+        trusted: Catena verificata (None se non determinabile)
+        verify_error: Motivo del rifiuto della catena
+        legacy: Versioni obsolete accettate dal server
+        now: Istante di riferimento (default: adesso)
+
+    Returns:
+        Lista di {level, title, recommendation} con level critical o warning
+    """
+    now = now or datetime.now(timezone.utc)
+    findings = []
+
+    def add(level: str, title: str, recommendation: str) -> None:
+        findings.append({"level": level, "title": title, "recommendation": recommendation})
+
+    days_left = (cert["not_after"] - now).days
+    expiry = cert["not_after"].strftime("%Y-%m-%d")
+    if cert["not_after"] <= now:
+        add("critical", f"Certificato TLS scaduto il {expiry}",
+            "Rinnovare subito il certificato: i client mostrano errori e gli utenti si abituano ad ignorarli.")
+    elif days_left <= EXPIRY_WARNING_DAYS:
+        add("warning", f"Certificato TLS in scadenza il {expiry} (tra {days_left} giorni)",
+            "Rinnovare il certificato e automatizzare il rinnovo (es. ACME/Let's Encrypt).")
+    elif cert["not_before"] > now:
+        add("warning", f"Certificato TLS non ancora valido (dal {cert['not_before']:%Y-%m-%d})",
+            "Verificare la data del certificato e l'orologio del server.")
+
+    if cert["self_signed"]:
+        add("warning", "Certificato autofirmato",
+            "Usare un certificato emesso da un'autorità riconosciuta o dalla CA interna distribuita ai client.")
+    elif trusted is False:
+        add("warning", f"Certificato non attendibile ({verify_error or 'catena non valida'})",
+            "Installare la catena completa dei certificati intermedi e verificare l'autorità emittente.")
+
+    if legacy:
+        add("warning", f"Protocolli obsoleti accettati: {', '.join(legacy)}",
+            "Disattivare TLS 1.0 e 1.1 e lasciare solo TLS 1.2 e 1.3.")
+    elif version in ("SSLv3", "TLSv1", "TLSv1.1"):
+        add("warning", f"Versione TLS obsoleta negoziata: {version}",
+            "Aggiornare il server per supportare TLS 1.2 e 1.3.")
+
+    if any(weak in cipher for weak in _BROKEN_CIPHERS):
+        add("critical", f"Cifrario senza protezione effettiva: {cipher}",
+            "Rimuovere i cifrari NULL, EXPORT e anonimi dalla configurazione del server.")
+    elif any(weak in cipher for weak in _WEAK_CIPHERS):
+        add("warning", f"Cifrario debole: {cipher}",
+            "Usare solo cifrari AEAD (AES-GCM, ChaCha20-Poly1305).")
+
+    minimum = 2048 if cert["key_type"] == "RSA" else 224
+    if 0 < cert["key_bits"] < minimum:
+        add("warning", f"Chiave {cert['key_type']} debole ({cert['key_bits']} bit)",
+            "Rigenerare il certificato con chiave RSA da almeno 2048 bit o ECDSA P-256.")
+    if cert["weak_signature"]:
+        add("warning", f"Certificato firmato con {cert['weak_signature']}",
+            "Riemettere il certificato con firma SHA-256 o superiore.")
+    return findings
+
+
+class TlsInspector:
+    """
+    Fase di ispezione TLS (vedi inspection.run_stage)
+
+    Args:
+        timeout: Timeout per connessione e handshake (secondi)
+        workers: Handshake in parallelo
+        cache_path: File JSON della cache tra scansioni (None: solo in memoria)
+    """
+
+    name = "tls"
+
+    def __init__(self, timeout: float = 3.0, workers: int = 16, cache_path: Optional[Path] = None):
+        self.timeout = timeout
+        self.workers = workers
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict] = self._load_cache()
+        self._dirty = False
+        self.cache_hits = 0
+
+    def wants(self, port: PortResult) -> bool:
+        """Porte TLS note o servizi riconosciuti come TLS da nmap"""
+        if port.protocol != "tcp":
+            return False
+        service = port.service.lower()
+        return port.port in TLS_PORTS or "https" in service or "ssl" in service or service in _TLS_SERVICES
+
+    def inspect(self, host: HostResult, port: PortResult) -> Optional[Dict]:
+        """
+        Handshake con il servizio e valutazione del certificato
+
+        Args:
+            host: Host della scansione (hostname usato per SNI e verifica)
+            port: Porta aperta
+
+        Returns:
+            Dizionario dei risultati oppure None se il servizio non parla TLS
+        """
+        server_name = host.hostname or None
+        try:
+            der, version, cipher = self._handshake(host.ip, port.port, probe_context(), server_name)
+        except (OSError, ssl.SSLError) as e:
+            logger.debug("Handshake TLS fallito su %s:%d: %s", host.ip, port.port, e)
+            return None
+        if not der:
+            return None
+
+        fingerprint = hashlib.sha256(der).hexdigest()
+        key = f"{host.ip}:{port.port}:{fingerprint}"
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and time.time() - cached["checked"] < CACHE_TTL:
+            with self._lock:
+                self.cache_hits += 1
+            checks = cached
+        else:
+            checks = self._slow_checks(host.ip, port.port, server_name)
+            checks["checked"] = time.time()
+            with self._lock:
+                self._cache[key] = checks
+                self._dirty = True
+
+        cert = parse_certificate(der)
+        findings = build_findings(cert, version, cipher, checks["trusted"], checks["verify_error"],
+                                  checks["legacy"])
+        days_left = (cert["not_after"] - datetime.now(timezone.utc)).days
+        return {
+            "version": version,
+            "cipher": cipher,
+            "subject": _format_name(cert["subject"]),
+            "issuer": _format_name(cert["issuer"]),
+            "not_after": cert["not_after"].strftime("%Y-%m-%d"),
+            "days_left": days_left,
+            "key": f"{cert['key_type']} {cert['key_bits']}",
+            "trusted": checks["trusted"],
+            "verify_error": checks["verify_error"],
+            "legacy_protocols": checks["legacy"],
+            "fingerprint": fingerprint,
+            "findings": findings,
+            "summary": f"{version}, certificato con scadenza {cert['not_after']:%Y-%m-%d}",
+        }
+
+    def finish(self) -> None:
+        """Salva la cache su disco (scrittura atomica)"""
+        if not (self.cache_path and self._dirty):
+            return
+        now = time.time()
+        with self._lock:
+            entries = {k: v for k, v in self._cache.items() if now - v["checked"] < CACHE_TTL}
+            self._dirty = False
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entries), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning("Impossibile salvare la cache TLS %s: %s", self.cache_path, e)
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        if not (self.cache_path and self.cache_path.exists()):
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning("Cache TLS illeggibile %s: %s", self.cache_path, e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _handshake(self, ip: str, port: int, context: ssl.SSLContext,
+                   server_name: Optional[str]) -> Tuple[bytes, str, str]:
+        with socket.create_connection((ip, port), timeout=self.timeout) as raw:
+            with context.wrap_socket(raw, server_hostname=server_name) as tls:
+                return tls.getpeercert(binary_form=True), tls.version() or "", tls.cipher()[0]
+
+    def _slow_checks(self, ip: str, port: int, server_name: Optional[str]) -> Dict:
+        """Catena di fiducia e protocolli obsoleti: ripetuti solo se cambia il certificato"""
+        trusted, verify_error = None, ""
+        context = ssl.create_default_context()
+        context.check_hostname = server_name is not None
+        try:
+            self._handshake(ip, port, context, server_name)
+            trusted = True
+        except ssl.SSLCertVerificationError as e:
+            trusted, verify_error = False, e.verify_message or str(e)
+        except (OSError, ssl.SSLError) as e:
+            logger.debug("Verifica catena non conclusa su %s:%d: %s", ip, port, e)
+
+        legacy = []
+        for version, label in ((ssl.TLSVersion.TLSv1, "TLSv1.0"), (ssl.TLSVersion.TLSv1_1, "TLSv1.1")):
+            try:
+                self._handshake(ip, port, probe_context(version), server_name)
+                legacy.append(label)
+            except (OSError, ssl.SSLError):
+                pass
+        return {"trusted": trusted, "verify_error": verify_error, "legacy": legacy}
@@ -0,0 +1,405 @@
+"""
+Scanner UDP - CyberSentinel
+Scansione UDP concorrente per DNS, SNMP, NTP, SSDP e altri servizi esposti
+
+Poche socket UDP non bloccanti condivise inviano tutte le sonde; le
+risposte vengono abbinate alla sonda tramite (ip, porta) di provenienza.
+Ogni servizio riceve un payload specifico (un datagramma vuoto non
+ottiene risposta dalla maggior parte dei servizi).
+
+Esiti:
+- open:     il servizio ha risposto
+- closed:   ICMP port unreachable (solo Linux, via IP_RECVERR)
+- filtered: nessuna risposta dopo i tentativi (open|filtered per nmap)
+            oppure ICMP di divieto amministrativo
+
+Le sonde senza risposta vengono ritrasmesse con timeout adattivo
+calcolato sui tempi di risposta osservati (RFC 6298).
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import errno
+import heapq
+import logging
+import re
+import selectors
+import socket
+import struct
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .scanner import HostResult, PortResult
+from .targets import normalize_address
+
+logger = logging.getLogger(__name__)
+
+# Payload per porta: richieste minime che ottengono una risposta
+UDP_PAYLOADS: Dict[int, bytes] = {
+    # DNS: query NS per la radice
+    53: b"\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x01",
+    # TFTP: lettura di un file inesistente (risponde con un errore)
+    69: b"\x00\x01cybersentinel.txt\x00octet\x00",
+    # NTP: richiesta client (modo 3, versione 4)
+    123: b"\xe3" + b"\x00" * 47,
+    # NetBIOS Name Service: NBSTAT "*"
+    137: (b"\x80\x01\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00"
+          b"\x20CKAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\x00\x00\x21\x00\x01"),
+    # SNMP v1: GetRequest sysDescr.0, community "public"
+    161: (b"\x30\x26\x02\x01\x00\x04\x06public\xa0\x19\x02\x01\x01\x02\x01\x00"
+          b"\x02\x01\x00\x30\x0e\x30\x0c\x06\x08\x2b\x06\x01\x02\x01\x01\x01\x00\x05\x00"),
+    # SQL Server Browser: elenco istanze
+    1434: b"\x02",
+    # SSDP/UPnP: M-SEARCH
+    1900: (b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\n"
+           b"MAN: \"ssdp:discover\"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n"),
+    # mDNS: elenco dei servizi
+    5353: (b"\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00"
+           b"\x09_services\x07_dns-sd\x04_udp\x05local\x00\x00\x0c\x00\x01"),
+    # Memcached: comando version con intestazione UDP
+    11211: b"\x00\x01\x00\x00\x00\x01\x00\x00version\r\n",
+}
+
+DEFAULT_UDP_PORTS = sorted(UDP_PAYLOADS)
+
+UDP_SERVICES = {
+    53: "DNS",
+    69: "TFTP",
+    123: "NTP",
+    137: "NetBIOS-NS",
+    161: "SNMP",
+    1434: "SQL Server Browser",
+    1900: "SSDP/UPnP",
+    5353: "mDNS",
+    11211: "Memcached",
+}
+
+# Servizi che rispondono da una porta diversa da quella interrogata
+_REPLY_FROM_OTHER_PORT = (69,)
+
+# Linux: errori ICMP letti dalla coda errori della socket
+# (costanti non esposte da tutte le versioni di Python)
+_RECVERR = sys.platform.startswith("linux")
+_IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+_IPV6_RECVERR = getattr(socket, "IPV6_RECVERR", 25)
+_MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+_ORIGIN_ICMP, _ORIGIN_ICMP6 = 2, 3
+
+_SNMP_SYSDESCR = b"\x06\x08\x2b\x06\x01\x02\x01\x01\x01\x00\x04"
+
+
+def icmp_state(origin: int, icmp_type: int, code: int) -> Optional[str]:
+    """
+    Stato della sonda da un errore ICMP/ICMPv6
+
+    Returns:
+        closed, filtered, unreachable (tutto l'host) oppure None se non ICMP
+    """
+    if origin == _ORIGIN_ICMP and icmp_type == 3:
+        if code == 3:
+            return "closed"
+        if code in (0, 1):
+            return "unreachable"
+        return "filtered"  # 9, 10, 13: divieto amministrativo
+    if origin == _ORIGIN_ICMP6 and icmp_type == 1:
+        if code == 4:
+            return "closed"
+        if code in (0, 3):
+            return "unreachable"
+        return "filtered"
+    return None
+
+
+def describe_response(port: int, data: bytes) -> str:
+    """Versione del servizio ricavata dalla risposta, se riconoscibile"""
+    try:
+        if port == 123 and len(data) >= 2:
+            return f"NTPv{(data[0] >> 3) & 7} stratum {data[1]}"
+        if port == 161:
+            start = data.find(_SNMP_SYSDESCR)
+            if start >= 0:
+                pos = start + len(_SNMP_SYSDESCR)
+                length = data[pos]
+                if length & 0x80:
+                    size = length & 0x7f
+                    length = int.from_bytes(data[pos + 1:pos + 1 + size], "big")
+                    pos += size
+                return data[pos + 1:pos + 1 + length].decode("utf-8", "replace").strip()
+        if port == 1900:
+            match = re.search(rb"(?im)^server:\s*(.+?)\s*$", data)
+            if match:
+                return match.group(1).decode("utf-8", "replace")
+        if port == 11211:
+            match = re.search(rb"VERSION (\S+)", data)
+            if match:
+                return f"memcached {match.group(1).decode('ascii', 'replace')}"
+    except IndexError:
+        pass
+    return ""
+
+
+class RttEstimator:
+    """
+    Timeout adattivo (RFC 6298): srtt + 4 * rttvar
+
+    Args:
+        initial: Timeout prima della prima misura (secondi)
+        minimum: Timeout minimo
+        maximum: Timeout massimo (default: initial)
+    """
+
+    def __init__(self, initial: float, minimum: float = 0.05, maximum: Optional[float] = None):
+        self.minimum = minimum
+        self.maximum = maximum if maximum is not None else initial
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self._initial = initial
+
+    def observe(self, sample: float) -> None:
+        """Aggiunge una misura (solo da sonde non ritrasmesse: algoritmo di Karn)"""
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - sample)
+            self.srtt = 0.875 * self.srtt + 0.125 * sample
+
+    @property
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return self._initial
+        return min(self.maximum, max(self.minimum, self.srtt + 4 * self.rttvar))
+
+
+class UdpScanner:
+    """
+    Scanner UDP con sonde concorrenti su socket condivise
+
+    Args:
+        ports: Porte UDP (default: DEFAULT_UDP_PORTS)
+        timeout: Timeout massimo per tentativo (secondi)
+        retries: Ritrasmissioni dopo il primo invio
+        sockets: Socket condivise per famiglia di indirizzi
+        max_in_flight: Sonde in attesa di risposta contemporaneamente
+    """
+
+    def __init__(
+        self,
+        ports: Optional[List[int]] = None,
+        timeout: float = 1.0,
+        retries: int = 2,
+        sockets: int = 4,
+        max_in_flight: int = 1024
+    ):
+        self.ports = ports or DEFAULT_UDP_PORTS
+        self.timeout = timeout
+        self.retries = retries
+        self.socket_count = max(1, sockets)
+        self.max_in_flight = max(1, max_in_flight)
+
+    def _open_sockets(self, family: int) -> List[socket.socket]:
+        sockets = []
+        for _ in range(self.socket_count):
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            if _RECVERR:
+                try:
+                    if family == socket.AF_INET6:
+                        sock.setsockopt(socket.IPPROTO_IPV6, _IPV6_RECVERR, 1)
+                    else:
+                        sock.setsockopt(socket.IPPROTO_IP, _IP_RECVERR, 1)
+                except OSError:
+                    pass
+            sockets.append(sock)
+        return sockets
+
+    def scan(self, ip_list: List[str], cancel=None) -> List[HostResult]:
+        """
+        Scansiona le porte UDP di tutti gli IP
+
+        Args:
+            ip_list: Indirizzi IPv4/IPv6
+            cancel: CancelToken; se annullato le sonde senza esito vengono
+                abbandonate (non contano né come aperte né come filtrate)
+
+        Returns:
+            Un HostResult per IP, nello stesso ordine (porte aperte con protocol="udp")
+        """
+        start = time.time()
+        ips = [normalize_address(ip) for ip in ip_list]
+        states: Dict[str, Dict[int, str]] = {ip: {} for ip in ips}
+        versions: Dict[Tuple[str, int], str] = {}
+        unreachable = set()
+
+        # Porta esterna: le sonde dello stesso host sono distanziate (limiti ICMP)
+        queue: Deque[Tuple[str, int]] = deque((ip, port) for port in self.ports for ip in ips)
+        pending: Dict[Tuple[str, int], List] = {}  # chiave -> [tentativi, inviata alle]
+        timers: List = []
+        rtt = RttEstimator(self.timeout)
+
+        selector = selectors.DefaultSelector()
+        pools: Dict[int, List[socket.socket]] = {}
+
+        def sockets_for(ip: str) -> List[socket.socket]:
+            family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+            if family not in pools:
+                pools[family] = self._open_sockets(family)
+                for sock in pools[family]:
+                    selector.register(sock, selectors.EVENT_READ)
+            return pools[family]
+
+        def resolve(key: Tuple[str, int], state: str) -> None:
+            if key[0] not in states or key[1] not in self.ports:
+                return
+            probe = pending.pop(key, None)
+            if state == "unreachable":
+                unreachable.add(key[0])
+                return
+            if state == "open" and probe is not None and probe[0] == 1:
+                rtt.observe(time.monotonic() - probe[1])
+            # Una risposta tardiva vince su un timeout già registrato
+            if state == "open" or key[1] not in states[key[0]]:
+                states[key[0]][key[1]] = state
+
+        def send(key: Tuple[str, int]) -> bool:
+            ip, port = key
+            pool = sockets_for(ip)
+            sock = pool[hash(key) % len(pool)]
+            payload = UDP_PAYLOADS.get(port, b"")
+            for _ in range(3):
+                try:
+                    sock.sendto(payload, key)
+                    break
+                except BlockingIOError:
+                    return False
+                except ConnectionRefusedError:
+                    # Errore ICMP di una sonda precedente: il datagramma non è partito
+                    self._drain_errors(sock, resolve)
+                except OSError as e:
+                    unreach = e.errno in (errno.EHOSTUNREACH, errno.ENETUNREACH)
+                    resolve(key, "unreachable" if unreach else "filtered")
+                    return True
+            else:
+                return False
+
+            probe = pending.setdefault(key, [0, 0.0])
+            probe[0] += 1
+            probe[1] = time.monotonic()
+            deadline = probe[1] + rtt.timeout * (2 ** (probe[0] - 1))
+            heapq.heappush(timers, (deadline, probe[0], key))
+            return True
+
+        try:
+            while (queue or pending) and not (cancel and cancel.cancelled):
+                # Nuove sonde fino al limite di concorrenza
+                while queue and len(pending) < self.max_in_flight:
+                    key = queue.popleft()
+                    if key[0] in unreachable:
+                        continue
+                    if not send(key):
+                        queue.appendleft(key)
+                        break
+
+                wait = 0.05
+                if timers:
+                    wait = max(0.0, min(wait, timers[0][0] - time.monotonic()))
+
+                for selected, _ in selector.select(wait):
+                    self._receive(selected.fileobj, pending, states, versions, resolve)
+
+                # Sonde scadute: ritrasmissione o rinuncia
+                now = time.monotonic()
+                while timers and timers[0][0] <= now:
+                    _, attempt, key = heapq.heappop(timers)
+                    probe = pending.get(key)
+                    if probe is None or probe[0] != attempt:
+                        continue
+                    if key[0] in unreachable:
+                        pending.pop(key)
+                    elif attempt <= self.retries:
+                        if not send(key):
+                            heapq.heappush(timers, (now + 0.01, attempt, key))
+                    else:
+                        resolve(key, "filtered")
+        finally:
+            selector.close()
+            for pool in pools.values():
+                for sock in pool:
+                    sock.close()
+
+        elapsed = time.time() - start
+        results = []
+        for ip in ips:
+            host_states = states[ip]
+            ports = [
+                PortResult(
+                    port=port,
+                    state="open",
+                    service=UDP_SERVICES.get(port, "unknown"),
+                    version=versions.get((ip, port), ""),
+                    protocol="udp"
+                )
+                for port in self.ports if host_states.get(port) == "open"
+            ]
+            closed = sum(1 for s in host_states.values() if s == "closed")
+            if ip in unreachable:
+                state = "unreachable"
+            elif ports or closed:
+                state = "up"  # anche un ICMP port unreachable prova che l'host esiste
+            else:
+                state = "unknown"
+            results.append(HostResult(
+                ip=ip,
+                state=state,
+                ports=ports,
+                scan_time=elapsed,
+                closed_count=closed,
+                filtered_count=sum(1 for s in host_states.values() if s == "filtered")
+            ))
+        return results
+
+    @staticmethod
+    def _drain_errors(sock: socket.socket, resolve) -> None:
+        """Legge gli errori ICMP accodati (Linux) e risolve le sonde relative"""
+        if not _RECVERR:
+            return
+        while True:
+            try:
+                _, ancdata, _, address = sock.recvmsg(512, 512, _MSG_ERRQUEUE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            for _, _, data in ancdata:
+                if len(data) < 8:
+                    continue
+                _, origin, icmp_type, code = struct.unpack_from("=IBBB", data)
+                state = icmp_state(origin, icmp_type, code)
+                if state and address:
+                    resolve((normalize_address(address[0]), address[1]), state)
+
+    @staticmethod
+    def _receive(sock, pending, states, versions, resolve) -> None:
+        """Svuota la socket: errori ICMP e risposte dei servizi"""
+        UdpScanner._drain_errors(sock, resolve)
+        while True:
+            try:
+                data, address = sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # Errore ICMP in sospeso: i dettagli sono nella coda errori
+                UdpScanner._drain_errors(sock, resolve)
+                return
+
+            ip, port = normalize_address(address[0]), address[1]
+            key = (ip, port)
+            if key not in pending and ip in states:
+                # Risposta da un'altra porta (es. TFTP)
+                key = next(((ip, p) for p in _REPLY_FROM_OTHER_PORT if (ip, p) in pending), key)
+            version = describe_response(key[1], data)
+            if version and key[0] in states:
+                versions[key] = version
+            resolve(key, "open")
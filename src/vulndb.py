@@ -0,0 +1,272 @@
+"""
+Indice Vulnerabilità - CyberSentinel
+Confronto offline delle versioni dei servizi con vulnerabilità note e fine supporto
+
+Il dataset (JSON locale, nessuna connessione) elenca per ogni prodotto gli
+intervalli di versioni vulnerabili. Per ogni prodotto gli estremi degli
+intervalli vengono ordinati una volta sola: ogni tratto tra due estremi
+consecutivi conosce già gli avvisi che lo coprono, e la ricerca di una
+versione è una bisezione sull'array ordinato.
+
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import logging
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .scanner import HostResult, PortResult
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE = Path(__file__).parent / "data" / "vulnerabilities.json"
+
+_VERSION = r"\d+(?:\.\d+)*(?:[a-z]+\d*)?"
+_VERSION_TOKEN = re.compile(r"\d+|[a-z]+")
+
+
+def version_key(version: str) -> Tuple:
+    """
+    Chiave ordinabile di una versione (8.2p1 < 8.9 < 9.8p1 < 9.10)
+
+    Numeri confrontati come numeri, lettere come testo; una versione
+    è minore delle sue estensioni (1.0.1 < 1.0.1g, 9.8 < 9.8p1).
+    """
+    return tuple(
+        (1, int(token), "") if token.isdigit() else (0, 0, token)
+        for token in _VERSION_TOKEN.findall(version.lower())
+    )
+
+
+@dataclass(frozen=True)
+class Advisory:
+    """Vulnerabilità o fine supporto per un intervallo di versioni"""
+    id: str
+    product: str
+    title: str
+    ranges: Tuple[Tuple[Optional[str], Optional[str]], ...]  # [da incluso, a escluso)
+    recommendation: str = ""
+    exploited: bool = False  # Sfruttata attivamente (es. catalogo CISA KEV)
+    eol: bool = False        # Versione senza più aggiornamenti di sicurezza
+
+    @property
+    def level(self) -> str:
+        """Livello del problema per il classificatore"""
+        return "critical" if self.exploited else "warning"
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Advisory":
+        return cls(
+            id=data["id"],
+            product=data["product"].lower(),
+            title=data["title"],
+            ranges=tuple((r[0], r[1]) for r in data["ranges"]),
+            recommendation=data.get("recommendation", ""),
+            exploited=bool(data.get("exploited", False)),
+            eol=bool(data.get("eol", False)),
+        )
+
+
+class _ProductIndex:
+    """Avvisi di un prodotto per tratti tra estremi ordinati"""
+
+    def __init__(self, advisories: Sequence[Advisory]):
+        keys = {version_key(v) for a in advisories for r in a.ranges for v in r if v}
+        self.bounds: List[Tuple] = sorted(keys)
+        position = {key: i for i, key in enumerate(self.bounds)}
+
+        # Tratto i = [bounds[i-1], bounds[i]): aperture e chiusure per tratto
+        opening: Dict[int, List[Advisory]] = {}
+        closing: Dict[int, List[Advisory]] = {}
+        for advisory in advisories:
+            for low, high in advisory.ranges:
+                start = position[version_key(low)] + 1 if low else 0
+                end = position[version_key(high)] + 1 if high else len(self.bounds) + 1
+                opening.setdefault(start, []).append(advisory)
+                closing.setdefault(end, []).append(advisory)
+
+        active: Dict[str, Tuple[Advisory, int]] = {}
+        self.segments: List[Tuple[Advisory, ...]] = []
+        current: Tuple[Advisory, ...] = ()
+        for i in range(len(self.bounds) + 1):
+            changed = False
+            for advisory in closing.get(i, ()):
+                item, count = active[advisory.id]
+                if count == 1:
+                    del active[advisory.id]
+                else:
+                    active[advisory.id] = (item, count - 1)
+                changed = True
+            for advisory in opening.get(i, ()):
+                item, count = active.get(advisory.id, (advisory, 0))
+                active[advisory.id] = (item, count + 1)
+                changed = True
+            if changed:  # tratti uguali condividono la stessa tupla
+                current = tuple(item for item, _ in active.values())
+            self.segments.append(current)
+
+    def match(self, version: str) -> Tuple[Advisory, ...]:
+        return self.segments[bisect_right(self.bounds, version_key(version))]
+
+
+class VulnerabilityIndex:
+    """
+    Indice degli avvisi per prodotto normalizzato e versione
+
+    Args:
+        advisories: Avvisi da indicizzare
+        aliases: Nomi con cui il prodotto compare nei banner, per prodotto
+    """
+
+    def __init__(self, advisories: Iterable[Advisory], aliases: Optional[Dict[str, List[str]]] = None):
+        by_product: Dict[str, List[Advisory]] = {}
+        for advisory in advisories:
+            by_product.setdefault(advisory.product, []).append(advisory)
+        self._products = {product: _ProductIndex(items) for product, items in by_product.items()}
+        self.size = sum(len(items) for items in by_product.values())
+
+        # Alias -> prodotto; nel banner il prodotto è seguito dalla versione
+        self._aliases: Dict[str, str] = {product: product for product in self._products}
+        for product, names in (aliases or {}).items():
+            for name in names:
+                self._aliases[_normalise(name)] = product.lower()
+        alternatives = "|".join(
+            r"[\s_-]+".join(map(re.escape, alias.split()))
+            for alias in sorted(self._aliases, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"(?<![a-z0-9])({alternatives})[\s/_-]+v?({_VERSION})")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def identify(self, banner: str) -> List[Tuple[str, str]]:
+        """
+        Prodotti e versioni citati in un banner
+
+        Args:
+            banner: Es. "OpenSSH 8.2p1 Ubuntu" o "Apache/2.4.49 (Unix) OpenSSL/1.0.2k"
+
+        Returns:
+            Lista di (prodotto normalizzato, versione)
+        """
+        found = []
+        for match in self._pattern.finditer(banner.lower()):
+            product = self._aliases[_normalise(match.group(1))]
+            if (product, match.group(2)) not in found:
+                found.append((product, match.group(2)))
+        return found
+
+    def match(self, product: str, version: str) -> Tuple[Advisory, ...]:
+        """Avvisi che coprono la versione del prodotto"""
+        index = self._products.get(product.lower())
+        return index.match(version) if index else ()
+
+    def lookup(self, banner: str) -> List[Tuple[str, str, Advisory]]:
+        """
+        Avvisi per tutti i prodotti di un banner
+
+        Returns:
+            Lista di (prodotto, versione, avviso)
+        """
+        return [
+            (product, version, advisory)
+            for product, version in self.identify(banner)
+            for advisory in self.match(product, version)
+        ]
+
+
+def _normalise(name: str) -> str:
+    return " ".join(re.split(r"[\s_-]+", name.lower().strip()))
+
+
+def _read_dataset(path: Path) -> Tuple[List[Advisory], Dict[str, List[str]]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [Advisory.from_dict(a) for a in data.get("advisories", [])], data.get("aliases", {})
+
+
+@lru_cache(maxsize=8)
+def load_index(extra: Tuple[str, ...] = ()) -> VulnerabilityIndex:
+    """
+    Indice dal dataset incluso più eventuali dataset locali
+
+    Args:
+        extra: Percorsi di altri file JSON nello stesso formato
+
+    Returns:
+        VulnerabilityIndex (memorizzato per gli stessi percorsi)
+
+    Raises:
+        OSError, ValueError: Se un dataset non è leggibile
+    """
+    advisories, aliases = _read_dataset(DATA_FILE)
+    for path in extra:
+        more, more_aliases = _read_dataset(Path(path))
+        advisories += more
+        for product, names in more_aliases.items():
+            aliases.setdefault(product, []).extend(names)
+    logger.debug("Indice vulnerabilità: %d avvisi", len(advisories))
+    return VulnerabilityIndex(advisories, aliases)
+
+
+class VulnerabilityMatcher:
+    """
+    Fase di confronto delle versioni (vedi inspection.run_stage)
+
+    Non apre connessioni: usa PortResult.version (nmap, banner, intestazione
+    Server), quindi va eseguita dopo le fasi che la completano.
+
+    Args:
+        index: Indice da usare (default: load_index())
+    """
+
+    name = "vulns"
+    workers = 1  # Solo CPU: ricerche di pochi microsecondi
+    offline = True  # Nessuna connessione: eseguita anche dopo l'annullamento
+
+    def __init__(self, index: Optional[VulnerabilityIndex] = None):
+        self.index = index or load_index()
+        self._seen: Dict[str, List[Tuple[str, str, Advisory]]] = {}
+
+    def wants(self, port: PortResult) -> bool:
+        return bool(port.version)
+
+    def inspect(self, host: HostResult, port: PortResult) -> Optional[Dict]:
+        """
+        Avvisi per la versione del servizio
+
+        Returns:
+            Dizionario dei risultati oppure None se nessun avviso corrisponde
+        """
+        matches = self._seen.get(port.version)
+        if matches is None:
+            matches = self._seen[port.version] = self.index.lookup(port.version)
+        if not matches:
+            return None
+
+        findings = []
+        for product, version, advisory in matches:
+            findings.append({
+                "level": advisory.level,
+                "title": f"{advisory.id} ({product} {version}): {advisory.title}",
+                "recommendation": advisory.recommendation
+                or f"Aggiornare {product} a una versione supportata e corretta.",
+            })
+        exploited = sum(1 for *_, a in matches if a.exploited)
+        summary = f"{len(matches)} vulnerabilità o fine supporto per la versione rilevata"
+        if exploited:
+            summary += f" ({exploited} sfruttate attivamente)"
+        return {
+            "advisories": [
+                {"id": a.id, "product": product, "version": version,
+                 "exploited": a.exploited, "eol": a.eol}
+                for product, version, a in matches
+            ],
+            "findings": findings,
+            "summary": summary,
+        }
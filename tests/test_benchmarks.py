@@ -0,0 +1,66 @@
+"""
+Test per la rete simulata e il confronto dei benchmark
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import socket
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import PortScanner
+from benchmarks.fakenet import FakeNetwork
+from benchmarks.suite import compare
+
+
+class TestFakeNetwork:
+    """Comportamenti della rete simulata"""
+
+    def test_behaviours(self):
+        hosts = {
+            "127.21.0.1": {2222: "open", 22: "banner", 8080: "filtered"},
+            "127.21.0.2": {80: "slow"},
+        }
+        with FakeNetwork(hosts, delay=0.05):
+            scanner = PortScanner(ports=[22, 2222, 8080, 3389], timeout=0.3, use_nmap=False)
+            states = {p: scanner._probe_port("127.21.0.1", p) for p in scanner.ports}
+            assert states[22].state == "open"
+            assert states[2222].state == "open"
+            assert states[3389].state == "closed"
+            assert states[8080].state == "filtered"
+
+            with socket.create_connection(("127.21.0.1", 22), timeout=1) as sock:
+                assert sock.recv(64).startswith(b"SSH-2.0")
+            with socket.create_connection(("127.21.0.2", 80), timeout=1) as sock:
+                assert sock.recv(64).startswith(b"HTTP/1.0 200")
+
+    def test_generate_is_reproducible(self):
+        first = FakeNetwork.generate(20, [22, 80, 445], seed=7)
+        second = FakeNetwork.generate(20, [22, 80, 445], seed=7)
+        assert first.hosts == second.hosts
+        assert any(first.expected_open().values())
+
+    def test_invalid_behaviour(self):
+        with pytest.raises(ValueError):
+            FakeNetwork({"127.21.0.1": {22: "strano"}})
+
+
+class TestCompare:
+    """Rilevamento delle regressioni"""
+
+    def _results(self, seconds, size=100, mismatches=0):
+        return {"results": {"scan": {"seconds": seconds, "size": size, "mismatches": mismatches}}}
+
+    def test_regression_detected(self):
+        assert compare(self._results(1.3), self._results(1.0), threshold=0.2)
+        assert not compare(self._results(1.1), self._results(1.0), threshold=0.2)
+
+    def test_different_size_ignored(self):
+        assert not compare(self._results(5.0, size=200), self._results(1.0))
+
+    def test_accuracy_regression(self):
+        assert compare(self._results(1.0, mismatches=2), self._results(1.0))
@@ -0,0 +1,199 @@
+"""
+Test per scadenza, annullamento e risultati parziali
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import socket
+import time
+from datetime import datetime
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.cancel import DEADLINE, INTERRUPTED, CancelToken
+from src.distributed import ScanCoordinator
+from src.inspection import run_inspections
+from src.report_text import incomplete_notice
+from src.scanner import HostResult, PortResult, PortScanner, ScanResult
+from src.sweep import ConnectSweep, RateLimiter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCancelToken:
+    """Scadenza, motivo e attese limitate"""
+
+    def test_deadline(self):
+        clock = _Clock()
+        cancel = CancelToken(10, clock=clock)
+        assert not cancel.cancelled and cancel.reason is None
+        assert cancel.timeout(2.0) == 2.0
+        clock.now += 9.5
+        assert cancel.timeout(2.0) == pytest.approx(0.5)
+        clock.now += 1
+        assert cancel.cancelled and cancel.reason == DEADLINE
+        assert cancel.remaining() == 0.0
+
+    def test_first_reason_wins(self):
+        cancel = CancelToken()
+        assert cancel.remaining() is None
+        cancel.cancel()
+        cancel.cancel(DEADLINE)
+        assert cancel.reason == INTERRUPTED
+        assert cancel.sleep(5) is True
+
+    def test_call(self):
+        cancel = CancelToken(0.2)
+        start = time.monotonic()
+        assert cancel.call(time.sleep, 5, default="scaduto") == "scaduto"
+        assert time.monotonic() - start < 1
+        assert CancelToken().call(sum, [1, 2]) == 3
+        with pytest.raises(socket.herror):
+            CancelToken().call(_raise_herror)
+
+
+def _raise_herror():
+    raise socket.herror("nessun nome")
+
+
+@pytest.fixture
+def no_reverse_dns(monkeypatch):
+    monkeypatch.setattr(socket, "gethostbyaddr", _raise_herror)
+
+
+class TestPartialScan:
+    """La scansione restituisce quanto raccolto alla scadenza"""
+
+    def test_socket_scan_deadline(self, no_reverse_dns):
+        scanner = PortScanner(ports=[22] + list(range(80, 90)), timeout=0.1, use_nmap=False)
+
+        def probe(ip, port, cancel=None):
+            time.sleep(0.03)
+            return PortResult(port, "open" if port == 22 else "closed")
+
+        scanner._probe_port = probe
+        start = time.monotonic()
+        result = scanner.scan("192.0.2.0/29", cancel=CancelToken(0.4))
+        assert time.monotonic() - start < 1.5
+
+        assert result.complete is False
+        coverage = result.coverage
+        assert coverage["reason"] == DEADLINE
+        assert coverage["hosts_total"] == 6
+        assert 1 <= coverage["hosts_scanned"] < 6
+        assert coverage["ports_probed"] < coverage["ports_total"] == 66
+        assert all(h.ports[0].port == 22 for h in result.hosts)
+
+    def test_complete_scan_unchanged(self, no_reverse_dns):
+        scanner = PortScanner(ports=[22, 80], timeout=0.1, use_nmap=False)
+        scanner._probe_port = lambda ip, port, cancel=None: PortResult(port, "closed")
+        result = scanner.scan("192.0.2.1", cancel=CancelToken(30))
+        assert result.complete is True and "reason" not in result.coverage
+        assert result.coverage["ports_probed"] == 2
+
+    def test_sweep_stops(self):
+        sweep = ConnectSweep(timeout=0.5, concurrency=4, limiter=RateLimiter(10))
+        start = time.monotonic()
+        outcomes = list(sweep.run("127.0.0.1", range(20000, 20100), CancelToken(0.3)))
+        assert time.monotonic() - start < 1
+        assert len(outcomes) < 10
+
+    def test_nmap_terminated(self, tmp_path, monkeypatch):
+        fake = tmp_path / "nmap"
+        fake.write_text(
+            f"#!{sys.executable}\n"
+            "import sys, time\n"
+            "sys.stdin.read()\n"
+            "print('<?xml version=\"1.0\"?><nmaprun><host><status state=\"up\"/>"
+            "<address addr=\"192.0.2.1\" addrtype=\"ipv4\"/><ports>"
+            "<port protocol=\"tcp\" portid=\"22\"><state state=\"open\"/>"
+            "<service name=\"ssh\"/></port></ports></host>', flush=True)\n"
+            "time.sleep(30)\n"
+        )
+        fake.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}:{Path(sys.executable).parent}")
+        monkeypatch.setattr(PortScanner, "_nmap_checked", True)
+
+        start = time.monotonic()
+        result = PortScanner(ports=[22], timeout=0.5).scan("192.0.2.0/30", cancel=CancelToken(1))
+        assert time.monotonic() - start < 5
+        assert [(h.ip, h.ports[0].port) for h in result.hosts] == [("192.0.2.1", 22)]
+        assert result.complete is False
+        assert result.coverage["hosts_scanned"] == 1
+
+
+class _Inspector:
+    def __init__(self, name, offline=False):
+        self.name = name
+        self.offline = offline
+        self.workers = 1
+
+    def wants(self, port):
+        return True
+
+    def inspect(self, host, port):
+        return {"ok": True}
+
+
+class TestPartialResults:
+    """Ispezioni, copertura e avviso nei report"""
+
+    def _result(self):
+        return ScanResult(target="10.0.0.0/30", start_time=datetime(2026, 1, 1), hosts=[
+            HostResult(ip="10.0.0.1", state="up",
+                       ports=[PortResult(port=22, state="open"), PortResult(port=80, state="open")])])
+
+    def test_inspections_after_cancel(self):
+        result = self._result()
+        cancel = CancelToken()
+        cancel.cancel()
+        counts = run_inspections(result, [_Inspector("http"), _Inspector("vulns", offline=True)], cancel)
+        assert counts == {"http": 0, "vulns": 2}
+        assert result.coverage["ports_not_inspected"] == 2
+        assert result.complete is False and result.coverage["reason"] == INTERRUPTED
+
+    def test_serialization_and_extend(self):
+        first = self._result()
+        first.coverage = {"hosts_total": 4, "hosts_scanned": 4, "ports_total": 8, "ports_probed": 8}
+        second = ScanResult(target="10.0.1.0/30", coverage={
+            "hosts_total": 4, "hosts_scanned": 1, "ports_total": 8, "ports_probed": 3})
+        second.mark_incomplete(DEADLINE)
+
+        first.extend(second)
+        assert first.complete is False
+        assert first.coverage == {"hosts_total": 8, "hosts_scanned": 5, "ports_total": 16,
+                                  "ports_probed": 11, "reason": DEADLINE}
+        loaded = ScanResult.from_dict(first.to_dict())
+        assert (loaded.complete, loaded.coverage) == (False, first.coverage)
+
+    def test_notice(self):
+        result = self._result()
+        assert incomplete_notice(result) is None
+        result.coverage = {"hosts_total": 4, "hosts_scanned": 1, "ports_total": 8,
+                           "ports_probed": 3, "ports_not_inspected": 2}
+        result.mark_incomplete(DEADLINE)
+        notice = incomplete_notice(result)
+        assert "raggiunta la scadenza" in notice
+        assert "Host verificati: 1 su 4 (25%)" in notice
+        assert "Servizi non analizzati: 2" in notice
+
+    def test_coordinator_cancelled(self):
+        coordinator = ScanCoordinator("127.0.0.0/30", ports=[22]).start()
+        try:
+            start = time.monotonic()
+            result = coordinator.wait(cancel=CancelToken(0.2))
+        finally:
+            coordinator.stop()
+        assert time.monotonic() - start < 2
+        assert result.complete is False and result.coverage["reason"] == DEADLINE
+        assert result.coverage["hosts_scanned"] == 0
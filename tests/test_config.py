@@ -0,0 +1,149 @@
+"""
+Test per la configurazione e i profili di scansione
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import dataclasses
+from datetime import datetime
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.classifier import PortClassifier, RiskLevel
+from src.config import ConfigError, ReportSettings, load_config, parse_config
+from src.html_report import HtmlReportGenerator
+from src.scanner import HostResult, PortResult, PortScanner, ScanResult
+
+ROOT = Path(__file__).parent.parent
+
+
+class TestProfiles:
+    """Lettura, ereditarietà e scelta dei profili"""
+
+    def test_profile_inherits_scanner_section(self):
+        config = parse_config({
+            "scanner": {"timeout": 1.5, "use_nmap": False, "rate_limit": 300},
+            "profiles": {
+                "server": {"targets": "10.0.0.10", "ports": [22, 443, "8000-8010"], "concurrency": 64},
+                "ufficio": {"targets": ["192.168.1.0/24"], "backend": "auto", "timeout": 3},
+            },
+        })
+        server = config.profile("server")
+        assert server.targets == ("10.0.0.10",)
+        assert server.ports == "22,443,8000-8010"
+        assert (server.timeout, server.rate_limit, server.concurrency) == (1.5, 300.0, 64)
+        assert server.backend == "socket" and server.use_nmap is False
+        assert config.profile("ufficio").timeout == 3.0
+        assert config.profile("ufficio").use_nmap is True
+
+        options = server.scanner_options()
+        assert len(list(options["ports"])) == 13
+        scanner = PortScanner(**options)
+        assert scanner.concurrency == 64 and scanner._limiter.interval == pytest.approx(1 / 300)
+
+    def test_immutable(self):
+        config = parse_config({"profiles": {"a": {"targets": ["10.0.0.1"]}}})
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.profile().timeout = 5
+        with pytest.raises(TypeError):
+            config.profiles["b"] = config.profile()
+
+    def test_profile_choice(self):
+        assert parse_config({"scanner": {"timeout": 4}}).profile().name == "default"
+        config = parse_config({"profiles": {"a": {}, "b": {}}})
+        with pytest.raises(ConfigError, match="Indicare il profilo"):
+            config.profile()
+        with pytest.raises(ConfigError, match="disponibili: a, b"):
+            config.profile("c")
+
+    @pytest.mark.parametrize("data, message", [
+        ({"profiles": {"a": {"prots": 22}}}, "chiavi sconosciute prots"),
+        ({"profiles": {"a": {"ports": "top-abc"}}}, "profilo a"),
+        ({"profiles": {"a": {"backend": "masscan"}}}, "backend"),
+        ({"profiles": {"a": {"rate_limit": 0}}}, "rate_limit"),
+        ({"scanner": {"timeout": "veloce"}}, "timeout"),
+        ({"classifier": {"risk_overrides": {3389: "rosso"}}}, "risk_overrides"),
+        ({"report": {"language": "it"}}, "report: chiavi sconosciute language"),
+        ({"logging": {"levl": "DEBUG"}}, "logging: chiavi sconosciute levl"),
+    ])
+    def test_invalid(self, data, message):
+        with pytest.raises(ConfigError, match=message):
+            parse_config(data)
+
+    def test_example_file(self):
+        config = load_config(str(ROOT / "config.example.yaml"))
+        assert config.profile().targets == ("192.168.1.0/24",)
+        assert config.report.detailed_recommendations is True
+        assert config.schedule.profiles[0].profile.targets == ("192.168.1.0/24",)
+
+
+class TestSchedule:
+    """Voci dello scheduler validate come profili di scansione"""
+
+    def test_entry_extends_profile(self):
+        config = parse_config({
+            "scanner": {"timeout": 1.5},
+            "profiles": {"server": {"targets": ["10.0.0.10"], "rate_limit": 200, "udp": True}},
+            "schedule": {"max_concurrent": 3, "profiles": [
+                {"name": "notte", "profile": "server", "every": "1d", "deadline": "2h",
+                 "ports": "top100", "report_format": "html"},
+            ]},
+        })
+        scan = config.schedule.profiles[0]
+        assert (scan.name, scan.interval, scan.jitter) == ("notte", 86400, 0.1)
+        assert scan.profile.targets == ("10.0.0.10",)
+        assert (scan.profile.timeout, scan.profile.rate_limit, scan.profile.udp) == (1.5, 200.0, True)
+        assert (scan.profile.deadline, scan.profile.ports, scan.profile.report_format) == (7200, "top100", "html")
+        assert config.schedule.max_concurrent == 3
+
+        scanner = PortScanner(**scan.profile.scanner_options())
+        assert scanner.udp_ports and scanner._limiter.interval == pytest.approx(1 / 200)
+
+    @pytest.mark.parametrize("entry, message", [
+        ({"name": "x", "target": "10.0.0.1"}, "manca 'every'"),
+        ({"name": "x", "every": "1d"}, "manca 'target'"),
+        ({"name": "x", "profile": "nessuno", "every": "1d"}, "profilo sconosciuto nessuno"),
+        ({"name": "x", "target": "10.0.0.1", "every": "1d", "prots": 22}, "chiavi sconosciute prots"),
+        ({"name": "x", "target": "10.0.0.1", "every": "1d", "ports": "top-abc"}, "profilo x"),
+        ({"name": "x", "target": "10.0.0.1", "every": "1d", "jitter": 2}, "jitter"),
+        ({"name": "x", "target": "10.0.0.1", "every": "1d", "output": "a.pdf"}, "output_dir"),
+    ])
+    def test_invalid_entry(self, entry, message):
+        with pytest.raises(ConfigError, match=message):
+            parse_config({"schedule": {"profiles": [entry]}})
+
+
+class TestSettings:
+    """Impostazioni usate da classificatore e report"""
+
+    def test_risk_override_keeps_findings(self):
+        settings = parse_config({"classifier": {"risk_overrides": {3389: "warning"}}}).classifier
+        classifier = PortClassifier(settings)
+        info = classifier.classify_port(3389)
+        assert info.risk_level == RiskLevel.WARNING
+        assert "configurazione" in info.risk_explanation
+        assert PortClassifier().classify_port(3389).risk_level == RiskLevel.CRITICAL
+
+        details = {"protocol": {"findings": [{"level": "critical", "title": "NLA non obbligatoria"}]}}
+        assert classifier.classify_port(3389, details=details).risk_level == RiskLevel.CRITICAL
+
+    def test_classification_cache_per_settings(self):
+        result = ScanResult(target="10.0.0.1", hosts=[
+            HostResult(ip="10.0.0.1", state="up", ports=[PortResult(port=3389, state="open")])])
+        settings = parse_config({"classifier": {"risk_overrides": {3389: "ok"}}}).classifier
+        assert result.classify(PortClassifier())["summary"]["critical_count"] == 1
+        assert result.classify(PortClassifier(settings))["summary"]["ok_count"] == 1
+
+    def test_report_without_recommendations(self, tmp_path):
+        result = ScanResult(target="10.0.0.1", start_time=datetime(2026, 1, 1), hosts=[
+            HostResult(ip="10.0.0.1", state="up", ports=[PortResult(port=23, state="open")])])
+        output = tmp_path / "r.html"
+        HtmlReportGenerator(ReportSettings(title="Audit Q1", detailed_recommendations=False)).generate(
+            result, str(output))
+        html = output.read_text(encoding="utf-8")
+        assert "<title>CyberSentinel - Audit Q1</title>" in html
+        assert "Cosa fare:" not in html
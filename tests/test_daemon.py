@@ -0,0 +1,207 @@
+"""
+Test per la modalità servizio
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import http.client
+import json
+import socket
+import time
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.daemon import ScanDaemon, JobStore, ScanJob
+from src.scanner import PortResult, PortScanner
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """Connessione HTTP su socket Unix"""
+
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def _request(daemon, method, path, body=None):
+    if daemon.address.startswith("unix:"):
+        conn = _UnixHTTPConnection(daemon.address[len("unix:"):])
+    else:
+        host, port = daemon.address.rsplit(":", 1)
+        conn = http.client.HTTPConnection(host, int(port), timeout=10)
+    payload = json.dumps(body).encode() if body is not None else None
+    conn.request(method, path, body=payload)
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response.status, data
+
+
+def _wait_status(daemon, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, data = _request(daemon, "GET", f"/jobs/{job_id}")
+        job = json.loads(data)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("Job non completato in tempo")
+
+
+@pytest.fixture
+def listener():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    yield server.getsockname()[1]
+    server.close()
+
+
+@pytest.fixture
+def slow_probe(monkeypatch):
+    """Connessioni lente (50 ms l'una): la scansione dura ben oltre la scadenza dei test"""
+    def probe(self, ip, port, cancel=None):
+        time.sleep(0.05)
+        return PortResult(port, "closed")
+
+    monkeypatch.setattr(PortScanner, "_probe_port", probe)
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    d = ScanDaemon(str(tmp_path / "state"), address="127.0.0.1:0", use_nmap=False)
+    d.start(warm_up=False)
+    yield d
+    d.stop()
+
+
+class TestJobStore:
+    """Test per la coda persistente"""
+
+    def test_running_jobs_requeued_after_restart(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        store.save(ScanJob(target="127.0.0.1", status="running"))
+        store.save(ScanJob(target="127.0.0.2", status="done"))
+
+        reloaded = JobStore(str(tmp_path))
+        assert [j.target for j in reloaded.pending()] == ["127.0.0.1"]
+
+    def test_snapshots_and_atomic_update(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job = ScanJob(target="127.0.0.1")
+        store.save(job)
+        job.status = "running"  # Modifiche locali non pubblicate
+        assert store.get(job.job_id).status == "queued"
+
+        claimed = store.update(job.job_id, expected="queued", status="running")
+        assert claimed.status == "running"
+        assert store.update(job.job_id, expected="queued", status="cancelled") is None
+        assert JobStore(str(tmp_path)).get(job.job_id).status == "queued"  # Ripreso al riavvio
+
+
+class TestDaemonApi:
+    """Test dell'API HTTP"""
+
+    def test_health(self, daemon):
+        status, data = _request(daemon, "GET", "/health")
+        assert status == 200
+        assert json.loads(data)["status"] == "ok"
+
+    def test_submit_and_fetch_result(self, daemon, listener):
+        status, data = _request(daemon, "POST", "/jobs", {
+            "target": "127.0.0.1", "ports": [listener], "timeout": 0.5, "report": False
+        })
+        assert status == 202
+        job = _wait_status(daemon, json.loads(data)["job_id"])
+        assert job["status"] == "done"
+        assert job["summary"]["total_open_ports"] == 1
+
+        status, data = _request(daemon, "GET", f"/jobs/{job['job_id']}/result")
+        assert status == 200
+        assert json.loads(data)["hosts"][0]["ports"][0]["port"] == listener
+
+    def test_report_generated(self, daemon, listener):
+        _, data = _request(daemon, "POST", "/jobs", {
+            "target": "127.0.0.1", "ports": [listener], "timeout": 0.5
+        })
+        job = _wait_status(daemon, json.loads(data)["job_id"])
+        status, pdf = _request(daemon, "GET", f"/jobs/{job['job_id']}/report")
+        assert status == 200
+        assert pdf.startswith(b"%PDF")
+
+    def test_scanner_reused_between_jobs(self, daemon, listener):
+        for _ in range(2):
+            _, data = _request(daemon, "POST", "/jobs", {
+                "target": "127.0.0.1", "ports": [listener], "timeout": 0.5, "report": False
+            })
+            _wait_status(daemon, json.loads(data)["job_id"])
+        assert len(daemon._scanners) == 1
+
+    def test_invalid_target(self, daemon):
+        status, _ = _request(daemon, "POST", "/jobs", {"target": "non valido"})
+        assert status == 400
+
+    @pytest.mark.parametrize("params", [
+        {"use_nmap": "false"},
+        {"report": 0},
+        {"timeout": 0},
+        {"timeout": -1},
+        {"timeout": "2"},
+    ])
+    def test_invalid_parameters(self, daemon, params):
+        status, data = _request(daemon, "POST", "/jobs", {"target": "127.0.0.1", **params})
+        assert status == 400
+        assert daemon.store.list() == []
+
+    def test_unknown_job(self, daemon):
+        status, _ = _request(daemon, "GET", "/jobs/inesistente")
+        assert status == 404
+
+    def test_deadline_partial_result(self, daemon, slow_probe):
+        _, data = _request(daemon, "POST", "/jobs", {
+            "target": "127.0.0.0/28", "ports": [20000, 20001, 20002],
+            "timeout": 0.5, "deadline": 0.3, "report": False
+        })
+        job = _wait_status(daemon, json.loads(data)["job_id"])
+        assert job["status"] == "done" and job["complete"] is False
+        _, data = _request(daemon, "GET", f"/jobs/{job['job_id']}/result")
+        assert json.loads(data)["coverage"]["reason"] == "deadline"
+
+    def test_cancel_running_job(self, daemon, slow_probe):
+        _, data = _request(daemon, "POST", "/jobs", {
+            "target": "127.0.0.0/28", "ports": [20000, 20001, 20002],
+            "timeout": 0.5, "report": False
+        })
+        job_id = json.loads(data)["job_id"]
+        deadline = time.monotonic() + 10
+        while daemon.store.get(job_id).status != "running" and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        status, _ = _request(daemon, "DELETE", f"/jobs/{job_id}")
+        assert status == 202
+        job = _wait_status(daemon, job_id, timeout=5)
+        assert job["status"] == "cancelled" and job["complete"] is False
+        status, data = _request(daemon, "GET", f"/jobs/{job_id}/result")
+        assert status == 200
+        assert json.loads(data)["coverage"]["reason"] == "interrupted"
+
+    def test_unix_socket(self, tmp_path, listener):
+        d = ScanDaemon(
+            str(tmp_path / "state"), address=f"unix:{tmp_path / 'api.sock'}", use_nmap=False
+        ).start(warm_up=False)
+        try:
+            status, data = _request(d, "POST", "/jobs", {
+                "target": "127.0.0.1", "ports": [listener], "report": False
+            })
+            assert status == 202
+            assert _wait_status(d, json.loads(data)["job_id"])["status"] == "done"
+        finally:
+            d.stop()
@@ -0,0 +1,175 @@
+"""
+Test per la scansione distribuita
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.distributed import ScanCoordinator, ScanWorker, parse_address, spawn_local_workers
+from src.scanner import HostResult, PortResult, ScanResult
+
+
+@pytest.fixture
+def listener():
+    """Porta TCP aperta su 127.0.0.1"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(64)
+    yield server.getsockname()[1]
+    server.close()
+
+
+def _start_workers(address, count):
+    threads = []
+    for i in range(count):
+        worker = ScanWorker(address, worker_id=f"test-{i}")
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+class _StuckWorker:
+    """Worker che prende un lease e non lo completa mai"""
+
+    def __init__(self, address):
+        family, addr = parse_address(address)
+        self.sock = socket.create_connection(addr)
+        self.rfile = self.sock.makefile("rb")
+        self.wfile = self.sock.makefile("wb")
+
+    def take_lease(self):
+        for message in ({"type": "hello", "worker": "stuck"}, {"type": "lease"}):
+            self.wfile.write((json.dumps(message) + "\n").encode())
+            self.wfile.flush()
+            reply = json.loads(self.rfile.readline())
+        return reply
+
+    def close(self):
+        self.rfile.close()
+        self.wfile.close()
+        self.sock.close()
+
+
+class TestParseAddress:
+    """Test per il parsing degli indirizzi"""
+
+    def test_tcp(self):
+        assert parse_address("127.0.0.1:9000") == (socket.AF_INET, ("127.0.0.1", 9000))
+
+    def test_unix(self):
+        assert parse_address("unix:/tmp/cs.sock") == (socket.AF_UNIX, "/tmp/cs.sock")
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_address("solo-host")
+
+
+class TestSerialization:
+    """Test per la serializzazione usata nel protocollo"""
+
+    def test_host_roundtrip(self):
+        host = HostResult(
+            ip="10.0.0.1", state="up",
+            ports=[PortResult(port=22, state="open", service="SSH")]
+        )
+        assert HostResult.from_dict(host.to_dict()) == host
+
+    def test_scan_result_roundtrip(self, tmp_path):
+        result = ScanResult(target="10.0.0.0/30")
+        result.hosts = [HostResult(ip="10.0.0.1", state="up")]
+        path = tmp_path / "scan.json"
+        result.to_json(str(path))
+
+        loaded = ScanResult.from_json(str(path))
+        assert loaded.target == result.target
+        assert loaded.start_time == result.start_time
+        assert loaded.hosts == result.hosts
+
+
+class TestCoordinator:
+    """Test coordinatore con worker locali"""
+
+    def test_multiple_workers(self, listener):
+        coordinator = ScanCoordinator(
+            "127.0.0.0/29", ports=[listener], timeout=0.5, shard_size=2
+        ).start()
+        threads = _start_workers(coordinator.address, 3)
+
+        result = coordinator.wait(timeout=30)
+        coordinator.stop()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert coordinator.finished
+        # Gli altri indirizzi di loopback rispondono con RST: up ma senza porte aperte
+        assert [h.ip for h in result.hosts if h.ports] == ["127.0.0.1"]
+        assert result.hosts[0].ports[0].port == listener
+        assert all(h.closed_count == 1 for h in result.hosts[1:])
+
+    def test_unix_socket(self, listener, tmp_path):
+        address = f"unix:{tmp_path / 'coord.sock'}"
+        coordinator = ScanCoordinator(
+            "127.0.0.1", address=address, ports=[listener], timeout=0.5
+        ).start()
+        _start_workers(coordinator.address, 1)
+
+        result = coordinator.wait(timeout=30)
+        coordinator.stop()
+        assert [h.ip for h in result.hosts] == ["127.0.0.1"]
+
+    def test_reassign_on_worker_death(self, listener):
+        coordinator = ScanCoordinator(
+            "127.0.0.1", ports=[listener], timeout=0.5, lease_ttl=30
+        ).start()
+
+        stuck = _StuckWorker(coordinator.address)
+        assert stuck.take_lease()["type"] == "lease"
+        stuck.close()
+
+        _start_workers(coordinator.address, 1)
+        result = coordinator.wait(timeout=30)
+        coordinator.stop()
+
+        assert coordinator.shards[0].attempts == 2
+        assert [h.ip for h in result.hosts] == ["127.0.0.1"]
+
+    def test_reassign_on_heartbeat_timeout(self, listener):
+        coordinator = ScanCoordinator(
+            "127.0.0.1", ports=[listener], timeout=0.5, lease_ttl=0.3
+        ).start()
+
+        # Connessione aperta ma senza heartbeat
+        stuck = _StuckWorker(coordinator.address)
+        assert stuck.take_lease()["type"] == "lease"
+        time.sleep(0.6)
+
+        _start_workers(coordinator.address, 1)
+        result = coordinator.wait(timeout=30)
+        coordinator.stop()
+        stuck.close()
+
+        assert [h.ip for h in result.hosts] == ["127.0.0.1"]
+
+    def test_local_worker_processes(self, listener):
+        coordinator = ScanCoordinator(
+            "127.0.0.0/30", ports=[listener], timeout=0.5, shard_size=1
+        ).start()
+        processes = spawn_local_workers(coordinator.address, 2)
+
+        result = coordinator.wait(timeout=30)
+        coordinator.stop()
+        for process in processes:
+            process.join(timeout=5)
+
+        assert [h.ip for h in result.hosts if h.ports] == ["127.0.0.1"]
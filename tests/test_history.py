@@ -0,0 +1,115 @@
+"""
+Test per lo storico delle scansioni e il report di andamento
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+from datetime import datetime
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import ScanResult, HostResult, PortResult
+from src.history import HistoryStore, months_ago, period_key
+
+
+def _scan(when, ports_by_host):
+    result = ScanResult(target="192.168.1.0/24", start_time=when)
+    result.hosts = [
+        HostResult(ip=ip, state="up", ports=[
+            PortResult(port=port, state="open") for port in ports
+        ])
+        for ip, ports in ports_by_host.items()
+    ]
+    return result
+
+
+class TestHistoryStore:
+    """Aggregati storici"""
+
+    def test_new_services_and_remediation(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.ingest(_scan(datetime(2026, 1, 1, 8), {"192.168.1.10": [445, 443]}))
+        store.ingest(_scan(datetime(2026, 1, 2, 8), {"192.168.1.10": [445, 443], "192.168.1.11": [3389]}))
+        store.ingest(_scan(datetime(2026, 1, 4, 8), {"192.168.1.10": [443]}))
+
+        days = store.trend("192.168.1.0/24", bucket="day")
+        assert [d.period for d in days] == ["2026-01-01", "2026-01-02", "2026-01-04"]
+        assert days[0].new_services == 2
+        assert days[1].new_services == 1 and days[1].new_critical == 1
+        # 445 aperta per 3 giorni, 3389 per 2: media 60 ore
+        assert days[2].remediated == 2
+        assert days[2].mttr_hours == 60.0
+        assert days[2].critical_count == 0
+        assert list(store.open_exposures("192.168.1.0/24")) == ["192.168.1.10:443"]
+
+    def test_monthly_rollup(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        for day in range(1, 29):
+            ports = [445] if day < 15 else [443]
+            store.ingest(_scan(datetime(2026, 2, day, 3), {"192.168.1.10": ports}))
+        store.ingest(_scan(datetime(2026, 3, 1, 3), {"192.168.1.10": [443]}))
+
+        months = store.trend("192.168.1.0/24")
+        assert [m.period for m in months] == ["2026-02", "2026-03"]
+        assert months[0].scans == 28
+        assert months[0].risk_score_max == 100
+        assert months[0].remediated == 1
+        assert months[1].risk_score == 0
+
+    def test_persisted_and_idempotent(self, tmp_path):
+        scan = _scan(datetime(2026, 1, 1, 8), {"192.168.1.10": [22]})
+        assert HistoryStore(str(tmp_path)).ingest(scan)
+
+        reopened = HistoryStore(str(tmp_path))
+        assert not reopened.ingest(scan)
+        assert reopened.targets() == ["192.168.1.0/24"]
+        assert reopened.trend("192.168.1.0/24")[0].scans == 1
+
+    def test_incomplete_scan_not_ingested(self, tmp_path):
+        store = HistoryStore(str(tmp_path))
+        store.ingest(_scan(datetime(2026, 1, 1, 8), {"10.0.0.1": [23]}))
+        partial = _scan(datetime(2026, 1, 2, 8), {})
+        partial.mark_incomplete("deadline")
+        assert not store.ingest(partial)
+
+        assert list(store.open_exposures("192.168.1.0/24")) == ["10.0.0.1:23"]
+        store.ingest(_scan(datetime(2026, 1, 3, 8), {"10.0.0.1": [23]}))
+        days = store.trend("192.168.1.0/24", bucket="day")
+        assert [d.period for d in days] == ["2026-01-01", "2026-01-03"]
+        assert days[1].remediated == 0 and days[1].new_services == 0
+
+    def test_ingest_files_in_order(self, tmp_path):
+        paths = []
+        for i, day in enumerate((3, 1, 2)):
+            path = tmp_path / f"scan_{i}.json"
+            _scan(datetime(2026, 1, day), {"192.168.1.10": [445]}).to_json(str(path))
+            paths.append(str(path))
+
+        store = HistoryStore(str(tmp_path / "history"))
+        assert store.ingest_files(paths) == (3, 0)
+        assert store.ingest_files(paths) == (0, 3)
+
+    def test_periods(self):
+        assert period_key("2026-03-14", "week") == "2026-W11"
+        assert months_ago(12, datetime(2026, 10, 19)) == datetime(2025, 11, 1)
+        with pytest.raises(ValueError):
+            period_key("2026-03-14", "year")
+
+
+class TestTrendReport:
+    """Report PDF di andamento"""
+
+    def test_generate_trend(self, tmp_path):
+        pytest.importorskip("reportlab")
+        from src.report_generator import ReportGenerator
+
+        store = HistoryStore(str(tmp_path))
+        for month in range(1, 13):
+            store.ingest(_scan(datetime(2026, month, 1), {"192.168.1.10": [445] if month < 6 else [22]}))
+        output = tmp_path / "trend.pdf"
+        ReportGenerator().generate_trend("192.168.1.0/24", store.trend("192.168.1.0/24"), str(output))
+        assert output.read_bytes().startswith(b"%PDF")
@@ -0,0 +1,106 @@
+"""
+Test per il generatore di report HTML
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import ScanResult, HostResult, PortResult
+from src.html_report import HtmlReportGenerator
+
+
+def _network(count):
+    result = ScanResult(target="10.0.0.0/16")
+    result.hosts = [
+        HostResult(
+            ip=f"10.0.{i // 250}.{i % 250 + 1}",
+            state="up",
+            ports=[
+                PortResult(port=445, state="open", service="SMB"),
+                PortResult(port=8080, state="open", service="HTTP Alternativo"),
+                PortResult(port=443, state="open", service="HTTPS"),
+            ]
+        )
+        for i in range(count)
+    ]
+    return result
+
+
+class TestHtmlReport:
+    """Test del report HTML"""
+
+    def test_self_contained_document(self, tmp_path):
+        output = tmp_path / "report.html"
+        HtmlReportGenerator().generate(_network(3), str(output))
+        html = output.read_text(encoding="utf-8")
+
+        assert html.startswith("<!DOCTYPE html>")
+        assert html.rstrip().endswith("</html>")
+        assert "<style>" in html
+        assert "<script" not in html and "<link" not in html
+        assert "RISCHIO ALTO" in html
+        assert html.count("Porta 445 (SMB)") == 1
+        assert "10.0.0.3" in html
+
+    def test_escapes_scan_data(self, tmp_path):
+        result = ScanResult(target="<script>")
+        result.hosts = [HostResult(
+            ip="10.0.0.1", hostname="<b>host</b>", state="up",
+            ports=[PortResult(port=22, state="open", service="SSH", version="<x>")]
+        ), HostResult(
+            ip="10.0.0.2", state="up",
+            ports=[PortResult(port=22, state="open", service="SSH")]
+        )]
+        output = tmp_path / "report.html"
+        HtmlReportGenerator().generate(result, str(output))
+        html = output.read_text(encoding="utf-8")
+        assert "<script>" not in html
+        assert "&lt;b&gt;host&lt;/b&gt;" in html
+
+    def test_streamed_in_chunks(self):
+        generator = HtmlReportGenerator()
+        generator.CHUNK_ROWS = 100
+        result = _network(1000)
+        classified = generator.classifier.classify_scan_results(result.hosts)
+        chunks = list(generator.render(result, classified))
+        assert len(chunks) > 20
+        assert max(len(c) for c in chunks) < 10000
+
+    def test_large_findings_set(self, tmp_path):
+        output = tmp_path / "report.html"
+        HtmlReportGenerator().generate(_network(10000), str(output))
+        html = output.read_text(encoding="utf-8")
+        assert "su 10000 host" in html
+        assert "10.0.39.250" in html
+
+    def test_uses_preclassified_results(self, tmp_path):
+        result = _network(2)
+        classified = result.classify()
+        classified["summary"]["critical_count"] = 99
+        output = tmp_path / "report.html"
+        HtmlReportGenerator().generate(result, str(output), classified=classified)
+        assert ">99<" in output.read_text(encoding="utf-8")
+
+    def test_findings_stay_with_their_host(self, tmp_path):
+        def host(ip, stage, title):
+            details = {stage: {"findings": [{"level": "critical", "title": title}]}}
+            return HostResult(ip=ip, state="up", ports=[
+                PortResult(port=443, state="open", service="https", details=details)])
+
+        result = ScanResult(target="10.0.0.0/30", hosts=[
+            host("10.0.0.1", "tls", "Certificato scaduto"),
+            host("10.0.0.2", "http", "Pannello di amministrazione esposto"),
+        ])
+        output = tmp_path / "report.html"
+        HtmlReportGenerator().generate(result, str(output))
+        html = output.read_text(encoding="utf-8")
+
+        findings = [block for block in html.split('<div class="finding') if "Porta 443" in block]
+        assert len(findings) == 2
+        by_host = {("10.0.0.1" in b, "10.0.0.2" in b): b for b in findings}
+        assert "Certificato scaduto" in by_host[(True, False)]
+        assert "Pannello di amministrazione esposto" in by_host[(False, True)]
+        assert "Pannello" not in by_host[(True, False)]
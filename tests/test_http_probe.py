@@ -0,0 +1,153 @@
+"""
+Test per la sonda HTTP
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.classifier import PortClassifier, RiskLevel
+from src.http_probe import PATHS, HttpInspector, _Reader, read_response
+from src.inspection import run_inspections
+from src.scanner import HostResult, PortResult, ScanResult
+
+PAGE = (b"<html><head><title>Pannello &amp; Test</title></head>"
+        b"<body><form><input type=\"password\" name=\"pw\"></form></body></html>")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "TestServer/2.1"
+    sys_version = ""
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        routes = self.server.routes
+        status, headers, body = routes.get(self.path, (404, {}, b"non trovato"))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server:
+    """Server web su loopback con percorsi fissi"""
+
+    def __init__(self, routes, protocol="HTTP/1.1"):
+        handler = type("Handler", (_Handler,), {"protocol_version": protocol})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.routes = routes
+        self.httpd.connections = 0
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                         daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _scan(port, service="http"):
+    host = HostResult(ip="127.0.0.1", state="up",
+                      ports=[PortResult(port=port, state="open", service=service)])
+    return ScanResult(target="127.0.0.1", hosts=[host])
+
+
+class TestHttpInspector:
+    """Percorsi, connessioni riusate e valutazione del servizio"""
+
+    def test_panel_and_login_single_connection(self):
+        server = _Server({
+            "/": (200, {}, PAGE),
+            "/manager/html": (401, {"WWW-Authenticate": 'Basic realm="Tomcat Manager Application"'}, b""),
+        })
+        try:
+            result = _scan(server.port)
+            assert run_inspections(result, [HttpInspector(timeout=2)]) == {"http": 1}
+        finally:
+            server.close()
+
+        port = result.hosts[0].ports[0]
+        http = port.details["http"]
+        assert server.httpd.connections == 1  # tutte le richieste in pipeline
+        assert http["paths"] == {path: 200 if path == "/" else 401 if path == "/manager/html" else 404
+                                 for path in PATHS}
+        assert http["title"] == "Pannello & Test"
+        assert http["panels"] == ["Tomcat Manager"]
+        assert http["login_form"] is True and http["risk"] == "warning"
+        assert port.version == "TestServer/2.1"
+
+        info = PortClassifier().classify_port(port.port, port.service, port.details)
+        assert info.risk_level == RiskLevel.CRITICAL
+        assert "Tomcat Manager" in info.risk_explanation
+
+    def test_connection_close_reconnects(self):
+        server = _Server({"/": (200, {}, PAGE)}, protocol="HTTP/1.0")
+        try:
+            responses = HttpInspector(timeout=2).fetch("127.0.0.1", server.port, use_tls=False)
+        finally:
+            server.close()
+        assert list(responses) == PATHS
+        assert server.httpd.connections == len(PATHS)
+
+    def test_https_redirect_grades_8080_ok(self):
+        server = _Server({"/": (301, {"Location": "https://intranet.local/"}, b"")})
+        try:
+            result = _scan(server.port)
+            run_inspections(result, [HttpInspector(timeout=2)])
+        finally:
+            server.close()
+
+        details = result.hosts[0].ports[0].details
+        assert details["http"]["https_redirect"] is True
+        classifier = PortClassifier()
+        assert classifier.classify_port(8080).risk_level == RiskLevel.WARNING
+        assert classifier.classify_port(8080, "http", details).risk_level == RiskLevel.OK
+        # La valutazione non abbassa mai una porta critica
+        assert classifier.classify_port(3389, "http", details).risk_level == RiskLevel.CRITICAL
+
+    def test_non_http_service(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        try:
+            result = _scan(listener.getsockname()[1])
+            assert HttpInspector(timeout=0.3).inspect(result.hosts[0], result.hosts[0].ports[0]) is None
+        finally:
+            listener.close()
+
+
+class TestReadResponse:
+    """Parsing delle risposte e limite di dimensione"""
+
+    def test_chunked_and_capped(self):
+        left, right = socket.socketpair()
+        with left, right:
+            left.sendall(
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"5\r\nabcde\r\n5\r\nfghij\r\n0\r\n\r\n"
+                b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n0123456789"
+                b"HTTP/1.0 204 No Content\r\n\r\n"
+            )
+            reader = _Reader(right)
+            first = read_response(reader, max_body=7)
+            second = read_response(reader, max_body=4)
+            third = read_response(reader)
+
+        assert first["body"] == b"abcdefg" and first["keep_alive"] is True
+        assert second["body"] == b"0123"
+        assert third["status"] == 204 and third["keep_alive"] is False
@@ -0,0 +1,108 @@
+"""
+Test per i log strutturati
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import logging
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import ConfigError, LoggingSettings, parse_config
+from src.logs import JsonFormatter, SamplingFilter, setup_logging, stop_logging
+from src.scanner import PortScanner
+
+
+@pytest.fixture(autouse=True)
+def restore_root():
+    """Ripristina i log di pytest dopo ogni test"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _record(msg="Host %s", level=logging.DEBUG, **extra):
+    record = logging.makeLogRecord({"name": "src.scanner", "levelno": level,
+                                    "levelname": logging.getLevelName(level),
+                                    "msg": msg, "args": ("10.0.0.1",)})
+    record.__dict__.update(extra)
+    return record
+
+
+class TestFormat:
+    """Una riga JSON per messaggio"""
+
+    def test_json_with_extras(self):
+        line = JsonFormatter().format(_record(sample="host", ip="10.0.0.1", open_ports=3))
+        entry = json.loads(line)
+        assert entry["msg"] == "Host 10.0.0.1"
+        assert (entry["level"], entry["logger"]) == ("DEBUG", "src.scanner")
+        assert (entry["ip"], entry["open_ports"]) == ("10.0.0.1", 3)
+        assert "sample" not in entry and "args" not in entry
+
+    def test_settings(self):
+        settings = parse_config({"logging": {"level": "debug", "file": "x.log", "sample_hosts": 10}}).logging
+        assert settings == LoggingSettings(level="DEBUG", file="x.log", sample_hosts=10)
+        with pytest.raises(ConfigError, match="logging.format"):
+            parse_config({"logging": {"format": "xml"}})
+
+
+class TestSampling:
+    """Un messaggio per host ogni N, avvisi sempre"""
+
+    def test_one_every_n(self):
+        sampling = SamplingFilter(10)
+        passed = [r for r in (_record(sample="host") for _ in range(100)) if sampling.filter(r)]
+        assert len(passed) == 10
+        assert all(r.sample_rate == 10 for r in passed)
+        assert sampling.filter(_record())  # Messaggi senza chiave non campionati
+
+    def test_warnings_always_pass(self):
+        sampling = SamplingFilter(1000)
+        sampling.filter(_record(sample="host"))
+        assert all(sampling.filter(_record(sample="host", level=logging.WARNING)) for _ in range(5))
+
+
+class TestSetup:
+    """File asincrono e costo dei messaggi sotto il livello"""
+
+    def test_queued_file(self, tmp_path):
+        path = tmp_path / "scan.log"
+        setup_logging(LoggingSettings(level="DEBUG", file=str(path), sample_hosts=2), console_level=None)
+        log = logging.getLogger("src.test")
+        for i in range(4):
+            log.debug("Host %d", i, extra={"sample": "host", "ip": f"10.0.0.{i}"})
+        log.info("Fine")
+        stop_logging()
+
+        entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert [e.get("ip") for e in entries] == ["10.0.0.0", "10.0.0.2", None]
+        assert entries[-1]["msg"] == "Fine"
+
+    def test_console_prefix(self, capsys):
+        setup_logging(console_level=logging.WARNING)
+        logging.getLogger("src.test").info("nascosto")
+        logging.getLogger("src.test").warning("Timeout nmap")
+        assert capsys.readouterr().err == "[!] Timeout nmap\n"
+
+    def test_host_messages_skipped_below_debug(self, tmp_path):
+        path = tmp_path / "scan.log"
+        setup_logging(LoggingSettings(level="INFO", file=str(path)), console_level=None)
+        scanner = PortScanner(ports=[1], timeout=0.2, use_nmap=False)
+        scanner.scan("127.0.0.1")
+        stop_logging()
+        assert not logging.getLogger("src.scanner").isEnabledFor(logging.DEBUG)
+        entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert not any("ip" in e for e in entries)
+        assert any(e["msg"].startswith("Scansione con socket") for e in entries)
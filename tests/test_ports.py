@@ -0,0 +1,95 @@
+"""
+Test per insiemi di porte e sweep TCP parallelo
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import time
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ports import PortSet, parse_ports, top_ports
+from src.scanner import PortScanner
+from src.sweep import ConnectSweep, RateLimiter
+from benchmarks.fakenet import FakeNetwork
+
+
+class TestPortSet:
+    """Bitmap e specifiche di porte"""
+
+    def test_ranges_and_spec(self):
+        ports = parse_ports("1-1024, 8000-9000,22,-5")
+        assert len(ports) == 1024 + 1001
+        assert 22 in ports and 8500 in ports and 1025 not in ports
+        assert ports.to_spec() == "1-1024,8000-9000"
+        assert parse_ports(ports.to_spec()) == ports
+
+    def test_all_ports_compact(self):
+        ports = parse_ports("all")
+        assert len(ports) == 65535
+        assert ports.to_spec() == "1-65535"
+        assert ports.to_list()[:3] == [1, 2, 3]
+        assert parse_ports("60000-") == PortSet(range(60000, 65536))
+
+    def test_profiles(self):
+        assert top_ports(3) == [80, 23, 443]
+        assert len(parse_ports("top100")) == 100
+        top1000 = parse_ports("top1000")
+        assert len(top1000) == 1000
+        assert all(p in top1000 for p in parse_ports("top100"))
+        assert set(PortScanner.DEFAULT_PORTS) == set(parse_ports("default"))
+
+    @pytest.mark.parametrize("spec", ["0", "70000", "abc", "100-50", "top", ""])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_ports(spec)
+
+
+class TestConnectSweep:
+    """Connessioni parallele verso la rete simulata"""
+
+    def test_states(self):
+        hosts = {"127.22.0.1": {2222: "open", 8080: "filtered", 22: "banner"}}
+        with FakeNetwork(hosts):
+            sweep = ConnectSweep(timeout=0.3, concurrency=8)
+            states = {port: state for port, state, _ in sweep.run("127.22.0.1", range(2200, 2300))}
+            states.update((p, s) for p, s, _ in sweep.run("127.22.0.1", [22, 8080]))
+        assert states[2222] == "open" and states[22] == "open"
+        assert states[8080] == "filtered"
+        assert states[2223] == "closed"
+        assert len(states) == 102
+
+    def test_scanner_uses_sweep(self):
+        hosts = {"127.22.0.2": {5001: "open", 6001: "open"}}
+        with FakeNetwork(hosts):
+            scanner = PortScanner(ports=parse_ports("5000-7000"), timeout=0.3, use_nmap=False)
+            host = scanner._scan_host_socket("127.22.0.2")
+        assert [p.port for p in host.ports] == [5001, 6001]
+        assert host.closed_count == 1999
+
+    def test_rate_limit(self):
+        hosts = {"127.22.0.3": {3001: "open"}}
+        with FakeNetwork(hosts):
+            sweep = ConnectSweep(timeout=0.3, concurrency=64, limiter=RateLimiter(200))
+            start = time.monotonic()
+            states = {port: state for port, state, _ in sweep.run("127.22.0.3", range(3000, 3050))}
+            elapsed = time.monotonic() - start
+        assert states[3001] == "open" and len(states) == 50
+        assert elapsed >= 49 / 200 * 0.9  # 50 connessioni a 200/s
+
+
+class TestRateLimiter:
+    """Intervalli regolari tra le connessioni"""
+
+    def test_reserve(self):
+        now = [100.0]
+        limiter = RateLimiter(10, clock=lambda: now[0])
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == pytest.approx(0.1)
+        assert limiter.delay() == pytest.approx(0.2)
+        now[0] += 1.0  # Tempo inutilizzato non si accumula
+        assert limiter.reserve() == 0 and limiter.delay() == pytest.approx(0.1)
@@ -0,0 +1,77 @@
+"""
+Test per la profilazione per fase
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import pstats
+import time
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import PortScanner, HostResult
+from src.profiling import StageProfiler, profile_to
+
+
+class TestStageProfiler:
+    """Test per l'accumulo dei tempi per fase"""
+
+    def test_span_and_breakdown(self):
+        profiler = StageProfiler()
+        with profiler.span("report"):
+            time.sleep(0.02)
+        profiler.record("dns", 0.001)
+        profiler.record("dns", 0.003)
+        profiler.stop()
+
+        rows = {r["stage"]: r for r in profiler.breakdown()}
+        assert rows["report"]["total"] >= 0.02
+        assert rows["dns"]["count"] == 2
+        assert rows["dns"]["mean"] == 0.002
+        assert profiler.breakdown()[0]["stage"] == "report"
+
+    def test_add_host_timings(self):
+        profiler = StageProfiler()
+        profiler.add_host(HostResult(ip="10.0.0.1", timings={"dns": 0.5, "connect": 1.0}))
+        profiler.add_host(HostResult(ip="10.0.0.2", timings={"dns": 0.5}))
+        assert profiler.totals == {"dns": 1.0, "connect": 1.0}
+
+    def test_to_json(self, tmp_path):
+        profiler = StageProfiler()
+        profiler.record("scan", 1.0)
+        profiler.stop()
+        path = tmp_path / "profile.json"
+        profiler.to_json(str(path))
+        assert json.loads(path.read_text())["stages"][0]["stage"] == "scan"
+
+
+class TestScannerTimings:
+    """Tempi per fase registrati dallo scanner"""
+
+    def test_host_timings_recorded(self):
+        scanner = PortScanner(ports=[9], timeout=0.2, use_nmap=False)
+        host = scanner._scan_host_socket("127.0.0.1")
+        assert set(host.timings) == {"discovery", "dns", "connect"}
+        assert sum(host.timings.values()) <= host.scan_time + 0.01
+
+    def test_timings_serialized(self):
+        host = HostResult(ip="10.0.0.1", timings={"dns": 0.25})
+        assert HostResult.from_dict(host.to_dict()).timings == {"dns": 0.25}
+
+
+class TestProfileOutput:
+    """Output compatibile cProfile"""
+
+    def test_cprofile_stats(self, tmp_path):
+        path = tmp_path / "run.prof"
+        with profile_to(str(path)):
+            sum(range(1000))
+        stats = pstats.Stats(str(path))
+        assert stats.total_calls > 0
+
+    def test_disabled(self):
+        with profile_to(None):
+            pass
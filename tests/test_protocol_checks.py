@@ -0,0 +1,214 @@
+"""
+Test per i controlli di protocollo SMB, RDP e SSH
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import socket
+import struct
+import threading
+import time
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.classifier import PortClassifier, RiskLevel
+from src.inspection import run_inspections
+from src.protocol_checks import ProtocolInspector, parse_kexinit
+from src.scanner import HostResult, PortResult, ScanResult
+
+
+class _Server:
+    """Servizio TCP su loopback: handler(conn) per ogni connessione"""
+
+    def __init__(self, handler):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(8)
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.handler = handler
+        self.requests = []
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while self._running:
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            conn.settimeout(2)
+            with conn:
+                try:
+                    self.handler(self, conn)
+                except OSError:
+                    pass
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1)
+        self.sock.close()
+
+
+def _nbss(conn):
+    length = int.from_bytes(conn.recv(4)[1:], "big")
+    data = b""
+    while len(data) < length:
+        data += conn.recv(length - len(data))
+    return data
+
+
+def _smb_handler(smb1_enabled):
+    def handler(server, conn):
+        request = _nbss(conn)
+        server.requests.append(request[:4])
+        if request[:4] == b"\xfeSMB":
+            body = struct.pack("<HHH", 65, 0x01, 0x0311) + b"\x00" * 58
+            reply = request[:64] + body
+        elif smb1_enabled:
+            reply = request[:32] + b"\x11" + struct.pack("<H", 0) + b"\x03" + b"\x00" * 40
+        else:
+            return  # SMBv1 disattivato: connessione chiusa
+        conn.sendall(b"\x00" + len(reply).to_bytes(3, "big") + reply)
+    return handler
+
+
+def _rdp_handler(nla_required):
+    def handler(server, conn):
+        request = conn.recv(64)
+        (protocols,) = struct.unpack_from("<I", request, 15)
+        server.requests.append(protocols)
+        if protocols & 0x2:
+            negotiation = struct.pack("<BBHI", 0x02, 0, 8, 0x2)      # CredSSP scelto
+        elif nla_required:
+            negotiation = struct.pack("<BBHI", 0x03, 0, 8, 0x5)      # HYBRID_REQUIRED_BY_SERVER
+        else:
+            negotiation = struct.pack("<BBHI", 0x02, 0, 8, 0x1)      # TLS accettato
+        x224 = bytes([14, 0xD0, 0, 0, 0, 0, 0]) + negotiation
+        conn.sendall(struct.pack(">BBH", 3, 0, 4 + len(x224)) + x224)
+    return handler
+
+
+def _name_list(names):
+    data = ",".join(names).encode()
+    return struct.pack(">I", len(data)) + data
+
+
+KEXINIT = b"\x14" + b"\x00" * 16 + b"".join(_name_list(n) for n in (
+    ["curve25519-sha256", "diffie-hellman-group1-sha1"], ["ssh-ed25519"],
+    ["aes128-ctr", "aes128-cbc"], ["aes128-ctr"], ["hmac-sha2-256"], ["hmac-sha2-256"],
+    ["none"], ["none"], [], [],
+)) + b"\x00" + b"\x00" * 4
+
+
+def _ssh_handler(server, conn):
+    conn.sendall(b"Benvenuto\r\nSSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.1\r\n")
+    server.requests.append(conn.recv(64))
+    padding = 8 - (len(KEXINIT) + 5) % 8 + 8
+    packet = bytes([padding]) + KEXINIT + b"\x00" * padding
+    conn.sendall(struct.pack(">I", len(packet)) + packet)
+
+
+def _inspect(server, service):
+    host = HostResult(ip="127.0.0.1", state="up",
+                      ports=[PortResult(port=server.port, state="open", service=service)])
+    result = ScanResult(target="127.0.0.1", hosts=[host])
+    run_inspections(result, [ProtocolInspector(timeout=2)])
+    return host.ports[0]
+
+
+class TestSmb:
+    """Negoziazione SMB2 e rilevamento SMBv1"""
+
+    def test_smb1_enabled(self):
+        server = _Server(_smb_handler(smb1_enabled=True))
+        try:
+            port = _inspect(server, "microsoft-ds")
+        finally:
+            server.close()
+        smb = port.details["protocol"]
+        assert server.requests == [b"\xfeSMB", b"\xffSMB"]
+        assert smb["dialect"] == "3.1.1" and smb["smb1"] is True
+        assert smb["signing_required"] is False
+        assert [f["level"] for f in smb["findings"]] == ["critical", "warning"]
+
+    def test_smb1_disabled(self):
+        server = _Server(_smb_handler(smb1_enabled=False))
+        try:
+            smb = _inspect(server, "microsoft-ds").details["protocol"]
+        finally:
+            server.close()
+        assert smb["smb1"] is False
+        assert "SMBv1" not in smb["summary"]
+
+
+class TestRdp:
+    """Obbligo di NLA"""
+
+    def test_nla_required(self):
+        server = _Server(_rdp_handler(nla_required=True))
+        try:
+            rdp = _inspect(server, "ms-wbt-server").details["protocol"]
+        finally:
+            server.close()
+        assert server.requests == [0xB, 0x1]
+        assert rdp["nla_required"] is True and rdp["findings"] == []
+        assert rdp["security"] == "CredSSP (NLA)"
+
+    def test_nla_not_required(self):
+        server = _Server(_rdp_handler(nla_required=False))
+        try:
+            port = _inspect(server, "ms-wbt-server")
+        finally:
+            server.close()
+        rdp = port.details["protocol"]
+        assert rdp["nla_required"] is False
+        info = PortClassifier().classify_port(3389, "RDP", port.details)
+        assert info.risk_level == RiskLevel.CRITICAL
+        assert "NLA non obbligatoria" in info.risk_explanation
+
+
+class TestSsh:
+    """Banner e algoritmi dal KEXINIT"""
+
+    def test_banner_and_weak_algorithms(self):
+        server = _Server(_ssh_handler)
+        try:
+            port = _inspect(server, "ssh")
+        finally:
+            server.close()
+        ssh = port.details["protocol"]
+        assert server.requests[0].startswith(b"SSH-2.0-CyberSentinel")
+        assert ssh["banner"] == "SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.1"
+        assert port.version == "OpenSSH_8.9p1 Ubuntu-3ubuntu0.1"
+        assert ssh["algorithms"]["kex"] == ["curve25519-sha256", "diffie-hellman-group1-sha1"]
+        assert "aes128-cbc" in ssh["findings"][0]["title"]
+        assert "risk" not in ssh
+
+    def test_publickey_only_is_ok(self):
+        details = {"protocol": {"protocol": "ssh", "auth_methods": ["publickey"],
+                                "findings": [], "risk": "ok", "summary": "OpenSSH_9.9"}}
+        classifier = PortClassifier()
+        assert classifier.classify_port(22, "SSH").risk_level == RiskLevel.WARNING
+        assert classifier.classify_port(22, "SSH", details).risk_level == RiskLevel.OK
+
+    def test_parse_kexinit(self):
+        lists = parse_kexinit(KEXINIT)
+        assert lists["hostkey"] == ["ssh-ed25519"]
+        assert lists["mac_s2c"] == ["hmac-sha2-256"]
+
+
+class TestBudget:
+    """Tempo massimo per host"""
+
+    def test_host_budget_exhausted(self):
+        inspector = ProtocolInspector(timeout=2, host_budget=0)
+        host = HostResult(ip="127.0.0.1", ports=[PortResult(port=22, state="open")])
+        start = time.monotonic()
+        assert inspector.inspect(host, host.ports[0]) is None
+        assert time.monotonic() - start < 0.5
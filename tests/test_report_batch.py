@@ -0,0 +1,66 @@
+"""
+Test per la generazione di report in batch
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("reportlab")
+
+from src.scanner import ScanResult, HostResult, PortResult
+from src.report_batch import generate_reports, plan_outputs
+
+
+def _save_scans(directory, count):
+    paths = []
+    for i in range(count):
+        result = ScanResult(target=f"10.0.{i}.0/24")
+        result.hosts = [HostResult(
+            ip=f"10.0.{i}.10", state="up",
+            ports=[PortResult(port=445, state="open", service="SMB")]
+        )]
+        path = directory / f"sede_{i}.json"
+        result.to_json(str(path))
+        paths.append(str(path))
+    return paths
+
+
+class TestReportBatch:
+    """Test del batch di report"""
+
+    def test_plan_outputs(self, tmp_path):
+        jobs = plan_outputs([str(tmp_path / "a.json")], output_dir=str(tmp_path / "pdf"))
+        assert jobs[0][1] == str(tmp_path / "pdf" / "a.pdf")
+
+    def test_process_pool(self, tmp_path):
+        sources = _save_scans(tmp_path, 4)
+        reports = generate_reports(sources, output_dir=str(tmp_path / "pdf"), workers=2)
+
+        assert [r.ok for r in reports] == [True] * 4
+        assert [Path(r.output).stem for r in reports] == [f"sede_{i}" for i in range(4)]
+        for report in reports:
+            assert Path(report.output).read_bytes().startswith(b"%PDF")
+        assert len({r.worker_pid for r in reports}) <= 2
+
+    def test_sequential_with_scan_results(self, tmp_path):
+        result = ScanResult(target="192.168.1.0/24")
+        reports = generate_reports([result], output_dir=str(tmp_path), workers=1)
+        assert reports[0].ok
+        assert Path(reports[0].output).exists()
+
+    def test_errors_are_isolated(self, tmp_path):
+        sources = _save_scans(tmp_path, 1)
+        broken = tmp_path / "rotto.json"
+        broken.write_text("{non json")
+        done = []
+
+        reports = generate_reports(sources + [str(broken)], workers=2, callback=done.append)
+        assert reports[0].ok
+        assert not reports[1].ok
+        assert "JSONDecodeError" in reports[1].error
+        assert len(done) == 2
@@ -0,0 +1,136 @@
+"""
+Test per il generatore di report PDF
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import re
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("reportlab")
+
+from src.scanner import ScanResult, HostResult, PortResult
+from src.classifier import PortClassifier
+from src.report_generator import ReportGenerator
+
+
+def _smb_network(count):
+    result = ScanResult(target="10.0.0.0/22")
+    result.hosts = [
+        HostResult(
+            ip=f"10.0.{i // 250}.{i % 250 + 1}",
+            state="up",
+            ports=[
+                PortResult(port=445, state="open", service="SMB"),
+                PortResult(port=8080, state="open", service="HTTP Alternativo"),
+                PortResult(port=443, state="open", service="HTTPS"),
+            ]
+        )
+        for i in range(count)
+    ]
+    return result
+
+
+def _page_count(path):
+    return len(re.findall(rb"/Type /Page\b", Path(path).read_bytes()))
+
+
+class TestGroupedLayout:
+    """Layout raggruppato per porta"""
+
+    def test_group_by_port(self):
+        classified = PortClassifier().classify_scan_results(_smb_network(3).hosts)
+        groups = ReportGenerator._group_by_port(classified["critical"])
+        assert len(groups) == 1
+        assert len(groups[0]) == 3
+
+    def test_group_by_port_keeps_findings_per_host(self):
+        result = _smb_network(3)
+        result.hosts[0].ports[0].details = {"protocol": {"findings": [
+            {"level": "critical", "title": "SMBv1 attivo"}]}}
+        classified = PortClassifier().classify_scan_results(result.hosts)
+        groups = ReportGenerator._group_by_port(classified["critical"])
+        assert [[item["host"] for item in g] for g in groups] == [["10.0.0.2", "10.0.0.3"], ["10.0.0.1"]]
+        assert "SMBv1 attivo" in groups[1][0]["port_info"].risk_explanation
+        assert "SMBv1 attivo" not in groups[0][0]["port_info"].risk_explanation
+
+    def test_section_size_independent_of_hosts(self):
+        generator = ReportGenerator()
+        classifier = PortClassifier()
+        small = classifier.classify_scan_results(_smb_network(2).hosts)
+        large = classifier.classify_scan_results(_smb_network(400).hosts)
+
+        assert len(generator._create_critical_section(small["critical"])) == \
+            len(generator._create_critical_section(large["critical"]))
+        assert len(generator._create_warning_section(small["warning"])) == \
+            len(generator._create_warning_section(large["warning"]))
+
+    def test_host_list_truncated(self):
+        generator = ReportGenerator()
+        generator.MAX_HOSTS_LISTED = 10
+        classified = PortClassifier().classify_scan_results(_smb_network(25).hosts)
+        elements = generator._create_host_table(classified["critical"], generator.COLORS['critical'])
+        notes = [e for e in elements if hasattr(e, "text") and "altri 15 host" in e.text]
+        assert notes
+
+    def test_large_report_stays_compact(self, tmp_path):
+        output = tmp_path / "report.pdf"
+        ReportGenerator().generate(_smb_network(500), str(output))
+        assert output.read_bytes().startswith(b"%PDF")
+        assert _page_count(output) < 20
+
+    def test_text_from_hosts_is_escaped(self, tmp_path):
+        title = 'HTTP 200, "<b>x" & <script'
+        result = ScanResult(target="10.0.0.1")
+        result.hosts = [HostResult(ip="10.0.0.1", state="up", ports=[
+            PortResult(port=445, state="open", service="SMB",
+                       details={"http": {"summary": title}}),
+            PortResult(port=8080, state="open", service="HTTP Alternativo",
+                       details={"http": {"summary": title}}),
+        ])]
+        classified = result.classify(PortClassifier())
+        generator = ReportGenerator()
+        generator.generate(result, str(tmp_path / "report.pdf"), classified=classified)
+
+        paragraphs = (generator._create_critical_section(classified["critical"])
+                      + generator._create_warning_section(classified["warning"]))
+        texts = [p.getPlainText() for p in paragraphs if hasattr(p, "getPlainText")]
+        assert sum(title in text for text in texts) == 2
+
+    def test_single_host_report(self, tmp_path):
+        result = ScanResult(target="192.168.1.100")
+        result.hosts = [HostResult(
+            ip="192.168.1.100", state="up",
+            ports=[PortResult(port=3389, state="open", service="RDP")]
+        )]
+        output = tmp_path / "report.pdf"
+        ReportGenerator().generate(result, str(output))
+        assert _page_count(output) >= 2
+
+
+class TestStyleCache:
+    """Stili e flowable statici condivisi nel processo"""
+
+    def test_styles_shared_between_instances(self):
+        assert ReportGenerator().styles is ReportGenerator().styles
+
+    def test_static_flowables_are_copies(self):
+        generator = ReportGenerator()
+        first = generator._create_footer()
+        second = generator._create_footer()
+        assert len(first) == len(second)
+        assert all(a is not b for a, b in zip(first, second))
+        assert first[2].text == second[2].text
+
+    def test_repeated_reports_in_process(self, tmp_path):
+        generator = ReportGenerator()
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            generator.generate(_smb_network(3), str(tmp_path / name))
+        sizes = {(tmp_path / name).stat().st_size for name in ("a.pdf", "b.pdf", "c.pdf")}
+        assert _page_count(tmp_path / "c.pdf") == _page_count(tmp_path / "a.pdf")
+        assert all(size > 0 for size in sizes)
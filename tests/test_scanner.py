@@ -5,6 +5,7 @@ Sviluppato da ISIPC - Truant Bruno | https://isipc.com
 
 import pytest
 from unittest.mock import patch, MagicMock
+import errno
 import socket
 
 import sys
@@ -13,7 +14,7 @@ from pathlib import Path
 # Aggiungi src al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.scanner import PortScanner, PortResult, HostResult, ScanResult
+from src.scanner import PortScanner, PortResult, HostResult, ScanResult, port_state_from_errno
 from src.classifier import PortClassifier, RiskLevel, PortInfo
 
 
@@ -201,5 +202,111 @@ class TestIntegration:
         assert classified["summary"]["ok_count"] == 1        # 443
 
 
+class TestClassificationCache:
+    """Classificazione memorizzata su ScanResult"""
+
+    def _result(self):
+        result = ScanResult(target="192.168.1.0/24")
+        result.hosts = [HostResult(
+            ip="192.168.1.10", state="up",
+            ports=[PortResult(port=445, state="open", service="SMB")]
+        )]
+        return result
+
+    def test_classified_once(self, monkeypatch):
+        result = self._result()
+        calls = []
+        original = PortClassifier.classify_scan_results
+
+        def counting(self, hosts):
+            calls.append(len(hosts))
+            return original(self, hosts)
+
+        monkeypatch.setattr(PortClassifier, "classify_scan_results", counting)
+        first = result.classify()
+        assert result.classify(PortClassifier()) is first
+        assert len(calls) == 1
+
+    def test_invalidated_when_hosts_change(self):
+        result = self._result()
+        assert result.classify()["summary"]["critical_count"] == 1
+
+        result.hosts.append(HostResult(
+            ip="192.168.1.11", state="up",
+            ports=[PortResult(port=3389, state="open", service="RDP")]
+        ))
+        assert result.classify()["summary"]["critical_count"] == 2
+
+        result.hosts[0].ports.append(PortResult(port=443, state="open", service="HTTPS"))
+        assert result.classify()["summary"]["ok_count"] == 1
+
+        result.hosts = []
+        assert result.classify()["summary"]["total_open_ports"] == 0
+
+    def test_explicit_invalidation(self):
+        result = self._result()
+        result.classify()
+        result.hosts[0].ports[0].state = "closed"
+        result.invalidate_classification()
+        assert result.classify()["summary"]["critical_count"] == 0
+
+    def test_not_serialized(self):
+        result = self._result()
+        result.classify()
+        assert "_classified" not in result.to_dict()
+
+
+class TestPortStates:
+    """Stati delle porte dai codici di errore e host irraggiungibili"""
+
+    def test_errno_taxonomy(self):
+        assert port_state_from_errno(0) == "open"
+        assert port_state_from_errno(errno.ECONNREFUSED) == "closed"
+        assert port_state_from_errno(errno.EAGAIN) == "filtered"
+        assert port_state_from_errno(errno.ETIMEDOUT) == "filtered"
+        assert port_state_from_errno(errno.EHOSTUNREACH) == "unreachable"
+        assert port_state_from_errno(errno.ENETUNREACH) == "unreachable"
+        assert port_state_from_errno(errno.EBADF) == "error"
+
+    def _probe(self, states):
+        def probe(ip, port, cancel=None):
+            return PortResult(port=port, state=states.get(port, "closed"))
+        return probe
+
+    def test_unreachable_host_short_circuits(self):
+        scanner = PortScanner(ports=[21, 22, 23, 25], timeout=0.1, use_nmap=False)
+        probed = []
+        scanner._probe_port = lambda ip, port, cancel=None: probed.append(port) or PortResult(port, "unreachable")
+
+        host = scanner._scan_host_socket("192.0.2.1")
+        assert host.state == "unreachable"
+        assert probed == [80]  # solo la prima porta della discovery
+        assert host.closed_count == host.filtered_count == 0
+
+    def test_counts_recorded(self):
+        scanner = PortScanner(ports=[21, 22, 23, 25], timeout=0.1, use_nmap=False)
+        # Un rifiuto ICMP su una porta non ferma un host che ha già risposto
+        scanner._probe_port = self._probe({22: "open", 23: "filtered", 25: "unreachable"})
+
+        host = scanner._scan_host_socket("192.0.2.1")
+        assert host.state == "up"
+        assert [p.port for p in host.ports] == [22]
+        assert (host.closed_count, host.filtered_count) == (1, 2)
+
+        restored = HostResult.from_dict(host.to_dict())
+        assert (restored.closed_count, restored.filtered_count) == (1, 2)
+
+    def test_nmap_extraports_counted(self):
+        xml = """<nmaprun><host><status state="up"/>
+            <address addr="192.168.1.5" addrtype="ipv4"/>
+            <ports><extraports state="closed" count="17"/>
+            <port protocol="tcp" portid="22"><state state="open"/><service name="ssh"/></port>
+            <port protocol="tcp" portid="445"><state state="filtered"/></port>
+            </ports></host></nmaprun>"""
+        hosts = PortScanner(use_nmap=False)._parse_nmap_xml(xml)
+        assert [p.port for p in hosts[0].ports] == [22]
+        assert (hosts[0].closed_count, hosts[0].filtered_count) == (17, 1)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,243 @@
+"""
+Test per lo scheduler delle scansioni programmate
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import random
+import socket
+import threading
+import time
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import inspection
+from src.config import ScanProfile, parse_duration
+from src.scheduler import ScanScheduler, ScheduledScan, ScheduledScanRunner, load_schedule
+
+
+class FakeClock:
+    """Orologio controllato dai test"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class BlockingRunner:
+    """Runner che resta in esecuzione finché il test non lo rilascia"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+
+    def __call__(self, profile):
+        self.started.append(profile.name)
+        self.release.wait(5)
+
+
+def _profiles(count, interval=3600.0, jitter=0.1):
+    return [
+        ScheduledScan(name=f"p{i}", profile=ScanProfile(name=f"p{i}", targets=(f"10.0.0.{i + 1}",)),
+                      interval=interval, jitter=jitter)
+        for i in range(count)
+    ]
+
+
+class TestParsing:
+    """Test per la lettura della configurazione"""
+
+    def test_parse_duration(self):
+        assert parse_duration("30m") == 1800
+        assert parse_duration("6h") == 21600
+        assert parse_duration("1d") == 86400
+        assert parse_duration(90) == 90
+
+    def test_parse_duration_invalid(self):
+        with pytest.raises(ValueError):
+            parse_duration("ogni tanto")
+
+    def test_load_schedule(self):
+        config = {"schedule": {"profiles": [
+            {"name": "ufficio", "target": "192.168.1.0/24", "every": "1d", "ports": [22, 445]}
+        ]}}
+        profiles = load_schedule(config)
+        assert profiles[0].interval == 86400
+        assert profiles[0].profile.ports == "22,445"
+        assert profiles[0].target == "192.168.1.0/24"
+
+    def test_load_schedule_missing_cadence(self):
+        with pytest.raises(ValueError):
+            load_schedule({"schedule": {"profiles": [{"name": "x", "target": "10.0.0.1"}]}})
+
+
+class TestScheduler:
+    """Test per la pianificazione"""
+
+    def test_first_runs_are_spread(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(
+            _profiles(40), runner=lambda p: None, startup_spread=600,
+            clock=clock, rng=random.Random(1)
+        )
+        offsets = [s.next_run - clock.now for s in scheduler.state.values()]
+        assert all(0 <= o <= 600 for o in offsets)
+        # Non partono tutte nello stesso istante
+        assert len({round(o) for o in offsets}) > 30
+        scheduler.shutdown()
+
+    def test_jitter_bounds(self):
+        clock = FakeClock()
+        scheduler = ScanScheduler(
+            _profiles(1, interval=1000, jitter=0.2), runner=lambda p: None,
+            clock=clock, rng=random.Random(2)
+        )
+        for _ in range(50):
+            delay = scheduler._jittered(scheduler.profiles["p0"])
+            assert 800 <= delay <= 1200
+        scheduler.shutdown()
+
+    def test_concurrency_limit_and_skip_if_running(self):
+        clock = FakeClock()
+        runner = BlockingRunner()
+        scheduler = ScanScheduler(
+            _profiles(3, interval=60, jitter=0), runner=runner, max_concurrent=2,
+            startup_spread=0, clock=clock
+        )
+
+        started = scheduler.run_pending()
+        assert len(started) == 2
+        waiting = ({"p0", "p1", "p2"} - set(started)).pop()
+        assert scheduler.state[waiting].next_run <= clock.now
+
+        # Un intervallo dopo: i profili ancora in corso saltano il turno
+        clock.now += 60
+        assert scheduler.run_pending() == []
+        for name in started:
+            assert scheduler.state[name].skipped == 1
+
+        runner.release.set()
+        deadline = time.monotonic() + 5
+        while scheduler.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.run_pending() == [waiting]
+        scheduler.shutdown()
+
+    def test_restart_does_not_run_everything(self, tmp_path):
+        state_file = tmp_path / "state.json"
+        clock = FakeClock()
+        profiles = _profiles(20, interval=3600, jitter=0)
+
+        first = ScanScheduler(profiles, state_file=str(state_file), runner=lambda p: None,
+                              max_concurrent=20, startup_spread=0, clock=clock)
+        assert len(first.run_pending()) == 20
+        first.shutdown()
+        assert all(s.runs == 1 for s in first.state.values())
+
+        # Riavvio a metà intervallo: nessuna scansione immediata
+        clock.now += 1800
+        second = ScanScheduler(profiles, state_file=str(state_file), runner=lambda p: None,
+                               clock=clock)
+        assert second.run_pending() == []
+        assert all(s.next_run == clock.now + 1800 for s in second.state.values())
+        second.shutdown()
+
+    def test_overdue_after_downtime_are_spread(self, tmp_path):
+        state_file = tmp_path / "state.json"
+        clock = FakeClock()
+        profiles = _profiles(20, interval=3600, jitter=0)
+
+        first = ScanScheduler(profiles, state_file=str(state_file), runner=lambda p: None,
+                              max_concurrent=20, startup_spread=0, clock=clock)
+        first.run_pending()
+        first.shutdown()
+
+        # Fermo per un giorno intero: le scansioni arretrate vengono distribuite
+        clock.now += 86400
+        second = ScanScheduler(profiles, state_file=str(state_file), runner=lambda p: None,
+                               startup_spread=900, clock=clock, rng=random.Random(3))
+        offsets = [s.next_run - clock.now for s in second.state.values()]
+        assert all(0 <= o <= 900 for o in offsets)
+        assert len(second.run_pending()) <= 1
+        second.shutdown()
+
+    def test_waiting_for_slot_does_not_rewrite_state(self, tmp_path):
+        clock = FakeClock()
+        runner = BlockingRunner()
+        scheduler = ScanScheduler(
+            _profiles(2, interval=60, jitter=0), state_file=str(tmp_path / "state.json"),
+            runner=runner, max_concurrent=1, startup_spread=0, clock=clock
+        )
+        assert len(scheduler.run_pending()) == 1
+        saves = []
+        scheduler._save_state = lambda: saves.append(1)
+        for _ in range(10):
+            assert scheduler.run_pending() == []
+        assert saves == []
+        runner.release.set()
+        scheduler.shutdown()
+
+    def test_run_forever_waits_for_free_slot(self):
+        runner = BlockingRunner()
+        scheduler = ScanScheduler(_profiles(2, interval=3600, jitter=0), runner=runner,
+                                  max_concurrent=1, startup_spread=0)
+        calls = []
+        run_pending = scheduler.run_pending
+        scheduler.run_pending = lambda: calls.append(1) or run_pending()
+
+        thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+        thread.start()
+        time.sleep(0.5)
+        assert len(runner.started) == 1
+        assert len(calls) <= 2  # Nessun ciclo mentre lo slot è occupato
+
+        runner.release.set()  # La fine della scansione sveglia il ciclo
+        deadline = time.monotonic() + 5
+        while len(runner.started) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(runner.started) == 2
+        scheduler.stop()
+        thread.join(5)
+
+
+class TestRunner:
+    """Esecutore di default"""
+
+    def test_runs_inspections_like_cli(self, tmp_path, monkeypatch):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(4)
+        port = server.getsockname()[1]
+        seen = []
+
+        class Inspector:
+            name, workers = "http", 1
+
+            def wants(self, port_result):
+                return True
+
+            def inspect(self, host, port_result):
+                seen.append(port_result.port)
+                return {"status": 200}
+
+        monkeypatch.setattr(inspection, "default_inspectors", lambda timeout: [Inspector()])
+        profile = ScheduledScan(
+            name="web",
+            profile=ScanProfile(name="web", targets=("127.0.0.1",), ports=str(port),
+                                timeout=0.5, backend="socket", report=False),
+            interval=60, output_dir=str(tmp_path)
+        )
+        try:
+            ScheduledScanRunner()(profile)
+        finally:
+            server.close()
+        assert seen == [port]
+        saved = json.loads(next(tmp_path.glob("web_*.json")).read_text(encoding="utf-8"))
+        assert saved["hosts"][0]["ports"][0]["details"]["http"] == {"status": 200}
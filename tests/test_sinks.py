@@ -0,0 +1,210 @@
+"""
+Test per i canali di notifica
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import socket
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import HostResult, PortResult
+from src.sinks import (
+    EmailSink, FileSink, Sink, SinkPipeline, SyslogSink, WebhookSink, sinks_from_config
+)
+
+
+def _host(i):
+    return HostResult(ip=f"10.0.{i // 256}.{i % 256}", state="up",
+                      ports=[PortResult(port=22, state="open", service="ssh")])
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        with server.lock:
+            status = server.statuses.pop(0) if server.statuses else 200
+            if status == 200:
+                server.batches.append(json.loads(body)["hosts"])
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class _WebhookServer:
+    """Webhook su loopback: risponde con gli stati indicati, poi 200"""
+
+    def __init__(self, statuses=()):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _WebhookHandler)
+        self.httpd.statuses = list(statuses)
+        self.httpd.batches = []
+        self.httpd.lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/hook"
+        threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                         daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Server SMTP minimo: accetta ogni messaggio"""
+
+    def handle(self):
+        self.wfile.write(b"220 test ESMTP\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                self.wfile.write(b"250 test\r\n")
+            elif command == b"DATA":
+                self.wfile.write(b"354 fine con .\r\n")
+                data = b""
+                while (line := self.rfile.readline()) != b".\r\n":
+                    data += line[1:] if line.startswith(b"..") else line
+                self.server.messages.append(message_from_bytes(data))
+                self.wfile.write(b"250 ok\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 ciao\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+
+class TestWebhook:
+    """Consegna in ordine, lotti e nuovi tentativi"""
+
+    def test_ordered_batches_with_retry(self):
+        server = _WebhookServer(statuses=[503])
+        pipeline = SinkPipeline([WebhookSink(server.url, timeout=2)], backoff=0.05)
+        try:
+            for i in range(120):
+                pipeline(_host(i))
+            stats = pipeline.close(timeout=10)["webhook"]
+        finally:
+            server.close()
+
+        received = [h["ip"] for batch in server.httpd.batches for h in batch]
+        assert received == [_host(i).ip for i in range(120)]
+        assert all(len(batch) <= WebhookSink.batch_size for batch in server.httpd.batches)
+        assert stats.delivered == 120 and stats.retries == 1 and stats.failed == 0
+
+    def test_client_error_not_retried(self):
+        server = _WebhookServer(statuses=[400])
+        pipeline = SinkPipeline([WebhookSink(server.url, timeout=2)], backoff=0.05)
+        try:
+            pipeline(_host(1))
+            stats = pipeline.close(timeout=10)["webhook"]
+        finally:
+            server.close()
+        assert stats.failed == 1 and stats.retries == 0
+
+
+class TestOtherSinks:
+    """Email, syslog e file"""
+
+    def test_email_batch(self):
+        smtpd = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpHandler)
+        smtpd.messages = []
+        threading.Thread(target=smtpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        sink = EmailSink("127.0.0.1", "admin@example.com", smtp_port=smtpd.server_address[1],
+                         starttls=False, timeout=2)
+        try:
+            sink.send([h.to_dict() for h in map(_host, range(3))])
+        finally:
+            smtpd.shutdown()
+            smtpd.server_close()
+
+        (message,) = smtpd.messages
+        assert message["Subject"] == "CyberSentinel: 3 host, 3 porte aperte"
+        text, attachment = [part for part in message.walk() if not part.is_multipart()]
+        assert "10.0.0.2: 22/ssh" in text.get_payload(decode=True).decode()
+        assert len(json.loads(attachment.get_payload(decode=True))["hosts"]) == 3
+
+    def test_syslog_datagram(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(2)
+        sink = SyslogSink(f"127.0.0.1:{receiver.getsockname()[1]}", facility="local0")
+        try:
+            sink.send([_host(5).to_dict()])
+            datagram = receiver.recv(65535).decode()
+        finally:
+            sink.close()
+            receiver.close()
+        header, _, payload = datagram.partition(" host - ")
+        assert header.startswith("<132>1 ")  # local0 (16) * 8 + warning (4)
+        assert json.loads(payload)["ip"] == "10.0.0.5"
+
+    def test_file_with_context(self, tmp_path):
+        path = tmp_path / "out" / "host.jsonl"
+        pipeline = SinkPipeline([FileSink(str(path))])
+        pipeline.submit(_host(1), profile="ufficio")
+        pipeline.submit(_host(2), profile="ufficio")
+        pipeline.close()
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [(r["profile"], r["ip"]) for r in records] == [("ufficio", "10.0.0.1"), ("ufficio", "10.0.0.2")]
+
+
+class _BlockedSink(Sink):
+    name = "lento"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.received = []
+
+    def send(self, batch):
+        self.release.wait(5)
+        self.received.extend(batch)
+
+
+class TestBackPressure:
+    """La coda piena scarta host invece di bloccare lo scanner"""
+
+    def test_full_queue_drops(self):
+        sink = _BlockedSink()
+        pipeline = SinkPipeline([sink], queue_size=10)
+        start = time.monotonic()
+        for i in range(200):
+            pipeline(_host(i))
+        assert time.monotonic() - start < 0.5
+        sink.release.set()
+        stats = pipeline.close(timeout=5)["lento"]
+        assert stats.dropped > 0
+        assert stats.delivered + stats.dropped == 200
+        ips = [h["ip"] for h in sink.received]
+        assert ips == sorted(ips, key=lambda ip: tuple(map(int, ip.split("."))))
+
+
+class TestConfig:
+    """Sezione 'notifications'"""
+
+    def test_enabled_sinks(self, tmp_path):
+        config = {"notifications": {
+            "email": {"enabled": False, "smtp_server": "smtp.example.com"},
+            "webhook": {"enabled": True, "url": "https://hooks.example.com/x"},
+            "file": {"enabled": True, "path": str(tmp_path / "h.jsonl")},
+        }}
+        assert [s.name for s in sinks_from_config(config)] == ["webhook", "file"]
+        assert sinks_from_config({}) == []
+
+    def test_incomplete_sink(self):
+        with pytest.raises(ValueError, match="url"):
+            sinks_from_config({"notifications": {"webhook": {"enabled": True}}})
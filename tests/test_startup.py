@@ -0,0 +1,88 @@
+"""
+Test per l'avvio rapido della CLI (import pigri, nmap verificato una volta)
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import shutil
+import subprocess
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import scanner as scanner_module
+from src.scanner import PortScanner
+from src.reports import create_report_generator, report_format_for
+from benchmarks.suite import first_probe
+
+ROOT = Path(__file__).parent.parent
+
+
+def _run_python(code, env=None):
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+
+
+class TestLazyImports:
+    """reportlab viene caricato solo per i report PDF"""
+
+    def test_package_import_is_lazy(self):
+        proc = _run_python(
+            "import sys, src\n"
+            "from src.scanner import PortScanner\n"
+            "from src.html_report import HtmlReportGenerator\n"
+            "print('reportlab' in sys.modules)"
+        )
+        assert proc.stdout.strip() == "False", proc.stderr
+
+    def test_lazy_exports(self):
+        import src
+        assert src.PortScanner is PortScanner
+
+    def test_report_backends(self):
+        assert report_format_for("rete.HTML") == "html"
+        assert report_format_for("rete.pdf") == "pdf"
+        assert report_format_for("rete.pdf", "html") == "html"
+        assert type(create_report_generator("html")).__name__ == "HtmlReportGenerator"
+
+
+class TestNmapCheck:
+    """Verifica di nmap memorizzata per processo"""
+
+    def test_checked_once(self, monkeypatch):
+        calls = []
+
+        class Completed:
+            returncode = 0
+
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            return Completed()
+
+        monkeypatch.setattr(PortScanner, "_nmap_checked", None)
+        monkeypatch.setattr(shutil, "which", lambda name: "/usr/bin/nmap")
+        monkeypatch.setattr(scanner_module.subprocess, "run", fake_run)
+
+        for _ in range(3):
+            assert PortScanner(ports=[80])._nmap_available
+        assert len(calls) == 1
+
+    def test_not_spawned_when_missing(self, monkeypatch):
+        monkeypatch.setattr(PortScanner, "_nmap_checked", None)
+        monkeypatch.setattr(shutil, "which", lambda name: None)
+        monkeypatch.setattr(scanner_module.subprocess, "run", None)
+        assert not PortScanner(ports=[80]).use_nmap
+
+
+class TestFirstProbe:
+    """La CLI --json-only arriva alla prima sonda senza caricare il superfluo"""
+
+    def test_json_only_first_probe(self):
+        # Il tempo di avvio è misurato dai benchmark (python -m benchmarks.suite --only startup)
+        elapsed, reportlab_loaded, nmap_checked = first_probe()
+        assert elapsed > 0
+        assert not reportlab_loaded
+        assert not nmap_checked
@@ -0,0 +1,116 @@
+"""
+Test per la generazione dei target IPv4/IPv6
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import ipaddress
+import socket
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import PortScanner
+from src import targets
+
+
+class TestNetworks:
+    """Indirizzi per reti piccole e grandi"""
+
+    def test_small_network_enumerated(self):
+        hosts = targets.hosts_for_network(ipaddress.ip_network("2001:db8::/126"))
+        assert hosts == ["2001:db8::1", "2001:db8::2", "2001:db8::3"]
+
+    def test_large_ipv4_truncated(self):
+        hosts = targets.hosts_for_network(ipaddress.ip_network("10.0.0.0/8"), limit=100)
+        assert len(hosts) == 100 and hosts[0] == "10.0.0.1"
+
+    def test_ipv6_prefix_not_enumerated(self):
+        network = ipaddress.ip_network("2001:db8:10::/64")
+        hitlist = ["2001:db8:10::beef:1", "2001:db8:99::1", "2001:db8:10::1"]
+        hosts = targets.hosts_for_network(network, limit=200, hitlist=hitlist, neighbours=False)
+
+        assert hosts[:2] == ["2001:db8:10::beef:1", "2001:db8:10::1"]
+        assert "2001:db8:99::1" not in hosts     # fuori dalla rete
+        assert "2001:db8:10::2" in hosts         # byte basso
+        assert len(hosts) == len(set(hosts)) == 200
+
+    def test_short_prefix_uses_low_subnets(self):
+        network = ipaddress.ip_network("2001:db8::/48")
+        hosts = list(targets.pattern_candidates(network, low_bytes=2))
+        assert hosts[:3] == ["2001:db8::1", "2001:db8:0:1::1", "2001:db8:0:2::1"]
+        assert "2001:db8:0:100::443" in hosts
+        assert all(ipaddress.ip_address(h) in network for h in hosts)
+
+
+class TestNeighbours:
+    """Lettura della neighbour cache"""
+
+    def test_parse_ip_neigh(self):
+        output = (
+            "fe80::1 dev eth0 lladdr 00:11:22:33:44:55 router REACHABLE\n"
+            "2001:db8::20 dev eth0 lladdr 00:11:22:33:44:66 STALE\n"
+            "2001:db8::21 dev eth0 FAILED\n"
+            "ff02::1 dev eth0 lladdr 33:33:00:00:00:01 NOARP\n"
+        )
+        assert targets.parse_neighbours(output) == ["fe80::1%eth0", "2001:db8::20"]
+
+    def test_parse_ndp(self):
+        output = (
+            "Neighbor                        Linklayer Address  Netif Expire    S Flags\n"
+            "fe80::1%en0                     0:11:22:33:44:55     en0 23h59m58s S R\n"
+        )
+        assert targets.parse_neighbours(output) == ["fe80::1%en0"]
+
+    def test_zone_without_ipaddress_support(self, monkeypatch):
+        # ipaddress accetta %zona solo da Python 3.9: simula la 3.8
+        original = ipaddress.ip_address
+
+        def ip_address(address):
+            if "%" in str(address):
+                raise ValueError(f"{address} does not appear to be an IPv4 or IPv6 address")
+            return original(address)
+
+        monkeypatch.setattr(ipaddress, "ip_address", ip_address)
+        assert targets.normalize_address("FE80::0001%eth0") == "fe80::1%eth0"
+        assert targets.in_network("fe80::1%eth0", ipaddress.ip_network("fe80::/64"))
+        assert targets.parse_neighbours("fe80::1%en0  0:11:22:33:44:55  en0 S R\n") == ["fe80::1%en0"]
+        assert PortScanner.validate_target("fe80::1%eth0")
+
+
+class TestDualStack:
+    """Risoluzione e connessioni IPv6"""
+
+    def test_resolve_localhost(self):
+        assert "127.0.0.1" in targets.resolve("localhost")
+        assert targets.resolve("nome.inesistente.invalid") == []
+
+    def test_probe_ipv6_loopback(self):
+        try:
+            listener = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+            listener.bind(("::1", 0))
+        except OSError:
+            pytest.skip("IPv6 non disponibile")
+        listener.listen(1)
+        port = listener.getsockname()[1]
+        try:
+            scanner = PortScanner(ports=[port], timeout=0.5, use_nmap=False)
+            assert scanner._probe_port("::1", port).state == "open"
+            assert scanner._get_hosts_from_target("::1") == ["::1"]
+        finally:
+            listener.close()
+
+    def test_nmap_ipv6_groups_and_xml(self):
+        scanner = PortScanner(use_nmap=False, hitlist=["2001:db8::5"])
+        assert scanner._nmap_target_groups("192.168.1.0/24") == [(False, ["192.168.1.0/24"])]
+        groups = scanner._nmap_target_groups("2001:db8::/64")
+        assert groups[0][0] is True and groups[0][1][0] == "2001:db8::5"
+
+        xml = """<nmaprun><host><status state="up"/>
+            <address addr="2001:db8::5" addrtype="ipv6"/>
+            <ports><port protocol="tcp" portid="22"><state state="open"/></port></ports>
+            </host></nmaprun>"""
+        assert scanner._parse_nmap_xml(xml)[0].ip == "2001:db8::5"
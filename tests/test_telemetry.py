@@ -0,0 +1,131 @@
+"""
+Test per la telemetria di scansione
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import io
+import socket
+import urllib.request
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scanner import PortScanner, HostResult
+from src.sweep import ConnectSweep
+from src.telemetry import (
+    ScanTelemetry, LatencyHistogram, LiveProgress, MetricsServer
+)
+from benchmarks.fakenet import FakeNetwork
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLatencyHistogram:
+    """Test per l'istogramma di latenza"""
+
+    def test_buckets_and_quantile(self):
+        h = LatencyHistogram(bounds=(0.01, 0.1, 1.0))
+        for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+            h.observe(value)
+        assert h.counts == [1, 2, 1, 1]
+        assert h.count == 5
+        assert h.quantile(0.5) == 0.1
+        assert h.quantile(1.0) == float("inf")
+
+
+class TestScanTelemetry:
+    """Test per le metriche derivate"""
+
+    def test_rates_and_eta(self):
+        clock = FakeClock()
+        t = ScanTelemetry(clock=clock)
+        t.add_hosts(10)
+        for state in ("open", "closed", "filtered", "filtered"):
+            t.probe_started()
+            t.probe_finished(state, 0.01)
+        t.host_finished(HostResult(ip="10.0.0.1", state="up"))
+        t.host_finished(HostResult(ip="10.0.0.2", state="down"))
+        clock.now = 2.0
+
+        assert t.in_flight == 0
+        assert t.probes_per_second == 2.0
+        assert t.timeout_ratio == 0.5
+        assert t.hosts_up == 1
+        assert t.eta == pytest.approx(8.0)
+
+    def test_eta_unknown_before_first_host(self):
+        t = ScanTelemetry()
+        t.add_hosts(5)
+        assert t.eta is None
+        assert "ETA --" in t.format_status()
+
+    def test_prometheus_format(self):
+        t = ScanTelemetry()
+        t.add_hosts(1)
+        t.probe_started()
+        t.probe_finished("open", 0.002)
+        text = t.to_prometheus()
+        assert 'cybersentinel_probes_total{state="open"} 1' in text
+        assert 'cybersentinel_stage_seconds_bucket{stage="connect",le="+Inf"} 1' in text
+        assert "cybersentinel_hosts_planned 1" in text
+
+
+class TestIntegration:
+    """Telemetria collegata allo scanner"""
+
+    def test_scanner_reports_probes_and_stages(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        port = server.getsockname()[1]
+
+        telemetry = ScanTelemetry()
+        scanner = PortScanner(ports=[port], timeout=0.5, use_nmap=False, telemetry=telemetry)
+        scanner.scan("127.0.0.1")
+        server.close()
+
+        snapshot = telemetry.snapshot()
+        assert snapshot["hosts_completed"] == snapshot["hosts_planned"] == 1
+        assert snapshot["probes_by_state"] == {"open": 1}
+        assert {"discovery", "dns", "connect", "host"} <= set(snapshot["stages"])
+
+    def test_sweep_reports_connections_in_flight(self):
+        hosts = {"127.21.1.1": {p: "filtered" for p in range(20000, 20008)}}
+        telemetry = ScanTelemetry()
+        sweep = ConnectSweep(timeout=0.3, concurrency=8, telemetry=telemetry)
+        with FakeNetwork(hosts):
+            outcomes = sweep.run("127.21.1.1", range(20000, 20008))
+            next(outcomes)
+            assert telemetry.in_flight == 7  # Le altre connessioni sono ancora in volo
+            outcomes.close()
+        assert telemetry.in_flight == 0
+        assert telemetry.probes_total == 1
+
+    def test_metrics_endpoint(self):
+        telemetry = ScanTelemetry()
+        telemetry.add_hosts(3)
+        server = MetricsServer(telemetry, port=0).start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+                body = response.read().decode()
+        finally:
+            server.stop()
+        assert "cybersentinel_hosts_planned 3" in body
+
+    def test_live_progress_without_tty(self):
+        telemetry = ScanTelemetry()
+        stream = io.StringIO()
+        live = LiveProgress(telemetry, interval=0.01, stream=stream).start()
+        telemetry.add_hosts(2)
+        live.stop()
+        assert stream.getvalue()
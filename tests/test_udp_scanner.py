@@ -0,0 +1,147 @@
+"""
+Test per lo scanner UDP
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import socket
+import threading
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.classifier import PortClassifier
+from src.scanner import HostResult, PortResult, merge_hosts
+from src.udp_scanner import UdpScanner, RttEstimator, UDP_PAYLOADS, describe_response, icmp_state
+
+
+class _UdpServer:
+    """Servizio UDP su loopback che risponde dal datagramma numero `answer_from`"""
+
+    def __init__(self, reply=b"pong", answer_from=1):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.reply = reply
+        self.answer_from = answer_from
+        self.received = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while self._running:
+            try:
+                _, address = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.received += 1
+            if self.received >= self.answer_from:
+                self.sock.sendto(self.reply, address)
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1)
+        self.sock.close()
+
+
+def _free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestUdpScanner:
+    """Sonde, ritrasmissioni e stati su loopback"""
+
+    def test_open_closed_filtered(self):
+        server = _UdpServer()
+        retry = _UdpServer(answer_from=2)
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(("127.0.0.1", 0))
+        closed = _free_udp_port()
+        try:
+            ports = [server.port, retry.port, silent.getsockname()[1], closed]
+            scanner = UdpScanner(ports=ports, timeout=0.2, retries=2, sockets=2)
+            host = scanner.scan(["127.0.0.1"])[0]
+        finally:
+            server.close()
+            retry.close()
+            silent.close()
+
+        assert sorted(p.port for p in host.ports) == sorted([server.port, retry.port])
+        assert all(p.protocol == "udp" for p in host.ports)
+        assert retry.received >= 2
+        assert host.state == "up"
+        assert host.filtered_count == 1
+        if sys.platform.startswith("linux"):
+            assert host.closed_count == 1
+
+    def test_many_hosts_one_pass(self):
+        server = _UdpServer()
+        try:
+            ips = ["127.0.0.1"] + [f"127.0.9.{i}" for i in range(1, 40)]
+            scanner = UdpScanner(ports=[server.port], timeout=0.2, retries=0, max_in_flight=8)
+            hosts = scanner.scan(ips)
+        finally:
+            server.close()
+        assert [h.ip for h in hosts] == ips
+        assert [h.ip for h in hosts if h.ports] == ["127.0.0.1"]
+
+
+class TestHelpers:
+    """Timeout adattivo, ICMP, payload e unione con i risultati TCP"""
+
+    def test_rtt_estimator(self):
+        rtt = RttEstimator(1.0, minimum=0.05)
+        assert rtt.timeout == 1.0
+        for _ in range(20):
+            rtt.observe(0.01)
+        assert rtt.timeout == pytest.approx(0.05)
+        rtt.observe(5.0)
+        assert rtt.timeout == 1.0
+
+    def test_icmp_state(self):
+        assert icmp_state(2, 3, 3) == "closed"
+        assert icmp_state(2, 3, 1) == "unreachable"
+        assert icmp_state(2, 3, 13) == "filtered"
+        assert icmp_state(3, 1, 4) == "closed"
+        assert icmp_state(0, 0, 0) is None
+
+    def test_payloads_and_versions(self):
+        snmp = UDP_PAYLOADS[161]
+        assert snmp[1] == len(snmp) - 2
+        reply = b"\x30\x30" + b"\x06\x08\x2b\x06\x01\x02\x01\x01\x01\x00\x04\x09RouterOS6"
+        assert describe_response(161, reply) == "RouterOS6"
+        assert describe_response(1900, b"HTTP/1.1 200 OK\r\nSERVER: Linux UPnP/1.0\r\n\r\n") == "Linux UPnP/1.0"
+
+    def test_merge_hosts(self):
+        tcp = [HostResult(ip="10.0.0.1", state="up", ports=[PortResult(port=22, state="open")])]
+        udp = [
+            HostResult(ip="10.0.0.1", state="up", closed_count=3,
+                       ports=[PortResult(port=161, state="open", protocol="udp")]),
+            HostResult(ip="10.0.0.2", state="unknown", filtered_count=9),
+        ]
+        merged = merge_hosts(tcp, udp)
+        assert [h.ip for h in merged] == ["10.0.0.1"]
+        assert [(p.port, p.protocol) for p in merged[0].ports] == [(22, "tcp"), (161, "udp")]
+        assert merged[0].closed_count == 3
+
+    def test_classification_by_protocol(self):
+        classifier = PortClassifier()
+        assert classifier.classify_port(161, protocol="udp").service == "SNMP"
+        assert classifier.classify_port(161).service == "Sconosciuto"  # SNMP è solo UDP
+        assert "(UDP)" in classifier.classify_port(11211, protocol="udp").description
+        assert "UDP" not in classifier.classify_port(11211).risk_explanation
+        assert classifier.classify_port(22, protocol="udp").service == "SSH"  # Voce per sola porta
+
+        host = HostResult(ip="10.0.0.1", state="up", ports=[
+            PortResult(port=123, state="open"), PortResult(port=123, state="open", protocol="udp")])
+        services = [e["port_info"].service for e in classifier.classify_scan_results([host])["warning"]]
+        assert sorted(services) == ["NTP", "Sconosciuto"]
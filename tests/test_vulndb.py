@@ -0,0 +1,105 @@
+"""
+Test per l'indice delle vulnerabilità
+Sviluppato da ISIPC - Truant Bruno | https://isipc.com
+"""
+
+import json
+import random
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.classifier import PortClassifier, RiskLevel
+from src.inspection import run_inspections
+from src.scanner import HostResult, PortResult, ScanResult
+from src.vulndb import Advisory, VulnerabilityIndex, VulnerabilityMatcher, load_index, version_key
+
+
+class TestVersions:
+    """Ordinamento delle versioni e riconoscimento dei banner"""
+
+    def test_version_key(self):
+        ordered = ["4.3", "4.3p2", "8.2p1", "8.9", "9.8p1", "9.10", "10.0"]
+        assert sorted(ordered, key=version_key) == ordered
+        assert version_key("1.0.1") < version_key("1.0.1g") < version_key("1.0.2")
+
+    def test_identify_banners(self):
+        index = load_index()
+        assert index.identify("OpenSSH_9.6p1 Ubuntu-3ubuntu13") == [("openssh", "9.6p1")]
+        assert index.identify("Apache/2.4.49 (Unix) OpenSSL/1.0.2k PHP/7.2.10") == [
+            ("apache httpd", "2.4.49"), ("openssl", "1.0.2k"), ("php", "7.2.10")]
+        assert index.identify("Microsoft-IIS/10.0") == [("microsoft iis", "10.0")]
+        assert index.identify("Apache Tomcat/Coyote JSP engine 1.1") == []
+        assert index.identify("phpMyAdmin 5.2") == []
+
+
+class TestIndex:
+    """Ricerca per intervalli"""
+
+    def test_bundled_dataset(self):
+        index = load_index()
+        ids = {a.id for _, _, a in index.lookup("Apache httpd 2.4.50")}
+        assert ids == {"CVE-2021-42013", "CVE-2023-25690"}
+        assert index.lookup("Apache httpd 2.4.62") == []
+        assert [a.id for _, _, a in index.lookup("OpenSSH 9.8p1")] == []
+        assert [a.id for _, _, a in index.lookup("OpenSSH 9.7p1")] == ["CVE-2024-6387"]
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+
+        def version():
+            return f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 30)}"
+
+        advisories = []
+        for i in range(3000):
+            low, high = sorted((version(), version()), key=version_key)
+            ranges = ((None if i % 17 == 0 else low, None if i % 23 == 0 else high),)
+            advisories.append(Advisory(id=f"ADV-{i}", product=f"prodotto{i % 20}", title="", ranges=ranges))
+        index = VulnerabilityIndex(advisories)
+        assert len(index) == 3000
+
+        def covers(advisory, v):
+            low, high = advisory.ranges[0]
+            return ((low is None or version_key(low) <= version_key(v))
+                    and (high is None or version_key(v) < version_key(high)))
+
+        for _ in range(300):
+            product, v = f"prodotto{rng.randint(0, 19)}", version()
+            expected = {a.id for a in advisories if a.product == product and covers(a, v)}
+            assert {a.id for a in index.match(product, v)} == expected
+
+    def test_extra_dataset(self, tmp_path):
+        extra = tmp_path / "interne.json"
+        extra.write_text(json.dumps({
+            "aliases": {"gestionale": ["acme gestionale"]},
+            "advisories": [{"id": "INT-1", "product": "gestionale", "title": "Password di default",
+                            "ranges": [[None, "3.0"]], "exploited": True}],
+        }), encoding="utf-8")
+        index = load_index((str(extra),))
+        assert [a.id for _, _, a in index.lookup("ACME Gestionale 2.7")] == ["INT-1"]
+        assert index.lookup("OpenSSH 9.7p1")  # dataset incluso sempre presente
+
+
+class TestMatcher:
+    """Fase di ispezione e classificazione"""
+
+    def test_exploited_version_is_critical(self):
+        host = HostResult(ip="10.0.0.5", ports=[
+            PortResult(port=80, state="open", service="http", version="Apache httpd 2.4.49"),
+            PortResult(port=22, state="open", service="ssh", version="OpenSSH 9.9p1"),
+            PortResult(port=8080, state="open", service="http"),
+        ])
+        result = ScanResult(target="10.0.0.5", hosts=[host])
+        assert run_inspections(result, [VulnerabilityMatcher()]) == {"vulns": 1}
+
+        vulns = host.ports[0].details["vulns"]
+        assert {a["id"] for a in vulns["advisories"] if a["exploited"]} == {"CVE-2021-41773", "CVE-2021-42013"}
+        assert "vulns" not in host.ports[1].details
+
+        classified = result.classify(PortClassifier())
+        entry = classified["critical"][0]
+        assert entry["port_info"].port == 80
+        assert entry["port_info"].risk_level == RiskLevel.CRITICAL
+        assert "CVE-2021-41773" in entry["port_info"].risk_explanation